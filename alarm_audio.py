@@ -0,0 +1,368 @@
+import array
+import io
+import math
+import os
+import sys
+import threading
+import time
+import wave
+
+# ============================================
+# KONFIGURASI AUDIO
+# ============================================
+# Multiple alarm file options
+ALARM_FILES = [
+    r"C:\HospitalAlarmApp\HospitalAlarmApp\alarm.wav",
+    r"C:\Windows\Media\Alarm01.wav",
+    r"C:\Windows\Media\Alarm02.wav",
+    r"C:\Windows\Media\Alarm03.wav",
+    r"C:\Windows\Media\Alarm04.wav",
+    r"C:\Windows\Media\Alarm05.wav",
+    r"C:\Windows\Media\Alarm06.wav",
+    r"C:\Windows\Media\Alarm07.wav",
+    r"C:\Windows\Media\Alarm08.wav",
+    r"C:\Windows\Media\Alarm09.wav",
+    r"C:\Windows\Media\Alarm10.wav",
+    r"C:\Windows\Media\ringout.wav",
+    r"C:\Windows\Media\notify.wav"
+]
+
+SAMPLE_RATE = 22050            # Rate untuk tone sintetis jika tidak ada file
+TONE_VOLUME = 0.5
+
+# Tone tambahan yang bisa di-mix di atas suara alarm utama:
+# nama -> (frekuensi Hz, durasi bunyi detik, jeda detik)
+TONES = {
+    "beep": (1000, 0.5, 0.5),       # Pengganti winsound.Beep lama
+    "urgent": (1400, 0.15, 0.15),   # Lebih dari satu alarm aktif
+}
+
+
+def find_alarm_file(candidates=None):
+    """Cari file alarm yang tersedia (dipanggil saat startup, bukan saat import)"""
+    for file in candidates or ALARM_FILES:
+        if os.path.exists(file):
+            return file
+    return None
+
+
+# ============================================
+# PCM DI MEMORI
+# ============================================
+class PcmBuffer:
+    """Sampel int16 yang sudah di-decode, siap di-loop oleh backend"""
+    __slots__ = ("samples", "rate", "channels")
+
+    def __init__(self, samples, rate, channels):
+        self.samples = samples        # array('h')
+        self.rate = rate
+        self.channels = channels
+
+    @property
+    def duration(self):
+        return len(self.samples) / float(self.rate * self.channels)
+
+    def to_bytes(self):
+        data = self.samples
+        if sys.byteorder != "little":
+            data = array.array("h", data)
+            data.byteswap()
+        return data.tobytes()
+
+    def to_wav_bytes(self):
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2)
+            wav.setframerate(self.rate)
+            wav.writeframes(self.to_bytes())
+        return buffer.getvalue()
+
+
+def decode_wav(path):
+    """Decode WAV PCM 8/16-bit ke PcmBuffer int16 (sekali saat startup)"""
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 2:
+        samples = array.array("h")
+        samples.frombytes(frames)
+        if sys.byteorder != "little":
+            samples.byteswap()
+    elif width == 1:
+        samples = array.array("h", ((b - 128) << 8 for b in frames))
+    else:
+        raise ValueError(f"unsupported WAV sample width: {width * 8}-bit")
+
+    return PcmBuffer(samples, rate, channels)
+
+
+def generate_tone(frequency, on_seconds, off_seconds, rate=SAMPLE_RATE, channels=1, volume=TONE_VOLUME):
+    """Sintesis pola beep (bunyi + jeda) sebagai PcmBuffer"""
+    amplitude = int(32767 * volume)
+    on_frames = int(on_seconds * rate)
+    off_frames = int(off_seconds * rate)
+    step = 2 * math.pi * frequency / rate
+
+    samples = array.array("h", bytes(2 * (on_frames + off_frames) * channels))
+    for i in range(on_frames):
+        value = int(amplitude * math.sin(step * i))
+        for c in range(channels):
+            samples[i * channels + c] = value
+    return PcmBuffer(samples, rate, channels)
+
+
+def mix_pcm(buffers):
+    """Mix beberapa PcmBuffer (rate/channel sama) menjadi satu loop.
+
+    Panjang hasil = buffer terpanjang, buffer pendek diulang; hasil di-clip
+    ke rentang int16.
+    """
+    if len(buffers) == 1:
+        return buffers[0]
+
+    first = buffers[0]
+    length = max(len(b.samples) for b in buffers)
+    mixed = [0] * length
+    for buffer in buffers:
+        samples = buffer.samples
+        n = len(samples)
+        if not n:
+            continue
+        for i in range(length):
+            mixed[i] += samples[i % n]
+
+    return PcmBuffer(
+        array.array("h", (32767 if v > 32767 else -32768 if v < -32768 else v for v in mixed)),
+        first.rate, first.channels
+    )
+
+
+# ============================================
+# BACKEND AUDIO
+# ============================================
+class AudioUnavailable(Exception):
+    """Tidak ada backend yang benar-benar bersuara di mesin ini"""
+
+
+class NullBackend:
+    """Backend tanpa suara untuk test/benchmark; opsional menulis PCM ke file WAV"""
+    name = "null"
+
+    def __init__(self, sink_path=None):
+        self.sink_path = sink_path
+        self.playing = None
+        self.starts = 0
+
+    def prepare(self, pcm):
+        return pcm
+
+    def start(self, prepared):
+        self.playing = prepared
+        self.starts += 1
+        if self.sink_path:
+            with open(self.sink_path, "wb") as f:
+                f.write(prepared.to_wav_bytes())
+
+    def stop(self):
+        self.playing = None
+
+
+class WinsoundBackend:
+    """winsound Windows; PCM ditulis sekali ke file temp karena
+    PlaySound tidak bisa SND_ASYNC dari memori"""
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self._winsound = winsound
+        self._files = []
+
+    def prepare(self, pcm):
+        import tempfile
+        fd, path = tempfile.mkstemp(prefix="hospital_alarm_", suffix=".wav")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pcm.to_wav_bytes())
+        self._files.append(path)
+        return path
+
+    def start(self, prepared):
+        ws = self._winsound
+        ws.PlaySound(prepared, ws.SND_FILENAME | ws.SND_ASYNC | ws.SND_LOOP | ws.SND_NODEFAULT)
+
+    def stop(self):
+        self._winsound.PlaySound(None, self._winsound.SND_PURGE)
+
+    def close(self):
+        for path in self._files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SubprocessBackend:
+    """ALSA (aplay) / PulseAudio (pacat): PCM mentah di-stream ke stdin secara loop"""
+
+    COMMANDS = {
+        "pacat": lambda pcm: ["pacat", "--raw", "--format=s16le",
+                              f"--rate={pcm.rate}", f"--channels={pcm.channels}"],
+        "aplay": lambda pcm: ["aplay", "-q", "-t", "raw", "-f", "S16_LE",
+                              "-r", str(pcm.rate), "-c", str(pcm.channels)],
+    }
+
+    def __init__(self, player=None):
+        self.player = player or self.available_player()
+        if self.player is None:
+            raise RuntimeError("no aplay/pacat found")
+        self.name = self.player
+        self._process = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def available_player(cls):
+        import shutil
+        for player in ("pacat", "aplay"):
+            if shutil.which(player):
+                return player
+        return None
+
+    def prepare(self, pcm):
+        return (self.COMMANDS[self.player](pcm), pcm.to_bytes())
+
+    def start(self, prepared):
+        self.stop()
+        import subprocess
+        command, data = prepared
+        self._stop = threading.Event()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        threading.Thread(target=self._feed, args=(self._process, data, self._stop), name="audio-feed",
+                         daemon=True).start()
+
+    @staticmethod
+    def _feed(process, data, stop):
+        try:
+            while not stop.is_set():
+                process.stdin.write(data)
+                process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+
+    def stop(self):
+        self._stop.set()
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.kill()
+                process.wait(1)
+            except Exception:
+                pass
+
+
+def default_backend():
+    """Pilih backend sesuai platform; AudioUnavailable jika tidak ada (NullBackend hanya untuk test)"""
+    if sys.platform.startswith("win"):
+        try:
+            return WinsoundBackend()
+        except ImportError:
+            raise AudioUnavailable("winsound is not available") from None
+    if SubprocessBackend.available_player():
+        return SubprocessBackend()
+    raise AudioUnavailable("no pacat/aplay found (install pulseaudio-utils or alsa-utils)")
+
+
+# ============================================
+# ENGINE ALARM
+# ============================================
+class AlarmAudio:
+    """Engine suara alarm: decode sekali, mix layer, start/stop tanpa I/O disk.
+
+    Layer "alarm" berasal dari file WAV (atau tone beep jika tidak ada file);
+    layer lain dari TONES. Setiap kombinasi layer di-mix dan disiapkan untuk
+    backend sekali saja lalu di-cache, jadi start berikutnya hanya memanggil
+    backend.
+    """
+
+    def __init__(self, backend=None, alarm_file=None, tones=None):
+        self.backend = backend or default_backend()
+        self.alarm_file = alarm_file
+        self.layers = set()
+        self._lock = threading.Lock()
+        self._prepared = {}
+        self.last_start_latency = None
+
+        base = None
+        if alarm_file:
+            try:
+                base = decode_wav(alarm_file)
+            except (OSError, EOFError, ValueError, wave.Error):
+                base = None
+        self.source = alarm_file if base is not None else "synthesized beep"
+
+        tones = TONES if tones is None else tones
+        if base is None:
+            base = generate_tone(*tones["beep"])
+
+        self.pcm = {"alarm": base}
+        for name, (frequency, on_seconds, off_seconds) in tones.items():
+            self.pcm[name] = generate_tone(frequency, on_seconds, off_seconds,
+                                           base.rate, base.channels)
+
+        # Siapkan layer utama sekarang supaya alarm pertama tidak menunggu,
+        # kombinasi dengan tone lain di-mix di background
+        self._prepare(frozenset(["alarm"]))
+        threading.Thread(target=self._warm_up, name="audio-warm-up", daemon=True).start()
+
+    @property
+    def playing(self):
+        return bool(self.layers)
+
+    def _prepare(self, layers):
+        prepared = self._prepared.get(layers)
+        if prepared is None:
+            mixed = mix_pcm([self.pcm[name] for name in sorted(layers)])
+            prepared = self._prepared.setdefault(layers, self.backend.prepare(mixed))
+        return prepared
+
+    def _warm_up(self):
+        for name in self.pcm:
+            if name != "alarm":
+                # Lock yang sama dengan start(): kombinasi tidak disiapkan dua kali
+                # (winsound menulis file temp per prepare)
+                with self._lock:
+                    self._prepare(frozenset(["alarm", name]))
+
+    def start(self, layer="alarm"):
+        """Tambah layer dan (re)start loop; kembalikan latensi start (detik)"""
+        begin = time.perf_counter()
+        with self._lock:
+            if layer in self.layers:
+                return 0.0
+            layers = frozenset(self.layers | {layer})
+            self.backend.start(self._prepare(layers))
+            self.layers = set(layers)
+        self.last_start_latency = time.perf_counter() - begin
+        return self.last_start_latency
+
+    def stop(self, layer=None):
+        """Hapus satu layer (atau semua jika None); sisa layer tetap berbunyi"""
+        with self._lock:
+            if layer is None:
+                self.layers.clear()
+            else:
+                self.layers.discard(layer)
+
+            if self.layers:
+                self.backend.start(self._prepare(frozenset(self.layers)))
+            else:
+                self.backend.stop()
+
+    def close(self):
+        self.stop()
+        close = getattr(self.backend, "close", None)
+        if close:
+            close()
@@ -0,0 +1,1010 @@
+import queue
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from alarm_audio import AlarmAudio, AudioUnavailable, NullBackend, find_alarm_file
+from alarm_forwarder import AlarmForwarder
+from alarm_registry import (
+    DEDUP_START, DEDUP_STOP, DEDUP_WINDOW_S, UNKNOWN_DEVICE, AlarmDeduplicator, AlarmRegistry,
+)
+from binary_frames import FRAMING_ACK, FRAMING_BIN1, FrameDecoder, frame_supported
+from command_queue import CommandQueue, parse_cmd_ack, seq_supported
+from diagnostics import Diagnostics, profile_mode
+from event_store import EVENT_ACK, EVENT_HANDSHAKE, EVENT_START, EVENT_STOP, EventStore
+from latency_metrics import METRICS_HOST, METRICS_PORT, AlarmTrace, LatencyMetrics, start_metrics_server
+from line_classifier import (
+    KIND_AUTO, KIND_CANCEL, KIND_COMMAND, KIND_EMERGENCY, KIND_JSON_ALARM,
+    KIND_STATUS, classify_line,
+)
+from link_supervisor import LinkSupervisor
+from patient_registry import PatientRegistry
+from port_discovery import PortCache, candidate_ports, discover_ports
+from serial_link import LinkMultiplexer, SerialLink, read_available
+
+# Modul ini sengaja tidak mengimpor tkinter, winsound, pyserial, subprocess
+# atau numpy di top-level: mode headless dan server.py hanya memuat yang
+# dipakai, pyserial baru diimpor saat port pertama dibuka dan vitals (numpy)
+# di thread warm-up sendiri.
+
+# ============================================
+# KONFIGURASI
+# ============================================
+SERIAL_PORT = 'COM3'           # Ganti dengan port CH341SER Anda
+BAUD_RATE = 115200
+STARTUP_BUDGET_MS = 3000       # Target: mulai listening <= 3 detik sejak start
+BINARY_FRAMING = True          # Terima framing biner BIN1 jika ESP menawarkannya
+METRICS_SUMMARY_MS = 300000    # Ringkasan latensi ke log setiap 5 menit
+ALARM_KINDS = (KIND_EMERGENCY, KIND_JSON_ALARM, KIND_AUTO)   # Baris yang di-trace latensinya
+TEST_SOURCE = "Manual Test"    # Alarm uji operator: tidak diteruskan ke server pusat
+
+
+# ============================================
+# CORE ALARM (SERIAL + REGISTRY + SUARA, TANPA GUI)
+# ============================================
+class AlarmCore:
+    """Listener serial, deteksi alarm, registry, metrik dan suara tanpa Tk.
+
+    Dipakai langsung oleh mode --headless dan server.py; GUI
+    (alarm_gui.PCAlarmController) mewarisi kelas ini dan hanya mengganti
+    hook tampilan: log_message, run_on_ui, refresh_*_panel,
+    set_connection_status, report_no_ports, show_emergency_notification dan
+    flash_window.
+    """
+
+    def __init__(self, multi_link=False, metrics_port=METRICS_PORT, alarm_file=None, port_cache=None,
+                 event_store=None, patients=None, dedup_window=DEDUP_WINDOW_S, central_url=None,
+                 forwarder=None, profile=False, diagnostics=None, vitals=None, metrics_host=METRICS_HOST):
+        self.started_ns = time.perf_counter_ns()
+        self.startup_ms = None         # Waktu sampai listener serial aktif
+
+        self.serial_conn = None
+        self.serial_link = None        # SerialLink mode single-link (state framing/handshake)
+        self.multi_link = multi_link   # True: buka semua port sekaligus
+        self.links = {}                # port -> SerialLink
+        self.expected_ports = set()    # Multi-link: port yang pernah terhubung, selalu disambung ulang
+        self.failed_ports = set()      # Multi-link: port yang gagal dibuka dan belum pernah terhubung
+        self.multiplexer = None
+        self.running = False
+        self.registry = AlarmRegistry()  # State device & alarm per device_id
+        self.dedup = AlarmDeduplicator(dedup_window)  # Debounce start/stop berulang per device
+        self.port_cache = port_cache if port_cache is not None else PortCache()
+        self._connect_lock = threading.Lock()
+        self._no_ports = False
+        self._stop_event = threading.Event()
+
+        # History alarm di disk (start/ack/stop/handshake), bukan hanya di log GUI
+        # Semua tulisan ke ESP lewat satu writer: pemanggil tidak menunggu serial write,
+        # ack alarm mendahului pesan lain, pesan kritis dikirim ulang sampai CMD_ACK
+        self.commands = CommandQueue(self.write_to_esp, on_sent=self.log_sent_command,
+                                     on_error=self.log_send_error, on_expired=self.log_unconfirmed_command,
+                                     on_retransmit=self.log_retransmit)
+
+        self.event_store = event_store if event_store is not None else EventStore(
+            on_error=lambda e: self.log_message(f"❌ Event store error: {e}", "red"))
+
+        # Alarm + heartbeat diteruskan ke API server pusat (server.js) jika central_url diisi
+        self.forwarder = forwarder if forwarder is not None else AlarmForwarder(
+            central_url, on_error=lambda message: self.log_message(f"🌐 Central server: {message}", "orange"))
+
+        # Pasien/ruangan dari data/patients.json + medical_data.csv, di-reload saat file berubah
+        self.patients = patients if patients is not None else PatientRegistry(
+            on_reload=lambda message: self.log_message(f"📋 Patient data: {message}", "blue"))
+        self.patients.start()
+
+        # Vital (HR, SpO2, battery, RSSI) dari STATUS, ambang dicek semua device sekaligus tiap detik;
+        # numpy diimpor di thread warm-up, STATUS sebelum siap hanya di-log
+        self.vitals = vitals
+        if vitals is not None:
+            vitals.start()
+        else:
+            threading.Thread(target=self.start_vitals, name="vitals-warm-up", daemon=True).start()
+
+        # Latensi per tahap alarm (rx -> framed -> classified -> ack -> sound)
+        self.metrics = LatencyMetrics()
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.metrics_server = None
+        self.recovery_metrics = LatencyMetrics(
+            "serial_recovery", "Time from serial link loss until listening again.", stages=("recover",))
+
+        # Profiling + pelacakan memori opt-in (--profile, ALARM_PROFILE=1, Ctrl+Shift+P di GUI)
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics(
+            on_error=lambda message: self.log_message(f"🔬 Diagnostics: {message}", "orange"))
+
+        # Reconnect otomatis (backoff + hot-plug) di thread sendiri
+        self.supervisor = LinkSupervisor(self)
+
+        # Suara alarm dijalankan worker sendiri agar tidak memblok thread serial;
+        # decode WAV juga di worker supaya tidak menunda koneksi serial
+        self.alarm_file = alarm_file
+        self.audio = None
+        self.sound_queue = queue.SimpleQueue()
+        self.sound_thread = threading.Thread(target=self.sound_worker, name="alarm-sound", daemon=True)
+        self.sound_thread.start()
+        self.sound_process = None
+
+        # profile: True/"full", "cpu" (tanpa tracemalloc), atau False = ikut env ALARM_PROFILE
+        mode = profile_mode() if not profile else ("full" if profile is True else profile)
+        if mode:
+            self.set_profiling(True, memory=mode == "full")
+
+    # ============================================
+    # HOOK TAMPILAN (NO-OP DI MODE HEADLESS)
+    # ============================================
+    def log_message(self, message, color="black"):
+        """Tulis log ke console (aman dipanggil dari thread manapun)"""
+        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        try:
+            sys.stdout.write(f"[{timestamp}] {message}\n")
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
+
+    def run_on_ui(self, func, *args):
+        """Tanpa GUI: jalankan langsung di thread pemanggil"""
+        func(*args)
+
+    def set_connection_status(self, status, detail=None):
+        """Status koneksi untuk ditampilkan (GUI), cukup di-log di headless"""
+
+    def report_no_ports(self):
+        """Dipanggil saat tidak ada port serial sama sekali"""
+
+    def refresh_device_panel(self, device):
+        """Render info device (GUI)"""
+
+    def refresh_alarm_panel(self):
+        """Render alarm aktif (GUI)"""
+
+    def show_emergency_notification(self, patient, room):
+        """Notifikasi emergency (GUI)"""
+
+    def flash_window(self, flashes=6):
+        """Flash window (GUI)"""
+
+    # ============================================
+    # KONEKSI SERIAL
+    # ============================================
+    def start_connect(self):
+        """Minta supervisor connect sekarang (tidak memblok GUI/main loop)"""
+        self.supervisor.start()
+        self.supervisor.kick()
+
+    def reconnect(self):
+        """Reconnect manual: buka ulang port walaupun masih terhubung"""
+        self.supervisor.start()
+        self.supervisor.kick(force=True)
+
+    def needs_connection(self):
+        """True jika masih ada port yang seharusnya terhubung"""
+        if not self.multi_link:
+            return not (self.serial_conn and self.serial_conn.is_open)
+        if not self.links:
+            return True
+        # Port yang tidak bisa dibuka tidak membuat supervisor retry tanpa henti
+        wanted = {port for port in self.find_serial_ports()
+                  if port in self.expected_ports or port not in self.failed_ports}
+        return bool(wanted - set(self.connected_ports()))
+
+    def connected_ports(self):
+        if self.multi_link:
+            return [port for port, link in list(self.links.items()) if link.is_open]
+        conn = self.serial_conn
+        if conn and conn.is_open:
+            return [getattr(conn, "port", SERIAL_PORT)]
+        return []
+
+    def link_lost(self, port):
+        """Link putus: tutup, update status dan bangunkan supervisor"""
+        self.set_connection_status(f"🟠 Link lost: {port}, reconnecting...")
+        self.commands.forget(port if self.multi_link else None)
+        self.supervisor.link_lost(port)
+
+    def on_ports_removed(self, ports):
+        """Hot-plug: port yang dicabut ditutup tanpa menunggu read error"""
+        # Dicolok ulang = dicoba lagi, meski sebelumnya gagal dibuka
+        self.failed_ports.difference_update(ports)
+        for port in ports:
+            link = self.links.get(port)
+            if link is not None:
+                if self.multiplexer:
+                    self.multiplexer.remove(link)
+                self.links.pop(port, None)
+                link.close()
+                self.link_lost(port)
+
+        conn = self.serial_conn
+        if not self.multi_link and conn and getattr(conn, "port", None) in ports:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            self.link_lost(conn.port)
+
+    def connect_serial(self):
+        """Membuka koneksi serial ke ESP8266"""
+        if not self._connect_lock.acquire(blocking=False):
+            self.log_message("⚠ Connection attempt already in progress", "orange")
+            return
+        try:
+            self._connect_serial()
+        finally:
+            self._connect_lock.release()
+
+    def _connect_serial(self):
+        ports = self.find_serial_ports()
+
+        if not ports:
+            # Retry supervisor tidak mengulang pesan/dialog yang sama
+            if not self._no_ports:
+                self._no_ports = True
+                self.log_message("❌ No serial ports found!", "red")
+                self.report_no_ports()
+            return
+        self._no_ports = False
+
+        if self.multi_link:
+            self.connect_all_serial(ports)
+            return
+
+        if self.serial_conn and self.serial_conn.is_open:
+            self.serial_conn.close()
+
+        # Semua port di-probe paralel, port dari cache dicoba lebih dulu
+        results = discover_ports(ports, self.open_serial_port, self.port_cache,
+                                 on_result=self.log_probe_result)
+
+        if not results:
+            self.set_connection_status("🔴 Connection Failed")
+            self.log_message("❌ Could not connect to any serial port!", "red")
+            return
+
+        result = results[0]
+        port = result.port
+        self.serial_conn = result.link.conn
+        self.serial_link = result.link
+
+        self.running = True
+        self.set_connection_status(f"🟢 Connected to {port}", f"Port: {port} | Baud: {BAUD_RATE}")
+
+        self.log_message(f"✅ Successfully connected to {port}", "green")
+        self.log_message(f"📡 Listening for ESP8266 commands...", "blue")
+
+        # Baris yang terbaca saat probe diproses dulu, baru listener mulai
+        self.replay_probe(result, None)
+        serial_thread = threading.Thread(target=self.serial_listener, args=(result.link,),
+                                         name="serial-listener", daemon=True)
+        serial_thread.start()
+        self.mark_listening()
+
+        # Send acknowledgment
+        self.send_to_esp("PC_CONTROLLER_READY")
+
+    def open_serial_port(self, port):
+        """Membuka satu port (identifikasi PC_PING dilakukan port_discovery)"""
+        import serial
+
+        self.log_message(f"🔍 Trying to connect to {port}...", "blue")
+
+        return serial.Serial(
+            port=port,
+            baudrate=BAUD_RATE,
+            timeout=1,
+            write_timeout=1
+        )
+
+    def log_probe_result(self, result):
+        """Callback discovery: hasil probe satu port"""
+        if result.error is not None:
+            self.log_message(f"Failed to connect to {result.port}: {str(result.error)[:50]}...", "orange")
+        elif result.identified:
+            self.log_message(f"🔍 {result.port} answered in {result.elapsed * 1000:.0f} ms", "blue")
+        elif result.ok:
+            self.log_message(f"🔍 {result.port} open but silent after {result.elapsed * 1000:.0f} ms", "orange")
+
+    def replay_probe(self, result, link):
+        """Proses baris yang dibaca saat probe dan simpan port ke cache"""
+        probe_link = result.link
+        for line in result.lines:
+            self.process_serial_line(line, probe_link.handshake_data, link)
+        if result.handshake is not None:
+            self.handle_complete_handshake(result.handshake, link)
+        else:
+            self.port_cache.remember(result.port, probe_link.device_id)
+
+    def connect_all_serial(self, ports):
+        """Multi-link: probe semua port paralel, tiap port langsung dibaca multiplexer"""
+        if self.multiplexer is None:
+            self.multiplexer = LinkMultiplexer(self.on_link_lines, self.on_link_error)
+
+        # Port yang sudah terhubung tidak di-probe ulang
+        ports = [p for p in ports if not (p in self.links and self.links[p].is_open)]
+
+        def attach(result):
+            self.log_probe_result(result)
+            if result.ok:
+                self.failed_ports.discard(result.port)
+                self.attach_link(result)
+            else:
+                self.failed_ports.add(result.port)
+
+        discover_ports(ports, self.open_serial_port, self.port_cache,
+                       first_only=False, on_result=attach)
+
+        if not self.links:
+            self.set_connection_status("🔴 Connection Failed")
+            self.log_message("❌ Could not connect to any serial port!", "red")
+            return
+
+        self.set_connection_status(f"🟢 Connected to {len(self.links)} ports",
+                                   f"Ports: {', '.join(sorted(self.links))} | Baud: {BAUD_RATE}")
+        self.log_message(f"📡 Listening on {len(self.links)} ESP8266 links...", "blue")
+
+    def attach_link(self, result):
+        """Multi-link: daftarkan satu port hasil probe ke multiplexer"""
+        link = result.link
+        self.links[link.port] = link
+        self.expected_ports.add(link.port)
+        self.replay_probe(result, link)
+        self.multiplexer.add(link)
+        self.log_message(f"✅ Successfully connected to {link.port}", "green")
+        self.send_to_esp("PC_CONTROLLER_READY", link)
+
+        if not self.running:
+            self.running = True
+            self.multiplexer.start(lambda: self.running)
+            self.mark_listening()
+
+    def mark_listening(self):
+        """Catat waktu startup sampai listener pertama aktif"""
+        if self.startup_ms is not None:
+            return
+        self.startup_ms = (time.perf_counter_ns() - self.started_ns) / 1e6
+        if self.startup_ms <= STARTUP_BUDGET_MS:
+            self.log_message(f"⏱ Listening {self.startup_ms:.0f} ms after start", "blue")
+        else:
+            self.log_message(f"⏱ Listening {self.startup_ms:.0f} ms after start "
+                             f"(budget {STARTUP_BUDGET_MS} ms)", "orange")
+
+    def on_link_lines(self, link, lines, rx_ns, framed_ns):
+        """Callback multiplexer: baris lengkap dari satu link"""
+        if link.framer.errors:
+            self.log_framing_errors(link)
+        for line in lines:
+            self.process_serial_line(line, link.handshake_data, link, (rx_ns, framed_ns))
+
+            handshake = link.track_handshake(line)
+            if handshake is not None:
+                self.handle_complete_handshake(handshake, link)
+
+    def on_link_error(self, link, error):
+        """Callback multiplexer: link putus, port lain tetap jalan"""
+        self.log_message(f"Serial error on {link.port}: {error}", "red")
+        self.links.pop(link.port, None)
+        link.close()
+        if self.running:
+            self.link_lost(link.port)
+
+    def find_serial_ports(self):
+        """Mencari port serial yang tersedia (tanpa membuka port)"""
+        return candidate_ports()
+
+    def serial_listener(self, link=None):
+        """Thread untuk membaca data dari serial"""
+        if link is None:
+            link = SerialLink(getattr(self.serial_conn, "port", SERIAL_PORT), self.serial_conn)
+            self.serial_link = link
+
+        conn = link.conn
+        while self.running and conn.is_open:
+            try:
+                # Tidur sampai ada byte masuk, tanpa polling in_waiting
+                raw_data = read_available(conn)
+            except Exception as e:
+                # Port diganti/ditutup dari sini (reconnect, shutdown): keluar diam-diam
+                if not self.running or conn is not self.serial_conn or not conn.is_open:
+                    return
+                self.log_message(f"Serial error: {e}", "red")
+                link.close()
+                self.link_lost(link.port)
+                return
+
+            if not raw_data:
+                continue
+            rx_ns = time.perf_counter_ns()
+
+            # Proses per baris (hanya baris lengkap yang di-decode)
+            lines = link.framer.feed(raw_data)
+            timing = (rx_ns, time.perf_counter_ns())
+            if link.framer.errors:
+                self.log_framing_errors(link)
+            for line in lines:
+                self.process_serial_line(line, link.handshake_data, timing=timing)
+
+                # Handle handshake parsing
+                handshake = link.track_handshake(line)
+                if handshake is not None:
+                    self.handle_complete_handshake(handshake)
+
+    # ============================================
+    # PEMROSESAN BARIS & ALARM
+    # ============================================
+    def process_serial_line(self, line, handshake_data, link=None, timing=None):
+        """Memproses satu baris data dari ESP8266"""
+        # Log semua data yang diterima (multi-link: beri tag port asal)
+        if link is not None:
+            self.log_message(f"📥 [{link.port}] {line}", "purple")
+        else:
+            self.log_message(f"📥 {line}", "purple")
+
+        # Konfirmasi pesan kritis ("CMD_ACK:<seq>"), bukan perintah
+        seq = parse_cmd_ack(line)
+        if seq is not None:
+            self.commands.confirm(self.command_key(link), seq)
+            return
+
+        # ============================================
+        # DETEKSI PERINTAH DARI ESP8266 (lihat line_classifier)
+        # ============================================
+        kind, data = classify_line(line)
+
+        # Trace latensi hanya untuk baris yang memicu alarm
+        trace = None
+        if timing is not None and kind in ALARM_KINDS:
+            trace = AlarmTrace(timing[0], timing[1], time.perf_counter_ns())
+
+        if kind == KIND_EMERGENCY:
+            self.handle_emergency_start("Button Press", handshake_data, link, trace)
+        elif kind == KIND_JSON_ALARM:
+            self.handle_emergency_start("JSON Command", data, link, trace)
+        elif kind == KIND_CANCEL:
+            self.handle_emergency_stop(link)
+        elif kind == KIND_COMMAND:
+            self.handle_custom_command(line, link)
+        elif kind == KIND_STATUS:
+            self.forwarder.heartbeat(handshake_data.get("DEVICE_ID"), detail=data,
+                                     port=link.port if link is not None else None)
+            self.update_status_from_device(line, handshake_data.get("DEVICE_ID"), data)
+        elif kind == KIND_AUTO:
+            self.handle_emergency_start("Auto-detected", data, link, trace)
+        # KIND_INFO dan baris lain cukup di-log
+
+    def handle_complete_handshake(self, handshake_data, link=None):
+        """Menangani data handshake yang lengkap"""
+        self.log_message("🤝 Handshake completed!", "green")
+
+        # Field yang tidak dikirim ESP dilengkapi dari data pasien
+        device_id = handshake_data.get("DEVICE_ID", "UNKNOWN")
+        info = self.patients.lookup(device_id, handshake_data.get("MAC"))
+
+        # Simpan ke registry, GUI membaca dari record
+        device = self.registry.update_device(
+            device_id,
+            handshake_data.get("PATIENT") or (info and info.patient) or "Unknown",
+            handshake_data.get("ROOM") or (info and info.room) or "Unknown",
+            link.port if link is not None else None
+        )
+
+        self.run_on_ui(self.refresh_device_panel, device)
+        self.event_store.append(EVENT_HANDSHAKE, device.device_id, patient=device.patient,
+                                room=device.room, port=device.port)
+        self.forwarder.heartbeat(device.device_id, patient=device.patient, room=device.room, port=device.port)
+
+        # Port yang berhasil handshake dicoba pertama saat restart berikutnya
+        port = link.port if link is not None else getattr(self.serial_conn, "port", None)
+        if port:
+            self.port_cache.remember(port, device.device_id)
+
+        self.log_message(f"Device: {device.device_id}, Patient: {device.patient}, Room: {device.room}", "blue")
+
+        # Kirim acknowledgment (dengan nomor urut jika ESP menawarkan CMD_SEQ)
+        self.commands.enable_acks(self.command_key(link), seq_supported(handshake_data))
+        self.send_to_esp("HANDSHAKE_ACK", link)
+
+        # Framing biner jika ESP menawarkannya (FRAMING: BIN1), selain itu tetap teks
+        self.negotiate_framing(handshake_data, link if link is not None else self.serial_link)
+
+    def negotiate_framing(self, handshake_data, link):
+        """Pindahkan link ke FrameDecoder dan balas FRAMING_ACK jika BIN1 ditawarkan"""
+        if link is None or not BINARY_FRAMING or not frame_supported(handshake_data):
+            return
+        if isinstance(link.framer, FrameDecoder):
+            # Handshake ulang (ESP reboot): nomor urut frame mulai dari awal
+            link.framer.reset_sequence()
+        else:
+            # Decoder diganti sebelum ACK terkirim: frame pertama pasti terbaca
+            link.framer = FrameDecoder(link.framer)
+            self.log_message(f"📦 {link.port}: binary framing {FRAMING_BIN1} enabled", "blue")
+        self.send_to_esp(FRAMING_ACK, link)
+
+    def log_framing_errors(self, link):
+        """Frame rusak (CRC) / hilang (nomor urut) dari FrameDecoder"""
+        for error in link.framer.take_errors():
+            self.log_message(f"⚠ [{link.port}] {error}", "orange")
+
+    def handle_emergency_start(self, source, data, link=None, trace=None):
+        """Menangani emergency alarm dari berbagai sumber"""
+        port = link.port if link is not None else None
+
+        # Data dari pesan, dilengkapi info device terakhir di port ini
+        patient = data.get("patient", data.get("PATIENT"))
+        room = data.get("room", data.get("ROOM"))
+        device = data.get("device_id", data.get("DEVICE_ID"))
+
+        known = self.registry.device_for_port(port)
+        if known is not None and device in (None, known.device_id):
+            device = known.device_id
+            patient = patient or known.patient
+            room = room or known.room
+
+        # Data pasien (device_id / MAC / room) dari file, lookup O(1) tanpa baca file
+        bed = None
+        info = self.patients.lookup(device, data.get("mac", data.get("MAC")), room)
+        if info is not None:
+            device = device or info.device_id
+            patient = patient or info.patient
+            room = room or info.room
+            bed = info.bed
+
+        patient = patient or "Unknown Patient"
+        room = room or "Unknown Room"
+        if not device:
+            # Device tanpa handshake dibedakan per port
+            device = UNKNOWN_DEVICE if port is None else f"{UNKNOWN_DEVICE}@{port}"
+
+        if link is not None:
+            source = f"{source} @ {port}"
+
+        # Pengulangan dalam jendela debounce (tombol memantul, echo EMERGENCY) cukup dihitung
+        admitted, repeats = self.dedup.admit(device, DEDUP_START)
+        if not admitted:
+            return
+
+        record, is_new = self.registry.start(device, patient, room, port, source)
+        if not is_new:
+            coalesced = f" ({repeats} more coalesced)" if repeats else ""
+            self.log_message(f"⚠ Alarm already active for {device}, ignoring duplicate{coalesced}", "orange")
+            return
+
+        # Kirim acknowledgment ke ESP8266 asal alarm lebih dulu
+        self.send_to_origin("ALARM_ACKNOWLEDGED", record.port)
+        self.registry.acknowledge(device)
+        self.event_store.append(EVENT_START, device, patient=patient, room=room, bed=bed,
+                                port=record.port, source=source)
+        self.event_store.append(EVENT_ACK, device, port=record.port)
+        if source != TEST_SOURCE:
+            self.forwarder.trigger(device, patient=patient, room=room, bed=bed, port=record.port, source=source,
+                                   triggered_at=datetime.now().astimezone().isoformat(timespec="milliseconds"))
+        if trace is not None:
+            trace.ack = time.perf_counter_ns()
+            trace.device = device
+            self.metrics.record_trace(trace, "framed", "classified", "ack")
+
+        # Log
+        self.log_message(f"🚨 EMERGENCY ALARM ACTIVATED! Source: {source}", "red")
+        bed_info = f", Bed: {bed}" if bed else ""
+        self.log_message(f"   Patient: {patient}, Room: {room}{bed_info}, Device: {device}", "red")
+
+        # Play alarm sound: alarm pertama memulai loop, alarm kedua menambah tone "urgent"
+        active = self.registry.active_count
+        if active == 1:
+            self.request_alarm_sound(trace)
+        elif active == 2:
+            self.request_alarm_sound(trace, "urgent")
+
+        # Update GUI, notification dan flash dijadwalkan di main loop
+        self.run_on_ui(self.refresh_alarm_panel)
+        self.run_on_ui(self.show_emergency_notification, patient, room)
+        self.run_on_ui(self.flash_window)
+
+    def handle_emergency_stop(self, link=None):
+        """Menangani pembatalan emergency dari device"""
+        port = link.port if link is not None else None
+        record = self.registry.alarm_for_port(port)
+        if record is None:
+            # STOP berulang setelah alarm berhenti: cukup satu peringatan per jendela
+            known = self.registry.device_for_port(port)
+            device = known.device_id if known is not None else f"{UNKNOWN_DEVICE}@{port}"
+            if self.dedup.admit(device, DEDUP_STOP)[0]:
+                self.log_message("⚠ No active alarm to stop", "orange")
+            return
+
+        self.stop_device_alarm(record)
+
+    def stop_device_alarm(self, record):
+        """Menghentikan alarm satu device"""
+        if self.registry.stop(record.device_id) is None:
+            return
+        # Alarm berikutnya dari device ini langsung diproses, tidak menunggu jendela debounce
+        repeats = self.dedup.forget(record.device_id, DEDUP_START)
+        duration_s = round(time.monotonic() - record.started_at, 3)
+        self.event_store.append(EVENT_STOP, record.device_id, patient=record.patient,
+                                room=record.room, port=record.port, repeats=repeats, duration_s=duration_s)
+        if record.source != TEST_SOURCE:
+            self.forwarder.cancel(record.device_id, cancelled_by="pc_controller", repeats=repeats,
+                                  duration_s=duration_s)
+
+        # Update GUI
+        self.run_on_ui(self.refresh_alarm_panel)
+
+        # Log
+        coalesced = f", {repeats} repeated triggers coalesced" if repeats else ""
+        self.log_message(f"✅ EMERGENCY ALARM STOPPED ({record.device_id}{coalesced})", "green")
+
+        # Stop alarm sound jika tidak ada alarm lain, lepas tone "urgent" jika tinggal satu
+        active = self.registry.active_count
+        if active == 0:
+            self.request_stop_sound()
+        elif active == 1:
+            self.request_stop_sound("urgent")
+
+        # Kirim acknowledgment ke device pemilik alarm
+        self.send_to_origin("ALARM_STOPPED_ACK", record.port)
+
+    def handle_custom_command(self, command, link=None):
+        """Menangani custom command"""
+        self.log_message(f"🔧 Custom command: {command}", "blue")
+
+        # Parse command
+        if "PLAY_SOUND" in command or "ALARM" in command.upper():
+            self.handle_emergency_start("Custom Command", {}, link)
+
+    def update_status_from_device(self, status_line, device_id=None, payload=None):
+        """Update status dari device; field vital di payload masuk riwayat per device"""
+        self.log_message(f"📊 Device status: {status_line}", "blue")
+        vitals = self.vitals
+        if vitals is not None and device_id and payload:
+            vitals.record(device_id, payload)
+
+    def start_vitals(self):
+        """Thread warm-up: import vitals + numpy di luar jalur startup lalu mulai monitor"""
+        from vitals import VitalsMonitor
+
+        monitor = VitalsMonitor(
+            on_breach=self.handle_vital_breaches,
+            on_error=lambda message: self.log_message(f"🩺 Vitals: {message}", "orange"))
+        if not monitor.enabled:
+            self.log_message("🩺 numpy not installed: vitals telemetry from STATUS lines disabled", "orange")
+        if self._stop_event.is_set():
+            return
+        monitor.start()
+        self.vitals = monitor
+
+    def handle_vital_breaches(self, breaches):
+        """Dipanggil thread vitals: HR/SpO2 di luar ambang memicu alarm, battery/RSSI hanya peringatan"""
+        for breach in breaches:
+            if breach.cleared:
+                self.log_message(f"🩺 {breach.device_id}: {breach.describe()}", "green")
+            elif breach.alarm:
+                self.log_message(f"🩺 {breach.device_id}: {breach.describe()}", "red")
+                known = self.registry.devices.get(breach.device_id)
+                link = self.links.get(known.port) if known is not None else None
+                self.handle_emergency_start(f"Vitals {breach.describe()}", {"device_id": breach.device_id}, link)
+            else:
+                self.log_message(f"🩺 {breach.device_id}: {breach.describe()}", "orange")
+
+    # ============================================
+    # SUARA ALARM
+    # ============================================
+    def request_alarm_sound(self, trace=None, layer="alarm"):
+        """Minta sound worker memutar alarm (tidak memblok pemanggil)"""
+        self.sound_queue.put(lambda: self.play_alarm_advanced(trace, layer))
+
+    def request_stop_sound(self, layer=None):
+        """Minta sound worker menghentikan alarm (tidak memblok pemanggil)"""
+        self.sound_queue.put(lambda: self.stop_alarm_sound(layer))
+
+    def sound_worker(self):
+        """Thread yang menyiapkan engine audio lalu menjalankan perintah suara berurutan"""
+        try:
+            self.audio = AlarmAudio(alarm_file=self.alarm_file)
+        except AudioUnavailable as e:
+            self.log_message(f"🔇 NO AUDIO OUTPUT: {e} - alarms will only ring the terminal bell", "red")
+        except Exception as e:
+            self.log_message(f"Audio engine failed: {e}", "orange")
+
+        while True:
+            action = self.sound_queue.get()
+            if action is None:
+                break
+            try:
+                action()
+            except Exception as e:
+                self.log_message(f"Sound error: {e}", "orange")
+
+        if self.audio is not None:
+            self.audio.close()
+
+    def mark_sound_started(self, trace):
+        """Catat tahap 'sound' untuk trace alarm (jika ada)"""
+        if trace is not None and trace.sound is None:
+            trace.sound = time.perf_counter_ns()
+            self.metrics.record_trace(trace, "sound")
+
+    def play_alarm_advanced(self, trace=None, layer="alarm"):
+        """Memutar alarm lewat engine audio (PCM sudah di-decode saat startup)"""
+        self.log_message("🔊 Playing alarm sound...", "blue")
+
+        try:
+            # NullBackend tidak bersuara: alarm sungguhan tidak boleh dianggap berbunyi
+            if self.audio is None or isinstance(self.audio.backend, NullBackend):
+                raise AudioUnavailable("no audio output")
+            latency = self.audio.start(layer)
+            self.mark_sound_started(trace)
+            self.log_message(f"✅ Alarm sound started ({self.audio.backend.name}, {layer}, "
+                             f"{latency * 1000:.1f} ms)", "green")
+        except Exception as e:
+            # Fallback: Print bell character (might work on some terminals)
+            self.log_message(f"Audio backend failed: {e}", "orange")
+            self.log_message("Trying bell character...", "blue")
+            print('\a' * 10)  # System bell
+            self.mark_sound_started(trace)
+            self.log_message("✅ Bell character sent", "green")
+
+    def stop_alarm_sound(self, layer=None):
+        """Menghentikan suara alarm (satu layer atau semuanya)"""
+        self.log_message("🔇 Stopping alarm sound...", "blue")
+
+        try:
+            self.audio.stop(layer)
+            self.log_message("✅ Alarm sound stopped", "green")
+        except Exception:
+            self.log_message("⚠ Could not stop sound properly", "orange")
+
+    # ============================================
+    # AKSI OPERATOR
+    # ============================================
+    def test_alarm(self):
+        """Test alarm manual"""
+        self.log_message("🔧 Manual test alarm triggered", "blue")
+
+        test_data = {
+            "patient": "TEST PATIENT",
+            "room": "TEST ROOM",
+            "device_id": "TEST_DEVICE"
+        }
+
+        self.handle_emergency_start(TEST_SOURCE, test_data)
+
+        # Kirim test command ke ESP8266
+        self.send_to_esp("TEST_ALARM_TRIGGERED")
+
+    def stop_alarm(self):
+        """Stop semua alarm aktif"""
+        records = self.registry.active_alarms()
+        if not records:
+            self.log_message("⚠ No active alarm to stop", "orange")
+            return
+
+        for record in records:
+            self.stop_device_alarm(record)
+
+    def emergency_stop(self):
+        """Emergency stop"""
+        self.log_message("🛑 EMERGENCY STOP from GUI", "red")
+        self.stop_alarm()
+
+    def send_to_esp(self, message, link=None):
+        """Antrikan pesan ke ESP8266 (multi-link tanpa link: broadcast); tidak memblok"""
+        if link is not None:
+            targets = [link]
+        elif self.multi_link:
+            targets = list(self.links.values())
+        else:
+            targets = [None]
+
+        for target in targets:
+            conn = target.conn if target is not None else self.serial_conn
+            if conn and conn.is_open:
+                self.commands.send(message, target, self.command_key(target))
+            else:
+                self.log_message("⚠ Cannot send: Serial not connected", "orange")
+
+    def command_key(self, link):
+        """Kunci port untuk antrian perintah (single-link: satu koneksi aktif)"""
+        return link.port if link is not None and self.multi_link else None
+
+    def send_to_origin(self, message, port):
+        """Balas hanya ke ESP asal alarm, tidak pernah broadcast.
+
+        Multi-link: alarm tanpa port (Test Alarm, alarm vital dari device tanpa
+        link) atau dari port yang sudah dicabut tidak dibalas. Single-link:
+        satu-satunya port.
+        """
+        if not self.multi_link:
+            self.send_to_esp(message)
+            return
+        link = self.links.get(port) if port is not None else None
+        if link is not None:
+            self.send_to_esp(message, link)
+
+    def write_to_esp(self, link, data):
+        """Dipanggil thread writer CommandQueue: satu-satunya yang menulis ke port"""
+        conn = link.conn if link is not None else self.serial_conn
+        if not (conn and conn.is_open):
+            raise OSError("Serial not connected")
+        conn.write(data)
+
+    def log_sent_command(self, command):
+        if command.key is not None:
+            self.log_message(f"📤 To ESP [{command.key}]: {command.message}", "darkgreen")
+        else:
+            self.log_message(f"📤 To ESP: {command.message}", "darkgreen")
+
+    def log_send_error(self, command, error):
+        self.log_message(f"❌ Error sending to ESP: {error}", "red")
+
+    def log_retransmit(self, command):
+        self.log_message(f"🔁 Resent {command.message} #{command.seq} (attempt {command.attempts}, "
+                         f"no CMD_ACK)", "orange")
+
+    def log_unconfirmed_command(self, command):
+        self.log_message(f"❌ ESP never confirmed {command.message} #{command.seq} "
+                         f"after {command.attempts} attempts", "red")
+
+    # ============================================
+    # METRIK, SHUTDOWN & MAIN LOOP HEADLESS
+    # ============================================
+    def start_metrics(self):
+        """Endpoint /metrics (jika metrics_port bukan 0)"""
+        if not self.metrics_port or self.metrics_server is not None:
+            return
+        try:
+            self.metrics_server = start_metrics_server([self.metrics, self.recovery_metrics,
+                                                        self.diagnostics.timings], self.metrics_port,
+                                                       self.metrics_host)
+            host = self.metrics_host if self.metrics_host not in ("", "127.0.0.1") else "localhost"
+            self.log_message(f"📈 Metrics at http://{host}:{self.metrics_port}/metrics", "blue")
+        except OSError as e:
+            self.log_message(f"Metrics server failed: {e}", "orange")
+
+    def log_metrics_summary(self):
+        """Ringkasan p50/p99/max latensi alarm ke log"""
+        lines = self.metrics.summary_lines()
+        if lines:
+            self.log_message("📈 Alarm latency since start (rx -> stage):", "blue")
+            for line in lines:
+                self.log_message(f"   {line}", "blue")
+
+        lines = self.recovery_metrics.summary_lines()
+        if lines:
+            self.log_message("♻ Serial link recovery (loss -> listening):", "blue")
+            for line in lines:
+                self.log_message(f"   {line}", "blue")
+
+        commands = self.commands.stats()
+        if commands["coalesced"] or commands["retransmits"] or commands["expired"]:
+            self.log_message(f"📤 ESP commands: {commands['sent']} sent, {commands['coalesced']} coalesced, "
+                             f"{commands['retransmits']} resent, {commands['confirmed']} confirmed, "
+                             f"{commands['expired']} unconfirmed", "blue")
+
+        if self.forwarder.url is not None:
+            forward = self.forwarder.stats()
+            self.log_message(f"🌐 Central server {'online' if forward['online'] else 'OFFLINE'}: "
+                             f"{forward['delivered']} alarm events delivered, {forward['heartbeats']} heartbeats, "
+                             f"backlog {forward['memory']} in memory + {forward['spool_bytes']} bytes on disk",
+                             "blue" if forward["online"] else "orange")
+
+        if self.diagnostics.enabled:
+            self.log_message(f"🔬 Profiling on ({self.diagnostics.stats()['files']} profiles written), "
+                             f"call duration since start:", "blue")
+            for line in self.diagnostics.timings.summary_lines():
+                self.log_message(f"   {line}", "blue")
+
+        vitals = self.vitals.stats() if self.vitals is not None else None
+        if vitals and vitals["devices"]:
+            self.log_message(f"🩺 Vitals: {vitals['devices']} devices, {vitals['records']} STATUS samples, "
+                             f"{vitals['active']} out of range now, {vitals['breaches']} breaches, "
+                             f"last check {vitals['tick_us']:g} us", "blue")
+
+        if self.dedup.coalesced:
+            self.log_message(f"🔁 {self.dedup.coalesced} repeated alarm events coalesced "
+                             f"(window {self.dedup.window:g} s)", "blue")
+
+    def shutdown(self):
+        """Tutup semua port, hentikan suara dan worker"""
+        self.log_message("🛑 Shutting down...", "red")
+        self.running = False
+        self._stop_event.set()
+        self.supervisor.stop()
+        self.patients.stop()
+        if self.vitals is not None:
+            self.vitals.stop()
+        # Sisa antrian (misal ALARM_STOPPED_ACK) ditulis dulu, lalu port dipakai langsung
+        self.commands.close()
+        time.sleep(0.5)
+
+        for link in list(self.links.values()):
+            try:
+                link.conn.write(b"PC_SHUTDOWN\n")
+            except:
+                pass
+        if self.multiplexer:
+            self.multiplexer.close()
+
+        if self.serial_conn and self.serial_conn.is_open:
+            try:
+                self.serial_conn.write(b"PC_SHUTDOWN\n")
+                time.sleep(0.2)
+                self.serial_conn.close()
+                self.log_message("Serial port closed", "blue")
+            except:
+                pass
+
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+
+        # Worker menghentikan suara lalu menutup engine audio
+        self.request_stop_sound()
+        self.sound_queue.put(None)
+        self.sound_thread.join(2)
+
+        # Sisa event ditulis + fsync sebelum keluar; alarm yang belum terkirim ke server pusat tetap di disk
+        self.event_store.close()
+        self.forwarder.close()
+        self.diagnostics.stop()
+
+    # ============================================
+    # PROFILING OPT-IN
+    # ============================================
+    def set_profiling(self, enabled, memory=True):
+        """Hidup/matikan sampling profiler, timing fungsi dan (memory=True) diff tracemalloc"""
+        if enabled == self.diagnostics.enabled:
+            return
+        if enabled:
+            self.diagnostics.gauges.update(self.diagnostic_gauges())
+            self.diagnostics.start(memory)
+            self.diagnostics.instrument(self)
+            self.log_message(f"🔬 Profiling on{'' if self.diagnostics.tracing else ' (no memory tracing)'}: "
+                             f"profiles and report in {self.diagnostics.directory}", "blue")
+        else:
+            self.diagnostics.stop()
+            self.log_message("🔬 Profiling off", "blue")
+
+    def diagnostic_gauges(self):
+        """Ukuran struktur yang bisa tumbuh, dicatat bersama snapshot memori"""
+        return {
+            "threads": threading.active_count,
+            "devices": lambda: len(self.registry.devices),
+            "active_alarms": lambda: len(self.registry.alarms),
+            "esp_commands_queued": lambda: len(self.commands),
+            "forward_backlog": lambda: self.forwarder.backlog,
+            "vitals_devices": lambda: len(self.vitals.devices) if self.vitals is not None else 0,
+        }
+
+    def stop(self):
+        """Minta run() headless berhenti (aman dari thread/signal manapun)"""
+        self._stop_event.set()
+
+    def run(self):
+        """Mode headless: langsung connect, lalu tunggu sampai Ctrl+C/SIGTERM"""
+        self.start_connect()
+        self.start_metrics()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        try:
+            while not self._stop_event.wait(METRICS_SUMMARY_MS / 1000):
+                self.log_metrics_summary()
+        except KeyboardInterrupt:
+            pass
+
+        self.shutdown()
+
+
+def run_headless(multi_link=False, metrics_port=METRICS_PORT, alarm_file=None, dedup_window=DEDUP_WINDOW_S,
+                 central_url=None, profile=False, metrics_host=METRICS_HOST):
+    """Jalankan core tanpa GUI (dipakai servers.py --headless dan server.py)"""
+    if alarm_file is None:
+        alarm_file = find_alarm_file()
+    core = AlarmCore(multi_link=multi_link, metrics_port=metrics_port, alarm_file=alarm_file,
+                     dedup_window=dedup_window, central_url=central_url, profile=profile,
+                     metrics_host=metrics_host)
+    core.log_message(f"🔊 Alarm sound: {alarm_file or 'synthesized beep'}", "blue")
+    core.run()
+    return core
@@ -0,0 +1,497 @@
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ============================================
+# KONFIGURASI FORWARD KE SERVER PUSAT
+# ============================================
+CENTRAL_URL = "http://localhost:8080"     # server.js (PORT 8080)
+SPOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "forward")
+POOL_SIZE = 2                  # Koneksi keep-alive: satu untuk alarm, satu untuk heartbeat
+REQUEST_TIMEOUT_S = 5
+MEMORY_EVENTS = 1000           # Event alarm yang boleh menunggu di memori; lebih = ke disk
+REPLAY_BATCH = 200             # Event dari disk yang dibaca sekaligus saat replay
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+HEARTBEAT_INTERVAL_S = 5.0     # Heartbeat per device dikirim paling sering sekali per interval
+RETRY_MIN_S = 0.5              # Backoff saat server pusat tidak bisa dihubungi
+RETRY_MAX_S = 30.0
+
+PATH_TRIGGER = "/api/alarm/trigger"
+PATH_CANCEL = "/api/alarm/cancel"
+PATH_HEARTBEAT = "/api/device/heartbeat"
+PATH_REGISTER = "/api/device/register"
+
+
+class ForwardError(Exception):
+    """Server pusat tidak bisa dihubungi / membalas 5xx (dicoba lagi)"""
+
+
+def server_body(device, fields):
+    """Body JSON untuk server.js: field None dibuang, nama field dashboard dilengkapi.
+
+    Dashboard server.js membaca room_number dan ip_address (ESP WiFi);
+    device serial memakai room dan nama port sebagai alamatnya.
+    """
+    body = {"device_id": device}
+    body.update((key, value) for key, value in fields.items() if value is not None)
+    if "room" in body:
+        body.setdefault("room_number", body["room"])
+    if "port" in body:
+        body.setdefault("ip_address", f"serial:{body['port']}")
+    return body
+
+
+# ============================================
+# POOL KONEKSI HTTP KEEP-ALIVE
+# ============================================
+class HttpPool:
+    """Beberapa http.client.HTTPConnection yang dipakai ulang antar request"""
+
+    def __init__(self, url, size=POOL_SIZE, timeout=REQUEST_TIMEOUT_S):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _connect(self):
+        self.opened += 1
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def post(self, path, payload):
+        """POST JSON; kembalikan status HTTP. ForwardError jika koneksi gagal"""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        conn = self._idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            conn.request("POST", self.prefix + path, body=body,
+                         headers={"Content-Type": "application/json", "Connection": "keep-alive"})
+            response = conn.getresponse()
+            response.read()
+            # 5xx: koneksi tidak dipakai ulang, retry membuka koneksi baru
+            if response.will_close or response.status >= 500:
+                conn.close()
+                conn = None
+            return response.status
+        except (OSError, http.client.HTTPException) as e:
+            if conn is not None:
+                conn.close()
+            conn = None
+            raise ForwardError(str(e) or type(e).__name__)
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if conn is not None:
+                conn.close()
+
+
+# ============================================
+# ANTRIAN DISK (STORE-AND-FORWARD)
+# ============================================
+class DiskSpool:
+    """Event yang belum terkirim, append-only JSON per baris + offset baca.
+
+    spool.jsonl hanya ditambah; spool.offset menyimpan byte pertama yang
+    belum terkirim (ditulis atomik lewat os.replace). Setelah semua event
+    terkirim file dipotong kembali ke 0. Ekor yang terpotong (crash saat
+    menulis) dibuang saat dibuka. count adalah jumlah event yang belum
+    terkirim (baris setelah offset), pending jumlah byte-nya.
+    """
+
+    def __init__(self, path=SPOOL_DIR, max_bytes=SPOOL_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self._data_path = os.path.join(path, "spool.jsonl")
+        self._offset_path = os.path.join(path, "spool.offset")
+        self._file = open(self._data_path, "a+b")
+        self.size = self._repair()
+        self.offset = min(self._read_offset(), self.size)
+        self.count = self._count_lines()
+        self._dirty = False
+
+    def _repair(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            return 0
+        self._file.seek(max(0, size - 65536))
+        tail = self._file.read()
+        if tail.endswith(b"\n"):
+            return size
+        cut = tail.rfind(b"\n")
+        good = size - len(tail) + cut + 1 if cut >= 0 else 0
+        self._file.truncate(good)
+        return good
+
+    def _count_lines(self):
+        self._file.seek(self.offset)
+        count, left = 0, self.pending
+        while left > 0:
+            block = self._file.read(min(left, 1 << 20))
+            if not block:
+                break
+            count += block.count(b"\n")
+            left -= len(block)
+        return count
+
+    def _read_offset(self):
+        try:
+            with open(self._offset_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @property
+    def pending(self):
+        """Byte yang belum terkirim"""
+        return self.size - self.offset
+
+    def append(self, records):
+        """Tambahkan event; False jika spool sudah penuh (SPOOL_MAX_BYTES)"""
+        data = b"".join(json.dumps(r, separators=(",", ":")).encode("utf-8") + b"\n" for r in records)
+        if self.size + len(data) > self.max_bytes:
+            return False
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._file.flush()
+        self.size += len(data)
+        self.count += len(records)
+        self._dirty = True
+        return True
+
+    def prepend(self, records):
+        """Taruh event di depan antrian (event memori yang lebih tua dari isi spool).
+
+        File ditulis ulang lewat os.replace; offset dinolkan lebih dulu, jadi
+        crash di tengah paling buruk mengirim ulang event (event_id sama),
+        tidak pernah kehilangan event.
+        """
+        if not self.pending:
+            return self.append(records)
+        data = b"".join(json.dumps(r, separators=(",", ":")).encode("utf-8") + b"\n" for r in records)
+        if self.pending + len(data) > self.max_bytes:
+            return False
+        self._file.seek(self.offset)
+        data += self._file.read(self.pending)
+        tmp = self._data_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_offset(0)
+        os.replace(tmp, self._data_path)
+        self._file.close()
+        self._file = open(self._data_path, "a+b")
+        self.size, self.offset = len(data), 0
+        self.count += len(records)
+        self._dirty = False
+        return True
+
+    def sync(self):
+        if self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def read(self, limit=REPLAY_BATCH):
+        """Maksimal limit event berikutnya: list (record, offset setelah record)"""
+        self._file.seek(self.offset)
+        records, position = [], self.offset
+        while len(records) < limit and position < self.size:
+            line = self._file.readline()
+            if not line:
+                break
+            position += len(line)
+            try:
+                records.append((json.loads(line), position))
+            except ValueError:
+                records.append((None, position))
+        return records
+
+    def commit(self, offset, count):
+        """count event sampai offset sudah terkirim"""
+        self.offset = offset
+        self.count -= count
+        if self.offset >= self.size:
+            self._file.truncate(0)
+            self.size = self.offset = self.count = 0
+        self._write_offset(self.offset)
+
+    def _write_offset(self, offset):
+        tmp = self._offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self._offset_path)
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+# ============================================
+# FORWARDER ALARM -> SERVER PUSAT
+# ============================================
+class AlarmForwarder:
+    """Meneruskan alarm dari port serial ke API server pusat (server.js).
+
+    trigger()/cancel() tidak memblok: event diberi nomor urut lalu masuk
+    antrian memori (maks memory_events) dan dikirim berurutan oleh satu
+    thread lewat HttpPool. Saat server tidak bisa dihubungi (error koneksi
+    atau 5xx) isi memori dipindah ke DiskSpool dan event berikutnya ikut
+    ke disk sampai spool habis. Event di memori selalu lebih tua dari isi
+    spool (dikirim lebih dulu, dipindah ke depan spool), jadi urutan tetap
+    terjaga dan memori tetap kecil selama server mati. Setelah server kembali, spool di-replay per
+    REPLAY_BATCH event. 4xx berarti event ditolak: dicatat lalu dilewati.
+
+    heartbeat() hanya menyimpan status terakhir per device; thread
+    heartbeat mengirim semuanya tiap heartbeat_interval (bukan tiap baris
+    STATUS), heartbeat tidak disimpan ke disk karena hanya status terkini.
+    server.js hanya memperbarui device yang sudah terdaftar, jadi status
+    pertama tiap device (dan yang pertama setelah server tidak bisa
+    dihubungi, daftar device server.js hanya di memori) dikirim ke
+    /api/device/register.
+
+    url=None mematikan forwarder (semua method no-op).
+    """
+
+    def __init__(self, url=CENTRAL_URL, spool_dir=SPOOL_DIR, pool_size=POOL_SIZE,
+                 memory_events=MEMORY_EVENTS, heartbeat_interval=HEARTBEAT_INTERVAL_S,
+                 timeout=REQUEST_TIMEOUT_S, on_error=None):
+        self.url = url
+        self.memory_events = memory_events
+        self.heartbeat_interval = heartbeat_interval
+        self.on_error = on_error
+
+        self.delivered = 0
+        self.rejected = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.heartbeats = 0
+        self.online = True
+        self.last_error = None
+
+        self._seq = 0
+        self._memory = []
+        self._beats = {}
+        self._registered = set()   # Device yang sudah didaftarkan ke server.js
+        self._closed = False
+        self._cond = threading.Condition()
+        if url is None:
+            self.pool = self.spool = None
+            self._threads = []
+            return
+
+        self.pool = HttpPool(url, pool_size, timeout)
+        self.spool = DiskSpool(spool_dir)
+        self._threads = [threading.Thread(target=self._send_loop, name="forward-alarms", daemon=True),
+                         threading.Thread(target=self._heartbeat_loop, name="forward-heartbeats", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    # ============================================
+    # API PEMANGGIL (TIDAK MEMBLOK)
+    # ============================================
+    def trigger(self, device, **fields):
+        return self._submit(PATH_TRIGGER, device, fields)
+
+    def cancel(self, device, **fields):
+        return self._submit(PATH_CANCEL, device, fields)
+
+    def heartbeat(self, device, **fields):
+        if self.url is None or not device:
+            return
+        payload = server_body(device, dict(fields, status="online"))
+        with self._cond:
+            self._beats[device] = payload
+
+    def _submit(self, path, device, fields):
+        if self.url is None:
+            return 0
+        body = server_body(device, fields)
+        with self._cond:
+            if self._closed:
+                return 0
+            self._seq += 1
+            body.setdefault("event_id", f"{int(time.time() * 1000)}-{self._seq}")
+            record = {"path": path, "body": body}
+            # Selama masih ada event di disk, event baru ikut ke disk (urutan terjaga)
+            if self.spool.pending or len(self._memory) >= self.memory_events:
+                self._spill([record])
+            else:
+                self._memory.append(record)
+            self._cond.notify_all()
+            return self._seq
+
+    def _spill(self, records):
+        if self.spool.append(records):
+            self.spilled += len(records)
+        else:
+            self.dropped += len(records)
+            self._report(f"forward spool full, {len(records)} alarm events dropped")
+
+    def _spill_memory(self):
+        if not self._memory:
+            return
+        if self.spool.prepend(self._memory):
+            self.spilled += len(self._memory)
+        else:
+            self.dropped += len(self._memory)
+            self._report(f"forward spool full, {len(self._memory)} alarm events dropped")
+        self._memory = []
+
+    @property
+    def backlog(self):
+        """Jumlah event alarm yang belum terkirim (memori + disk)"""
+        with self._cond:
+            return len(self._memory) + (self.spool.count if self.spool is not None else 0)
+
+    def wait_idle(self, timeout=None):
+        """Tunggu sampai tidak ada event alarm yang belum terkirim"""
+        if self.url is None:
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._memory and not self.spool.pending, timeout)
+
+    def stats(self):
+        with self._cond:
+            return {"online": self.online, "delivered": self.delivered, "rejected": self.rejected,
+                    "spilled": self.spilled, "replayed": self.replayed, "dropped": self.dropped,
+                    "heartbeats": self.heartbeats, "memory": len(self._memory),
+                    "spool_events": self.spool.count if self.spool is not None else 0,
+                    "spool_bytes": self.spool.pending if self.spool is not None else 0,
+                    "connections_opened": self.pool.opened if self.pool is not None else 0}
+
+    def close(self, timeout=2):
+        """Kirim sisa antrian (maks timeout), sisanya disimpan di disk untuk start berikutnya"""
+        if self.url is None:
+            return
+        with self._cond:
+            self._cond.wait_for(lambda: not self._memory or not self.online, timeout)
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._cond:
+            self._spill_memory()
+            self.spool.close()
+        self.pool.close()
+
+    def _report(self, message):
+        self.last_error = message
+        if self.on_error is not None:
+            self.on_error(message)
+
+    # ============================================
+    # THREAD PENGIRIM ALARM
+    # ============================================
+    def _send_loop(self):
+        delay = RETRY_MIN_S
+        while True:
+            with self._cond:
+                while not self._closed and not self._memory and not self.spool.pending:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self.spool.sync()
+                # Event di memori selalu lebih tua dari isi spool
+                from_disk = not self._memory
+                batch = self.spool.read() if from_disk else [(r, None) for r in self._memory[:REPLAY_BATCH]]
+
+            sent, failure = self._deliver(batch, from_disk)
+
+            with self._cond:
+                if from_disk:
+                    if sent:
+                        self.spool.commit(batch[sent - 1][1], sent)
+                        self.replayed += sent
+                else:
+                    del self._memory[:sent]
+                if failure is not None:
+                    # Server mati: antrian memori pindah ke disk di depan spool
+                    self._spill_memory()
+                    self.spool.sync()
+                    self._registered.clear()
+                was_online, self.online = self.online, failure is None
+                self._cond.notify_all()
+
+            if failure is None:
+                delay = RETRY_MIN_S
+                if not was_online:
+                    self._report("central server reachable again, replaying backlog")
+                continue
+            if was_online:
+                self._report(f"central server unreachable ({failure}), queueing alarms to disk")
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, delay)
+            delay = min(delay * 2, RETRY_MAX_S)
+
+    def _deliver(self, batch, from_disk):
+        """Kirim berurutan; kembalikan (jumlah selesai, error koneksi atau None)"""
+        for index, (record, _) in enumerate(batch):
+            if record is None:
+                continue       # Baris spool rusak: dilewati
+            try:
+                status = self.pool.post(record["path"], record["body"])
+            except ForwardError as e:
+                return index, e
+            if status >= 500:
+                return index, ForwardError(f"HTTP {status}")
+            with self._cond:
+                if status >= 400:
+                    self.rejected += 1
+                else:
+                    self.delivered += 1
+            if status >= 400:
+                self._report(f"central server rejected {record['path']} (HTTP {status})")
+        return len(batch), None
+
+    # ============================================
+    # THREAD HEARTBEAT (STATUS TERAKHIR PER DEVICE)
+    # ============================================
+    def _heartbeat_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, self.heartbeat_interval)
+                if self._closed:
+                    return
+                if not self.online:
+                    continue
+                beats, self._beats = self._beats, {}
+                registered = set(self._registered)
+            sent, new = 0, []
+            try:
+                for device, payload in beats.items():
+                    if device in registered:
+                        self.pool.post(PATH_HEARTBEAT, payload)
+                    elif self.pool.post(PATH_REGISTER, payload) < 400:
+                        new.append(device)
+                    sent += 1
+            except ForwardError:
+                # Dicoba lagi interval berikutnya, kecuali device sudah punya status lebih baru.
+                # Server mungkin restart: semua device didaftarkan ulang.
+                new = []
+                with self._cond:
+                    self._registered.clear()
+                    for device, payload in beats.items():
+                        self._beats.setdefault(device, payload)
+            with self._cond:
+                self.heartbeats += sent
+                self._registered.update(new)
@@ -0,0 +1,338 @@
+import collections
+import threading
+from datetime import datetime
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from alarm_core import METRICS_SUMMARY_MS, AlarmCore
+from alarm_registry import DEDUP_WINDOW_S
+from event_store import HISTORY_LIMIT
+from latency_metrics import METRICS_HOST, METRICS_PORT
+from log_pipeline import LogPipeline, LogRing
+from log_view import VirtualLogView
+
+# ============================================
+# KONFIGURASI GUI
+# ============================================
+UI_TICK_MS = 33                # Interval eksekusi update GUI dari thread lain
+
+# ============================================
+# KELAS UTAMA PC ALARM CONTROLLER (FIXED)
+# ============================================
+class PCAlarmController(AlarmCore):
+    """GUI Tk di atas AlarmCore: serial, alarm dan suara diwarisi dari core"""
+
+    def __init__(self, multi_link=False, metrics_port=METRICS_PORT, alarm_file=None,
+                 dedup_window=DEDUP_WINDOW_S, central_url=None, profile=False, metrics_host=METRICS_HOST):
+        # Update GUI dari thread lain dijalankan di main loop
+        self.ui_queue = collections.deque()
+
+        # GUI Setup (sebelum core, supaya log dari worker core langsung masuk pipeline)
+        self.setup_gui()
+
+        super().__init__(multi_link=multi_link, metrics_port=metrics_port, alarm_file=alarm_file,
+                         dedup_window=dedup_window, central_url=central_url, profile=profile,
+                         metrics_host=metrics_host)
+
+    def setup_gui(self):
+        """Setup GUI untuk monitoring"""
+        self.root = tk.Tk()
+        self.root.title("Hospital Alarm PC Controller - FIXED")
+        self.root.geometry("900x700")
+
+        # Style
+        style = ttk.Style()
+        style.theme_use('clam')
+
+        # Header
+        header_frame = ttk.Frame(self.root, padding="20")
+        header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+        ttk.Label(header_frame, text="🏥 HOSPITAL EMERGENCY ALARM SYSTEM",
+                 font=("Arial", 20, "bold")).grid(row=0, column=0)
+        ttk.Label(header_frame, text="FIXED VERSION - Handles all ESP8266 formats",
+                 font=("Arial", 12)).grid(row=1, column=0)
+
+        # Status Frame
+        status_frame = ttk.LabelFrame(self.root, text="System Status", padding="10")
+        status_frame.grid(row=1, column=0, padx=20, pady=10, sticky=(tk.W, tk.E))
+
+        self.status_label = ttk.Label(status_frame, text="⚪ Disconnected", font=("Arial", 12))
+        self.status_label.grid(row=0, column=0, sticky=tk.W)
+
+        self.connection_label = ttk.Label(status_frame, text="Port: Not connected")
+        self.connection_label.grid(row=0, column=1, sticky=tk.W, padx=50)
+
+        # Alarm Status Frame
+        alarm_status_frame = ttk.LabelFrame(self.root, text="Active Emergency", padding="15")
+        alarm_status_frame.grid(row=2, column=0, padx=20, pady=10, sticky=(tk.W, tk.E))
+
+        self.alarm_icon = ttk.Label(alarm_status_frame, text="🔴", font=("Arial", 40))
+        self.alarm_icon.grid(row=0, column=0, rowspan=2, padx=20)
+
+        self.alarm_text = ttk.Label(alarm_status_frame, text="NO ACTIVE ALARM",
+                                   font=("Arial", 18, "bold"), foreground="green")
+        self.alarm_text.grid(row=0, column=1, sticky=tk.W)
+
+        self.alarm_details = ttk.Label(alarm_status_frame, text="System Ready", font=("Arial", 12))
+        self.alarm_details.grid(row=1, column=1, sticky=tk.W)
+
+        # Device Info Frame
+        device_frame = ttk.LabelFrame(self.root, text="Connected Device Info", padding="10")
+        device_frame.grid(row=3, column=0, padx=20, pady=10, sticky=(tk.W, tk.E))
+
+        self.device_id_label = ttk.Label(device_frame, text="Device ID: Not connected")
+        self.device_id_label.grid(row=0, column=0, sticky=tk.W)
+
+        self.patient_label = ttk.Label(device_frame, text="Patient: Unknown")
+        self.patient_label.grid(row=0, column=1, sticky=tk.W, padx=50)
+
+        self.room_label = ttk.Label(device_frame, text="Room: Unknown")
+        self.room_label.grid(row=0, column=2, sticky=tk.W)
+
+        # Control Buttons
+        control_frame = ttk.Frame(self.root)
+        control_frame.grid(row=4, column=0, pady=20)
+
+        ttk.Button(control_frame, text="🔊 Test Alarm",
+                  command=self.test_alarm, width=15).grid(row=0, column=0, padx=5)
+        ttk.Button(control_frame, text="⏹️ Stop Alarm",
+                  command=self.stop_alarm, width=15).grid(row=0, column=1, padx=5)
+        ttk.Button(control_frame, text="🔄 Reconnect",
+                  command=self.reconnect, width=15).grid(row=0, column=2, padx=5)
+        ttk.Button(control_frame, text="📊 View Log",
+                  command=self.show_log, width=15).grid(row=0, column=3, padx=5)
+        ttk.Button(control_frame, text="🛑 Emergency Stop",
+                  command=self.emergency_stop, width=15).grid(row=0, column=4, padx=5)
+
+        # Log Frame
+        log_frame = ttk.LabelFrame(self.root, text="Serial Monitor & Log", padding="10")
+        log_frame.grid(row=5, column=0, padx=20, pady=10, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # Log Text dengan Scrollbar
+        log_container = ttk.Frame(log_frame)
+        log_container.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # Log disimpan di ring buffer, widget hanya merender baris yang terlihat
+        self.log_ring = LogRing()
+        self.log_view = VirtualLogView(log_container, self.log_ring, height=15, width=100,
+                                       font=("Consolas", 10))
+        self.log_view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # Semua log lewat pipeline, di-flush per batch di main loop
+        self.log_pipeline = LogPipeline(self.root, self.log_ring)
+        self.log_pipeline.add_view(self.log_view)
+        self.log_pipeline.start()
+        self.root.after(UI_TICK_MS, self.process_ui_queue)
+
+        # Button untuk clear log
+        ttk.Button(log_frame, text="Clear Log", command=self.clear_log).grid(row=1, column=0, pady=5)
+
+        # Configure grid weights
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(5, weight=1)
+        log_container.columnconfigure(0, weight=1)
+        log_container.rowconfigure(0, weight=1)
+
+        # Bind close event
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        # Tombol tersembunyi untuk teknisi: Ctrl+Shift+P hidup/matikan profiling
+        self.root.bind("<Control-Shift-P>", self.toggle_profiling)
+
+        # Set icon
+        self.set_window_icon()
+
+    def set_window_icon(self):
+        """Set window icon (if available)"""
+        try:
+            self.root.iconbitmap(r"C:\HospitalAlarmApp\icon.ico")
+        except:
+            pass
+
+    def log_message(self, message, color="black"):
+        """Menambahkan pesan ke log dengan warna (aman dipanggil dari thread manapun)"""
+        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+
+        # Widget dan console di-update per batch oleh LogPipeline
+        self.log_pipeline.push(f"[{timestamp}] {message}", color)
+
+    def run_on_ui(self, func, *args):
+        """Jadwalkan update GUI dari thread manapun (dieksekusi di main loop)"""
+        self.ui_queue.append((func, args))
+
+    def process_ui_queue(self):
+        """Menjalankan semua update GUI yang mengantri"""
+        queue_ = self.ui_queue
+        for _ in range(len(queue_)):
+            func, args = queue_.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                self.log_message(f"GUI update error: {e}", "orange")
+        self.root.after(UI_TICK_MS, self.process_ui_queue)
+
+    def toggle_profiling(self, event=None):
+        """Ctrl+Shift+P: stop profiler menulis file + snapshot, jadi tidak di main loop"""
+        threading.Thread(target=self.set_profiling, args=(not self.diagnostics.enabled,),
+                         name="profiler-toggle", daemon=True).start()
+
+    def diagnostic_gauges(self):
+        """Tambahan GUI: ring log, antrian update dan view log yang masih terdaftar"""
+        gauges = super().diagnostic_gauges()
+        gauges.update({
+            "log_ring_lines": lambda: len(self.log_ring),
+            "log_lines_total": lambda: self.log_ring.total,
+            "log_pending": lambda: self.log_pipeline.backlog,
+            "log_dropped": lambda: self.log_pipeline.dropped,
+            "log_views": lambda: len(self.log_pipeline.views),
+            "ui_queue": lambda: len(self.ui_queue),
+        })
+        return gauges
+
+    def clear_log(self):
+        """Membersihkan log"""
+        self.log_ring.clear()
+        self.log_pipeline.refresh_views()
+        self.log_message("Log cleared", "blue")
+
+    def set_connection_status(self, status, detail=None):
+        """Update label status koneksi (connect berjalan di thread sendiri)"""
+        self.run_on_ui(self._show_connection_status, status, detail)
+
+    def _show_connection_status(self, status, detail):
+        self.status_label.config(text=status)
+        if detail is not None:
+            self.connection_label.config(text=detail)
+
+    def report_no_ports(self):
+        self.run_on_ui(messagebox.showerror, "Error",
+                       "No serial ports detected!\nPlease connect ESP8266 via USB.")
+
+    def refresh_device_panel(self, device):
+        """Render panel Connected Device Info dari record registry"""
+        self.device_id_label.config(text=f"Device ID: {device.device_id}")
+        self.patient_label.config(text=f"Patient: {device.patient}")
+        self.room_label.config(text=f"Room: {device.room}")
+
+    def refresh_alarm_panel(self):
+        """Render panel Active Emergency dari registry"""
+        latest = self.registry.latest_alarm()
+
+        if latest is None:
+            self.alarm_icon.config(text="✅", foreground="green")
+            self.alarm_text.config(text="NO ACTIVE ALARM", foreground="green")
+            self.alarm_details.config(text="System Ready")
+            return
+
+        count = self.registry.active_count
+        self.alarm_icon.config(text="🚨", foreground="red")
+        if count == 1:
+            self.alarm_text.config(text="EMERGENCY ALARM ACTIVE!", foreground="red")
+        else:
+            self.alarm_text.config(text=f"{count} EMERGENCY ALARMS ACTIVE!", foreground="red")
+
+        timestamp = datetime.fromtimestamp(latest.started_wall).strftime("%H:%M:%S")
+        alarm_details = f"Time: {timestamp} | Source: {latest.source}\n"
+        alarm_details += f"Patient: {latest.patient} | Room: {latest.room}\n"
+        alarm_details += f"Device: {latest.device_id}"
+
+        self.alarm_details.config(text=alarm_details)
+
+    def show_emergency_notification(self, patient, room):
+        """Menampilkan notifikasi emergency"""
+        try:
+            message = f"EMERGENCY ALERT!\n\nPatient: {patient}\nRoom: {room}\n\nTime: {datetime.now().strftime('%H:%M:%S')}"
+
+            # Tkinter messagebox
+            self.root.after(0, lambda:
+                messagebox.showwarning("🚨 HOSPITAL EMERGENCY", message,
+                                      icon=messagebox.WARNING))
+
+            # Bring window to front
+            self.root.lift()
+            self.root.attributes('-topmost', True)
+            self.root.after(1000, lambda: self.root.attributes('-topmost', False))
+
+        except Exception as e:
+            self.log_message(f"Notification error: {e}", "orange")
+
+    def flash_window(self, flashes=6):
+        """Flash window untuk perhatian (dijadwalkan dengan after, tanpa sleep)"""
+        try:
+            original_color = self.root.cget("bg")
+        except:
+            return
+
+        def step(i):
+            try:
+                if i >= flashes * 2:
+                    self.root.config(bg=original_color)
+                    return
+                self.root.config(bg="red" if i % 2 == 0 else original_color)
+                self.root.after(300, step, i + 1)
+            except:
+                pass
+
+        step(0)
+
+    def show_log(self):
+        """Menampilkan log window (view virtual atas ring buffer yang sama)"""
+        log_window = tk.Toplevel(self.root)
+        log_window.title("Alarm History")
+        log_window.geometry("800x600")
+
+        # History alarm dari event store (tetap ada setelah restart)
+        history_frame = ttk.LabelFrame(log_window, text=f"Alarm Events (latest {HISTORY_LIMIT})", padding="5")
+        history_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        columns = ("time", "event", "device", "patient", "room", "source")
+        history = ttk.Treeview(history_frame, columns=columns, show="headings", height=10)
+        for column, width in zip(columns, (140, 80, 160, 120, 80, 200)):
+            history.heading(column, text=column.title())
+            history.column(column, width=width, stretch=column == "source")
+        scrollbar = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=history.yview)
+        history.configure(yscrollcommand=scrollbar.set)
+        history.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for event in self.event_store.recent(HISTORY_LIMIT):
+            timestamp = datetime.fromtimestamp(event.get("ts", 0)).strftime("%Y-%m-%d %H:%M:%S")
+            history.insert("", tk.END, values=(timestamp, event.get("kind", ""), event.get("device") or "",
+                                               event.get("patient", ""), event.get("room", ""),
+                                               event.get("source", "")))
+
+        self.log_pipeline.flush()
+        view = VirtualLogView(log_window, self.log_ring, height=20, font=("Consolas", 10))
+        view.pack(side=tk.TOP, expand=True, fill=tk.BOTH, padx=5, pady=5)
+        self.log_pipeline.add_view(view)
+
+        def close():
+            self.log_pipeline.remove_view(view)
+            log_window.destroy()
+
+        log_window.protocol("WM_DELETE_WINDOW", close)
+        ttk.Button(log_window, text="Close", command=close).pack(pady=10)
+
+    def on_closing(self):
+        """Handle window closing"""
+        self.shutdown()
+        self.log_pipeline.flush()
+        self.log_pipeline.stop()
+        self.root.destroy()
+
+    def run(self):
+        """Menjalankan aplikasi"""
+        # Connect langsung di thread sendiri, GUI tetap responsif
+        self.start_connect()
+
+        # Endpoint /metrics dan ringkasan latensi periodik di log
+        self.start_metrics()
+        self.root.after(METRICS_SUMMARY_MS, self.log_metrics_summary)
+
+        # Run GUI
+        self.root.mainloop()
+
+    def log_metrics_summary(self):
+        """Ringkasan p50/p99/max latensi alarm ke log"""
+        super().log_metrics_summary()
+        self.root.after(METRICS_SUMMARY_MS, self.log_metrics_summary)
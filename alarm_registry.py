@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================
+# REGISTRY DEVICE & ALARM (IN-MEMORY)
+# ============================================
+UNKNOWN_DEVICE = "Unknown"
+DEDUP_WINDOW_S = 2.0           # Event sama dari device yang sama dalam jendela ini digabung
+DEDUP_MAX_KEYS = 4096          # Batas LRU (device, aksi) yang diingat
+DEDUP_START = "start"          # Semua jenis pemicu alarm (tombol, JSON, echo EMERGENCY, CMD)
+DEDUP_STOP = "stop"            # !ALARM_STOP! tanpa alarm aktif
+
+
+class DeviceRecord:
+    """Info device terakhir dari handshake"""
+    __slots__ = ("device_id", "patient", "room", "port", "last_seen")
+
+    def __init__(self, device_id, patient="Unknown", room="Unknown", port=None):
+        self.device_id = device_id
+        self.patient = patient
+        self.room = room
+        self.port = port
+        self.last_seen = time.monotonic()
+
+
+class AlarmRecord:
+    """Satu alarm aktif per device"""
+    __slots__ = ("device_id", "patient", "room", "port", "source",
+                 "started_at", "started_wall", "acknowledged_at")
+
+    def __init__(self, device_id, patient, room, port, source):
+        self.device_id = device_id
+        self.patient = patient
+        self.room = room
+        self.port = port
+        self.source = source
+        self.started_at = time.monotonic()
+        self.started_wall = time.time()
+        self.acknowledged_at = None
+
+    @property
+    def acknowledged(self):
+        return self.acknowledged_at is not None
+
+
+def _unindex(index, key, device_id):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(device_id, None)
+        if not bucket:
+            del index[key]
+
+
+class AlarmRegistry:
+    """Index device dan alarm aktif per device_id dan per room.
+
+    Semua operasi (lookup, start, stop, acknowledge) berupa operasi dict
+    sehingga O(1) berapapun jumlah device yang aktif bersamaan. Perubahan
+    dilindungi lock karena dipanggil dari thread serial dan thread GUI.
+    """
+
+    def __init__(self):
+        self.devices = {}          # device_id -> DeviceRecord
+        self.port_devices = {}     # port (None = single link) -> device_id
+        self.alarms = {}           # device_id -> AlarmRecord (insertion order = urutan start)
+        self.room_alarms = {}      # room -> {device_id: AlarmRecord}
+        self.port_alarms = {}      # port -> {device_id: AlarmRecord}
+        self.last_device = None
+        self._lock = threading.Lock()
+
+    # ---------- Device ----------
+    def update_device(self, device_id, patient, room, port=None):
+        """Simpan/refresh info device dari handshake"""
+        with self._lock:
+            record = self.devices.get(device_id)
+            if record is None:
+                record = DeviceRecord(device_id, patient, room, port)
+                self.devices[device_id] = record
+            else:
+                record.patient = patient
+                record.room = room
+                record.port = port
+                record.last_seen = time.monotonic()
+
+            self.port_devices[port] = device_id
+            self.last_device = record
+            return record
+
+    def device(self, device_id):
+        return self.devices.get(device_id)
+
+    def device_for_port(self, port):
+        """Device yang terakhir handshake di port ini"""
+        device_id = self.port_devices.get(port)
+        return self.devices.get(device_id) if device_id is not None else None
+
+    # ---------- Alarm ----------
+    def start(self, device_id, patient, room, port, source):
+        """Mulai alarm untuk device; kembalikan (record, is_new)"""
+        with self._lock:
+            record = self.alarms.get(device_id)
+            if record is not None:
+                return record, False
+
+            record = AlarmRecord(device_id, patient, room, port, source)
+            self.alarms[device_id] = record
+            self.room_alarms.setdefault(room, {})[device_id] = record
+            self.port_alarms.setdefault(port, {})[device_id] = record
+            return record, True
+
+    def stop(self, device_id):
+        """Hentikan alarm device, kembalikan record atau None"""
+        with self._lock:
+            record = self.alarms.pop(device_id, None)
+            if record is None:
+                return None
+
+            _unindex(self.room_alarms, record.room, device_id)
+            _unindex(self.port_alarms, record.port, device_id)
+            return record
+
+    def acknowledge(self, device_id):
+        """Tandai alarm sudah di-ack ke ESP8266"""
+        record = self.alarms.get(device_id)
+        if record is not None and record.acknowledged_at is None:
+            record.acknowledged_at = time.monotonic()
+        return record
+
+    def alarm(self, device_id):
+        return self.alarms.get(device_id)
+
+    def alarm_for_port(self, port):
+        """Alarm aktif milik device di port ini (atau alarm tanpa device di port ini)"""
+        device = self.device_for_port(port)
+        if device is not None and device.device_id in self.alarms:
+            return self.alarms[device.device_id]
+        with self._lock:
+            port_alarms = self.port_alarms.get(port)
+            if port_alarms:
+                return next(reversed(port_alarms.values()))
+            return None
+
+    def active_alarms(self):
+        """Snapshot semua alarm aktif, urut dari yang paling lama"""
+        with self._lock:
+            return list(self.alarms.values())
+
+    def alarms_in_room(self, room):
+        with self._lock:
+            return list(self.room_alarms.get(room, {}).values())
+
+    def latest_alarm(self):
+        """Alarm aktif paling baru (untuk panel GUI)"""
+        with self._lock:
+            if not self.alarms:
+                return None
+            return next(reversed(self.alarms.values()))
+
+    @property
+    def active_count(self):
+        return len(self.alarms)
+
+
+# ============================================
+# PEREDAM EVENT BERULANG (DEBOUNCE PER DEVICE)
+# ============================================
+class _DedupEntry:
+    __slots__ = ("admitted_at", "repeats")
+
+    def __init__(self, admitted_at):
+        self.admitted_at = admitted_at
+        self.repeats = 0
+
+
+class AlarmDeduplicator:
+    """Gabungkan event (device, aksi) yang berulang dalam `window` detik.
+
+    Event pertama diproses dan membuka jendela; pengulangan di dalam
+    jendela (tombol memantul, ESP mengirim ulang !ALARM_START! atau echo
+    "EMERGENCY") hanya dihitung. Setelah jendela lewat event berikutnya
+    diproses lagi dan membawa jumlah pengulangan yang digabung. forget()
+    menutup jendela saat alarm dihentikan, jadi alarm baru setelah stop
+    tidak pernah tertelan. Device lain punya key sendiri.
+
+    Key disimpan di OrderedDict LRU dengan batas `max_keys`: memori tetap
+    konstan walaupun ada ribuan device atau banjir event.
+    """
+
+    def __init__(self, window=DEDUP_WINDOW_S, max_keys=DEDUP_MAX_KEYS, clock=time.monotonic):
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self.coalesced = 0         # Total event yang digabung sejak start
+        self.evicted = 0           # Key yang dibuang LRU sebelum jendelanya habis
+        self._recent = OrderedDict()   # (device, aksi) -> _DedupEntry
+        self._lock = threading.Lock()
+
+    def admit(self, device, action):
+        """(True, pengulangan yang digabung sebelumnya) jika diproses, (False, 0) jika digabung"""
+        now = self.clock()
+        key = (device, action)
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is not None and now - entry.admitted_at < self.window:
+                entry.repeats += 1
+                self.coalesced += 1
+                return False, 0
+
+            repeats = entry.repeats if entry is not None else 0
+            self._recent[key] = _DedupEntry(now)
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_keys:
+                _, oldest = self._recent.popitem(last=False)
+                if now - oldest.admitted_at < self.window:
+                    self.evicted += 1
+            return True, repeats
+
+    def forget(self, device, action):
+        """Tutup jendela (misal alarm dihentikan operator); kembalikan pengulangan yang belum dilaporkan"""
+        with self._lock:
+            entry = self._recent.pop((device, action), None)
+            return entry.repeats if entry is not None else 0
+
+    def __len__(self):
+        return len(self._recent)
@@ -0,0 +1,466 @@
+import bisect
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+# ============================================
+# KONFIGURASI BACKUP STORE
+# ============================================
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "backup")
+STORE_DIR = os.path.join(BACKUP_DIR, "store")
+CACHE_CHUNKS = 4096            # Chunk hasil decompress yang disimpan di memori (LRU)
+COMMIT_EVERY = 500             # compact(): fsync setiap sekian snapshot
+
+PACK_FILE = "chunks.pack"
+MANIFEST_FILE = "snapshots.log"
+PACK_MAGIC = b"HABACKUP1\n"
+CHUNK_HEADER = struct.Struct("<16sI")      # digest blake2b-128, panjang data terkompresi
+SNAPSHOT_NAME = re.compile(r"backup-(\d+)\.json$")
+
+# Kamus preset zlib: chunk backup kecil (~100-200 byte) hampir tidak bisa
+# dikompres sendirian, dengan kamus berisi kunci/nilai khas backup server
+# hasilnya jauh lebih kecil. JANGAN diubah: chunk lama di-decode dengan
+# kamus yang sama (id kamus dicek saat store dibuka).
+ZDICT = (
+    b'"button","emergency","ACTIVE","Not Responded","Room ","Bed ","Patient ",'
+    b'{"id":"","mac":"","ip":"","status":"disconnected","lastSeen":null}'
+    b'{"active":false,"type":"test","triggeredAt":null,"triggeredBy":null,"acknowledged":false,"duration":10000}'
+    b'{"id":"TEST-001","name":"Test Patient","room":"Test Room","bed":"Test Bed","status":"EMERGENCY_TEST",'
+    b'"time":"25/12/2025, 10.53.36"}'
+    b'{"active":true,"type":"button","triggeredAt":"2025-12-25T03:53:36.932Z","triggeredBy":"system_test",'
+    b'"acknowledged":true,"duration":10000}'
+    b'{"id":"ESP8266-ROOM-101","mac":"AA:BB:CC:DD:EE:FF","ip":"192.168.18.250","status":"connected",'
+    b'"lastSeen":"2025-12-25T03:53:48.151Z"}'
+)
+ZDICT_ID = zlib.crc32(ZDICT)
+
+
+class BackupStoreError(Exception):
+    """Store rusak / tidak cocok (bukan sekadar ekor yang terpotong)"""
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _render(snapshot):
+    """Format file backup server (JSON.stringify(data, null, 2))"""
+    return json.dumps(snapshot, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class Snapshot:
+    """Satu backup di manifest: waktu (epoch ms), nama file asal dan chunk penyusunnya"""
+    __slots__ = ("ts", "name", "size", "keys", "parts", "raw")
+
+    def __init__(self, ts, name, size, keys=None, parts=None, raw=None):
+        self.ts = ts
+        self.name = name
+        self.size = size
+        self.keys = keys           # id chunk daftar kunci top-level (urutan asli)
+        self.parts = parts         # Per kunci: id chunk nilai, atau [id chunk daftar id elemen] untuk list
+        self.raw = raw             # id chunk file utuh (jika tidak bisa dipecah tanpa mengubah byte)
+
+    def to_json(self):
+        entry = {"t": self.ts, "s": self.size}
+        if self.name != f"backup-{self.ts}.json":
+            entry["n"] = self.name
+        if self.raw is not None:
+            entry["r"] = self.raw
+        else:
+            entry["k"], entry["p"] = self.keys, self.parts
+        return entry
+
+    @classmethod
+    def from_json(cls, entry):
+        ts = entry["t"]
+        return cls(ts, entry.get("n", f"backup-{ts}.json"), entry.get("s", 0),
+                   entry.get("k"), entry.get("p"), entry.get("r"))
+
+    def chunk_ids(self):
+        if self.raw is not None:
+            return [self.raw]
+        ids = [self.keys]
+        for part in self.parts:
+            ids.extend(part if isinstance(part, list) else [part])
+        return ids
+
+
+# ============================================
+# BACKUP STORE (CONTENT-ADDRESSED, DEDUP)
+# ============================================
+class BackupStore:
+    """Backup data server yang di-dedup per sub-objek dan dikompres.
+
+    Tiap snapshot (backup-<epoch>.json) dipecah per kunci top-level
+    (device, patients, alarm, ...); nilai list (patients) dipecah lagi per
+    elemen. Tiap potongan disimpan sekali di chunks.pack berdasarkan hash
+    isinya (blake2b), dikompres zlib dengan kamus preset, jadi potongan
+    yang tidak berubah antar snapshot tidak memakan tempat lagi.
+    snapshots.log (JSON per baris) mencatat urutan chunk per snapshot.
+
+    Restore menyusun ulang byte file asli persis sama (dicek saat ingest;
+    file yang tidak bisa disusun ulang persis disimpan utuh sebagai satu
+    chunk). Snapshot point-in-time dicari dengan bisect, chunk dibaca
+    dengan seek + read dan di-cache LRU.
+
+    Urutan tulis: chunk -> fsync pack -> manifest -> fsync manifest, jadi
+    manifest tidak pernah menunjuk chunk yang belum di disk. Ekor file yang
+    terpotong (crash) dibuang saat store dibuka.
+    """
+
+    def __init__(self, path=STORE_DIR, fsync=True, cache_chunks=CACHE_CHUNKS):
+        self.path = path
+        self.fsync = fsync
+        self.cache_chunks = cache_chunks
+        os.makedirs(path, exist_ok=True)
+
+        self._offsets = []         # id chunk -> (offset data, panjang)
+        self._ids = {}             # digest -> id chunk
+        self._snapshots = []       # urut waktu
+        self._times = []           # ts per snapshot (untuk bisect)
+        self._names = {}           # nama file -> Snapshot
+        self._pending = []         # manifest yang menunggu commit()
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._pack = self._open_pack(os.path.join(path, PACK_FILE))
+        self._manifest = self._open_manifest(os.path.join(path, MANIFEST_FILE))
+
+    # ============================================
+    # BUKA / PERBAIKI FILE
+    # ============================================
+    def _open_pack(self, path):
+        f = open(path, "a+b")
+        f.seek(0)
+        header = f.read(len(PACK_MAGIC) + 4)
+        if not header:
+            f.write(PACK_MAGIC + struct.pack("<I", ZDICT_ID))
+            f.flush()
+            return f
+        if header[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise BackupStoreError(f"{path} is not a backup pack")
+        if struct.unpack("<I", header[len(PACK_MAGIC):])[0] != ZDICT_ID:
+            raise BackupStoreError(f"{path} was written with a different compression dictionary")
+
+        offset = len(header)
+        size = os.fstat(f.fileno()).st_size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            while offset + CHUNK_HEADER.size <= size:
+                digest, length = CHUNK_HEADER.unpack_from(view, offset)
+                data_offset = offset + CHUNK_HEADER.size
+                if data_offset + length > size:
+                    break
+                self._ids[digest] = len(self._offsets)
+                self._offsets.append((data_offset, length))
+                offset = data_offset + length
+        if offset < size:
+            # Chunk terakhir terpotong (crash saat menulis): buang
+            f.truncate(offset)
+        return f
+
+    def _open_manifest(self, path):
+        f = open(path, "a+b")
+        f.seek(0)
+        good = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                snapshot = Snapshot.from_json(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                break
+            good += len(line)
+            if all(chunk < len(self._offsets) for chunk in snapshot.chunk_ids()):
+                self._insert(snapshot)
+        if good < os.fstat(f.fileno()).st_size:
+            f.truncate(good)
+        return f
+
+    def _insert(self, snapshot):
+        if snapshot.name in self._names:
+            return
+        if not self._times or snapshot.ts >= self._times[-1]:
+            self._times.append(snapshot.ts)
+            self._snapshots.append(snapshot)
+        else:
+            index = bisect.bisect_right(self._times, snapshot.ts)
+            self._times.insert(index, snapshot.ts)
+            self._snapshots.insert(index, snapshot)
+        if snapshot.name:
+            self._names[snapshot.name] = snapshot
+
+    # ============================================
+    # INGEST
+    # ============================================
+    def add(self, data, ts, name=None, commit=True):
+        """Simpan satu file backup (bytes); kembalikan Snapshot (yang sudah ada jika nama sama)"""
+        with self._lock:
+            if name is not None and name in self._names:
+                return self._names[name]
+
+            snapshot = None
+            try:
+                value = json.loads(data)
+                structured = isinstance(value, dict) and _render(value) == data
+            except (ValueError, UnicodeEncodeError):
+                # Bukan JSON, atau surrogate tunggal ("\ud800") yang tidak bisa di-encode UTF-8: simpan mentah
+                structured = False
+            if structured:
+                parts = []
+                for item in value.values():
+                    if isinstance(item, list):
+                        # Daftar id elemen juga jadi chunk: list yang tidak berubah = chunk yang sama
+                        elements = [self._put(_encode(element)) for element in item]
+                        parts.append([self._put(_encode(elements))])
+                    else:
+                        parts.append(self._put(_encode(item)))
+                snapshot = Snapshot(ts, name, len(data), self._put(_encode(list(value))), parts)
+            if snapshot is None:
+                snapshot = Snapshot(ts, name, len(data), raw=self._put(data))
+
+            self._pending.append(snapshot)
+            self._insert(snapshot)
+            if commit:
+                self.commit()
+            return snapshot
+
+    def add_file(self, path, commit=True):
+        name = os.path.basename(path)
+        match = SNAPSHOT_NAME.match(name)
+        ts = int(match[1]) if match else int(os.stat(path).st_mtime * 1000)
+        with open(path, "rb") as f:
+            return self.add(f.read(), ts, name, commit)
+
+    def _put(self, payload):
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        chunk = self._ids.get(digest)
+        if chunk is not None:
+            return chunk
+        compressor = zlib.compressobj(9, zdict=ZDICT)
+        data = compressor.compress(payload) + compressor.flush()
+        self._pack.seek(0, os.SEEK_END)
+        offset = self._pack.tell() + CHUNK_HEADER.size
+        self._pack.write(CHUNK_HEADER.pack(digest, len(data)) + data)
+        chunk = len(self._offsets)
+        self._offsets.append((offset, len(data)))
+        self._ids[digest] = chunk
+        return chunk
+
+    def commit(self):
+        """Pastikan chunk lalu manifest snapshot baru ada di disk"""
+        with self._lock:
+            if not self._pending:
+                return
+            self._sync(self._pack)
+            self._manifest.seek(0, os.SEEK_END)
+            self._manifest.write(b"".join(_encode(s.to_json()) + b"\n" for s in self._pending))
+            self._sync(self._manifest)
+            self._pending.clear()
+
+    def _sync(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    # ============================================
+    # RESTORE
+    # ============================================
+    @property
+    def snapshots(self):
+        return list(self._snapshots)
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def snapshot_at(self, ts=None, name=None):
+        """Snapshot dengan nama itu, atau snapshot terakhir pada/sebelum ts (epoch ms; None = terbaru)"""
+        if name is not None:
+            return self._names.get(name)
+        if ts is None:
+            return self._snapshots[-1] if self._snapshots else None
+        index = bisect.bisect_right(self._times, ts)
+        return self._snapshots[index - 1] if index else None
+
+    def restore(self, ts=None, name=None):
+        """Byte file backup asli untuk titik waktu ts (atau nama file); None jika tidak ada"""
+        snapshot = self.snapshot_at(ts, name)
+        if snapshot is None:
+            return None
+        if snapshot.raw is not None:
+            return self._chunk(snapshot.raw)
+        value = {}
+        for key, part in zip(json.loads(self._chunk(snapshot.keys)), snapshot.parts):
+            if isinstance(part, list):
+                value[key] = [json.loads(self._chunk(chunk)) for chunk in json.loads(self._chunk(part[0]))]
+            else:
+                value[key] = json.loads(self._chunk(part))
+        return _render(value)
+
+    def load(self, ts=None, name=None):
+        """Snapshot sebagai dict"""
+        data = self.restore(ts, name)
+        return json.loads(data) if data is not None else None
+
+    def _chunk(self, chunk):
+        with self._lock:
+            payload = self._cache.get(chunk)
+            if payload is not None:
+                self._cache.move_to_end(chunk)
+                return payload
+            offset, length = self._offsets[chunk]
+            self._pack.seek(offset)
+            data = self._pack.read(length)
+            decompressor = zlib.decompressobj(zdict=ZDICT)
+            payload = decompressor.decompress(data) + decompressor.flush()
+            self._cache[chunk] = payload
+            if len(self._cache) > self.cache_chunks:
+                self._cache.popitem(last=False)
+            return payload
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ============================================
+    # STATISTIK / TUTUP
+    # ============================================
+    def stats(self):
+        with self._lock:
+            stored = sum(_file_size(os.path.join(self.path, name)) for name in (PACK_FILE, MANIFEST_FILE))
+            original = sum(s.size for s in self._snapshots)
+            return {"snapshots": len(self._snapshots), "chunks": len(self._offsets),
+                    "original_bytes": original, "stored_bytes": stored,
+                    "saved_pct": round((1 - stored / original) * 100, 1) if original else 0.0}
+
+    def close(self):
+        with self._lock:
+            self.commit()
+            self._pack.close()
+            self._manifest.close()
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+# ============================================
+# COMPACT DIREKTORI data/backup
+# ============================================
+def compact(directory=BACKUP_DIR, store=None, delete=True):
+    """Pindahkan backup-*.json di directory ke store (dedup + kompres).
+
+    File asli baru dihapus setelah snapshotnya di-commit (fsync) dan hasil
+    restore dicek sama persis dengan isi file. Aman diulang: file yang
+    sudah ada di store dilewati (lalu dihapus). Kembalikan
+    (jumlah file, byte disk yang dibebaskan).
+    """
+    own = store is None
+    if own:
+        store = BackupStore(os.path.join(directory, "store"))
+    try:
+        paths = sorted(glob.glob(os.path.join(directory, "backup-*.json")))
+        freed = 0
+        for begin in range(0, len(paths), COMMIT_EVERY):
+            batch = paths[begin:begin + COMMIT_EVERY]
+            for path in batch:
+                store.add_file(path, commit=False)
+            store.commit()
+            if delete:
+                freed += _remove_verified(store, batch)
+        return len(paths), freed
+    finally:
+        if own:
+            store.close()
+
+
+def _remove_verified(store, paths):
+    freed = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        if store.restore(name=os.path.basename(path)) != data:
+            raise BackupStoreError(f"restore of {path} does not match, file kept")
+        freed += disk_usage(path)
+        os.remove(path)
+    return freed
+
+
+def disk_usage(path):
+    """Byte yang benar-benar dipakai di disk (blok), bukan ukuran file"""
+    st = os.stat(path)
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def _parse_time(text):
+    """epoch ms / epoch s / ISO 8601 -> epoch ms"""
+    if text.isdigit():
+        value = int(text)
+        return value if value > 10 ** 11 else value * 1000
+    from datetime import datetime
+    return int(datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def main():
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Deduplicated, compressed store for data/backup snapshots")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="backup directory (store lives in <dir>/store)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("compact", help="move backup-*.json files into the store")
+    ingest.add_argument("--keep", action="store_true", help="ingest only, do not delete the original files")
+    commands.add_parser("list", help="list stored snapshots")
+    restore = commands.add_parser("restore", help="rebuild the snapshot at a point in time")
+    restore.add_argument("when", nargs="?", help="epoch (s/ms), ISO time or backup-<epoch>.json (default: latest)")
+    restore.add_argument("-o", "--output", help="write to this file instead of stdout")
+    commands.add_parser("stats", help="show disk savings")
+    args = parser.parse_args()
+
+    store = BackupStore(os.path.join(args.dir, "store"))
+    try:
+        if args.command == "compact":
+            count, freed = compact(args.dir, store, delete=not args.keep)
+            print(f"📦 Compacted {count} backup files, freed {freed / 1e6:.1f} MB")
+        elif args.command == "list":
+            for snapshot in store.snapshots:
+                when = datetime.fromtimestamp(snapshot.ts / 1000).isoformat(timespec="seconds")
+                print(f"{when}  {snapshot.name or '-'}  {snapshot.size} bytes")
+        elif args.command == "restore":
+            if args.when and SNAPSHOT_NAME.match(args.when):
+                data = store.restore(name=args.when)
+            else:
+                data = store.restore(_parse_time(args.when) if args.when else None)
+            if data is None:
+                print("❌ No snapshot at or before that time", file=sys.stderr)
+                return 1
+            if args.output:
+                with open(args.output, "wb") as f:
+                    f.write(data)
+                print(f"✅ Restored {len(data)} bytes to {args.output}")
+            else:
+                # Byte-identik dengan file asli (restore > file)
+                sys.stdout.buffer.write(data)
+        else:
+            stats = store.stats()
+            print(f"📊 {stats['snapshots']} snapshots, {stats['chunks']} unique chunks | "
+                  f"{stats['original_bytes'] / 1e6:.2f} MB -> {stats['stored_bytes'] / 1e6:.2f} MB "
+                  f"({stats['saved_pct']}% saved)")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Benchmark engine audio alarm dengan NullBackend.
+
+Mengukur waktu decode WAV sekali di startup, waktu mix layer, dan latensi
+start/stop alarm yang sudah di-cache (tanpa I/O disk).
+
+Jalankan: python benchmarks/bench_alarm_audio.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_audio import AlarmAudio, NullBackend, decode_wav, generate_tone
+
+
+def make_wav(path, seconds=3.0, rate=44100, channels=2):
+    pcm = generate_tone(880, seconds / 2, seconds / 2, rate=rate, channels=channels)
+    with open(path, "wb") as f:
+        f.write(pcm.to_wav_bytes())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(cycles=5000):
+    print("=" * 70)
+    print("ALARM AUDIO ENGINE BENCHMARK (null backend)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "alarm.wav")
+        make_wav(path)
+
+        pcm, decode_ms = timed(decode_wav, path)
+        print(f"decode_wav  {os.path.getsize(path) / 1024:.0f} KB -> {pcm.duration:.1f} s PCM in {decode_ms:.2f} ms")
+
+        sink = os.path.join(tmp, "sink.wav")
+        engine, init_ms = timed(AlarmAudio, NullBackend(sink), path)
+        print(f"AlarmAudio() startup (decode + tones + prepare) {init_ms:.1f} ms")
+
+        _, mix_ms = timed(engine._warm_up)
+        engine.start("alarm")
+        engine.start("urgent")
+        engine.stop()
+        print(f"background pre-mix of tone layers               {mix_ms:.1f} ms")
+        assert decode_wav(sink).duration >= pcm.duration, "file sink did not receive mixed PCM"
+
+        engine.backend.sink_path = None
+        latencies = []
+        for _ in range(cycles):
+            latencies.append(engine.start("alarm") * 1e6)
+            engine.stop()
+        latencies.sort()
+        print(f"start latency ({cycles} cycles): p50 {latencies[len(latencies) // 2]:.1f} us | "
+              f"p99 {latencies[int(cycles * 0.99)]:.1f} us | mean {statistics.mean(latencies):.1f} us")
+
+        layered = []
+        for _ in range(cycles):
+            engine.start("alarm")
+            layered.append(engine.start("urgent") * 1e6)
+            engine.stop()
+        layered.sort()
+        print(f"add 'urgent' layer (cached mix):  p50 {layered[len(layered) // 2]:.1f} us | "
+              f"p99 {layered[int(cycles * 0.99)]:.1f} us")
+        assert engine.backend.starts >= cycles * 3
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
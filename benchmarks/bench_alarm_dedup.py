@@ -0,0 +1,116 @@
+"""Benchmark debounce alarm per device (AlarmDeduplicator).
+
+1. Banjir dari ESP: DEVICES device masing-masing mengirim tombol memantul
+   (BOUNCES x !ALARM_START!), echo "EMERGENCY" / "Button pressed", STOP
+   berulang, lalu alarm baru yang sah. Dijalankan lewat
+   process_serial_line AlarmCore asli dengan jendela 0 (tanpa debounce)
+   vs DEDUP_WINDOW_S; dihitung tulisan log, pesan ke ESP dan waktu proses.
+   Alarm baru setelah STOP harus tetap diproses.
+2. Memori konstan: KEYS device berbeda x REPEATS event ke deduplicator;
+   jumlah key dan memori (tracemalloc) harus tetap di batas LRU.
+
+Jalankan: python benchmarks/bench_alarm_dedup.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_registry import DEDUP_MAX_KEYS, DEDUP_START, DEDUP_WINDOW_S, AlarmDeduplicator
+from tests.headless import HeadlessCore
+
+DEVICES = 500
+BOUNCES = 8
+KEYS = 200_000
+REPEATS = 5
+
+
+class CountingCore(HeadlessCore):
+    def __init__(self, dedup_window):
+        self.logs = 0
+        self.sent = 0
+        super().__init__(dedup_window=dedup_window)
+
+    def log_message(self, message, color="black"):
+        self.logs += 1
+
+    def send_to_esp(self, message, link=None):
+        self.sent += 1
+
+
+def device_script():
+    """Urutan baris satu device: pantulan + echo, STOP berulang, alarm baru"""
+    return (["!ALARM_START!"] * BOUNCES + ["EMERGENCY BUTTON", "Button pressed"]
+            + ["!ALARM_STOP!"] * BOUNCES + ["!ALARM_START!"])
+
+
+def flood(window):
+    core = CountingCore(window)
+    links = []
+    for i in range(DEVICES):
+        link = SimpleNamespace(port=f"/dev/ttyUSB{i}", handshake_data={"DEVICE_ID": f"ESP8266-{i:04d}"})
+        core.registry.update_device(f"ESP8266-{i:04d}", f"Patient {i}", f"{i}", link.port)
+        links.append(link)
+    core.logs = 0
+
+    script = device_script()
+    begin = time.perf_counter()
+    for step in range(len(script)):
+        # Device bergantian seperti multiplexer, bukan satu device sampai selesai
+        for link in links:
+            core.process_serial_line(script[step], link.handshake_data, link)
+    elapsed = time.perf_counter() - begin
+    core.close()
+    return core, elapsed, DEVICES * len(script)
+
+
+def constant_memory():
+    dedup = AlarmDeduplicator()
+    tracemalloc.start()
+    begin = time.perf_counter()
+    peak_keys = 0
+    for repeat in range(REPEATS):
+        for i in range(KEYS):
+            dedup.admit(i, DEDUP_START)
+        peak_keys = max(peak_keys, len(dedup))
+        if repeat == 0:
+            baseline = tracemalloc.get_traced_memory()[0]
+    elapsed = time.perf_counter() - begin
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return dedup, peak_keys, baseline, current, elapsed
+
+
+def main():
+    print("=" * 78)
+    print(f"ALARM DEBOUNCE ({DEVICES} devices, {BOUNCES} bounces + echoes + {BOUNCES} stops + re-alarm each)")
+    print("=" * 78)
+    results = {}
+    for window in (0.0, DEDUP_WINDOW_S):
+        core, elapsed, lines = flood(window)
+        results[window] = core
+        print(f"[window {window:3.1f} s] {lines} lines in {elapsed * 1000:6.1f} ms | log writes {core.logs:6} | "
+              f"sent to ESP {core.sent:5} | coalesced {core.dedup.coalesced:6} | active {core.registry.active_count}")
+        # Alarm baru setelah STOP tidak boleh tertelan jendela debounce
+        assert core.registry.active_count == DEVICES, "re-alarm after stop must be processed"
+
+    legacy, debounced = results[0.0], results[DEDUP_WINDOW_S]
+    assert debounced.sent == legacy.sent, "acks must be identical"
+    assert debounced.logs < legacy.logs
+    print(f"[saved    ] {legacy.logs - debounced.logs} log writes "
+          f"({(1 - debounced.logs / legacy.logs) * 100:.0f}% fewer)")
+
+    dedup, peak_keys, baseline, current, elapsed = constant_memory()
+    print("-" * 78)
+    print(f"[LRU      ] {KEYS:,} devices x {REPEATS} rounds: {KEYS * REPEATS / elapsed:9.0f} admits/s | "
+          f"keys {peak_keys} (max {DEDUP_MAX_KEYS}) | memory {baseline / 1e6:.2f} -> {current / 1e6:.2f} MB")
+    print("=" * 78)
+    assert peak_keys <= DEDUP_MAX_KEYS
+    assert current < baseline * 1.2, "memory must not grow with the number of devices"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Benchmark forward alarm ke server pusat (alarm_forwarder.AlarmForwarder).
+
+IngestServer dari test_server.py berjalan di proses ini sebagai pengganti
+server.js (route /api/alarm/trigger, /api/alarm/cancel,
+/api/device/heartbeat, /api/device/register). Diukur:
+  - online  : LIVE_EVENTS trigger/cancel, latensi trigger() dipanggil ->
+              event sampai di sink server, p50/p99/max; waktu di thread
+              pemanggil (trigger() tidak boleh memblok)
+  - offline : server dimatikan, OUTAGE_EVENTS event masuk; antrian memori
+              tidak boleh melebihi MEMORY_EVENTS (sisanya ke disk)
+  - replay  : server hidup lagi di port yang sama, laju pengosongan backlog
+              (event/s)
+  - beat    : STATUS_LINES heartbeat dari DEVICES device selama beberapa
+              interval -> jumlah POST heartbeat
+Semua event harus sampai tepat sekali dan berurutan; koneksi keep-alive
+dipakai ulang (connections_opened kecil).
+
+Jalankan: python benchmarks/bench_alarm_forwarder.py
+"""
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alarm_forwarder
+from alarm_forwarder import AlarmForwarder
+from test_server import IngestServer
+
+LIVE_EVENTS = 500
+LIVE_GAP_S = 0.002
+OUTAGE_EVENTS = 20000
+MEMORY_EVENTS = 1000
+DEVICES = 8
+STATUS_LINES = 2000
+BEAT_INTERVAL_S = 0.2
+BEAT_RUN_S = 1.0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CentralServer(IngestServer):
+    """IngestServer yang bisa "mati" seperti proses: koneksi keep-alive ikut putus"""
+
+    def process_request(self, request, client_address):
+        self.sockets.add(request)
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        pass                       # Koneksi yang diputus kill() bukan error
+
+    def kill(self):
+        self.shutdown()
+        self.server_close()
+        for sock in list(self.sockets):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class Central:
+    """Server pengganti server.js yang mencatat waktu tiba tiap event"""
+
+    def __init__(self, port):
+        self.port = port
+        self.alarms = []
+        self.beats = []
+        self.arrival = {}
+        self.server = None
+        self._lock = threading.Lock()
+
+    def sink(self, events):
+        now = time.perf_counter_ns()
+        with self._lock:
+            for event in events:
+                if "event_id" in event:
+                    self.alarms.append(event)
+                    self.arrival[event["n"]] = now
+                else:
+                    self.beats.append(event)
+
+    def start(self):
+        self.server = CentralServer(("127.0.0.1", self.port), sink=self.sink, access_log=False)
+        self.server.sockets = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.kill()
+
+    def wait_for(self, total, timeout=60):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if len(self.alarms) >= total:
+                    return True
+            time.sleep(0.005)
+        return False
+
+
+def main():
+    alarm_forwarder.RETRY_MAX_S = 0.5      # Replay cepat setelah server hidup lagi
+    port = free_port()
+    directory = tempfile.mkdtemp(prefix="bench_alarm_forwarder_")
+    central = Central(port).start()
+    forwarder = AlarmForwarder(f"http://127.0.0.1:{port}", spool_dir=directory, memory_events=MEMORY_EVENTS,
+                               heartbeat_interval=BEAT_INTERVAL_S)
+    try:
+        print("=" * 96)
+        print(f"ALARM FORWARDER ({LIVE_EVENTS} live events, {OUTAGE_EVENTS} during an outage, "
+              f"{DEVICES} devices)")
+        print("=" * 96)
+
+        # ONLINE: latensi end-to-end
+        sent, caller = {}, []
+        for n in range(LIVE_EVENTS):
+            submit = forwarder.trigger if n % 2 == 0 else forwarder.cancel
+            sent[n] = time.perf_counter_ns()
+            submit(f"ESP8266-{n % DEVICES:03d}", n=n)
+            caller.append((time.perf_counter_ns() - sent[n]) / 1000)
+            time.sleep(LIVE_GAP_S)
+        assert central.wait_for(LIVE_EVENTS), "live events did not arrive"
+        latencies = [(central.arrival[n] - sent[n]) / 1e6 for n in range(LIVE_EVENTS)]
+        print(f"[online ] trigger -> central p50 {percentile(latencies, 0.5):6.2f} ms | "
+              f"p99 {percentile(latencies, 0.99):6.2f} ms | max {max(latencies):6.2f} ms | "
+              f"caller p99 {percentile(caller, 0.99):6.1f} us")
+
+        # OFFLINE: memori tetap kecil, sisanya ke disk
+        central.stop()
+        peak = 0
+        for n in range(LIVE_EVENTS, LIVE_EVENTS + OUTAGE_EVENTS):
+            forwarder.trigger(f"ESP8266-{n % DEVICES:03d}", n=n)
+            peak = max(peak, forwarder.stats()["memory"])
+        stats = forwarder.stats()
+        print(f"[offline] {OUTAGE_EVENTS} events while the central server is down: peak {peak} in memory | "
+              f"{stats['spool_events']} events ({stats['spool_bytes'] / 1e6:5.2f} MB) spooled to disk")
+        assert forwarder.backlog == stats["memory"] + stats["spool_events"]
+        assert peak <= MEMORY_EVENTS, "memory backlog must stay bounded"
+
+        # REPLAY: server kembali di port yang sama
+        time.sleep(0.5)
+        central.start()
+        begin = time.perf_counter()
+        total = LIVE_EVENTS + OUTAGE_EVENTS
+        assert central.wait_for(total), "backlog was not replayed"
+        elapsed = time.perf_counter() - begin
+        assert forwarder.wait_idle(10)
+        print(f"[replay ] backlog drained in {elapsed:5.2f} s ({OUTAGE_EVENTS / elapsed:7.0f} events/s, "
+              f"includes up to {alarm_forwarder.RETRY_MAX_S} s retry backoff)")
+
+        numbers = [event["n"] for event in central.alarms]
+        assert numbers == list(range(total)), "events lost, duplicated or reordered"
+        ids = [event["event_id"] for event in central.alarms]
+        assert len(set(ids)) == total
+
+        # HEARTBEAT: hanya status terakhir per device per interval
+        central.beats.clear()
+        begin = time.perf_counter()
+        per_line = BEAT_RUN_S / STATUS_LINES
+        for line in range(STATUS_LINES):
+            forwarder.heartbeat(f"ESP8266-{line % DEVICES:03d}", detail={"line": line})
+            time.sleep(per_line)
+        time.sleep(BEAT_INTERVAL_S * 2)
+        intervals = (time.perf_counter() - begin) / BEAT_INTERVAL_S
+        beats = len(central.beats)
+        print(f"[beat   ] {STATUS_LINES} STATUS lines from {DEVICES} devices over {intervals:.0f} intervals -> "
+              f"{beats} heartbeat POSTs")
+        assert beats <= DEVICES * (intervals + 1), "heartbeats must be coalesced per device"
+        latest = {}
+        for beat in central.beats:
+            latest[beat["device_id"]] = beat["detail"]["line"]
+        assert sorted(latest.values()) == list(range(STATUS_LINES - DEVICES, STATUS_LINES)), \
+            "the latest status of every device must arrive"
+
+        stats = forwarder.stats()
+        print(f"[pool   ] {stats['delivered']} alarms + {stats['heartbeats']} heartbeats over "
+              f"{stats['connections_opened']} connections ({stats['replayed']} replayed from disk)")
+        print("=" * 96)
+        assert stats["dropped"] == 0 and stats["rejected"] == 0
+        assert stats["connections_opened"] < 20, "connections should be reused"
+    finally:
+        forwarder.close()
+        central.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Benchmark push stream GET /events (AlarmStream, Server-Sent Events).
+
+Server test_server.py berjalan di proses terpisah (--quiet). Proses ini
+membuka SUBSCRIBERS koneksi /events (satu thread, selectors) lalu mengirim
+event lewat POST /emergency yang membawa waktu kirim (CLOCK_MONOTONIC):
+  - paced : PACED_EVENTS event, satu tiap PACED_GAP_S
+  - burst : BURST_EVENTS event dalam satu batch
+Latensi fan-out = POST dikirim -> frame diterima subscriber, p50/p99/max
+atas semua (event x subscriber); tiap subscriber harus menerima semua
+event berurutan. Dibandingkan dengan polling dashboard lama
+(refreshData 10 s + jumlah client 5 s): latensi rata-rata dan request saat
+idle.
+
+Self-check di proses ini: resume dengan Last-Event-ID (replay tepat event
+yang terlewat, id basi -> "reset") dan client yang tidak membaca diputus
+tanpa menahan client lain.
+
+Jalankan: python benchmarks/bench_alarm_stream.py
+"""
+import http.client
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import test_server
+from test_server import STREAM_RESET, STREAM_TRIGGERED, IngestServer
+
+SUBSCRIBERS = 500
+PACED_EVENTS = 100
+PACED_GAP_S = 0.05
+BURST_EVENTS = 200
+POLL_REFRESH_S = 10            # dashboard.js refreshData
+POLL_CLIENTS_S = 5             # dashboard.js get_clients_count
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def open_stream(port, last_event_id=None):
+    sock = socket.create_connection(("127.0.0.1", port))
+    headers = f"Last-Event-ID: {last_event_id}\r\n" if last_event_id else ""
+    sock.sendall(f"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n{headers}\r\n".encode())
+    return sock
+
+
+def parse_frames(buffer):
+    """Potong frame SSE lengkap dari buffer; kembalikan (frame dict, sisa buffer)"""
+    frames = []
+    while b"\n\n" in buffer:
+        block, buffer = buffer.split(b"\n\n", 1)
+        frame = {}
+        for line in block.decode("utf-8").split("\n"):
+            if line.startswith(("HTTP/", ":")) or ": " not in line:
+                continue
+            field, value = line.split(": ", 1)
+            frame[field] = value
+        if "data" in frame:
+            frames.append(frame)
+    return frames, buffer
+
+
+class Subscribers:
+    """SUBSCRIBERS koneksi /events dibaca satu thread lewat selectors"""
+
+    def __init__(self, port, count):
+        self.selector = selectors.DefaultSelector()
+        self.received = {}
+        self.latencies = []
+        self.running = True
+        for index in range(count):
+            sock = open_stream(port)
+            sock.setblocking(False)
+            self.received[index] = []
+            self.selector.register(sock, selectors.EVENT_READ, [index, b""])
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        while self.running:
+            for key, _ in self.selector.select(0.1):
+                now = time.monotonic_ns()
+                try:
+                    data = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    self.selector.unregister(key.fileobj)
+                    continue
+                frames, key.data[1] = parse_frames(key.data[1] + data)
+                for frame in frames:
+                    event = json.loads(frame["data"])
+                    if "sent_ns" in event:
+                        self.latencies.append(now - event["sent_ns"])
+                        self.received[key.data[0]].append(event["n"])
+
+    def wait_for(self, total, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if all(len(events) >= total for events in self.received.values()):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self):
+        self.running = False
+        self.thread.join(2)
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+
+
+def post(conn, events):
+    conn.request("POST", "/emergency", body=json.dumps(events), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 200, response.status
+
+
+def status(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/status")
+    payload = json.loads(conn.getresponse().read())
+    conn.close()
+    return payload
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name, latencies):
+    millis = [ns / 1e6 for ns in latencies]
+    print(f"[{name:6}] {len(millis):7} deliveries | fan-out p50 {percentile(millis, 0.5):7.2f} ms | "
+          f"p99 {percentile(millis, 0.99):7.2f} ms | max {max(millis):7.2f} ms")
+    return percentile(millis, 0.99)
+
+
+def fan_out():
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "test_server.py"), "--port", str(port),
+                               "--host", "127.0.0.1", "--quiet"], stdout=subprocess.DEVNULL)
+    subscribers = None
+    try:
+        for _ in range(100):
+            try:
+                status(port)
+                break
+            except OSError:
+                time.sleep(0.05)
+        subscribers = Subscribers(port, SUBSCRIBERS)
+        deadline = time.perf_counter() + 30
+        while status(port)["stream_subscribers"] < SUBSCRIBERS and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        assert status(port)["stream_subscribers"] == SUBSCRIBERS, "not every subscriber connected"
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        for n in range(PACED_EVENTS):
+            post(conn, {"device_id": f"ESP01S-{n % 20}", "type": "EMERGENCY", "n": n,
+                        "sent_ns": time.monotonic_ns()})
+            time.sleep(PACED_GAP_S)
+        assert subscribers.wait_for(PACED_EVENTS), "paced events did not reach every subscriber"
+        paced, subscribers.latencies = subscribers.latencies, []
+        p99 = report("paced", paced)
+
+        burst = [{"device_id": f"ESP01S-{n % 20}", "type": "EMERGENCY", "n": PACED_EVENTS + n}
+                 for n in range(BURST_EVENTS)]
+        sent_ns = time.monotonic_ns()
+        for event in burst:
+            event["sent_ns"] = sent_ns
+        post(conn, burst)
+        total = PACED_EVENTS + BURST_EVENTS
+        assert subscribers.wait_for(total), "burst did not reach every subscriber"
+        report("burst", subscribers.latencies)
+        conn.close()
+
+        expected = list(range(total))
+        assert all(events == expected for events in subscribers.received.values()), "events lost or reordered"
+        stats = status(port)
+        assert stats["stream_dropped"] == 0, "no subscriber should be dropped"
+
+        polling_rps = SUBSCRIBERS / POLL_REFRESH_S + SUBSCRIBERS / POLL_CLIENTS_S
+        print(f"[poll  ] dashboard polling: alarm visible after {POLL_REFRESH_S / 2:.1f} s on average "
+              f"({POLL_REFRESH_S} s worst) | idle {polling_rps:.0f} requests/s for {SUBSCRIBERS} screens")
+        print(f"[stream] {SUBSCRIBERS} subscribers, {total} events each in order | idle: one keep-alive "
+              f"comment per {test_server.HEARTBEAT_S} s per screen, 0 requests")
+        return p99
+    finally:
+        if subscribers is not None:
+            subscribers.close()
+        server.terminate()
+        server.wait(5)
+
+
+# ============================================
+# SELF-CHECK RESUME & CLIENT LAMBAT
+# ============================================
+def read_frames(sock, count, timeout=5):
+    sock.settimeout(timeout)
+    buffer, frames = b"", []
+    while len(frames) < count:
+        data = sock.recv(65536)
+        if not data:
+            break
+        found, buffer = parse_frames(buffer + data)
+        frames += found
+    return frames
+
+
+def check_resume_and_slow_client():
+    test_server.SEND_TIMEOUT_S = 0.5
+    server = IngestServer(("127.0.0.1", 0), sink=lambda events: None, access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        first = open_stream(port)
+        time.sleep(0.1)
+        server.stream.publish(STREAM_TRIGGERED, {"n": 0})
+        last_id = read_frames(first, 1)[0]["id"]
+        first.close()
+        for n in range(1, 6):
+            server.stream.publish(STREAM_TRIGGERED, {"n": n})
+        resumed = open_stream(port, last_id)
+        replay = [json.loads(frame["data"])["n"] for frame in read_frames(resumed, 5)]
+        resumed.close()
+        assert replay == [1, 2, 3, 4, 5], replay
+
+        stale = open_stream(port, "0-1")
+        assert read_frames(stale, 1)[0]["event"] == STREAM_RESET
+        stale.close()
+
+        # Client yang tidak pernah membaca vs client normal
+        slow = socket.socket()
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        slow.connect(("127.0.0.1", port))
+        slow.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        fast = open_stream(port)
+        time.sleep(0.1)
+        padding = "x" * 1000
+        for n in range(2000):
+            server.stream.publish(STREAM_TRIGGERED, {"n": n, "padding": padding})
+            if n % 100 == 0:
+                time.sleep(0.01)
+        got = read_frames(fast, 2000, timeout=10)
+        deadline = time.perf_counter() + 5
+        while server.stream.dropped == 0 and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        fast.close()
+        slow.close()
+        assert [json.loads(frame["data"])["n"] for frame in got] == list(range(2000)), "fast client lost events"
+        assert server.stream.dropped == 1, "slow client should be dropped"
+        print("[check ] Last-Event-ID replays missed events | stale id -> reset | "
+              "non-reading client dropped, others unaffected")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    print("=" * 100)
+    print(f"ALARM STREAM /events ({SUBSCRIBERS} local subscribers, {PACED_EVENTS} paced + "
+          f"{BURST_EVENTS} burst events)")
+    print("=" * 100)
+    p99 = fan_out()
+    print("-" * 100)
+    check_resume_and_slow_client()
+    print("=" * 100)
+    assert p99 < POLL_REFRESH_S * 1000 / 2, "push should beat the average polling delay"
+
+
+if __name__ == "__main__":
+    main()
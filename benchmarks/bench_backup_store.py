@@ -0,0 +1,155 @@
+"""Benchmark backup store (backup_store.py) dengan backup simulasi.
+
+Server menulis data/backup/backup-<epoch>.json tiap 5 menit. Disimulasikan
+MONTHS bulan snapshot (device dengan lastSeen yang berubah tiap snapshot,
+BEDS pasien yang statusnya sesekali berubah, alarm beberapa kali sehari),
+ditulis sebagai file biasa lalu di-compact di tempat. Diukur:
+  - disk    : ukuran + pemakaian blok disk file asli vs gzip per file vs store
+  - compact : waktu ingest + verifikasi + hapus file asli
+  - buka    : waktu membuka store (scan pack + manifest)
+  - restore : latensi p50/p99 snapshot point-in-time acak, cache dingin
+              (tiap restore cache dikosongkan) dan hangat
+Semua hasil restore harus sama persis byte-per-byte dengan file asli.
+
+Jalankan: python benchmarks/bench_backup_store.py [MONTHS]
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_store import BackupStore, compact, disk_usage
+
+MONTHS = 3
+INTERVAL_MS = 5 * 60 * 1000
+BEDS = 12
+EVENTS_PER_DAY = 8             # Perubahan status pasien / alarm per hari
+RESTORES = 2000
+START_MS = 1766634826951
+
+
+def iso(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+def local_time(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%d/%m/%Y, %H.%M.%S")
+
+
+def snapshots(count, seed=7):
+    """Generator (epoch ms, bytes) backup server berurutan"""
+    rng = random.Random(seed)
+    patients = [{"id": f"P-{bed:03d}", "name": f"Patient {bed}", "room": f"Room {101 + bed // 2}",
+                 "bed": f"Bed {bed % 2 + 1}", "status": "Stable", "time": local_time(START_MS)}
+                for bed in range(BEDS)]
+    device = {"id": "ESP8266-ROOM-101", "mac": "AA:BB:CC:DD:EE:FF", "ip": "192.168.18.250",
+              "status": "connected", "lastSeen": None}
+    alarm = {"active": False, "type": None, "triggeredAt": None, "triggeredBy": None,
+             "acknowledged": False, "duration": 10000}
+    chance = EVENTS_PER_DAY / (24 * 12)
+    for i in range(count):
+        ts = START_MS + i * INTERVAL_MS + rng.randrange(500)
+        if rng.random() < chance:
+            patient = rng.choice(patients)
+            patient["status"] = rng.choice(["Stable", "EMERGENCY", "Not Responded", "Observation"])
+            patient["time"] = local_time(ts)
+        if rng.random() < chance:
+            if alarm["active"]:
+                alarm.update(active=False, acknowledged=True)
+            else:
+                alarm.update(active=True, type=rng.choice(["button", "test"]), triggeredAt=iso(ts),
+                             triggeredBy=device["id"], acknowledged=False)
+        if rng.random() < 0.002:
+            device["status"] = "disconnected" if device["status"] == "connected" else "connected"
+        if device["status"] == "connected":
+            device["lastSeen"] = iso(ts - rng.randrange(30000))
+        data = {"device": device, "patients": patients, "alarm": alarm}
+        yield ts, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def restore_latency(store, times, cold):
+    latencies = []
+    for ts in times:
+        if cold:
+            store.clear_cache()
+        begin = time.perf_counter()
+        store.restore(ts)
+        latencies.append((time.perf_counter() - begin) * 1000)
+    return percentile(latencies, 0.50), percentile(latencies, 0.99)
+
+
+def main():
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else MONTHS
+    count = months * 30 * 24 * 12
+    directory = tempfile.mkdtemp(prefix="bench_backup_store_")
+    try:
+        print("=" * 78)
+        print(f"BACKUP STORE ({months} months of 5-minute snapshots = {count:,} files, {BEDS} patients)")
+        print("=" * 78)
+        times, digests = [], {}
+        apparent = disk = gzipped = 0
+        for ts, data in snapshots(count):
+            path = os.path.join(directory, f"backup-{ts}.json")
+            with open(path, "wb") as f:
+                f.write(data)
+            times.append(ts)
+            digests[ts] = hashlib.blake2b(data).digest()
+            apparent += len(data)
+            disk += disk_usage(path)
+            gzipped += len(gzip.compress(data, 9))
+        print(f"[files     ] {apparent / 1e6:8.2f} MB apparent | {disk / 1e6:8.2f} MB on disk | "
+              f"gzip per file {gzipped / 1e6:6.2f} MB")
+
+        begin = time.perf_counter()
+        compacted, freed = compact(directory)
+        elapsed = time.perf_counter() - begin
+        assert compacted == count and freed == disk
+        assert not [name for name in os.listdir(directory) if name.endswith(".json")], "originals must be removed"
+        store_dir = os.path.join(directory, "store")
+        stored = sum(disk_usage(os.path.join(store_dir, name)) for name in os.listdir(store_dir))
+        print(f"[compact   ] {elapsed:6.1f} s ({count / elapsed:6.0f} files/s, verified + deleted) | "
+              f"store {stored / 1e6:6.2f} MB on disk | saved {(1 - stored / disk) * 100:.1f}% "
+              f"({disk / stored:.0f}x, gzip per file would save {(1 - gzipped / apparent) * 100:.0f}% of apparent)")
+
+        begin = time.perf_counter()
+        store = BackupStore(store_dir)
+        opened = (time.perf_counter() - begin) * 1000
+        stats = store.stats()
+        print(f"[open      ] {opened:6.1f} ms | {stats['snapshots']:,} snapshots, {stats['chunks']:,} unique chunks")
+        assert stats["snapshots"] == count
+
+        # Byte-exact: tiap snapshot lewat waktunya sendiri dan titik di antara dua snapshot
+        for ts in times:
+            assert hashlib.blake2b(store.restore(ts)).digest() == digests[ts], f"restore {ts} differs"
+        for before, after in zip(times[::97], times[1::97]):
+            assert store.restore((before + after) // 2) == store.restore(before)
+        assert store.restore(times[0] - 1) is None
+
+        rng = random.Random(1)
+        picks = [rng.randrange(times[0], times[-1]) for _ in range(RESTORES)]
+        cold = restore_latency(store, picks, cold=True)
+        warm = restore_latency(store, picks, cold=False)
+        print(f"[restore   ] cold p50 {cold[0]:6.3f} ms p99 {cold[1]:6.3f} ms | "
+              f"warm p50 {warm[0]:6.3f} ms p99 {warm[1]:6.3f} ms ({RESTORES} random points in time)")
+        store.close()
+        print("=" * 78)
+        assert stored < disk * 0.1, "store should be an order of magnitude smaller than the files"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
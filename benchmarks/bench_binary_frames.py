@@ -0,0 +1,128 @@
+"""Benchmark framing biner BIN1 vs baris teks.
+
+Campuran event ESP8266 yang sama dikirim dua kali: sebagai baris teks
+(format sekarang) dan sebagai frame BIN1 (binary_frames.FrameEncoder).
+Mengukur:
+  1. Byte per event dan waktu kabel per event di 115200 baud (8N1)
+  2. Throughput decode + classify_line (chunk CHUNK byte seperti read serial):
+     LineFramer vs FrameDecoder
+  3. Deteksi data rusak: tiap event dikirim dengan satu bit terbalik;
+     dihitung event yang lolos sebagai baris lain tanpa terdeteksi
+
+Jalankan: python benchmarks/bench_binary_frames.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_frames import FrameDecoder, FrameEncoder
+from line_classifier import classify_line
+from serial_link import LineFramer
+
+EVENTS = 200_000
+CHUNK = 64
+BAUD_BYTES_S = 115200 / 10
+CORRUPT_EVENTS = 20_000
+
+ALARM = {"patient": "Budi Santoso", "room": "101", "device_id": "ESP8266-ROOM-101"}
+# (bobot, teks sekarang, encoder BIN1)
+MIX = [
+    (50, "STATUS: RSSI=-61, BATTERY=87, UPTIME=1234", lambda e: e.status(-61, 87, 1234)),
+    (20, "✅ WiFi connected, heartbeat OK", lambda e: e.text("✅ WiFi connected, heartbeat OK")),
+    (10, "!ALARM_START!", lambda e: e.emergency()),
+    (10, "!ALARM_STOP!", lambda e: e.cancel()),
+    (10, '{"command":"PLAY_ALARM","patient":"Budi Santoso","room":"101","device_id":"ESP8266-ROOM-101"}',
+     lambda e: e.alarm(**ALARM)),
+]
+
+
+def build_streams(count, rng):
+    encoder = FrameEncoder()
+    choices = [entry for entry in MIX for _ in range(entry[0])]
+    text, frames, lines = [], [], []
+    for _ in range(count):
+        _, line, encode = rng.choice(choices)
+        lines.append(line)
+        text.append(line.encode("utf-8") + b"\n")
+        frames.append(encode(encoder))
+    return text, frames, lines
+
+
+def chunked(data, size=CHUNK):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def decode_all(framer, chunks):
+    kinds = []
+    for chunk in chunks:
+        for line in framer.feed(chunk):
+            kinds.append(classify_line(line)[0])
+    return kinds
+
+
+def timed(func):
+    begin = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - begin
+
+
+def corruption(events, make_framer, rng):
+    """Satu bit terbalik per event; kembalikan (lolos tanpa terdeteksi, terdeteksi)"""
+    silent = detected = 0
+    for data, expected in events:
+        damaged = bytearray(data)
+        bit = rng.randrange(len(damaged) * 8)
+        damaged[bit // 8] ^= 1 << (bit % 8)
+        framer = make_framer()
+        lines = framer.feed(bytes(damaged)) + framer.feed(b"\n")
+        errors = framer.errors if isinstance(framer.errors, list) else []
+        if errors:
+            detected += 1
+        elif lines and lines != [expected]:
+            silent += 1
+    return silent, detected
+
+
+def main():
+    rng = random.Random(11)
+    text, frames, lines = build_streams(EVENTS, rng)
+    text_bytes, frame_bytes = sum(map(len, text)), sum(map(len, frames))
+
+    print("=" * 78)
+    print(f"BINARY FRAMING BIN1 ({EVENTS:,} events, chunk {CHUNK} B)")
+    print("=" * 78)
+    for name, size in (("text", text_bytes), ("BIN1", frame_bytes)):
+        per_event = size / EVENTS
+        print(f"[{name:5}] {per_event:6.1f} B/event | wire {per_event / BAUD_BYTES_S * 1e6:7.0f} us/event "
+              f"@115200 | max {BAUD_BYTES_S / per_event:6.0f} events/s")
+    print(f"[saved] {(1 - frame_bytes / text_bytes) * 100:.0f}% fewer bytes on the wire")
+
+    text_chunks = chunked(b"".join(text))
+    frame_chunks = chunked(b"".join(frames))
+    text_kinds, text_time = timed(lambda: decode_all(LineFramer(), text_chunks))
+    frame_kinds, frame_time = timed(lambda: decode_all(FrameDecoder(), frame_chunks))
+    assert text_kinds == frame_kinds, "both encodings must classify identically"
+    print("-" * 78)
+    print(f"[text ] decode+classify {EVENTS / text_time:9.0f} events/s | {text_bytes / text_time / 1e6:6.1f} MB/s")
+    print(f"[BIN1 ] decode+classify {EVENTS / frame_time:9.0f} events/s | {frame_bytes / frame_time / 1e6:6.1f} MB/s")
+    print(f"        (both far above the {BAUD_BYTES_S / (text_bytes / EVENTS):.0f} events/s a 115200 baud link carries)")
+
+    sample = list(zip(text, lines))[:CORRUPT_EVENTS]
+    text_silent, _ = corruption(sample, LineFramer, rng)
+    frame_sample = [(data, FrameDecoder().feed(data)[0]) for data in frames[:CORRUPT_EVENTS]]
+    frame_silent, frame_detected = corruption(frame_sample, FrameDecoder, rng)
+    print("-" * 78)
+    print(f"[text ] 1-bit errors passed on as a different line: {text_silent:6} / {len(sample)}")
+    print(f"[BIN1 ] 1-bit errors passed on as a different line: {frame_silent:6} / {len(frame_sample)} "
+          f"(CRC/sync detected {frame_detected})")
+    print("=" * 78)
+
+    assert frame_bytes < text_bytes
+    assert frame_silent == 0, "CRC-16 must catch every single-bit error"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Benchmark antrian perintah PC -> ESP (command_queue.CommandQueue).
+
+1. Pemanggil: process_serial_line untuk ALARMS baris !ALARM_START! /
+   !ALARM_STOP! di LINKS link. Port meniru UART 115200 baud (write memblok
+   selama byte dikirim). send_to_esp lama (write + log di thread pemanggil)
+   vs antrian (pemanggil hanya enqueue); diukur waktu per baris di thread
+   serial.
+2. Prioritas: CHATTER pesan status sudah antri di satu port, lalu
+   ALARM_ACKNOWLEDGED; waktu sampai ack benar-benar ditulis dengan antrian
+   FIFO (satu prioritas) vs antrian prioritas.
+3. Coalesce: COALESCE x PC_CONTROLLER_READY yang sama selagi port sibuk.
+4. Retransmit end-to-end: armada ESP simulasi (pty) menawarkan CMD_SEQ dan
+   membuang ACK_LOSS CMD_ACK. Semua pesan kritis harus akhirnya
+   terkonfirmasi, tidak ada yang menyerah.
+
+Jalankan: python benchmarks/bench_command_queue.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_queue import PRIORITY_STATUS, CommandQueue
+from esp_simulator import SimulatedEsp
+from tests.headless import HeadlessCore, headless_core
+
+LINKS = 8
+ALARMS = 50
+CHATTER = 200
+COALESCE = 1000
+BAUD = 115200
+DEVICES = 4
+ACK_LOSS = 0.3
+RUN_S = 4.0
+
+
+class UartConn:
+    """Port yang menulis secepat UART: 10 bit per byte pada BAUD"""
+
+    def __init__(self, port):
+        self.port = port
+        self.is_open = True
+        self.writes = []
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        with self._lock:
+            time.sleep(len(data) * 10 / BAUD)
+            self.writes.append((time.perf_counter_ns(), data))
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+
+class LegacyCore(HeadlessCore):
+    """send_to_esp lama: write + log langsung di thread pemanggil"""
+
+    def send_to_esp(self, message, link=None):
+        if link is not None:
+            targets = [(link.port, link.conn)]
+        elif self.multi_link:
+            targets = [(port, l.conn) for port, l in list(self.links.items())]
+        else:
+            targets = [(None, self.serial_conn)]
+
+        for port, conn in targets:
+            if conn and conn.is_open:
+                try:
+                    full_message = f"{message}\n"
+                    conn.write(full_message.encode('utf-8'))
+                    if port and self.multi_link:
+                        self.log_message(f"📤 To ESP [{port}]: {message}", "darkgreen")
+                    else:
+                        self.log_message(f"📤 To ESP: {message}", "darkgreen")
+                except Exception as e:
+                    self.log_message(f"❌ Error sending to ESP: {e}", "red")
+            else:
+                self.log_message("⚠ Cannot send: Serial not connected", "orange")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ============================================
+# 1. WAKTU DI THREAD PEMANGGIL
+# ============================================
+def caller_latency(core_class):
+    core = core_class(multi_link=True, dedup_window=0)
+    links = []
+    for i in range(LINKS):
+        port = f"/dev/ttyUSB{i}"
+        link = SimpleNamespace(port=port, conn=UartConn(port), handshake_data={"DEVICE_ID": f"ESP8266-{i:03d}"},
+                               is_open=True)
+        core.links[port] = link
+        core.registry.update_device(f"ESP8266-{i:03d}", f"Patient {i}", f"{i}", port)
+        links.append(link)
+
+    timings = []
+    for _ in range(ALARMS):
+        for line in ("!ALARM_START!", "!ALARM_STOP!"):
+            for link in links:
+                begin = time.perf_counter_ns()
+                core.process_serial_line(line, link.handshake_data, link)
+                timings.append((time.perf_counter_ns() - begin) / 1000)
+    core.commands.flush(30)
+    written = sum(len(link.conn.writes) for link in links)
+    core.close()
+    return timings, written
+
+
+# ============================================
+# 2. PRIORITAS & 3. COALESCE
+# ============================================
+def ack_behind_chatter(prioritized):
+    conn = UartConn("/dev/ttyUSB0")
+    link = SimpleNamespace(conn=conn)
+    gate = threading.Event()
+
+    def write(target, data):
+        gate.wait()
+        target.conn.write(data)
+
+    commands = CommandQueue(write)
+    for i in range(CHATTER):
+        commands.send(f"STATUS_REQUEST {i}", link)
+    # FIFO: semua pesan satu prioritas, urutan kedatangan
+    commands.send("ALARM_ACKNOWLEDGED", link, priority=None if prioritized else PRIORITY_STATUS)
+    begin = time.perf_counter_ns()
+    gate.set()
+    commands.flush(30)
+    commands.close()
+    ack_ns = next(ns for ns, data in conn.writes if data.startswith(b"ALARM_ACKNOWLEDGED"))
+    position = next(i for i, (_, data) in enumerate(conn.writes) if data.startswith(b"ALARM_ACKNOWLEDGED"))
+    return (ack_ns - begin) / 1e6, position
+
+
+def coalesce():
+    conn = UartConn("/dev/ttyUSB0")
+    link = SimpleNamespace(conn=conn)
+    gate = threading.Event()
+
+    def write(target, data):
+        gate.wait()
+        target.conn.write(data)
+
+    commands = CommandQueue(write)
+    commands.send("PC_CONTROLLER_READY", link)
+    time.sleep(0.01)               # yang pertama sedang ditulis (writer menunggu gate)
+    for _ in range(COALESCE):
+        commands.send("PC_CONTROLLER_READY", link)
+    gate.set()
+    commands.flush(30)
+    commands.close()
+    return len(conn.writes), commands.coalesced
+
+
+# ============================================
+# 4. RETRANSMIT END-TO-END (PTY)
+# ============================================
+def retransmit():
+    directory = tempfile.mkdtemp(prefix="bench_command_queue_")
+    fleet = [SimulatedEsp(i, directory, rate=40, cmd_seq=True, ack_loss=ACK_LOSS,
+                          mix=((50, "status"), (40, "alarm"), (10, "handshake"))).start()
+             for i in range(DEVICES)]
+    core = headless_core(ports_dir=directory, multi_link=True, dedup_window=0)
+    try:
+        core.start_connect()
+        deadline = time.perf_counter() + 15
+        while len(core.connected_ports()) < DEVICES and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        assert len(core.connected_ports()) == DEVICES, "fleet did not connect"
+        time.sleep(RUN_S)
+        for esp in fleet:
+            esp.rate = 0
+        deadline = time.perf_counter() + 10
+        while (core.commands.awaiting or len(core.commands)) and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        stats = core.commands.stats()
+        sequenced = {(esp.index, seq) for esp in fleet for _, seq in esp.received if seq is not None}
+        return stats, len(sequenced), sum(esp.stats["cmd_acks"] for esp in fleet)
+    finally:
+        core.close()
+        for esp in fleet:
+            esp.unplug()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    print("=" * 96)
+    print(f"ESP COMMAND QUEUE ({LINKS} links at {BAUD} baud, {ALARMS} start/stop rounds each)")
+    print("=" * 96)
+    results = {}
+    for name, core_class in (("legacy", LegacyCore), ("queue", HeadlessCore)):
+        timings, written = caller_latency(core_class)
+        results[name] = timings
+        print(f"[{name:8}] serial thread per line: p50 {percentile(timings, 0.5):8.1f} us | "
+              f"p99 {percentile(timings, 0.99):8.1f} us | max {max(timings):8.1f} us | {written} writes")
+        assert written == 2 * ALARMS * LINKS, "every ack must reach the port"
+    assert percentile(results["queue"], 0.99) < percentile(results["legacy"], 0.5), \
+        "callers must not wait for the serial write"
+
+    print("-" * 96)
+    fifo, fifo_position = ack_behind_chatter(prioritized=False)
+    prio, prio_position = ack_behind_chatter(prioritized=True)
+    print(f"[priority] ALARM_ACKNOWLEDGED behind {CHATTER} queued status messages: "
+          f"FIFO {fifo:7.1f} ms (write #{fifo_position}) | priority {prio:5.1f} ms (write #{prio_position})")
+    assert prio_position <= 1 and prio < fifo
+
+    writes, coalesced = coalesce()
+    print(f"[coalesce] {COALESCE + 1} x PC_CONTROLLER_READY while the port is busy -> {writes} writes "
+          f"({coalesced} coalesced)")
+    assert writes == 2
+
+    print("-" * 96)
+    stats, sequenced, acks = retransmit()
+    print(f"[resend  ] {DEVICES} simulated ESP, {ACK_LOSS:.0%} CMD_ACK lost: {sequenced} sequenced messages, "
+          f"{stats['retransmits']} resent, {stats['confirmed']} confirmed, {stats['expired']} unconfirmed")
+    print("=" * 96)
+    assert sequenced > 0 and stats["retransmits"] > 0
+    assert stats["expired"] == 0 and stats["awaiting_ack"] == 0, "every critical message must be confirmed"
+    assert stats["confirmed"] <= acks
+
+
+if __name__ == "__main__":
+    main()
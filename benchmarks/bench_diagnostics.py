@@ -0,0 +1,160 @@
+"""Benchmark overhead profiling opt-in (diagnostics.Diagnostics).
+
+Core headless memproses LINES baris serial (campuran STATUS, alarm
+start/stop, perintah) di thread "serial-listener" dengan:
+  - off  : profiling mati (default)
+  - cpu  : sampling profiler + timing fungsi (--profile cpu)
+  - full : cpu + tracemalloc (--profile / ALARM_PROFILE=1)
+Diukur waktu per baris (p50/p99) dan throughput; overhead dibandingkan
+dengan mode off.
+
+Self-check file yang ditulis:
+  - .folded: tiap baris "stack jumlah", thread serial-listener ada
+  - .prof  : dibuka pstats.Stats, process_serial_line punya waktu kumulatif
+  - rotasi : hanya KEEP profil terakhir yang tersisa
+  - memori : kebocoran buatan (satu bytearray tiap LEAK_EVERY baris)
+             muncul di diagnostics.log dengan file:baris sumbernya
+  - stop   : wrapper method dilepas, tracemalloc dimatikan
+
+Jalankan: python benchmarks/bench_diagnostics.py
+"""
+import io
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diagnostics import Diagnostics
+from tests.headless import headless_core
+
+LINES = 20000
+DEVICES = 8
+WINDOW_S = 1.0
+KEEP = 3
+LEAK_EVERY = 10
+
+PATTERN = ["STATUS: OK RSSI=-61 UPTIME=123", "STATUS: OK RSSI=-60 UPTIME=124", "!ALARM_START!",
+           "STATUS: OK RSSI=-62 UPTIME=125", "!ALARM_STOP!", "HEARTBEAT", "STATUS: BATTERY=87"]
+
+
+class Link:
+    def __init__(self, index):
+        self.port = f"/dev/ttyUSB{index}"
+        self.conn = None
+        self.handshake_data = {"DEVICE_ID": f"ESP8266-{index:03d}"}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_lines(core, links, leak=None):
+    """Proses LINES baris di thread serial-listener; kembalikan waktu per baris (us)"""
+    timings = []
+
+    def listener():
+        for n in range(LINES):
+            link = links[n % DEVICES]
+            begin = time.perf_counter_ns()
+            core.process_serial_line(PATTERN[n % len(PATTERN)], link.handshake_data, link)
+            timings.append((time.perf_counter_ns() - begin) / 1000)
+            if leak is not None and n % LEAK_EVERY == 0:
+                leak.append(bytearray(256))
+
+    thread = threading.Thread(target=listener, name="serial-listener")
+    begin = time.perf_counter()
+    thread.start()
+    thread.join()
+    return timings, time.perf_counter() - begin
+
+
+def overhead():
+    results = {}
+    for mode in ("off", "cpu", "full"):
+        directory = tempfile.mkdtemp(prefix="bench_diagnostics_")
+        diagnostics = Diagnostics(directory, window=60, memory_interval=60)
+        core = headless_core(multi_link=True, dedup_window=0, diagnostics=diagnostics)
+        links = [Link(i) for i in range(DEVICES)]
+        for link in links:
+            core.registry.update_device(link.handshake_data["DEVICE_ID"], "Patient", "101", link.port)
+        if mode != "off":
+            core.set_profiling(True, memory=mode == "full")
+        try:
+            timings, elapsed = run_lines(core, links)
+            samples = diagnostics.stats()["samples"]
+        finally:
+            core.close()
+            shutil.rmtree(directory, ignore_errors=True)
+        results[mode] = percentile(timings, 0.5)
+        print(f"[{mode:8}] per line p50 {percentile(timings, 0.5):6.1f} us | p99 {percentile(timings, 0.99):7.1f} us "
+              f"| {LINES / elapsed:7.0f} lines/s | {samples} stack samples "
+              f"| +{percentile(timings, 0.5) - results['off']:5.1f} us per line")
+    return results
+
+
+def files_and_memory():
+    directory = tempfile.mkdtemp(prefix="bench_diagnostics_")
+    diagnostics = Diagnostics(directory, window=WINDOW_S, memory_interval=WINDOW_S, keep=KEEP)
+    core = headless_core(multi_link=True, dedup_window=0, diagnostics=diagnostics)
+    links = [Link(i) for i in range(DEVICES)]
+    leak = []
+    try:
+        core.set_profiling(True)
+        assert "process_serial_line" in vars(core), "methods must be wrapped while profiling"
+        deadline = time.perf_counter() + WINDOW_S * (KEEP + 3)
+        while time.perf_counter() < deadline:
+            run_lines(core, links, leak)
+        core.set_profiling(False)
+        assert "process_serial_line" not in vars(core), "wrappers must be removed"
+        assert not tracemalloc.is_tracing(), "tracemalloc must stop with profiling"
+
+        names = sorted(os.listdir(directory))
+        folded = [name for name in names if name.endswith(".folded")]
+        profs = [name for name in names if name.endswith(".prof")]
+        assert len(folded) == KEEP and len(profs) == KEEP, names
+        print(f"[files   ] {diagnostics.files} profiles written, {len(folded)} kept: {', '.join(folded)}")
+
+        largest = max(folded, key=lambda name: os.path.getsize(os.path.join(directory, name)))
+        with open(os.path.join(directory, largest), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any(line.startswith("serial-listener;") for line in lines)
+
+        # Jendela dengan sample terbanyak (jendela saat snapshot memori lebih sedikit sample)
+        largest = max(profs, key=lambda name: os.path.getsize(os.path.join(directory, name)))
+        stats = pstats.Stats(os.path.join(directory, largest), stream=io.StringIO())
+        entry = next(value for key, value in stats.stats.items() if key[2] == "process_serial_line")
+        print(f"[pstats  ] {len(stats.stats)} functions, process_serial_line cumulative {entry[3]:.2f} s "
+              f"of {stats.total_tt:.2f} s sampled")
+
+        with open(os.path.join(directory, "diagnostics.log"), encoding="utf-8") as f:
+            report = f.read()
+        leak_line = f"bench_diagnostics.py:{run_lines.__code__.co_firstlineno + 11}"
+        assert leak_line in report, "artificial leak must show up in the memory report"
+        assert "timing process_serial_line" in report and "gauge devices" in report
+        print(f"[memory  ] {diagnostics.snapshots} tracemalloc diffs, leak of {len(leak)} blocks "
+              f"found at {leak_line}")
+    finally:
+        core.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    print("=" * 100)
+    print(f"DIAGNOSTICS ({LINES} serial lines from {DEVICES} devices per run)")
+    print("=" * 100)
+    overhead()
+    print("-" * 100)
+    files_and_memory()
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
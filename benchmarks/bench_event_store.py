@@ -0,0 +1,190 @@
+"""Benchmark event store: group commit fsync dan query lewat index sparse.
+
+Mengukur:
+  1. Tulis durable dari WRITERS thread (seperti listener multi-link):
+     - fsync per event : open append + write + fsync tiap event (pendekatan naif)
+     - group commit    : EventStore.append + flush, fsync dibagi per batch
+     plus latensi append() yang dilihat handler alarm (tidak memblok).
+  2. Query atas EVENTS event (DEVICES device, rentang 30 hari, beberapa segmen):
+     rentang 1 jam, 1 device dalam 1 hari, 500 event terbaru, dibandingkan
+     scan penuh semua file. Juga waktu buka ulang store (index dari .idx).
+  3. Recovery: ekor record terpotong (crash saat menulis) dibuang saat buka.
+
+Jalankan: python benchmarks/bench_event_store.py
+"""
+import glob
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import EVENT_START, EventStore
+
+WRITERS = 8
+DURABLE_EVENTS = 2000
+EVENTS = 1_000_000
+DEVICES = 200
+SPAN_S = 30 * 86400
+SEGMENT_BYTES = 16 * 1024 * 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def timed(func):
+    begin = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - begin
+
+
+# ============================================
+# 1. TULIS DURABLE
+# ============================================
+def naive_writes(directory):
+    path = os.path.join(directory, "naive.log")
+    lock = threading.Lock()
+
+    def writer(index):
+        for i in range(DURABLE_EVENTS // WRITERS):
+            line = json.dumps({"ts": time.time(), "kind": EVENT_START, "device": f"ESP-{index}"}) + "\n"
+            with lock, open(path, "ab") as f:
+                f.write(line.encode())
+                f.flush()
+                os.fsync(f.fileno())
+
+    return run_writers(writer)
+
+
+def group_commit_writes(directory):
+    store = EventStore(os.path.join(directory, "store"))
+    append_latency = []
+
+    def writer(index):
+        for i in range(DURABLE_EVENTS // WRITERS):
+            begin = time.perf_counter()
+            store.append(EVENT_START, f"ESP-{index}", room="101")
+            append_latency.append(time.perf_counter() - begin)
+            store.flush()
+
+    elapsed = run_writers(writer)
+    store.close()
+    return elapsed, append_latency
+
+
+def run_writers(target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(WRITERS)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - begin
+
+
+# ============================================
+# 2. QUERY
+# ============================================
+def populate(path):
+    rng = random.Random(7)
+    store = EventStore(path, segment_bytes=SEGMENT_BYTES, fsync=False)
+    begin_ts = time.time() - SPAN_S
+    step = SPAN_S / EVENTS
+    for i in range(EVENTS):
+        device = f"ESP8266-ROOM-{rng.randrange(DEVICES):03d}"
+        store.append(("start", "ack", "stop")[i % 3], device, ts=begin_ts + i * step,
+                     patient="Budi", room=device[-3:], port="COM3")
+    store.flush()
+    store.close()
+    return begin_ts
+
+
+def full_scan(path, predicate):
+    found = 0
+    for name in sorted(glob.glob(os.path.join(path, "events-*.log"))):
+        with open(name, "rb") as f:
+            for line in f:
+                if predicate(json.loads(line)):
+                    found += 1
+    return found
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="bench_event_store_")
+    try:
+        print("=" * 78)
+        print(f"EVENT STORE ({WRITERS} writer threads, {DURABLE_EVENTS} durable events)")
+        print("=" * 78)
+        naive = naive_writes(directory)
+        grouped, append_latency = group_commit_writes(directory)
+        print(f"[fsync/event ] {naive * 1000:8.0f} ms | {DURABLE_EVENTS / naive:8.0f} durable events/s")
+        print(f"[group commit] {grouped * 1000:8.0f} ms | {DURABLE_EVENTS / grouped:8.0f} durable events/s "
+              f"-> {naive / grouped:.1f}x")
+        print(f"[append()    ] p50 {percentile(append_latency, 0.5) * 1e6:6.1f} us | "
+              f"p99 {percentile(append_latency, 0.99) * 1e6:6.1f} us (alarm path, no fsync wait)")
+
+        path = os.path.join(directory, "history")
+        begin_ts, elapsed = timed(lambda: populate(path))
+        segments = len(glob.glob(os.path.join(path, "events-*.log")))
+        size = sum(os.path.getsize(name) for name in glob.glob(os.path.join(path, "*.log")))
+        print("-" * 78)
+        print(f"[populate    ] {EVENTS:,} events, {DEVICES} devices, {segments} segments, "
+              f"{size / 1e6:.0f} MB in {elapsed:.1f} s")
+
+        store, opened = timed(lambda: EventStore(path, segment_bytes=SEGMENT_BYTES))
+        _, ready = timed(lambda: store.query(end=0))
+        print(f"[reopen      ] {(opened + ready) * 1000:8.1f} ms (index loaded from .idx, no rescan)")
+        assert store.count == EVENTS
+
+        hour_start = begin_ts + SPAN_S / 2
+        device = "ESP8266-ROOM-042"
+        day_start = begin_ts + 10 * 86400
+        cases = [
+            ("1 hour", lambda: store.query(hour_start, hour_start + 3600),
+             lambda e: hour_start <= e["ts"] <= hour_start + 3600),
+            ("device/day", lambda: store.query(day_start, day_start + 86400, device=device),
+             lambda e: e["device"] == device and day_start <= e["ts"] <= day_start + 86400),
+            ("device/all", lambda: store.query(device=device),
+             lambda e: e["device"] == device),
+            ("latest 500", lambda: store.recent(500), None),
+        ]
+        for name, query, predicate in cases:
+            events, indexed = timed(query)
+            line = f"[{name:12}] indexed {indexed * 1000:8.1f} ms -> {len(events):6} events"
+            if predicate is not None:
+                expected, scanned = timed(lambda: full_scan(path, predicate))
+                assert expected == len(events), (name, expected, len(events))
+                line += f" | full scan {scanned * 1000:8.0f} ms -> {scanned / indexed:6.0f}x"
+            print(line)
+        latest = store.recent(500)
+        assert latest[0]["ts"] >= latest[-1]["ts"]
+        store.close()
+
+        # ============================================
+        # 3. RECOVERY EKOR TERPOTONG
+        # ============================================
+        active = sorted(glob.glob(os.path.join(path, "events-*.log")))[-1]
+        with open(active, "ab") as f:
+            f.write(b'{"ts":1,"kind":"start","dev')
+        store = EventStore(path, segment_bytes=SEGMENT_BYTES)
+        store.append(EVENT_START, "ESP8266-ROOM-999")
+        store.flush()
+        assert store.count == EVENTS + 1, "torn tail must be dropped, new append kept"
+        assert store.query(device="ESP8266-ROOM-999")[0]["kind"] == EVENT_START
+        store.close()
+        print(f"[recovery    ] torn tail dropped, {EVENTS + 1:,} events readable")
+        print("=" * 78)
+        assert grouped < naive, "group commit should beat per-event fsync"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Benchmark ingest HTTP: HTTPServer single-thread lama vs IngestServer keep-alive.
+
+Server dijalankan di proses terpisah (tanpa print/access log), generator
+beban asyncio di proses ini mensimulasikan N ESP-01S yang masing-masing
+mengirim POST /emergency berulang (closed loop) selama DURATION_S:
+  - legacy : salinan TestHandler lama di HTTPServer (HTTP/1.0, koneksi
+             ditutup tiap request, backlog accept 5)
+  - ingest : test_server.py (ThreadingHTTPServer, HTTP/1.1 keep-alive)
+  - batch  : test_server.py, tiap request membawa BATCH_EVENTS event
+Dilaporkan request/s, event/s, p50/p99/max latensi dan error per level.
+
+Self-check backpressure di proses ini: sink yang macet + antrian kecil
+harus menghasilkan 503 dengan Retry-After, bukan antrian yang terus tumbuh.
+
+Jalankan: python benchmarks/bench_http_ingest.py
+"""
+import asyncio
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from test_server import IngestServer
+
+DEVICE_LEVELS = (100, 250, 500, 1000)
+DURATION_S = 3.0
+REQUEST_TIMEOUT_S = 15.0
+BATCH_EVENTS = 20
+EVENT = {"device_id": "ESP01S-{n}", "room": "101", "type": "EMERGENCY"}
+
+LEGACY_SERVER = r"""
+import sys
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import json, time
+
+class TestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path == '/emergency':
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            print(f"Received emergency: {post_data.decode()}")
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            response = {"status": "received", "message": "Emergency signal received",
+                        "timestamp": time.time()}
+            self.wfile.write(json.dumps(response).encode())
+
+HTTPServer(('127.0.0.1', int(sys.argv[1])), TestHandler).serve_forever()
+"""
+
+
+# ============================================
+# SERVER DI PROSES TERPISAH
+# ============================================
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind):
+    port = free_port()
+    if kind == "legacy":
+        args = [sys.executable, "-c", LEGACY_SERVER, str(port)]
+    else:
+        args = [sys.executable, os.path.join(ROOT, "test_server.py"),
+                "--host", "127.0.0.1", "--port", str(port), "--quiet"]
+    proc = subprocess.Popen(args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+# ============================================
+# GENERATOR BEBAN ASYNCIO
+# ============================================
+async def read_response(reader):
+    """(status, keep_alive) dari satu respons; body tanpa Content-Length dibaca sampai EOF"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    version, status = status_line.split(b" ", 2)[:2]
+    length = None
+    keep_alive = version == b"HTTP/1.1"
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection":
+            keep_alive = value.strip().lower() == b"keep-alive"
+    if length is None:
+        await reader.read()
+        keep_alive = False
+    else:
+        await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def device(index, port, batch, deadline, latencies, counters):
+    body = [dict(EVENT, device_id=f"ESP01S-{index}-{i}") for i in range(batch)]
+    payload = json.dumps(body if batch > 1 else body[0]).encode()
+    request = (f"POST /emergency HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        begin = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT_S)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            counters["errors"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        latencies.append(time.perf_counter() - begin)
+        if status == 200:
+            counters["ok"] += 1
+            counters["events"] += batch
+        else:
+            counters["busy"] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, devices, batch):
+    latencies = []
+    counters = {"ok": 0, "busy": 0, "errors": 0, "events": 0}
+    begin = time.perf_counter()
+    deadline = begin + DURATION_S
+    await asyncio.gather(*(device(i, port, batch, deadline, latencies, counters)
+                           for i in range(devices)))
+    return latencies, counters, time.perf_counter() - begin
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(kind, devices):
+    batch = BATCH_EVENTS if kind == "batch" else 1
+    proc, port = start_server(kind)
+    try:
+        latencies, counters, elapsed = asyncio.run(load(port, devices, batch))
+    finally:
+        proc.kill()
+        proc.wait()
+    rps = counters["ok"] / elapsed
+    print(f"[{kind:6}] devices {devices:5} | {rps:8.0f} req/s | {counters['events'] / elapsed:8.0f} events/s | "
+          f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms | p99 {percentile(latencies, 0.99) * 1000:7.1f} ms | "
+          f"max {max(latencies, default=0) * 1000:7.1f} ms | 503 {counters['busy']} | errors {counters['errors']}")
+    return rps, percentile(latencies, 0.99), counters
+
+
+# ============================================
+# SELF-CHECK BACKPRESSURE
+# ============================================
+def check_backpressure():
+    release = threading.Event()
+    server = IngestServer(("127.0.0.1", 0), sink=lambda events: release.wait(),
+                          queue_size=10, access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+    def post(body):
+        conn.request("POST", "/emergency", body=json.dumps(body),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, response.getheader("Retry-After"), json.loads(response.read())
+
+    # Satu event diambil sink yang macet, 10 berikutnya mengisi antrian penuh
+    statuses = [post({"device_id": f"ESP01S-{i}"})[0] for i in range(11)]
+    time.sleep(0.05)
+    status, retry_after, payload = post([{"device_id": "ESP01S-X"}] * 3)
+    bad_status = post([1, 2, 3])[0]
+    sock = conn.sock
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+    assert all(code == 200 for code in statuses), statuses
+    assert status == 503 and retry_after is not None, (status, retry_after)
+    assert payload["status"] == "busy"
+    assert bad_status == 400
+    assert sock is conn.sock, "keep-alive connection should be reused across requests"
+    print(f"[check ] full queue -> 503 Retry-After: {retry_after} | invalid batch -> 400 | keep-alive reused")
+
+
+def main():
+    print("=" * 110)
+    print(f"HTTP INGEST (closed loop, {DURATION_S:.0f} s per level, batch mode {BATCH_EVENTS} events/request)")
+    print("=" * 110)
+    results = {}
+    for devices in DEVICE_LEVELS:
+        for kind in ("legacy", "ingest", "batch"):
+            results[kind, devices] = run(kind, devices)
+        print("-" * 110)
+    check_backpressure()
+    print("=" * 110)
+
+    top = DEVICE_LEVELS[-1]
+    assert results["ingest", top][2]["errors"] == 0, "keep-alive server dropped connections"
+    assert results["ingest", top][1] < results["legacy", top][1], "tail latency should beat legacy"
+    assert results["batch", top][2]["events"] > results["ingest", top][2]["events"]
+
+
+if __name__ == "__main__":
+    main()
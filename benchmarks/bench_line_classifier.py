@@ -0,0 +1,44 @@
+"""Micro-benchmark classify_line vs rantai cek lama di process_serial_line.
+
+Corpus dan rantai lama ada di tests/line_corpus.py; kesetaraan keduanya
+dicek oleh tests/test_line_classifier.py (python -m pytest).
+
+Jalankan: python benchmarks/bench_line_classifier.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from line_classifier import classify_line
+from tests.line_corpus import CORPUS, legacy_classify
+
+def bench(func, lines, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for line in lines:
+            func(line)
+    elapsed = time.perf_counter() - start
+    return len(lines) * rounds / elapsed
+
+
+def main():
+    print("=" * 70)
+    print("LINE CLASSIFIER BENCHMARK")
+    print("=" * 70)
+    # Campuran realistis: kebanyakan info/status, sesekali alarm
+    traffic = [line for line, _ in CORPUS] * 200
+    realistic = (["STATUS: OK, RSSI=-61, BATTERY=87"] * 6 + ["🔘 Button pressed", "Heap: 41234",
+                 '{"command":"PLAY_ALARM","patient":"Budi","room":"101"}', "!ALARM_START!"]) * 2000
+
+    for label, lines in (("corpus", traffic), ("realistic", realistic)):
+        legacy = bench(legacy_classify, lines)
+        new = bench(classify_line, lines)
+        print(f"[{label:9}] legacy: {legacy:>12,.0f} lines/s | "
+              f"classifier: {new:>12,.0f} lines/s | x{new / legacy:.2f}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
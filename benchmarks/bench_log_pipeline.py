@@ -0,0 +1,183 @@
+"""Stress test LogPipeline: 10k baris/detik dari thread lain ke widget Tk.
+
+Responsivitas main loop diukur dengan heartbeat root.after(10 ms): semakin
+besar keterlambatan heartbeat, semakin "macet" UI. Mode "legacy" meniru
+log_message lama (insert + tag + see per baris) lewat root.after(0) per
+baris supaya tetap aman dipanggil dari thread; mode "pipeline" memakai
+LogPipeline + LogRing + VirtualLogView seperti alarm_gui.
+
+Tanpa display (Tk gagal dibuka) hanya bagian pipeline yang diukur: drain
+dijalankan manual pada LOG_FLUSH_HZ (tanpa render widget), lalu main loop
+"macet" STALL_S detik; antrian harus tetap <= LOG_MAX_PENDING dan jumlah
+baris yang dibuang ditulis sebagai satu peringatan.
+
+Jalankan: python benchmarks/bench_log_pipeline.py
+"""
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_pipeline import LOG_FLUSH_HZ, LOG_MAX_PENDING, LogPipeline, LogRing
+from log_view import VirtualLogView
+
+RATE = 10_000          # baris per detik
+DURATION = 5.0         # detik
+HEARTBEAT_MS = 10
+COLORS = ["purple", "blue", "green", "red", "black", "orange", "darkgreen"]
+STALL_S = 8.0          # main loop macet lebih lama dari LOG_MAX_PENDING / RATE
+
+
+def legacy_insert(text, message, color):
+    text.insert(tk.END, f"{message}\n")
+    if color != "black":
+        text.tag_add(color, "end-2l", "end-1l")
+        text.tag_config(color, foreground=color)
+    text.see(tk.END)
+
+
+def producer(push, stop):
+    """Kirim RATE baris per detik dalam burst 1 ms"""
+    per_tick = max(1, RATE // 1000)
+    seq = 0
+    next_tick = time.perf_counter()
+    while not stop.is_set():
+        for _ in range(per_tick):
+            push(f"[00:00:00.000] 📥 STATUS: OK seq={seq}", COLORS[seq % len(COLORS)])
+            seq += 1
+        next_tick += 0.001
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return seq
+
+
+def run(mode, root):
+    if mode == "pipeline":
+        ring = LogRing()
+        view = VirtualLogView(root, ring, height=15, width=100)
+        view.pack()
+        pipeline = LogPipeline(root, ring, echo=False)
+        pipeline.add_view(view)
+        pipeline.start()
+        push = pipeline.push
+    else:
+        text = tk.Text(root, height=15, width=100)
+        text.pack()
+        pipeline = None
+        push = lambda message, color: root.after(0, legacy_insert, text, message, color)
+
+    lateness = []
+    expected = [time.perf_counter() + HEARTBEAT_MS / 1000]
+
+    def heartbeat():
+        now = time.perf_counter()
+        lateness.append(max(0.0, now - expected[0]))
+        expected[0] = now + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, heartbeat)
+
+    stop = threading.Event()
+    sent = [0]
+    thread = threading.Thread(target=lambda: sent.__setitem__(0, producer(push, stop)), daemon=True)
+
+    root.after(HEARTBEAT_MS, heartbeat)
+    root.after(0, thread.start)
+    root.after(int(DURATION * 1000), stop.set)
+    root.after(int(DURATION * 1000) + 200, root.quit)
+    root.mainloop()
+    thread.join(1)
+
+    backlog = pipeline.backlog if pipeline else 0
+    root.destroy()
+
+    lateness.sort()
+    return {
+        "sent": sent[0],
+        "p50": lateness[len(lateness) // 2] * 1000,
+        "p99": lateness[int(len(lateness) * 0.99) - 1] * 1000,
+        "max": lateness[-1] * 1000,
+        "backlog": backlog,
+    }
+
+
+class ManualRoot:
+    """Pengganti Tk tanpa display: after() hanya dicatat, drain dipanggil manual"""
+
+    def after(self, ms, func, *args):
+        return "after"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def run_headless():
+    """Drain pada LOG_FLUSH_HZ sambil producer jalan, lalu main loop macet STALL_S"""
+    ring = LogRing()
+    pipeline = LogPipeline(ManualRoot(), ring, echo=False)
+    stop = threading.Event()
+    sent = [0]
+    thread = threading.Thread(target=lambda: sent.__setitem__(0, producer(pipeline.push, stop)), daemon=True)
+    thread.start()
+
+    drains, peak = [], 0
+    deadline = time.perf_counter() + DURATION
+    while time.perf_counter() < deadline:
+        time.sleep(1 / LOG_FLUSH_HZ)
+        peak = max(peak, pipeline.backlog)
+        begin = time.perf_counter()
+        pipeline._drain()
+        drains.append((time.perf_counter() - begin) * 1000)
+
+    time.sleep(STALL_S)                            # main loop macet, producer tetap jalan
+    stalled = pipeline.backlog
+    stop.set()
+    thread.join(1)
+    batch = pipeline._take()                       # Flush pertama setelah macet: peringatan di depan
+    warnings = [line for line, _ in batch if "log lines dropped" in line]
+    pipeline._write(batch)
+    pipeline.flush()
+
+    drains.sort()
+    return {
+        "sent": sent[0],
+        "p50": drains[len(drains) // 2],
+        "p99": drains[int(len(drains) * 0.99) - 1],
+        "max": drains[-1],
+        "peak": peak,
+        "stalled": stalled,
+        "dropped": pipeline.dropped,
+        "warnings": warnings,
+    }
+
+
+def main():
+    print("=" * 70)
+    print(f"LOG PIPELINE STRESS TEST ({RATE:,} lines/s for {DURATION:.0f} s)")
+    print("=" * 70)
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        print(f"[no display] {e}: measuring the pipeline without Tk widgets")
+        stats = run_headless()
+        print(f"[pipeline] sent {stats['sent']:>7,} | drain at {LOG_FLUSH_HZ} Hz p50 {stats['p50']:.2f} ms | "
+              f"p99 {stats['p99']:.2f} ms | max {stats['max']:.2f} ms | peak backlog {stats['peak']:,}")
+        print(f"[stall   ] main loop stalled {STALL_S:.0f} s: backlog {stats['stalled']:,} "
+              f"(limit {LOG_MAX_PENDING:,}), {stats['dropped']:,} dropped | {stats['warnings'][0]}")
+        assert stats["stalled"] <= LOG_MAX_PENDING and stats["dropped"] > 0
+        assert len(stats["warnings"]) == 1
+        print("=" * 70)
+        return
+
+    for mode in ("legacy", "pipeline"):
+        root = tk.Tk()
+        stats = run(mode, root)
+        print(f"[{mode:8}] sent {stats['sent']:>7,} | heartbeat lateness p50 {stats['p50']:.1f} ms | "
+              f"p99 {stats['p99']:.1f} ms | max {stats['max']:.1f} ms | backlog {stats['backlog']}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Benchmark parser/tail log server (log_tail.py).
+
+1. Throughput file historis: system.log sintetis SIZE_MB MB (format
+   [ISO] [LEVEL] pesan, banner multi-baris, ALARM_DEVICES device dengan
+   trigger / duplikat / stop). Blok unik 4 MB diulang sampai ukuran
+   tercapai. Dibandingkan:
+     - naive      : for line in open(...) + regex per baris (tanpa multi-baris)
+     - read_records: mmap per blok -> LogRecord
+     - intervals  : read_records + alarm_intervals (event trigger -> respon)
+   Memori puncak (tracemalloc) read_records harus tetap kecil berapapun
+   ukuran file.
+2. tail -f: writer menulis TAIL_RECORDS entri (dengan waktu tulis di pesan),
+   di tengah jalan file di-rename + dibuat ulang lalu dipotong
+   (copytruncate); semua entri harus sampai berurutan. Latensi tulis ->
+   yield untuk inotify vs polling.
+
+Jalankan: python benchmarks/bench_log_tail.py [SIZE_MB]
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_tail import LogTail, alarm_intervals, read_records
+
+SIZE_MB = 256
+BLOCK_MB = 4
+ALARM_DEVICES = 50
+TAIL_RECORDS = 3000
+TAIL_POLL_S = 0.25
+
+BANNER = "\n".join(["", "╔" + "═" * 58 + "╗", "║     🚨 HOSPITAL EMERGENCY ALARM SYSTEM v1.0 🚨         ║",
+                    "╚" + "═" * 58 + "╝", "    "])
+
+
+def synthetic_block(size):
+    """Satu blok log unik ~size byte; kembalikan (bytes, jumlah entri, jumlah alarm)"""
+    lines, total, records, alarms, i = [], 0, 0, 0, 0
+    # Blok selalu berakhir di batas siklus alarm (40 entri) supaya bisa diulang
+    while total < size or i % 40:
+        second = i // 10
+        ts = f"2025-12-25T{second // 3600 % 24:02d}:{second // 60 % 60:02d}:{second % 60:02d}.{i % 1000:03d}Z"
+        step = i % 40
+        device = f"ESP8266-ROOM-{i // 40 % ALARM_DEVICES:03d}"
+        if step == 0:
+            entry = f"[{ts}] [INFO] Received data from device: {device}"
+        elif step == 1:
+            entry = f"[{ts}] [ALARM] 🚨 ALARM TRIGGERED by {device} (button)"
+            alarms += 1
+        elif step in (5, 9):
+            entry = f"[{ts}] [WARN] Alarm already active, ignoring duplicate trigger"
+        elif step == 30:
+            entry = f"[{ts}] [INFO] Alarm stopped by nurse_{i % 7}"
+        elif i % 5000 == 7:
+            entry = f"[{ts}] [INFO] {BANNER}"
+        elif step % 3 == 0:
+            entry = f"[{ts}] [INFO] Data saved successfully"
+        else:
+            entry = f"[{ts}] [INFO] Heartbeat from {device} (RSSI -6{step % 10} dBm, uptime {i} s)"
+        data = entry + "\n"
+        lines.append(data)
+        total += len(data.encode("utf-8"))
+        records += 1
+        i += 1
+    return "".join(lines).encode("utf-8"), records, alarms
+
+
+def write_log(path, size_mb):
+    block, records, alarms = synthetic_block(BLOCK_MB << 20)
+    repeats = max(1, (size_mb << 20) // len(block))
+    with open(path, "wb") as f:
+        for _ in range(repeats):
+            f.write(block)
+    return records * repeats, alarms * repeats
+
+
+def naive(path):
+    header = re.compile(r"\[([^\]]+)\] \[([A-Z]+)\] ?(.*)")
+    count = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if header.match(line):
+                count += 1
+    return count
+
+
+def timed(func):
+    begin = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - begin
+
+
+def historical(path, size_mb):
+    expected, alarms = write_log(path, size_mb)
+    size = os.path.getsize(path) / 1e6
+    print(f"[file      ] {size:7.1f} MB | {expected:,} entries | {alarms:,} alarms")
+
+    count, elapsed = timed(lambda: naive(path))
+    print(f"[naive     ] {size / elapsed:7.1f} MB/s | {count / elapsed:9.0f} lines/s (multi-line entries split)")
+
+    tracemalloc.start()
+    count, elapsed = timed(lambda: sum(1 for _ in read_records(path)))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    _, elapsed = timed(lambda: sum(1 for _ in read_records(path)))
+    print(f"[records   ] {size / elapsed:7.1f} MB/s | {count / elapsed:9.0f} entries/s | "
+          f"peak memory {peak / 1e6:.1f} MB")
+    assert count == expected, f"expected {expected} entries, got {count}"
+    assert peak < 32e6, "read_records must stay in constant memory"
+
+    intervals, elapsed = timed(lambda: list(alarm_intervals(read_records(path))))
+    print(f"[intervals ] {size / elapsed:7.1f} MB/s | {len(intervals):,} trigger -> response intervals | "
+          f"{sum(i.duplicates for i in intervals):,} duplicates")
+    assert len(intervals) == alarms
+    assert all(i.duplicates == 2 and i.responder.startswith("nurse_") for i in intervals)
+
+
+def tail(directory, use_inotify):
+    path = os.path.join(directory, f"tail-{use_inotify}.log")
+    open(path, "w").close()
+    follower = LogTail(path, poll_interval=TAIL_POLL_S, use_inotify=use_inotify)
+    received, latencies = [], []
+
+    def consume():
+        for record in follower.follow():
+            sent = int(record.message.rsplit(" ", 1)[1])
+            latencies.append(time.monotonic_ns() - sent)
+            received.append(int(record.message.split(" ", 2)[1]))
+            if len(received) == TAIL_RECORDS:
+                follower.stop()
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    time.sleep(0.3)
+
+    f = open(path, "a", encoding="utf-8")
+    for i in range(TAIL_RECORDS):
+        if i == TAIL_RECORDS // 3:
+            # Rotasi rename + file baru (logrotate create)
+            f.close()
+            os.rename(path, path + ".1")
+            f = open(path, "a", encoding="utf-8")
+        elif i == 2 * TAIL_RECORDS // 3:
+            # copytruncate: isi disalin lalu file dipotong di tempat. Entri yang
+            # belum terbaca saat dipotong memang hilang (sifat copytruncate),
+            # jadi reader diberi waktu menyusul dulu
+            f.flush()
+            time.sleep(TAIL_POLL_S * 3)
+            shutil.copy(path, path + ".2")
+            f.truncate(0)
+            f.seek(0)
+            time.sleep(TAIL_POLL_S * 3)
+        f.write(f"[2025-12-25T10:00:00.000Z] [INFO] entry {i} {time.monotonic_ns()}\n")
+        f.flush()
+        if i % 10 == 0:
+            time.sleep(0.002)
+    f.close()
+    thread.join(15)
+    follower.stop()
+
+    assert received == list(range(TAIL_RECORDS)), \
+        f"{follower.mode}: {len(received)} of {TAIL_RECORDS} entries in order"
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] / 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] / 1e6
+    print(f"[tail {follower.mode:7}] {len(received)} entries, {follower.rotations} rotations | "
+          f"write -> yield p50 {p50:7.1f} ms | p99 {p99:7.1f} ms")
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE_MB
+    directory = tempfile.mkdtemp(prefix="bench_log_tail_")
+    try:
+        print("=" * 78)
+        print(f"LOG TAIL / PARSE (synthetic system.log {size_mb} MB, tail {TAIL_RECORDS} entries)")
+        print("=" * 78)
+        historical(os.path.join(directory, "system.log"), size_mb)
+        print("-" * 78)
+        tail(directory, use_inotify=True)
+        tail(directory, use_inotify=False)
+        print("=" * 78)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark registry pasien: load CSV besar, reload inkremental dan lookup O(1).
+
+Mengukur pada CSV berformat data/medical_data.csv (ROWS baris, satu device
+per baris, satu pasien per room):
+  - load penuh           : parse seluruh file ke index device_id/MAC/room
+  - refresh tanpa ubahan : hanya os.stat
+  - append APPEND baris  : reload inkremental dari offset terakhir (prefix
+                           diverifikasi dengan hash blake2b)
+  - lookup               : per alarm, dibandingkan scan CSV per alarm
+                           (pendekatan naif tanpa index) pada file terkecil
+
+Jalankan: python benchmarks/bench_patient_registry.py
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from patient_registry import PatientRegistry
+
+ROWS = (10_000, 100_000, 500_000)
+APPEND = 100
+LOOKUPS = 100_000
+HEADER = "Timestamp,DeviceID,MACAddress,IPAddress,PatientName,Room,Bed,AdmissionTime,Status,RespondedBy\n"
+
+
+def row(i):
+    mac = ":".join(f"{(i >> shift) & 0xFF:02X}" for shift in (40, 32, 24, 16, 8, 0))
+    return (f"2025-12-25 10:00:00,ESP8266-{i:06d},{mac},10.0.{i // 250 % 256}.{i % 250},"
+            f"Patient {i},Room {i // 2:05d},Bed {i % 2 + 1},2025-12-25 08:00:00,ACTIVE,Not Responded\n")
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.writelines(row(i) for i in range(rows))
+
+
+def naive_lookup(path, device_id):
+    """Tanpa registry: baca CSV sampai device ketemu, tiap alarm"""
+    with open(path, newline="", encoding="utf-8") as f:
+        for entry in csv.DictReader(f):
+            if entry["DeviceID"] == device_id:
+                return entry
+    return None
+
+
+def timed(func):
+    begin = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - begin
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="bench_patient_registry_")
+    try:
+        print("=" * 78)
+        print(f"PATIENT REGISTRY (medical_data.csv format, append {APPEND} rows)")
+        print("=" * 78)
+        for rows in ROWS:
+            path = os.path.join(directory, f"medical_{rows}.csv")
+            write_csv(path, rows)
+            registry = PatientRegistry(json_path=None, csv_path=path)
+            _, load = timed(registry.refresh)
+            assert registry.count == rows
+
+            _, idle = timed(registry.refresh)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(row(i) for i in range(rows, rows + APPEND))
+            changed, incremental = timed(registry.refresh)
+            assert changed and registry.count == rows + APPEND
+
+            # Hasil inkremental harus sama dengan load penuh file yang sama
+            fresh = PatientRegistry(json_path=None, csv_path=path)
+            fresh.refresh()
+            last = f"ESP8266-{rows + APPEND - 1:06d}"
+            assert registry.lookup(last).patient == fresh.lookup(last).patient == f"Patient {rows + APPEND - 1}"
+
+            ids = [f"ESP8266-{i * 7919 % rows:06d}" for i in range(LOOKUPS)]
+            _, lookup = timed(lambda: [registry.lookup(device_id) for device_id in ids])
+            record = registry.lookup(mac="00-00-00-00-00-2A")
+            assert record is not None and record.device_id == "ESP8266-000042"
+            assert registry.lookup(room="room 00021").patient == "Patient 43"
+
+            size = os.path.getsize(path) / 1e6
+            print(f"[{rows:>7} rows] {size:6.1f} MB | load {load * 1000:7.0f} ms ({rows / load:8.0f} rows/s) | "
+                  f"idle refresh {idle * 1e6:5.0f} us | +{APPEND} rows {incremental * 1000:6.2f} ms | "
+                  f"lookup {lookup / LOOKUPS * 1e9:4.0f} ns")
+            assert incremental < load / 10, "append should not re-parse the whole file"
+
+        path = os.path.join(directory, f"medical_{ROWS[0]}.csv")
+        target = f"ESP8266-{ROWS[0] // 2:06d}"
+        _, naive = timed(lambda: [naive_lookup(path, target) for _ in range(20)])
+        print("-" * 78)
+        print(f"[naive       ] scan {ROWS[0]} rows per alarm: {naive / 20 * 1000:.2f} ms per lookup")
+        print("=" * 78)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
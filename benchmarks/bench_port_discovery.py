@@ -0,0 +1,170 @@
+"""Benchmark discovery port: probe berurutan + sleep tetap vs probe paralel + cache.
+
+Skenario (port palsu di memori, 9 kandidat):
+  - 6 port mati (open gagal setelah 20 ms, seperti COM yang tidak ada)
+  - 2 port terbuka tapi diam (misal modem Bluetooth)
+  - 1 ESP8266 yang boot BOOT_S setelah port dibuka lalu mengirim handshake
+
+Versi lama: buka port satu per satu, sleep 2 + 0.5 detik, pakai port
+pertama yang terbuka. Versi baru: port_discovery.discover_ports tanpa
+cache (cold) dan dengan cache dari run sebelumnya (warm). Skenario kedua
+memakai firmware yang diam sampai tombol ditekan: tidak ada port yang
+bisa diidentifikasi sehingga semua probe menunggu sampai timeout, tapi
+cache (handshake sesi sebelumnya) tetap menaruh port yang benar di depan.
+
+Jalankan: python benchmarks/bench_port_discovery.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from port_discovery import PROBE_TIMEOUT_S, PortCache, discover_ports
+
+BOOT_S = 0.4
+DEAD_OPEN_S = 0.02
+ESP_PORT = "COM9"
+PORTS = ["COM1", "COM2", "COM3", "COM4", "COM5", "COM6", "COM7", "COM8", ESP_PORT]
+SILENT = {"COM3", "COM7"}
+HANDSHAKE = (b"=== HANDSHAKE ===\nDEVICE_ID: ESP8266-ROOM-101\nPATIENT: Budi\n"
+             b"ROOM: 101\n=== END_HANDSHAKE ===\n")
+
+
+# ============================================
+# PORT PALSU
+# ============================================
+class FakePort:
+    """API pyserial minimal: read/in_waiting/write/reset_input_buffer/close"""
+
+    def __init__(self, port, reply_after=None, answers_ping=True):
+        self.port = port
+        self.is_open = True
+        self.timeout = 1
+        self._data = bytearray()
+        self._cond = threading.Condition()
+        self._answers_ping = answers_ping
+        if reply_after is not None and answers_ping:
+            timer = threading.Timer(reply_after, self._push, (HANDSHAKE,))
+            timer.daemon = True
+            timer.start()
+            self._booted_at = time.perf_counter() + reply_after
+        else:
+            self._booted_at = None
+
+    def _push(self, data):
+        with self._cond:
+            self._data += data
+            self._cond.notify_all()
+
+    @property
+    def in_waiting(self):
+        return len(self._data)
+
+    def read(self, size=1):
+        with self._cond:
+            if not self._data and self.is_open:
+                self._cond.wait(self.timeout)
+            chunk = bytes(self._data[:size])
+            del self._data[:size]
+            return chunk
+
+    def write(self, data):
+        # PING sebelum boot selesai hilang (ESP masih reset), sesudahnya dijawab
+        if (data == b"PC_PING\n" and self._answers_ping and self._booted_at is not None
+                and time.perf_counter() >= self._booted_at):
+            self._push(b"PONG\n")
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self._cond:
+            self._data.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+
+def make_opener(answers_ping=True):
+    def open_port(port):
+        if port == ESP_PORT:
+            return FakePort(port, BOOT_S, answers_ping)
+        if port in SILENT:
+            return FakePort(port)
+        time.sleep(DEAD_OPEN_S)
+        raise OSError(f"could not open port {port}")
+    return open_port
+
+
+def legacy_connect(ports, open_port):
+    """Salinan alur lama: find_serial_ports + connect_serial berurutan"""
+    for port in ports:
+        try:
+            conn = open_port(port)
+            time.sleep(2)
+            conn.reset_input_buffer()
+            conn.reset_output_buffer()
+            conn.write(b"PC_PING\n")
+            time.sleep(0.5)
+            return conn
+        except Exception:
+            continue
+    return None
+
+
+def timed(func):
+    begin = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - begin
+
+
+def scenario(title, answers_ping):
+    print(f"-- {title}")
+    open_port = make_opener(answers_ping)
+
+    conn, elapsed = timed(lambda: legacy_connect(PORTS, open_port))
+    picked = conn.port if conn else None
+    note = "ESP8266" if picked == ESP_PORT else "WRONG DEVICE (silent port)"
+    print(f"[legacy  ] {elapsed * 1000:7.0f} ms -> {picked} ({note})")
+    if conn:
+        conn.close()
+
+    cache = PortCache(path=None)
+    results, cold = timed(lambda: discover_ports(PORTS, open_port, cache))
+    result = results[0]
+    print(f"[cold    ] {cold * 1000:7.0f} ms -> {result.port} (identified={result.identified})")
+    result.close()
+    if answers_ping:
+        assert result.port == ESP_PORT
+    # Cache diisi seperti setelah handshake berhasil di sesi sebelumnya
+    cache.remember(ESP_PORT, "ESP8266-ROOM-101")
+
+    results, warm = timed(lambda: discover_ports(PORTS, open_port, cache))
+    warm_result = results[0]
+    print(f"[warm    ] {warm * 1000:7.0f} ms -> {warm_result.port} "
+          f"(cached, identified={warm_result.identified})")
+    warm_result.close()
+
+    assert warm_result.port == ESP_PORT
+    if answers_ping:
+        assert warm < 1.0, "answering port should connect in under a second"
+    return cold, warm
+
+
+def main():
+    print("=" * 70)
+    print(f"PORT DISCOVERY ({len(PORTS)} candidates, ESP boot {BOOT_S * 1000:.0f} ms, "
+          f"probe timeout {PROBE_TIMEOUT_S:.1f} s)")
+    print("=" * 70)
+    scenario("firmware answers with handshake after boot", answers_ping=True)
+    scenario("firmware silent until button press", answers_ping=False)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
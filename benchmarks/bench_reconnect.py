@@ -0,0 +1,105 @@
+"""Benchmark reconnect: waktu pulih setelah kabel dicabut lalu dipasang lagi.
+
+ESP8266 disimulasikan dengan pasangan pty (esp_simulator.SimulatedEsp):
+sisi master dijawab thread "firmware" (PC_PING -> handshake), sisi slave
+dibuka controller lewat symlink ttyUSB<n> di direktori temp. Cabut = symlink dihapus + master
+ditutup (read di slave gagal EIO); pasang = pty baru dengan nama ttyUSB
+berikutnya setelah REPLUG_S, seperti kabel yang dicolok ulang.
+
+Mode yang dibandingkan:
+  - inotify : PortWatcher dibangunkan inotify pada direktori temp
+  - poll    : PortWatcher polling tiap HOTPLUG_POLL_S
+  - backoff : tanpa watcher, hanya retry backoff LinkSupervisor
+Waktu pulih = link putus -> listening lagi (recovery_metrics), dikurangi
+REPLUG_S (waktu kabel memang tercabut).
+
+Butuh POSIX (pty). Jalankan: python benchmarks/bench_reconnect.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from esp_simulator import SimulatedEsp
+from link_supervisor import HOTPLUG_POLL_S, LinkSupervisor, PortWatcher
+from tests.headless import HeadlessCore
+
+CYCLES = 8
+REPLUG_S = 0.3
+
+
+class BenchCore(HeadlessCore):
+    def __init__(self, directory):
+        self.handshakes = 0
+        super().__init__(ports_dir=directory)
+
+    def handle_complete_handshake(self, handshake_data, link=None):
+        self.handshakes += 1
+        super().handle_complete_handshake(handshake_data, link)
+
+
+def plug(directory, index):
+    """Kabel baru: ESP simulasi yang hanya menjawab PC_PING (tanpa event berkala)"""
+    return SimulatedEsp(index, directory, rate=0).start()
+
+
+def wait_for(predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.002)
+    return False
+
+
+def run(mode):
+    directory = tempfile.mkdtemp(prefix="bench_reconnect_")
+    core = BenchCore(directory)
+    if mode == "backoff":
+        watcher = PortWatcher(lambda added, removed: None, core.find_serial_ports,
+                              poll_interval=3600, use_inotify=False)
+    else:
+        watcher = PortWatcher(None, core.find_serial_ports, watch_dirs=(directory,),
+                              use_inotify=(mode == "inotify"))
+    core.supervisor = LinkSupervisor(core, watcher=watcher)
+    if mode != "backoff":
+        watcher.on_change = core.supervisor.on_ports_changed
+
+    esp = plug(directory, 0)
+    core.start_connect()
+    assert wait_for(lambda: not core.needs_connection(), 5), "initial connect failed"
+
+    for cycle in range(1, CYCLES + 1):
+        esp.unplug()
+        time.sleep(REPLUG_S)
+        esp = plug(directory, cycle)
+        recovered = lambda: core.recovery_metrics.merged("recover").count >= cycle
+        assert wait_for(recovered, 30), f"{mode}: no recovery in cycle {cycle}"
+
+    hist = core.recovery_metrics.merged("recover")
+    handshakes = core.handshakes
+    core.close()
+    esp.unplug()
+    shutil.rmtree(directory, ignore_errors=True)
+    return ("none" if mode == "backoff" else watcher.mode), hist, handshakes
+
+
+def main():
+    print("=" * 70)
+    print(f"RECONNECT ({CYCLES} unplug/replug cycles, cable out {REPLUG_S * 1000:.0f} ms, "
+          f"poll {HOTPLUG_POLL_S:.1f} s)")
+    print("=" * 70)
+    for mode in ("inotify", "poll", "backoff"):
+        actual, hist, handshakes = run(mode)
+        offset = REPLUG_S * 1000
+        print(f"[{mode:8}] watcher={actual:8} | recover p50 {hist.percentile(0.5) / 1000 - offset:7.1f} ms | "
+              f"max {hist.max / 1000 - offset:7.1f} ms | handshakes {handshakes}")
+        assert handshakes == CYCLES + 1, "handshake must re-run after every reconnect"
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Benchmark pembaca serial: loop polling lama vs LineFramer + read_available.
+
+Mengukur:
+  1. Throughput framing (lines/sec) pada burst data di memori
+  2. Latensi wake-to-dispatch lewat pipe OS (hanya POSIX)
+
+Jalankan: python benchmarks/bench_serial_reader.py
+"""
+import fcntl
+import os
+import select
+import statistics
+import struct
+import sys
+import termios
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_link import LineFramer, read_available
+
+SAMPLE_LINES = [
+    "=== HANDSHAKE ===",
+    "DEVICE_ID: ESP8266-ROOM-101",
+    "PATIENT: Budi Santoso",
+    "ROOM: 101",
+    "=== END_HANDSHAKE ===",
+    "STATUS: OK, RSSI=-61, BATTERY=87",
+    "🔘 Button pressed",
+    "!ALARM_START!",
+    '{"command":"PLAY_ALARM","patient":"Budi","room":"101","device_id":"ESP8266-ROOM-101"}',
+    "!ALARM_STOP!",
+]
+
+
+# ============================================
+# PORT PALSU BERBASIS PIPE
+# ============================================
+class PipeSerial:
+    """Meniru API pyserial yang dipakai listener (read, in_waiting, is_open)"""
+
+    def __init__(self, fd, timeout=1):
+        self.fd = fd
+        self.timeout = timeout
+        self.is_open = True
+
+    @property
+    def in_waiting(self):
+        buf = fcntl.ioctl(self.fd, termios.FIONREAD, struct.pack("I", 0))
+        return struct.unpack("I", buf)[0]
+
+    def read(self, size=1):
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        if not ready:
+            return b""
+        return os.read(self.fd, size)
+
+
+def legacy_feed(buffer, raw_data, out):
+    """Salinan logika framing lama (decode per chunk + split per baris)"""
+    data = raw_data.decode("utf-8", errors="replace")
+    buffer += data
+    while "\n" in buffer:
+        line, buffer = buffer.split("\n", 1)
+        line = line.strip()
+        if line:
+            out.append(line)
+    return buffer
+
+
+def legacy_listener(conn, dispatch, stop):
+    """Salinan loop polling lama (in_waiting + sleep 10 ms)"""
+    buffer = ""
+    lines = []
+    while not stop.is_set():
+        if conn.in_waiting > 0:
+            raw_data = conn.read(conn.in_waiting)
+            buffer = legacy_feed(buffer, raw_data, lines)
+            for line in lines:
+                dispatch(line)
+            lines.clear()
+        time.sleep(0.01)
+
+
+def framer_listener(conn, dispatch, stop):
+    """Loop baru: blok di read_available, framing dengan LineFramer"""
+    framer = LineFramer()
+    while not stop.is_set():
+        raw_data = read_available(conn)
+        if raw_data:
+            for line in framer.feed(raw_data):
+                dispatch(line)
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+def bench_throughput(total_lines=200_000, chunk_size=256):
+    payload = ("\n".join(SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(total_lines)) + "\n").encode("utf-8")
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+
+    # Burst besar dalam satu read (kasus quadratic di versi lama)
+    burst = [payload[:256 * 1024]]
+
+    results = {}
+    for label, data in (("chunked", chunks), ("burst-256KB", burst)):
+        joined = b"".join(data).decode("utf-8", errors="replace")
+        expected = [line.strip() for line in joined.split("\n")[:-1] if line.strip()]
+
+        out = []
+        start = time.perf_counter()
+        buffer = ""
+        for chunk in data:
+            buffer = legacy_feed(buffer, chunk, out)
+        legacy_time = time.perf_counter() - start
+        legacy_count = len(out)
+
+        framer = LineFramer(max_line=len(payload))
+        new_out = []
+        start = time.perf_counter()
+        for chunk in data:
+            new_out.extend(framer.feed(chunk))
+        new_time = time.perf_counter() - start
+
+        # Versi lama bisa merusak karakter UTF-8 yang terpotong antar chunk
+        assert new_out == expected, "LineFramer output differs from expected lines"
+        corrupted = sum(1 for a, b in zip(out, expected) if a != b)
+        results[label] = (legacy_count / legacy_time, len(new_out) / new_time, corrupted)
+    return results
+
+
+def bench_latency(listener, samples=200, gap=0.02):
+    read_fd, write_fd = os.pipe()
+    conn = PipeSerial(read_fd, timeout=0.2)
+    stop = threading.Event()
+    latencies = []
+    sent_at = {}
+
+    def dispatch(line):
+        seq = int(line.split(":", 1)[1])
+        latencies.append(time.perf_counter() - sent_at[seq])
+
+    thread = threading.Thread(target=listener, args=(conn, dispatch, stop), daemon=True)
+    thread.start()
+    time.sleep(0.05)
+
+    for seq in range(samples):
+        sent_at[seq] = time.perf_counter()
+        os.write(write_fd, f"!ALARM_START!:{seq}\n".encode())
+        time.sleep(gap)
+
+    time.sleep(0.1)
+    stop.set()
+    os.write(write_fd, b"\n")
+    thread.join(1)
+    os.close(write_fd)
+    os.close(read_fd)
+
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max": latencies[-1] * 1000,
+        "mean": statistics.mean(latencies) * 1000,
+    }
+
+
+def main():
+    print("=" * 70)
+    print("SERIAL READER BENCHMARK")
+    print("=" * 70)
+
+    for label, (legacy, new, corrupted) in bench_throughput().items():
+        print(f"Throughput [{label:12}] legacy: {legacy:>12,.0f} lines/s | "
+              f"framer: {new:>12,.0f} lines/s | x{new / legacy:.1f} "
+              f"(legacy corrupted {corrupted} lines)")
+
+    print("-" * 70)
+    for name, listener in (("legacy poll", legacy_listener), ("framer", framer_listener)):
+        stats = bench_latency(listener)
+        print(f"Wake-to-dispatch [{name:11}] p50 {stats['p50']:.3f} ms | "
+              f"p99 {stats['p99']:.3f} ms | max {stats['max']:.3f} ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Suite benchmark serial: controller asli vs armada ESP8266 simulasi.
+
+Armada (esp_simulator.py) berjalan di subprocess sendiri sehingga CPU yang
+diukur hanya milik controller. Controller memakai AlarmCore asli (discovery,
+serial_listener mode single-link, LinkMultiplexer mode multi-link,
+classify_line, registry); hanya hook tampilan/suara yang dimatikan.
+
+Per skenario diukur selama DURATION_S (setelah WARMUP_S):
+  - lines/s       : baris yang sampai di process_serial_line
+  - latensi       : baris STATUS membawa waktu kirim T (CLOCK_MONOTONIC),
+                    p50/p99/max = write di ESP -> process_serial_line
+  - CPU           : process_time controller / waktu dinding
+  - memori        : RSS controller di akhir skenario
+  - framing       : frame/baris rusak yang dibuang (skenario noise/BIN1)
+
+Hasil ditambahkan ke benchmarks/results/serial_suite.jsonl (satu baris per
+run, dengan commit git) dan dibandingkan dengan run sebelumnya; penurunan
+lines/s > LINES_REGRESSION atau kenaikan p99 > P99_REGRESSION ditandai.
+
+Butuh POSIX (pty). Jalankan: python benchmarks/bench_serial_suite.py [--no-save] [--only NAME]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from tests.headless import HeadlessCore
+
+SIMULATOR = os.path.join(BENCH_DIR, "esp_simulator.py")
+RESULTS = os.path.join(BENCH_DIR, "results", "serial_suite.jsonl")
+WARMUP_S = 1.0
+DURATION_S = 5.0
+LINES_REGRESSION = 0.10        # lines/s turun > 10% dari run sebelumnya
+P99_REGRESSION = 0.25          # p99 naik > 25% (dan > 1 ms) dari run sebelumnya
+
+# nama -> parameter simulator + mode controller; rate = baris/detik per device
+SCENARIOS = {
+    "single-200": dict(devices=1, rate=200),
+    "single-max": dict(devices=1, rate=50_000),
+    "multi-16x50": dict(devices=16, rate=50, multi=True),
+    "noisy-8x50": dict(devices=8, rate=50, noise=0.05, partial=0.3, multi=True),
+    "bin1-8x50": dict(devices=8, rate=50, binary=True, multi=True),
+}
+
+
+class SuiteCore(HeadlessCore):
+    """Core headless dengan port pty yang mencatat latency baris STATUS"""
+
+    def __init__(self, directory, multi_link):
+        self.recording = False
+        self.lines = 0
+        self.latencies = []
+        super().__init__(ports_dir=directory, multi_link=multi_link)
+
+    def process_serial_line(self, line, handshake_data, link=None, timing=None):
+        now = time.monotonic_ns()
+        if self.recording:
+            self.lines += 1
+            if line.startswith("STATUS: SEQ="):
+                start = line.index("T=") + 2
+                self.latencies.append(now - int(line[start:line.index(",", start)]))
+        super().process_serial_line(line, handshake_data, link, timing)
+
+    def framers(self):
+        if self.multi_link:
+            return [link.framer for link in list(self.links.values())]
+        return [self.serial_link.framer] if self.serial_link is not None else []
+
+
+def wait_for(predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def run_scenario(devices, rate, noise=0.0, partial=0.0, binary=False, multi=False, duration=DURATION_S):
+    directory = tempfile.mkdtemp(prefix="bench_serial_suite_")
+    command = [sys.executable, SIMULATOR, "--devices", str(devices), "--rate", str(rate),
+               "--noise", str(noise), "--partial", str(partial), "--dir", directory, "--json"]
+    if binary:
+        command.append("--binary")
+    fleet = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    core = None
+    try:
+        ready = json.loads(fleet.stdout.readline())["ready"]
+        assert len(ready) == devices, "simulator did not start"
+
+        core = SuiteCore(directory, multi)
+        core.start_connect()
+        connected = (lambda: len(core.connected_ports()) == devices) if multi else (lambda: not core.needs_connection())
+        assert wait_for(connected, 15), f"connected {len(core.connected_ports())} of {devices} devices"
+        time.sleep(WARMUP_S)
+
+        rss_before = rss_mb()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        core.recording = True
+        time.sleep(duration)
+        core.recording = False
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+
+        latencies = [ns / 1e6 for ns in core.latencies]
+        framers = core.framers()
+        result = {
+            "devices": devices,
+            "offered_lines_s": devices * rate,
+            "lines_s": round(core.lines / wall, 1),
+            "probes": len(latencies),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "max_ms": round(max(latencies), 3),
+            "cpu_pct": round(cpu / wall * 100, 1),
+            "rss_mb": round(rss_mb(), 1),
+            "rss_growth_mb": round(rss_mb() - rss_before, 1),
+            "framing_corrupt": sum(getattr(framer, "corrupt", 0) for framer in framers),
+            "framing_lost": sum(getattr(framer, "lost", 0) for framer in framers),
+            "binary_links": sum(1 for framer in framers if hasattr(framer, "corrupt")),
+        }
+    finally:
+        fleet.send_signal(signal.SIGTERM)
+        try:
+            fleet.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            fleet.kill()
+        if core is not None:
+            core.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+# ============================================
+# HASIL & PERBANDINGAN ANTAR VERSI
+# ============================================
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path=RESULTS):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def save_run(run, path=RESULTS):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, separators=(",", ":")) + "\n")
+
+
+def regressions(name, current, before):
+    """Pesan regresi satu skenario dibanding run sebelumnya"""
+    found = []
+    if current["lines_s"] < before["lines_s"] * (1 - LINES_REGRESSION):
+        found.append(f"{name}: lines/s {before['lines_s']:.0f} -> {current['lines_s']:.0f}")
+    if current["p99_ms"] > before["p99_ms"] * (1 + P99_REGRESSION) and current["p99_ms"] - before["p99_ms"] > 1:
+        found.append(f"{name}: p99 {before['p99_ms']:.2f} -> {current['p99_ms']:.2f} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial benchmark suite against a simulated ESP8266 fleet")
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS), help="run only this scenario")
+    parser.add_argument("--duration", type=float, default=DURATION_S)
+    parser.add_argument("--no-save", action="store_true", help=f"do not append to {RESULTS}")
+    args = parser.parse_args()
+
+    before = previous_run()
+    run = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duration_s": args.duration,
+        "scenarios": {},
+    }
+
+    print("=" * 100)
+    print(f"SERIAL SUITE (simulated ESP8266 fleet on pty, {args.duration:.0f} s per scenario, "
+          f"commit {run['commit'] or '?'})")
+    print("=" * 100)
+    found = []
+    for name in args.only or SCENARIOS:
+        params = SCENARIOS[name]
+        result = run_scenario(duration=args.duration, **params)
+        run["scenarios"][name] = result
+        print(f"[{name:12}] {result['lines_s']:8.0f} lines/s (offered {result['offered_lines_s']:6}) | "
+              f"dispatch p50 {result['p50_ms']:7.2f} p99 {result['p99_ms']:7.2f} max {result['max_ms']:7.1f} ms | "
+              f"CPU {result['cpu_pct']:5.1f}% | RSS {result['rss_mb']:5.1f} MB | "
+              f"corrupt {result['framing_corrupt']}")
+
+        assert result["probes"] > 0, f"{name}: no STATUS probe reached the controller"
+        if result["offered_lines_s"] < 5000:
+            assert result["lines_s"] > result["offered_lines_s"] * 0.8, f"{name}: controller fell behind"
+        if params.get("binary"):
+            assert result["binary_links"] == params["devices"], f"{name}: BIN1 not negotiated on every link"
+            assert result["framing_corrupt"] == result["framing_lost"] == 0, f"{name}: clean link reported errors"
+        if before and name in before.get("scenarios", {}):
+            found += regressions(name, result, before["scenarios"][name])
+
+    print("-" * 100)
+    if before:
+        print(f"Compared with {before.get('commit') or '?'} ({before.get('time')}):")
+        for message in found or ["no regressions"]:
+            print(f"  {'⚠ ' if found else ''}{message}")
+    if not args.no_save:
+        save_run(run)
+        print(f"Saved to {os.path.relpath(RESULTS)}")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark startup: biaya import dan waktu sampai listener serial aktif.
+
+Mengukur (tiap angka = minimum dari beberapa proses baru):
+  1. Import (python -X importtime, kumulatif mikrodetik):
+     - before: import top-level servers.py lama (tkinter, ttk, messagebox,
+       subprocess, json, pyserial jika ada) + GUI
+     - after : alarm_core saja (jalur --headless / server.py)
+  2. Waktu proses: interpreter start sampai listener aktif. Port serial
+     diganti port palsu di memori yang menjawab PC_PING. Versi lama
+     menunggu root.after(1000) lalu sleep tetap 2 + 0.5 detik per port;
+     keduanya ditambahkan sebagai konstanta untuk baris "before".
+
+Jalankan: python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alarm_core import STARTUP_BUDGET_MS
+
+RUNS = 7
+LEGACY_CONNECT_DELAY_MS = 1000     # root.after(1000, self.connect_serial) di versi lama
+LEGACY_SETTLE_MS = 2500            # time.sleep(2) + time.sleep(0.5) per port di versi lama
+
+
+def has_module(name):
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+LEGACY_MODULES = ["json", "subprocess", "tkinter", "tkinter.ttk", "tkinter.messagebox", "alarm_gui"]
+if has_module("serial"):
+    LEGACY_MODULES.insert(0, "serial")
+CORE_MODULES = ["alarm_core"]
+
+
+# ============================================
+# 1. IMPORTTIME
+# ============================================
+def importtime(modules):
+    """Total kumulatif (us) entri top-level untuk modul yang diminta"""
+    code = "import " + ", ".join(modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    wanted = set(modules)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Entri top-level tidak diindentasi (anak-anaknya diawali spasi ekstra)
+        if name[1:2] != " " and name.strip() in wanted:
+            total += int(cumulative)
+    return total
+
+
+# ============================================
+# 2. PROSES BARU SAMPAI LISTENING
+# ============================================
+CHILD = r"""
+import json, sys, threading, time
+t0 = time.perf_counter_ns()
+from tests.headless import HeadlessCore
+
+class FakeSerial:
+    port = "BENCH"
+    is_open = True
+    timeout = 1
+    def __init__(self):
+        self._data = bytearray()
+        self._ready = threading.Event()
+    @property
+    def in_waiting(self):
+        return len(self._data)
+    def read(self, size=1):
+        if not self._data:
+            self._ready.wait(self.timeout)
+        chunk = bytes(self._data[:size])
+        del self._data[:size]
+        if not self._data and self.is_open:
+            self._ready.clear()
+        return chunk
+    def write(self, data):
+        if data == b"PC_PING\n":
+            self._data += b"PONG\n"
+            self._ready.set()
+        return len(data)
+    def reset_input_buffer(self):
+        self._data.clear()
+    def close(self):
+        self.is_open = False
+        self._ready.set()
+
+class BenchCore(HeadlessCore):
+    def find_serial_ports(self):
+        return ["BENCH"]
+    def open_serial_port(self, port):
+        return FakeSerial()
+
+t_import = time.perf_counter_ns()
+core = BenchCore()
+t_ready = time.perf_counter_ns()
+core.start_connect()
+while core.startup_ms is None:
+    time.sleep(0.0005)
+t_listen = time.perf_counter_ns()
+core.close()
+print(json.dumps({"import": (t_import - t0) / 1e6, "ready": (t_ready - t0) / 1e6,
+                  "listening": (t_listen - t0) / 1e6}))
+"""
+
+
+def child_startup():
+    begin = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - begin) * 1000
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats["process"] = wall
+    return stats
+
+
+def interpreter_baseline():
+    begin = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - begin) * 1000
+
+
+def main():
+    print("=" * 70)
+    print(f"STARTUP BENCHMARK (min of {RUNS} fresh processes)")
+    print("=" * 70)
+
+    before = min(importtime(LEGACY_MODULES) for _ in range(RUNS))
+    after = min(importtime(CORE_MODULES) for _ in range(RUNS))
+    print(f"[imports ] before {before / 1000:8.1f} ms  ({', '.join(LEGACY_MODULES)})")
+    print(f"[imports ] after  {after / 1000:8.1f} ms  (alarm_core)  -> {before / max(after, 1):.1f}x less")
+
+    interpreter = min(interpreter_baseline() for _ in range(RUNS))
+    runs = [child_startup() for _ in range(RUNS)]
+    best = {key: min(r[key] for r in runs) for key in runs[0]}
+    new_total = interpreter + best["listening"]
+    old_total = interpreter + before / 1000 + LEGACY_CONNECT_DELAY_MS + LEGACY_SETTLE_MS
+    print(f"[startup ] interpreter {interpreter:.1f} ms | core import {best['import']:.1f} ms | "
+          f"core ready {best['ready']:.1f} ms | listening {best['listening']:.1f} ms")
+    print(f"[listen  ] before ~{old_total:7.0f} ms  (interpreter + imports + 1000 ms delay + settle)")
+    print(f"[listen  ] after  ~{new_total:7.0f} ms  (interpreter + core + PC_PING probe)  "
+          f"budget {STARTUP_BUDGET_MS} ms")
+    print("=" * 70)
+
+    # Self-check: jalur headless tidak boleh memuat modul GUI/platform
+    check = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, alarm_core; print(','.join(m for m in ('tkinter', 'serial', 'winsound', "
+         "'subprocess', 'http.server') if m in sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = check.stdout.strip()
+    assert not loaded, f"alarm_core imported GUI/platform modules eagerly: {loaded}"
+    assert best["listening"] <= STARTUP_BUDGET_MS, "startup budget exceeded"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Benchmark telemetri vital dari baris STATUS (vitals.VitalsMonitor).
+
+Diukur:
+  - record : biaya per baris STATUS di thread serial (parse + antri)
+  - tick   : satu evaluasi ring NumPy (sebar antrian + median bergulir
+             + cek ambang) untuk DEVICE_COUNTS device yang masing-masing
+             mengirim satu STATUS per tick, p50/p99; dibandingkan dengan
+             implementasi naif deque per device per field di Python
+Self-check:
+  - breach dari ring NumPy sama persis dengan referensi naif (acak, dengan
+    sample hilang dan spike)
+  - SpO2 turun bertahap -> tepat satu breach, naik lagi -> tepat satu pulih;
+    satu spike tidak memicu apa-apa
+  - device yang diam tidak dianggap pulih
+  - lebih dari HISTORY_SAMPLES STATUS dalam satu tick: hanya yang terakhir
+    disimpan, urut
+  - core: STATUS "SPO2=84" berulang dari device ber-handshake memicu alarm
+    di registry; battery rendah hanya peringatan
+
+Jalankan: python benchmarks/bench_vitals.py
+"""
+import collections
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.headless import headless_core
+from vitals import (
+    HISTORY_SAMPLES, MIN_SAMPLES, RECENT_SAMPLES, THRESHOLDS, VITAL_FIELDS, VitalsMonitor, parse_vitals,
+)
+
+DEVICE_COUNTS = (100, 500, 2000)
+TICKS = 200
+RECORD_LINES = 50000
+CHECK_DEVICES = 50
+CHECK_TICKS = 300
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class NaiveVitals:
+    """Referensi: deque per device per field, median dan ambang dicek satu per satu"""
+
+    def __init__(self):
+        self.history = {}
+        self.active = {}
+
+    def record(self, device_id, values):
+        rings = self.history.setdefault(
+            device_id, {field: collections.deque(maxlen=HISTORY_SAMPLES) for field in VITAL_FIELDS})
+        for field in VITAL_FIELDS:
+            rings[field].append(values.get(field))
+
+    def tick(self):
+        events = []
+        for device_id, rings in self.history.items():
+            for field, ring in rings.items():
+                recent = [value for value in list(ring)[-RECENT_SAMPLES:] if value is not None]
+                low, high = THRESHOLDS[field]
+                breach = False
+                if len(recent) >= MIN_SAMPLES:
+                    median = statistics.median(recent)
+                    breach = (low is not None and median < low) or (high is not None and median > high)
+                if breach != self.active.get((device_id, field), False):
+                    self.active[(device_id, field)] = breach
+                    events.append((device_id, field, not breach))
+        return events
+
+
+def status_line(rng, spo2=None):
+    hr = rng.gauss(75, 8)
+    return (f"OK, HR={hr:.0f}, SPO2={spo2 if spo2 is not None else rng.gauss(96, 1.5):.0f}, "
+            f"BATTERY={rng.randint(10, 100)}, RSSI={rng.randint(-95, -40)}")
+
+
+def bench_record():
+    monitor = VitalsMonitor()
+    rng = random.Random(1)
+    lines = [status_line(rng) for _ in range(1000)]
+    begin = time.perf_counter_ns()
+    for n in range(RECORD_LINES):
+        monitor.record(f"ESP8266-{n % 500:03d}", lines[n % len(lines)])
+    per_line = (time.perf_counter_ns() - begin) / RECORD_LINES / 1000
+    applied = monitor.tick()
+    print(f"[record ] {per_line:5.2f} us per STATUS line on the serial thread (parse + queue), "
+          f"{len(monitor.devices)} devices, {len(applied)} state changes")
+    assert monitor.records == RECORD_LINES
+
+
+def bench_tick():
+    rng = random.Random(2)
+    lines = [status_line(rng) for _ in range(1000)]
+    parsed = [parse_vitals(line) for line in lines]
+    for devices in DEVICE_COUNTS:
+        monitor = VitalsMonitor()
+        naive = NaiveVitals()
+        names = [f"ESP8266-{n:04d}" for n in range(devices)]
+        fast, slow = [], []
+        for tick in range(TICKS):
+            for n, name in enumerate(names):
+                values = parsed[(tick * devices + n) % len(parsed)]
+                monitor.record(name, values)
+                naive.record(name, values)
+            begin = time.perf_counter_ns()
+            monitor.tick()
+            fast.append((time.perf_counter_ns() - begin) / 1000)
+            begin = time.perf_counter_ns()
+            naive.tick()
+            slow.append((time.perf_counter_ns() - begin) / 1000)
+        print(f"[tick   ] {devices:5} devices: numpy p50 {percentile(fast, 0.5):7.1f} us | "
+              f"p99 {percentile(fast, 0.99):7.1f} us | naive p50 {percentile(slow, 0.5):8.1f} us "
+              f"({percentile(slow, 0.5) / percentile(fast, 0.5):4.1f}x) | capacity {monitor.capacity}")
+
+
+def check_against_naive():
+    rng = random.Random(3)
+    monitor = VitalsMonitor()
+    naive = NaiveVitals()
+    total = 0
+    for tick in range(CHECK_TICKS):
+        for n in range(CHECK_DEVICES):
+            if rng.random() < 0.1:
+                continue                                  # STATUS hilang
+            values = {"hr": rng.gauss(90, 30), "spo2": rng.gauss(92, 4), "battery": rng.gauss(30, 20),
+                      "rssi": rng.gauss(-80, 10)}
+            if rng.random() < 0.2:
+                values.pop(rng.choice(VITAL_FIELDS))     # Firmware lama tanpa field tertentu
+            values = {field: float(round(value)) for field, value in values.items()}
+            device = f"ESP8266-{n:03d}"
+            for _ in range(rng.choice((1, 1, 1, 2))):     # Kadang dua STATUS dalam satu tick
+                monitor.record(device, values)
+                naive.record(device, values)
+        fast = sorted((event.device_id, event.field, event.cleared) for event in monitor.tick())
+        slow = sorted(naive.tick())
+        assert fast == slow, (tick, fast, slow)
+        total += len(fast)
+    print(f"[check  ] {CHECK_TICKS} random ticks x {CHECK_DEVICES} devices: {total} state changes "
+          f"identical to the per-device Python reference")
+
+
+def check_edges():
+    monitor = VitalsMonitor()
+    script = [97, 96, 60, 97, 96, 95, 91, 88, 86, 85, 84, 85, 88, 93, 96, 97, 98, 97]
+    events = []
+    for spo2 in script:
+        monitor.record("ESP8266-001", f"HR=72, SPO2={spo2}")
+        events.extend(monitor.tick())
+    kinds = [(event.field, event.cleared) for event in events]
+    assert kinds == [("spo2", False), ("spo2", True)], [event.describe() for event in events]
+    print(f"[edges  ] SpO2 {script}: {', '.join(event.describe() for event in events)}")
+
+    # Device diam setelah breach: state tidak berubah sampai ada STATUS baru
+    for _ in range(RECENT_SAMPLES):
+        monitor.record("ESP8266-002", "HR=30")
+    breach = monitor.tick()
+    assert [(event.device_id, event.cleared) for event in breach] == [("ESP8266-002", False)]
+    assert monitor.tick() == [] and monitor.stats()["active"] == 1, "silent devices must keep their state"
+
+    # Burst lebih panjang dari ring: hanya HISTORY_SAMPLES terakhir, urut
+    for n in range(HISTORY_SAMPLES * 3 + 7):
+        monitor.record("ESP8266-003", f"RSSI={-n}")
+    monitor.tick()
+    snapshot = monitor.snapshot("ESP8266-003")["rssi"]
+    assert snapshot["samples"] == HISTORY_SAMPLES and snapshot["last"] == -(HISTORY_SAMPLES * 3 + 6)
+    assert snapshot["max"] == -(HISTORY_SAMPLES * 2 + 7)
+    print(f"[edges  ] silent device keeps its breach; burst of {HISTORY_SAMPLES * 3 + 7} lines keeps "
+          f"the last {snapshot['samples']} (rssi {snapshot['max']:g}..{snapshot['last']:g})")
+
+
+class Link:
+    port = "/dev/ttyUSB0"
+    conn = None
+    handshake_data = {"DEVICE_ID": "ESP8266-007"}
+
+
+def check_core():
+    core = headless_core(messages=[], multi_link=True, dedup_window=0,
+                         vitals=VitalsMonitor(interval=3600))      # tick() dipanggil manual
+    link = Link()
+    try:
+        core.links[link.port] = link
+        core.registry.update_device("ESP8266-007", "Budi", "204", link.port)
+        for _ in range(RECENT_SAMPLES):
+            core.process_serial_line("STATUS: OK, HR=70, SPO2=84, BATTERY=9, RSSI=-60",
+                                     link.handshake_data, link)
+        core.handle_vital_breaches(core.vitals.tick())
+        record = core.registry.alarms.get("ESP8266-007")
+        assert record is not None, "low SpO2 must raise an alarm"
+        assert record.source == f"Vitals SpO2 84 < 90 @ {link.port}" and record.patient == "Budi", record.source
+        assert len(core.registry.alarms) == 1, "low battery must not raise an alarm"
+        warnings = [message for message in core.messages if message.startswith("🩺")]
+        assert any("Battery 9 < 15" in message for message in warnings)
+        print(f"[core   ] STATUS SPO2=84 -> alarm '{record.source}' for {record.patient} room {record.room}; "
+              f"{len(warnings)} vitals log lines")
+    finally:
+        core.close()
+
+
+def main():
+    print("=" * 100)
+    print(f"VITALS TELEMETRY ({', '.join(map(str, DEVICE_COUNTS))} devices, ring of {HISTORY_SAMPLES} samples, "
+          f"median of last {RECENT_SAMPLES})")
+    print("=" * 100)
+    bench_record()
+    bench_tick()
+    print("-" * 100)
+    check_against_naive()
+    check_edges()
+    check_core()
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
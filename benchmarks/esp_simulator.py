@@ -0,0 +1,334 @@
+"""Simulator armada ESP8266 di atas pasangan pty (Linux/POSIX).
+
+Tiap SimulatedEsp membuat satu pty: sisi slave dibuka controller seperti
+COM port (lewat symlink ttyUSB<n> jika directory diberikan), sisi master
+dijalankan "firmware" palsu yang berbicara format yang sama dengan
+process_serial_line:
+  - PC_PING            -> blok === HANDSHAKE === (opsional FRAMING: BIN1)
+  - HANDSHAKE_ACK      -> mulai mengirim event dengan laju `rate` baris/detik
+  - event              : STATUS (membawa SEQ dan waktu kirim T untuk ukur
+                         latensi), !ALARM_START! / !ALARM_STOP!, JSON
+                         PLAY_ALARM, baris info emoji, handshake ulang
+  - noise              : byte sampah + newline dengan peluang `noise`
+  - partial            : baris dipotong beberapa write dengan jeda kecil
+  - FRAMING_ACK:BIN1   -> event berikutnya dikirim sebagai frame BIN1
+  - cmd_seq            : handshake menawarkan CMD_SEQ, pesan "<pesan> #<seq>"
+                         dibalas CMD_ACK:<seq> (hilang dengan peluang ack_loss)
+
+T memakai time.monotonic_ns() (CLOCK_MONOTONIC), jadi bisa dibandingkan
+dengan proses controller di mesin yang sama.
+
+Dipakai bench_serial_suite.py (sebagai subprocess) dan bench_reconnect.py
+(PtyPort). Manual: python benchmarks/esp_simulator.py --devices 4 --rate 20 --dir /tmp/esp
+lalu arahkan controller ke /tmp/esp/ttyUSB*.
+
+Jalankan: python benchmarks/esp_simulator.py --help
+"""
+import argparse
+import fcntl
+import json
+import os
+import random
+import select
+import signal
+import struct
+import sys
+import tempfile
+import termios
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_frames import FRAMING_ACK, FrameEncoder
+from command_queue import CMD_ACK_PREFIX, SEQ_KEY
+
+INFO_LINES = ("✅ Sensor OK", "📤 Heartbeat sent to PC", "🔘 Button released")
+# (bobot, jenis event)
+DEFAULT_MIX = ((60, "status"), (12, "alarm"), (5, "json"), (22, "info"), (1, "handshake"))
+
+
+def handshake_block(device_id, patient, room, binary=False, cmd_seq=False):
+    lines = ["=== HANDSHAKE ===", f"DEVICE_ID: {device_id}", f"PATIENT: {patient}", f"ROOM: {room}"]
+    if binary:
+        lines.append("FRAMING: BIN1")
+    if cmd_seq:
+        lines.append(f"{SEQ_KEY}: 1")
+    lines.append("=== END_HANDSHAKE ===")
+    return "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+
+# ============================================
+# ESP8266 PALSU
+# ============================================
+class SimulatedEsp:
+    """Satu ESP8266 palsu di sisi master pty"""
+
+    def __init__(self, index, directory=None, rate=20.0, noise=0.0, partial=0.0, binary=False,
+                 mix=DEFAULT_MIX, seed=None, cmd_seq=False, ack_loss=0.0):
+        self.index = index
+        self.device_id = f"ESP8266-SIM-{index:03d}"
+        self.patient = f"Pasien {index}"
+        self.room = f"{100 + index}"
+        self.rate = rate
+        self.noise = noise
+        self.partial = partial
+        self.binary = binary
+        self.cmd_seq = cmd_seq
+        self.ack_loss = ack_loss
+        self.rng = random.Random(index if seed is None else seed)
+        self._choices = [kind for weight, kind in mix for _ in range(weight)]
+
+        self.master, slave = os.openpty()
+        tty.setraw(slave)
+        self.slave_path = os.ttyname(slave)
+        os.close(slave)
+        self.path = self.slave_path
+        if directory is not None:
+            self.path = os.path.join(directory, f"ttyUSB{index}")
+            os.symlink(self.slave_path, self.path)
+
+        self.encoder = None            # FrameEncoder setelah FRAMING_ACK:BIN1
+        self.alarm_active = False
+        self.seq = 0
+        self.stats = {"lines": 0, "status": 0, "noise": 0, "bytes": 0, "acks": 0, "cmd_acks": 0}
+        self.received = []             # (pesan, seq) dari PC, urut kedatangan
+        self.connected = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._reader, daemon=True),
+                         threading.Thread(target=self._sender, daemon=True)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def unplug(self):
+        """Cabut kabel: firmware berhenti, symlink hilang, slave mendapat EIO"""
+        self.stop()
+        if self.path != self.slave_path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        os.close(self.master)
+
+    # ============================================
+    # FIRMWARE: MENJAWAB PC
+    # ============================================
+    def _reader(self):
+        buffer = b""
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self.master], [], [], 0.05)
+                if not ready:
+                    continue
+                buffer += os.read(self.master, 4096)
+            except OSError:
+                # Slave belum dibuka siapapun (EIO) atau master sudah ditutup
+                time.sleep(0.005)
+                continue
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                self._on_command(line.strip().decode("utf-8", "replace"))
+
+    def _on_command(self, command):
+        command, _, seq = command.partition(" #")
+        self.received.append((command, int(seq) if seq.isdigit() else None))
+        if seq.isdigit() and self.rng.random() >= self.ack_loss:
+            self._write(f"{CMD_ACK_PREFIX}{seq}\n".encode())
+            self.stats["cmd_acks"] += 1
+        if command == "PC_PING":
+            self._write(handshake_block(self.device_id, self.patient, self.room, self.binary, self.cmd_seq))
+        elif command == "HANDSHAKE_ACK":
+            self.connected.set()
+        elif command == FRAMING_ACK and self.encoder is None:
+            # FRAMING_ACK ulang (setelah handshake ulang) tidak mereset nomor urut
+            self.encoder = FrameEncoder()
+        elif command.endswith("_ACK") or command == "ALARM_ACKNOWLEDGED":
+            self.stats["acks"] += 1
+
+    # ============================================
+    # FIRMWARE: EVENT BERKALA
+    # ============================================
+    def _sender(self):
+        while not self.connected.wait(0.05):
+            if self._stop.is_set():
+                return
+        interval = 1.0 / self.rate if self.rate > 0 else None
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            if interval is None:
+                self._stop.wait(0.1)
+                continue
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            elif delay < -1.0:
+                # Tertinggal jauh (controller lambat membaca): jangan burst tanpa batas
+                next_at = time.monotonic()
+            try:
+                self._send_event(self.rng.choice(self._choices))
+                if self.noise and self.rng.random() < self.noise:
+                    self._send_noise()
+            except OSError:
+                return
+
+    def _send_event(self, kind):
+        encoder = self.encoder
+        if kind == "status":
+            self.seq += 1
+            self.stats["status"] += 1
+            # T diisi tepat sebelum write supaya latensi tidak termasuk jeda antrian
+            line = (f"STATUS: SEQ={self.seq}, T={time.monotonic_ns()}, "
+                    f"RSSI={-40 - self.rng.randrange(40)}, BATTERY={self.rng.randrange(20, 100)}")
+            data = encoder.text(line) if encoder else f"{line}\n".encode()
+        elif kind == "alarm":
+            self.alarm_active = not self.alarm_active
+            if encoder:
+                data = encoder.emergency() if self.alarm_active else encoder.cancel()
+            else:
+                data = b"!ALARM_START!\n" if self.alarm_active else b"!ALARM_STOP!\n"
+        elif kind == "json" and not self.alarm_active:
+            self.alarm_active = True
+            fields = {"patient": self.patient, "room": self.room, "device_id": self.device_id}
+            if encoder:
+                data = encoder.alarm(**fields)
+            else:
+                data = (json.dumps({"command": "PLAY_ALARM", **fields}, separators=(",", ":")) + "\n").encode()
+        elif kind == "handshake":
+            data = handshake_block(self.device_id, self.patient, self.room, self.binary)
+            if encoder:
+                # Handshake ulang selalu teks (seperti setelah reboot), nomor urut mulai dari 0
+                encoder.seq = 0
+        else:
+            line = self.rng.choice(INFO_LINES)
+            data = encoder.text(line) if encoder else f"{line}\n".encode()
+        self.stats["lines"] += data.count(b"\n") if not encoder or kind == "handshake" else 1
+        self._write(data)
+
+    def _send_noise(self):
+        self.stats["noise"] += 1
+        garbage = bytes(self.rng.randrange(0x80, 0x100) for _ in range(self.rng.randrange(1, 12)))
+        self._write(garbage + b"\n")
+
+    def _write(self, data):
+        with self._write_lock:
+            if self.partial and len(data) > 2 and self.rng.random() < self.partial:
+                cut = sorted(self.rng.sample(range(1, len(data)), min(2, len(data) - 1)))
+                pieces = [data[a:b] for a, b in zip([0] + cut, cut + [len(data)])]
+                for piece in pieces[:-1]:
+                    self._write_all(piece)
+                    time.sleep(self.rng.uniform(0.0002, 0.001))
+                self._write_all(pieces[-1])
+            else:
+                self._write_all(data)
+            self.stats["bytes"] += len(data)
+
+    def _write_all(self, data):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master, view)
+            view = view[written:]
+
+
+# ============================================
+# PORT DI SISI CONTROLLER
+# ============================================
+class PtyPort:
+    """Subset API pyserial di atas fd slave (dipakai jika pyserial tidak ada)"""
+
+    def __init__(self, path, timeout=1):
+        self.port = path
+        self.timeout = timeout
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        self.is_open = True
+
+    def fileno(self):
+        return self.fd
+
+    @property
+    def in_waiting(self):
+        buf = fcntl.ioctl(self.fd, termios.FIONREAD, struct.pack("I", 0))
+        return struct.unpack("I", buf)[0]
+
+    def read(self, size=1):
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        if not ready:
+            return b""
+        data = os.read(self.fd, size)
+        if not data:
+            raise OSError("device disconnected")
+        return data
+
+    def write(self, data):
+        return os.write(self.fd, data)
+
+    def reset_input_buffer(self):
+        termios.tcflush(self.fd, termios.TCIFLUSH)
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            os.close(self.fd)
+
+
+def port_opener():
+    try:
+        import serial
+        return lambda path: serial.Serial(path, 115200, timeout=1, write_timeout=1)
+    except ImportError:
+        return PtyPort
+
+
+# ============================================
+# CLI: ARMADA DI PROSES SENDIRI
+# ============================================
+def main():
+    parser = argparse.ArgumentParser(description="Simulated ESP8266 fleet on pty pairs")
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=20.0, help="lines/second per device")
+    parser.add_argument("--noise", type=float, default=0.0, help="probability of a garbage line per event")
+    parser.add_argument("--partial", type=float, default=0.0, help="probability of a split write per event")
+    parser.add_argument("--binary", action="store_true", help="offer BIN1 framing in the handshake")
+    parser.add_argument("--cmd-seq", action="store_true", help="offer CMD_SEQ and answer CMD_ACK:<seq>")
+    parser.add_argument("--ack-loss", type=float, default=0.0, help="probability of dropping a CMD_ACK")
+    parser.add_argument("--dir", default=None, help="directory for ttyUSB<n> symlinks")
+    parser.add_argument("--json", action="store_true", help="machine-readable READY/stats lines")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="esp_fleet_")
+    os.makedirs(directory, exist_ok=True)
+    fleet = [SimulatedEsp(i, directory, args.rate, args.noise, args.partial, args.binary,
+                          cmd_seq=args.cmd_seq, ack_loss=args.ack_loss).start()
+             for i in range(args.devices)]
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    if args.json:
+        print(json.dumps({"ready": [esp.path for esp in fleet]}), flush=True)
+    else:
+        print(f"{len(fleet)} simulated ESP8266 in {directory}:")
+        for esp in fleet:
+            print(f"  {esp.path} -> {esp.slave_path} ({esp.device_id})")
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+
+    for esp in fleet:
+        esp.unplug()
+    totals = {key: sum(esp.stats[key] for esp in fleet) for key in fleet[0].stats}
+    print(json.dumps({"stats": totals}) if args.json else f"Sent: {totals}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import binascii
+import json
+import re
+import struct
+
+from serial_link import MAX_LINE_BYTES
+
+# ============================================
+# FORMAT FRAME BINER (BIN1)
+# ============================================
+# | A5 5A | type u8 | seq u16 LE | len u16 LE | payload (len) | crc u16 LE |
+# CRC-16/CCITT (binascii.crc_hqx, init 0xFFFF) dihitung dari type s/d payload.
+# Byte 0xA5 tidak pernah mengawali karakter UTF-8, jadi frame dan baris teks
+# lama bisa bercampur di stream yang sama (fallback otomatis ke teks).
+SYNC = b"\xA5\x5A"
+HEADER = struct.Struct("<2sBHH")
+CRC = struct.Struct("<H")
+FRAME_OVERHEAD = HEADER.size + CRC.size
+MAX_PAYLOAD = 1024
+CRC_INIT = 0xFFFF
+
+# Negosiasi: ESP menulis "FRAMING: BIN1" di blok === HANDSHAKE ===, PC
+# membalas FRAMING_ACK:BIN1 lalu membaca link dengan FrameDecoder
+FRAMING_KEY = "FRAMING"
+FRAMING_BIN1 = "BIN1"
+FRAMING_ACK = f"FRAMING_ACK:{FRAMING_BIN1}"
+
+FRAME_EMERGENCY = 0x01         # tanpa payload
+FRAME_CANCEL = 0x02            # tanpa payload
+FRAME_ALARM = 0x03             # JSON {"command":"PLAY_ALARM",...}
+FRAME_STATUS = 0x04            # STATUS_PAYLOAD
+FRAME_COMMAND = 0x05           # teks CMD:... / PLAY_SOUND...
+FRAME_TEXT = 0x06              # baris teks bebas (info, handshake)
+FRAME_HEARTBEAT = 0x07         # tanpa payload, tidak diteruskan sebagai baris
+
+STATUS_PAYLOAD = struct.Struct("<bBI")   # rssi dBm, baterai %, uptime detik
+
+# Baris teks ESP tidak pernah berisi karakter kontrol; header frame selalu
+# berisi (byte type), jadi frame yang SYNC-nya rusak tidak lolos sebagai teks
+_CONTROL_BYTES = re.compile(rb"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def frame_supported(handshake_data):
+    """True jika handshake ESP menawarkan framing BIN1"""
+    offered = handshake_data.get(FRAMING_KEY, "")
+    return FRAMING_BIN1 in (item.strip().upper() for item in offered.split(","))
+
+
+# ============================================
+# ENCODER (REFERENSI UNTUK FIRMWARE / SIMULATOR)
+# ============================================
+def encode_frame(kind, seq, payload=b""):
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload too large ({len(payload)} > {MAX_PAYLOAD})")
+    body = HEADER.pack(SYNC, kind, seq & 0xFFFF, len(payload)) + payload
+    return body + CRC.pack(binascii.crc_hqx(body[2:], CRC_INIT))
+
+
+class FrameEncoder:
+    """Encoder dengan nomor urut otomatis (wrap 16 bit), seperti di firmware"""
+
+    def __init__(self, seq=0):
+        self.seq = seq
+
+    def frame(self, kind, payload=b""):
+        data = encode_frame(kind, self.seq, payload)
+        self.seq = (self.seq + 1) & 0xFFFF
+        return data
+
+    def emergency(self):
+        return self.frame(FRAME_EMERGENCY)
+
+    def cancel(self):
+        return self.frame(FRAME_CANCEL)
+
+    def alarm(self, **fields):
+        data = {"command": "PLAY_ALARM", **fields}
+        return self.frame(FRAME_ALARM, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    def status(self, rssi, battery, uptime):
+        return self.frame(FRAME_STATUS, STATUS_PAYLOAD.pack(rssi, battery, uptime))
+
+    def command(self, text):
+        return self.frame(FRAME_COMMAND, text.encode("utf-8"))
+
+    def text(self, line):
+        return self.frame(FRAME_TEXT, line.encode("utf-8"))
+
+    def heartbeat(self):
+        return self.frame(FRAME_HEARTBEAT)
+
+
+# ============================================
+# DECODER (FRAME + BARIS TEKS CAMPURAN)
+# ============================================
+def _status_line(payload):
+    rssi, battery, uptime = STATUS_PAYLOAD.unpack(payload)
+    return f"STATUS: RSSI={rssi}, BATTERY={battery}, UPTIME={uptime}"
+
+
+# Frame -> baris kanonik yang sudah dikenali classify_line (jalur alarm tidak berubah)
+_FIXED_LINES = {FRAME_EMERGENCY: "!ALARM_START!", FRAME_CANCEL: "!ALARM_STOP!"}
+_TEXT_FRAMES = (FRAME_ALARM, FRAME_COMMAND, FRAME_TEXT)
+
+
+class FrameDecoder:
+    """Pengganti LineFramer untuk link yang sudah negosiasi BIN1.
+
+    feed() mengembalikan list baris seperti LineFramer: frame biner
+    diterjemahkan ke baris kanonik (!ALARM_START!, STATUS: ..., JSON,
+    teks), baris teks biasa tetap diterima. Header dan CRC dibaca langsung
+    dari memoryview chunk (tanpa menyalin chunk ke buffer jika tidak ada
+    sisa frame sebelumnya). Frame dengan CRC salah dibuang lalu decoder
+    mencari SYNC berikutnya; celah / duplikat nomor urut dicatat. Pesan
+    error diambil lewat take_errors().
+    """
+
+    def __init__(self, previous=None, max_line=MAX_LINE_BYTES):
+        self._buf = bytearray()
+        self.max_line = max_line
+        self.expected_seq = None
+        self.errors = []
+        self.frames = 0
+        self.text_lines = 0
+        self.heartbeats = 0
+        self.corrupt = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.dropped = 0
+        if previous is not None:
+            # Sisa baris teks yang belum lengkap dari LineFramer sebelumnya
+            self._buf += previous.take_pending()
+
+    def feed(self, data):
+        if self._buf:
+            self._buf += data
+            source = self._buf
+        else:
+            source = data
+        lines = []
+        with memoryview(source) as view:
+            consumed = self._parse(source, view, lines)
+            rest = bytes(view[consumed:]) if consumed < len(source) else b""
+        if source is self._buf:
+            del self._buf[:consumed]
+        else:
+            self._buf += rest
+        if len(self._buf) > self.max_line + FRAME_OVERHEAD + MAX_PAYLOAD:
+            self.dropped += len(self._buf)
+            self._buf.clear()
+        return lines
+
+    def _parse(self, source, view, lines):
+        size = len(source)
+        pos = 0
+        while pos < size:
+            if source[pos] == 0xA5:
+                if size - pos < HEADER.size:
+                    return pos
+                sync, kind, seq, length = HEADER.unpack_from(view, pos)
+                if sync != SYNC or length > MAX_PAYLOAD:
+                    self.corrupt += 1
+                    pos = self._resync(source, pos + 1)
+                    continue
+                end = pos + HEADER.size + length + CRC.size
+                if end > size:
+                    return pos
+                (crc,) = CRC.unpack_from(view, end - CRC.size)
+                if binascii.crc_hqx(view[pos + 2:end - CRC.size], CRC_INIT) != crc:
+                    self.corrupt += 1
+                    self.errors.append(f"CRC mismatch (frame type 0x{kind:02X}, seq {seq}), frame dropped")
+                    pos = self._resync(source, pos + 1, report=False)
+                    continue
+                self._on_frame(kind, seq, view[pos + HEADER.size:end - CRC.size], lines)
+                pos = end
+                continue
+
+            # Baris teks: sampai newline, atau sampai SYNC jika muncul lebih dulu
+            newline = source.find(b"\n", pos)
+            sync_at = source.find(SYNC, pos, newline if newline >= 0 else size)
+            if sync_at >= 0:
+                self.dropped += sync_at - pos
+                pos = sync_at
+                continue
+            if newline < 0:
+                if size - pos > self.max_line:
+                    self.dropped += size - pos
+                    return size
+                return pos
+            line = None
+            if not _CONTROL_BYTES.search(source, pos, newline):
+                try:
+                    line = str(view[pos:newline], "utf-8").strip()
+                except UnicodeDecodeError:
+                    pass
+            if line is None:
+                # Bukan baris teks valid: kemungkinan frame yang SYNC-nya rusak
+                self.corrupt += 1
+                self.dropped += newline + 1 - pos
+                self.errors.append(f"Invalid bytes dropped ({newline + 1 - pos} B, not a text line)")
+                pos = newline + 1
+                continue
+            if line:
+                self.text_lines += 1
+                lines.append(line)
+            pos = newline + 1
+        return pos
+
+    def _resync(self, source, start, report=True):
+        found = source.find(SYNC, start)
+        end = found if found >= 0 else len(source)
+        # Byte terakhir bisa jadi awal SYNC berikutnya
+        if found < 0 and source[-1:] == SYNC[:1]:
+            end -= 1
+        self.dropped += end - start + 1
+        if report:
+            self.errors.append(f"Frame sync lost, {end - start + 1} B skipped")
+        return end
+
+    def _on_frame(self, kind, seq, payload, lines):
+        expected = self.expected_seq
+        if expected is not None and seq != expected:
+            if seq == (expected - 1) & 0xFFFF:
+                # Retransmit frame terakhir: sudah diproses
+                self.duplicates += 1
+                return
+            gap = (seq - expected) & 0xFFFF
+            self.lost += gap
+            self.errors.append(f"{gap} frame(s) lost before seq {seq}")
+        self.expected_seq = (seq + 1) & 0xFFFF
+        self.frames += 1
+
+        line = _FIXED_LINES.get(kind)
+        try:
+            if line is None:
+                if kind in _TEXT_FRAMES:
+                    line = str(payload, "utf-8", "replace").strip()
+                elif kind == FRAME_STATUS:
+                    line = _status_line(payload)
+                elif kind == FRAME_HEARTBEAT:
+                    self.heartbeats += 1
+                    return
+                else:
+                    self.errors.append(f"Unknown frame type 0x{kind:02X} (seq {seq})")
+                    return
+        except struct.error:
+            self.errors.append(f"Malformed payload in frame type 0x{kind:02X} (seq {seq})")
+            return
+        if line:
+            lines.append(line)
+
+    def take_errors(self):
+        errors, self.errors = self.errors, []
+        return errors
+
+    def reset_sequence(self):
+        """ESP reboot / handshake ulang: nomor urut mulai dari awal"""
+        self.expected_seq = None
+
+    def take_pending(self):
+        pending = bytes(self._buf)
+        self._buf.clear()
+        return pending
+
+    def reset(self):
+        self._buf.clear()
+        self.expected_seq = None
+
+    @property
+    def pending(self):
+        return len(self._buf)
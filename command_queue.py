@@ -0,0 +1,337 @@
+import heapq
+import itertools
+import threading
+import time
+
+# ============================================
+# KONFIGURASI ANTRIAN PERINTAH KE ESP
+# ============================================
+RETRANSMIT_S = 0.5             # Pesan kritis tanpa CMD_ACK dikirim ulang setelah ini
+MAX_ATTEMPTS = 5               # Kirim awal + retransmit sebelum menyerah
+QUEUE_LIMIT = 1024             # Pesan yang boleh menunggu; penuh = pesan prioritas terendah dibuang
+
+# Prioritas (kecil = lebih dulu): ack alarm mendahului obrolan status
+PRIORITY_CRITICAL = 0
+PRIORITY_CONTROL = 1
+PRIORITY_STATUS = 2
+
+CRITICAL_MESSAGES = frozenset({"ALARM_ACKNOWLEDGED", "ALARM_STOPPED_ACK", "HANDSHAKE_ACK"})
+CONTROL_MESSAGES = frozenset({"PC_CONTROLLER_READY", "TEST_ALARM_TRIGGERED", "PC_SHUTDOWN"})
+
+# Negosiasi: ESP menulis "CMD_SEQ: 1" di blok === HANDSHAKE ===, PC lalu
+# mengirim pesan kritis sebagai "<pesan> #<seq>" dan ESP membalas
+# "CMD_ACK:<seq>". ESP lama (tanpa CMD_SEQ) tetap menerima teks biasa.
+SEQ_KEY = "CMD_SEQ"
+CMD_ACK_PREFIX = "CMD_ACK:"
+
+
+def command_priority(message):
+    """Prioritas default satu pesan PC -> ESP"""
+    if message in CRITICAL_MESSAGES or message.startswith("FRAMING_ACK"):
+        return PRIORITY_CRITICAL
+    if message in CONTROL_MESSAGES:
+        return PRIORITY_CONTROL
+    return PRIORITY_STATUS
+
+
+def seq_supported(handshake_data):
+    """True jika handshake ESP menawarkan nomor urut + CMD_ACK"""
+    return handshake_data.get(SEQ_KEY, "").strip() not in ("", "0")
+
+
+def parse_cmd_ack(line):
+    """Nomor urut dari baris "CMD_ACK:<seq>", None jika bukan CMD_ACK"""
+    if not line.startswith(CMD_ACK_PREFIX):
+        return None
+    try:
+        return int(line[len(CMD_ACK_PREFIX):])
+    except ValueError:
+        return None
+
+
+class OutboundCommand:
+    """Satu pesan PC -> ESP di antrian (atau menunggu CMD_ACK)"""
+    __slots__ = ("message", "link", "key", "priority", "seq", "attempts", "deadline", "queued_ns", "sent_ns",
+                 "confirmed", "superseded")
+
+    def __init__(self, message, link, key, priority, seq=None):
+        self.message = message
+        self.link = link
+        self.key = key             # Port tujuan (None = koneksi single-link)
+        self.priority = priority
+        self.seq = seq             # Nomor urut jika link mendukung CMD_ACK
+        self.attempts = 0
+        self.deadline = None
+        self.queued_ns = time.perf_counter_ns()
+        self.sent_ns = None
+        self.confirmed = False
+        self.superseded = False    # Digantikan pesan sama yang lebih baru: tidak dikirim ulang
+
+    @property
+    def wire(self):
+        text = self.message if self.seq is None else f"{self.message} #{self.seq}"
+        return f"{text}\n".encode("utf-8")
+
+
+# ============================================
+# WRITER TUNGGAL + ANTRIAN PRIORITAS
+# ============================================
+class CommandQueue:
+    """Semua tulisan ke ESP lewat satu thread writer.
+
+    send() hanya memasukkan pesan ke heap prioritas lalu kembali, jadi
+    thread GUI/serial tidak pernah menunggu serial write (write_timeout
+    1 s). Pesan yang sama dengan pesan terakhir yang masih antri ke port
+    itu digabung (coalesce). Di link yang menawarkan CMD_SEQ, pesan kritis
+    membawa nomor urut dan dikirim ulang tiap `retransmit` detik sampai
+    CMD_ACK datang atau `max_attempts` habis (on_expired).
+
+    write(link, data) menulis ke port (dipanggil hanya dari thread writer),
+    on_sent(command) / on_error(command, error) / on_expired(command)
+    dipanggil dari thread writer untuk logging.
+    """
+
+    def __init__(self, write, on_sent=None, on_error=None, on_expired=None, on_retransmit=None,
+                 retransmit=RETRANSMIT_S, max_attempts=MAX_ATTEMPTS, limit=QUEUE_LIMIT):
+        self.write = write
+        self.on_sent = on_sent
+        self.on_error = on_error
+        self.on_expired = on_expired
+        self.on_retransmit = on_retransmit
+        self.retransmit = retransmit
+        self.max_attempts = max_attempts
+        self.limit = limit
+
+        self.sent = 0
+        self.coalesced = 0
+        self.shed = 0
+        self.retransmits = 0
+        self.confirmed = 0
+        self.expired = 0
+
+        self._heap = []
+        self._order = itertools.count()
+        self._seq = itertools.count(1)
+        self._queued = {}          # (key, message) -> command yang belum ditulis
+        self._last = {}            # key -> command terakhir yang di-antrikan
+        self._awaiting = {}        # (key, seq) -> command yang menunggu CMD_ACK
+        self._resending = {}       # (key, seq) -> command yang antri dikirim ulang
+        self._sequenced = set()    # key port yang mendukung CMD_SEQ
+        self._inflight = None      # Command yang sedang ditulis thread writer
+        self._writing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="esp-writer", daemon=True)
+        self._thread.start()
+
+    # ============================================
+    # API PEMANGGIL (TIDAK MEMBLOK)
+    # ============================================
+    def send(self, message, link=None, key=None, priority=None):
+        """Antrikan satu pesan; False jika digabung dengan pesan yang sudah antri"""
+        if priority is None:
+            priority = command_priority(message)
+        with self._cond:
+            if self._closed:
+                return False
+            # Hanya duplikat dari pesan terakhir yang antri ke port itu: urutan
+            # ACK -> STOPPED_ACK -> ACK tetap utuh
+            queued = self._queued.get((key, message))
+            if queued is not None and self._last.get(key) is queued:
+                self.coalesced += 1
+                if priority < queued.priority:
+                    queued.priority = priority
+                    heapq.heapify(self._heap)
+                return False
+
+            seq = None
+            if priority == PRIORITY_CRITICAL and key in self._sequenced:
+                seq = next(self._seq)
+                self._supersede(key, message)
+            command = OutboundCommand(message, link, key, priority, seq)
+
+            if len(self._heap) >= self.limit and not self._shed_one(priority):
+                self.shed += 1
+                return False
+            self._queued[key, message] = command
+            self._last[key] = command
+            heapq.heappush(self._heap, (priority, next(self._order), command))
+            self._cond.notify()
+            return True
+
+    def _supersede(self, key, message):
+        """Pesan sama yang masih menunggu CMD_ACK (atau antri/sedang dikirim ulang) digantikan yang baru"""
+        pending = [*self._awaiting.values(), *self._resending.values()]
+        if self._inflight is not None and self._inflight.seq is not None:
+            pending.append(self._inflight)
+        for command in pending:
+            if command.key == key and command.message == message:
+                command.superseded = True
+                self._awaiting.pop((key, command.seq), None)
+                # Entri heap-nya dilewati _run
+                self._resending.pop((key, command.seq), None)
+
+    def _shed_one(self, priority):
+        """Antrian penuh: buang satu pesan berprioritas lebih rendah"""
+        worst = max(self._heap)
+        if worst[0] <= priority:
+            return False
+        self._heap.remove(worst)
+        heapq.heapify(self._heap)
+        self._queued.pop((worst[2].key, worst[2].message), None)
+        self.shed += 1
+        return True
+
+    def confirm(self, key, seq):
+        """CMD_ACK:<seq> diterima dari port key; kembalikan command-nya (None jika tidak dikenal)"""
+        with self._cond:
+            command = self._awaiting.pop((key, seq), None)
+            if command is None:
+                # CMD_ACK telat: command sudah antri dikirim ulang, batalkan kirim ulangnya
+                command = self._resending.pop((key, seq), None)
+            if command is not None:
+                command.confirmed = True
+                self.confirmed += 1
+            return command
+
+    def enable_acks(self, key, enabled=True):
+        """Port key menawarkan CMD_SEQ (handshake)"""
+        with self._cond:
+            if enabled:
+                self._sequenced.add(key)
+            else:
+                self._sequenced.discard(key)
+
+    def forget(self, key):
+        """Port putus: buang pesan antri dan pesan yang menunggu CMD_ACK"""
+        with self._cond:
+            self._sequenced.discard(key)
+            self._heap = [item for item in self._heap if item[2].key != key]
+            heapq.heapify(self._heap)
+            self._last.pop(key, None)
+            for name in [name for name in self._queued if name[0] == key]:
+                del self._queued[name]
+            for name in [name for name in self._awaiting if name[0] == key]:
+                del self._awaiting[name]
+            for name in [name for name in self._resending if name[0] == key]:
+                del self._resending[name]
+
+    @property
+    def awaiting(self):
+        with self._cond:
+            return len(self._awaiting)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def flush(self, timeout=None):
+        """Tunggu sampai antrian kosong dan tidak ada write berjalan"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._heap and not self._writing, timeout)
+
+    def close(self, timeout=2):
+        """Tulis sisa antrian (tanpa retransmit lagi) lalu hentikan writer"""
+        with self._cond:
+            self._closed = True
+            self._awaiting.clear()
+            self._resending.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {"queued": len(self._heap), "awaiting_ack": len(self._awaiting), "sent": self.sent,
+                    "coalesced": self.coalesced, "shed": self.shed, "retransmits": self.retransmits,
+                    "confirmed": self.confirmed, "expired": self.expired}
+
+    # ============================================
+    # THREAD WRITER
+    # ============================================
+    def _run(self):
+        while True:
+            expired = []
+            command = None
+            with self._cond:
+                while True:
+                    expired += self._requeue_due()
+                    if self._heap or self._closed or expired:
+                        break
+                    self._cond.wait(self._next_deadline())
+                if self._heap:
+                    command = heapq.heappop(self._heap)[2]
+                    if self._queued.get((command.key, command.message)) is command:
+                        del self._queued[command.key, command.message]
+                    if command.seq is not None:
+                        self._resending.pop((command.key, command.seq), None)
+                    if command.confirmed or command.superseded:
+                        command = None     # CMD_ACK datang / pesan baru menggantikan sebelum kirim ulang
+                    else:
+                        self._inflight = command
+                        self._writing += 1
+                elif not expired:
+                    break              # Ditutup dan antrian kosong
+
+            for lost in expired:
+                if self.on_expired is not None:
+                    self.on_expired(lost)
+            if command is None:
+                continue
+            self._write(command)
+
+            with self._cond:
+                self._inflight = None
+                self._writing -= 1
+                self._cond.notify_all()
+
+    def _write(self, command):
+        name = (command.key, command.seq)
+        with self._cond:
+            # Didaftarkan sebelum write: CMD_ACK bisa datang sebelum write() kembali
+            if command.seq is not None and not self._closed and not command.superseded:
+                command.deadline = time.monotonic() + self.retransmit
+                self._awaiting[name] = command
+        try:
+            self.write(command.link, command.wire)
+        except Exception as e:
+            with self._cond:
+                if self._awaiting.get(name) is command:
+                    del self._awaiting[name]
+            if self.on_error is not None:
+                self.on_error(command, e)
+            return
+        command.sent_ns = time.perf_counter_ns()
+        command.attempts += 1
+        with self._cond:
+            self.sent += 1
+            if self._awaiting.get(name) is command:
+                command.deadline = time.monotonic() + self.retransmit
+        if command.attempts == 1:
+            if self.on_sent is not None:
+                self.on_sent(command)
+        elif self.on_retransmit is not None:
+            self.on_retransmit(command)
+
+    def _requeue_due(self):
+        """Pesan yang lewat deadline CMD_ACK: kirim ulang di depan, atau menyerah"""
+        if not self._awaiting:
+            return []
+        now = time.monotonic()
+        expired = []
+        for name, command in list(self._awaiting.items()):
+            if command.deadline > now:
+                continue
+            del self._awaiting[name]
+            if command.attempts >= self.max_attempts:
+                self.expired += 1
+                expired.append(command)
+            else:
+                self.retransmits += 1
+                self._resending[name] = command
+                heapq.heappush(self._heap, (PRIORITY_CRITICAL, next(self._order), command))
+        return expired
+
+    def _next_deadline(self):
+        if not self._awaiting:
+            return None
+        return max(0.0, min(c.deadline for c in self._awaiting.values()) - time.monotonic())
@@ -0,0 +1,378 @@
+import collections
+import functools
+import logging
+import logging.handlers
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from latency_metrics import LatencyMetrics
+
+# ============================================
+# KONFIGURASI PROFILING & MEMORI (OPT-IN)
+# ============================================
+PROFILE_ENV = "ALARM_PROFILE"  # ALARM_PROFILE=1 (atau =cpu) mengaktifkan profiling saat start
+PROFILE_MODES = ("full", "cpu")  # cpu: tanpa tracemalloc (overhead jauh lebih kecil)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+SAMPLE_INTERVAL_S = 0.01       # Sampling stack 100 Hz
+PROFILE_WINDOW_S = 300         # Satu file profil per jendela
+PROFILE_KEEP = 24              # File profil terlama dihapus (rotasi)
+MEMORY_INTERVAL_S = 300        # Snapshot tracemalloc + diff (0 = tanpa tracemalloc)
+MEMORY_FRAMES = 1              # Diff per baris cukup 1 frame; tiap frame tambahan memperlambat alokasi
+MEMORY_TOP = 15                # Baris diff yang ditulis per snapshot
+REPORT_NAME = "diagnostics.log"
+REPORT_MAX_BYTES = 5 * 1024 * 1024
+REPORT_BACKUPS = 5
+
+# Thread yang di-sample (prefix nama): GUI, serial, suara
+PROFILE_THREADS = ("MainThread", "serial-", "alarm-sound", "audio-")
+# Method controller yang diukur per panggilan
+TIMED_METHODS = ("process_serial_line", "handle_emergency_start", "log_message")
+
+_SELF_THREAD = "profiler"
+
+
+def profile_mode(environ=os.environ):
+    """Mode dari env ALARM_PROFILE: None (mati), "cpu" atau "full" (nilai lain)"""
+    value = environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    return "cpu" if value == "cpu" else "full"
+
+
+# ============================================
+# AKUMULASI STACK (FOLDED + PSTATS)
+# ============================================
+class StackSamples:
+    """Hitungan sample per stack, ditulis sebagai folded stack dan pstats.
+
+    Folded (thread;root;...;leaf count per baris) dibaca flamegraph.pl,
+    speedscope dan inferno. File .prof adalah dict marshal format pstats
+    (python -m pstats, snakeviz): tt = sample sebagai leaf, ct = sample di
+    mana fungsi ada di stack, dikali interval sampling.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counts = collections.Counter()   # (thread, (key root..leaf)) -> sample
+        self.total = 0
+        self.started = time.time()
+
+    def __len__(self):
+        return self.total
+
+    def add(self, thread, stack):
+        self.counts[thread, stack] += 1
+        self.total += 1
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for (thread, stack), count in sorted(self.counts.items()):
+                frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})"
+                                  for filename, line, name in stack)
+                f.write(f"{thread};{frames} {count}\n" if frames else f"{thread} {count}\n")
+
+    def pstats(self):
+        stats = {}
+        for (_, stack), count in self.counts.items():
+            seconds = count * self.interval
+            seen = set()
+            for depth, key in enumerate(stack):
+                cc, nc, tt, ct, callers = stats.get(key) or (0, 0, 0.0, 0.0, {})
+                if key not in seen:
+                    # Rekursi: cumulative dihitung sekali per stack
+                    cc, ct = cc + count, ct + seconds
+                    seen.add(key)
+                nc += count
+                if depth == len(stack) - 1:
+                    tt += seconds
+                if depth:
+                    edge = callers.get(stack[depth - 1], (0, 0, 0.0, 0.0))
+                    callers[stack[depth - 1]] = (edge[0] + count, edge[1] + count,
+                                                 edge[2] + (seconds if depth == len(stack) - 1 else 0.0),
+                                                 edge[3] + seconds)
+                stats[key] = (cc, nc, tt, ct, callers)
+        return stats
+
+    def write_pstats(self, path):
+        with open(path, "wb") as f:
+            marshal.dump(self.pstats(), f)
+
+    def top(self, limit=10):
+        """Fungsi dengan sample leaf terbanyak: list (thread, key, sample)"""
+        leaves = collections.Counter()
+        for (thread, stack), count in self.counts.items():
+            if stack:
+                leaves[thread, stack[-1]] += count
+        return [(thread, key, count) for (thread, key), count in leaves.most_common(limit)]
+
+
+# ============================================
+# PROFILER + PELACAK MEMORI
+# ============================================
+class Diagnostics:
+    """Instrumentasi opt-in untuk controller yang berjalan berminggu-minggu.
+
+    start() menjalankan satu thread "profiler" yang:
+      - tiap sample_interval membaca stack thread PROFILE_THREADS
+        (sys._current_frames, tanpa hook di thread yang di-sample),
+      - tiap window menulis logs/profile-<waktu>.folded + .prof
+        (PROFILE_KEEP pasang terakhir disimpan),
+      - tiap memory_interval mengambil snapshot tracemalloc dan menulis
+        pertumbuhan terbesar sejak snapshot sebelumnya dan sejak start,
+        ditambah nilai gauges ({nama: callable}), ke logs/diagnostics.log
+        (RotatingFileHandler).
+    instrument(obj) membungkus TIMED_METHODS di instance obj; durasi
+    per panggilan masuk self.timings (LatencyMetrics, ikut /metrics).
+    Saat mati tidak ada overhead sama sekali: tidak ada thread, wrapper
+    maupun tracemalloc.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, sample_interval=SAMPLE_INTERVAL_S, window=PROFILE_WINDOW_S,
+                 memory_interval=MEMORY_INTERVAL_S, threads=PROFILE_THREADS, keep=PROFILE_KEEP,
+                 gauges=None, on_error=None):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.window = window
+        self.memory_interval = memory_interval
+        self.threads = tuple(threads)
+        self.keep = keep
+        self.gauges = dict(gauges or {})
+        self.on_error = on_error
+        self.timings = LatencyMetrics("controller_function_duration",
+                                      "Wall time per call of profiled controller functions.", stages=TIMED_METHODS)
+        self.samples = None
+        self.tracing = False           # tracemalloc aktif untuk sesi ini
+        self.files = 0
+        self.snapshots = 0
+
+        self._labels = {}              # code object -> (filename, line, name)
+        self._wrapped = []             # (obj, nama method)
+        self._baseline = None
+        self._previous = None
+        self._own_tracemalloc = False
+        self._logger = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self._thread is not None
+
+    # ============================================
+    # START / STOP
+    # ============================================
+    def start(self, memory=True):
+        """Aktifkan profiling (memory=False: tanpa tracemalloc); False jika sudah aktif"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            os.makedirs(self.directory, exist_ok=True)
+            self._logger = self._open_report()
+            self.tracing = bool(memory and self.memory_interval)
+            if self.tracing:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(MEMORY_FRAMES)
+                    self._own_tracemalloc = True
+                self._baseline = self._previous = self._snapshot()
+            self.samples = StackSamples(self.sample_interval)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=_SELF_THREAD, daemon=True)
+            self._thread.start()
+            self._logger.info("profiling started: sampling %s every %.0f ms, window %g s, memory %s",
+                              ", ".join(self.threads), self.sample_interval * 1000, self.window,
+                              f"every {self.memory_interval:g} s" if self.tracing else "not traced")
+            return True
+
+    def stop(self):
+        """Matikan profiling: tulis jendela terakhir, lepas wrapper dan tracemalloc"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return False
+            self._stop.set()
+            thread.join(5)
+            self.uninstrument()
+            self._write_window()
+            self._memory_report()
+            self._logger.info("profiling stopped")
+            self._close_report()
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+                self._own_tracemalloc = False
+            self._baseline = self._previous = None
+            self.tracing = False
+            return True
+
+    def _open_report(self):
+        logger = logging.getLogger(f"{__name__}.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(os.path.join(self.directory, REPORT_NAME),
+                                                       maxBytes=REPORT_MAX_BYTES, backupCount=REPORT_BACKUPS,
+                                                       encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        return logger
+
+    def _close_report(self):
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            handler.close()
+
+    # ============================================
+    # TIMING PER FUNGSI
+    # ============================================
+    def instrument(self, obj, names=TIMED_METHODS):
+        """Bungkus method instance obj; durasi per panggilan -> self.timings"""
+        for name in names:
+            if name in vars(obj) or not callable(getattr(obj, name, None)):
+                continue
+            setattr(obj, name, self._timed(name, getattr(obj, name)))
+            self._wrapped.append((obj, name))
+
+    def uninstrument(self):
+        for obj, name in self._wrapped:
+            vars(obj).pop(name, None)
+        self._wrapped = []
+
+    def _timed(self, name, method):
+        record = self.timings.record
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            begin = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(name, threading.current_thread().name, time.perf_counter_ns() - begin)
+
+        return timed
+
+    # ============================================
+    # THREAD PROFILER
+    # ============================================
+    def _run(self):
+        names = {}
+        now = time.monotonic()
+        names_due = now
+        window_due = now + self.window
+        memory_due = now + self.memory_interval if self.tracing else float("inf")
+        while not self._stop.wait(self.sample_interval):
+            now = time.monotonic()
+            if now >= names_due:
+                # Nama thread di-refresh tiap detik, bukan tiap sample
+                names = {t.ident: t.name for t in threading.enumerate() if t.name.startswith(self.threads)}
+                names_due = now + 1.0
+            try:
+                self._sample(names)
+                if now >= window_due:
+                    self._write_window()
+                    window_due = now + self.window
+                if now >= memory_due:
+                    self._memory_report()
+                    memory_due = now + self.memory_interval
+            except Exception as e:
+                self._report(f"profiler error: {e}")
+
+    def _sample(self, names):
+        samples = self.samples
+        labels = self._labels
+        for ident, frame in sys._current_frames().items():
+            thread = names.get(ident)
+            if thread is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = labels.get(code)
+                if key is None:
+                    key = labels[code] = (code.co_filename, code.co_firstlineno, code.co_name)
+                stack.append(key)
+                frame = frame.f_back
+            stack.reverse()
+            samples.add(thread, tuple(stack))
+
+    def _write_window(self):
+        samples, self.samples = self.samples, StackSamples(self.sample_interval)
+        if samples is None or not samples.counts:
+            return
+        stamp = datetime.fromtimestamp(samples.started).strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.directory, f"profile-{stamp}")
+        try:
+            samples.write_folded(base + ".folded")
+            samples.write_pstats(base + ".prof")
+        except OSError as e:
+            self._report(f"cannot write profile: {e}")
+            return
+        self.files += 1
+        self._rotate()
+
+        self._logger.info("profile %s: %d samples over %.0f s", os.path.basename(base), len(samples),
+                          time.time() - samples.started)
+        for thread, (filename, line, name), count in samples.top():
+            self._logger.info("  %-18s %5.1f%%  %s (%s:%d)", thread, count * 100 / len(samples), name,
+                              os.path.basename(filename), line)
+        for line in self.timings.summary_lines():
+            self._logger.info("  timing %s", line)
+
+    def _rotate(self):
+        profiles = sorted(name for name in os.listdir(self.directory)
+                          if name.startswith("profile-") and name.endswith(".folded"))
+        for name in profiles[:-self.keep] if self.keep else []:
+            for suffix in (".folded", ".prof"):
+                try:
+                    os.remove(os.path.join(self.directory, name[:-len(".folded")] + suffix))
+                except OSError:
+                    pass
+
+    # ============================================
+    # PERTUMBUHAN MEMORI (TRACEMALLOC)
+    # ============================================
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),          # Buffer sample profiler sendiri
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _memory_report(self):
+        if self._previous is None:
+            return
+        snapshot = self._snapshot()
+        self.snapshots += 1
+        current, peak = tracemalloc.get_traced_memory()
+        self._logger.info("memory: %.1f MB traced (peak %.1f MB)", current / 1e6, peak / 1e6)
+        for name, gauge in self.gauges.items():
+            try:
+                self._logger.info("  gauge %s = %s", name, gauge())
+            except Exception as e:
+                self._logger.info("  gauge %s failed: %s", name, e)
+        for title, base in (("since last snapshot", self._previous), ("since profiling started", self._baseline)):
+            growth = [stat for stat in snapshot.compare_to(base, "lineno") if stat.size_diff > 0][:MEMORY_TOP]
+            if growth:
+                self._logger.info("  growth %s:", title)
+            for stat in growth:
+                frame = stat.traceback[0]
+                self._logger.info("    %+9.1f KB %+7d blocks  %s:%d", stat.size_diff / 1024, stat.count_diff,
+                                  frame.filename, frame.lineno)
+        self._previous = snapshot
+
+    def _report(self, message):
+        if self._logger is not None:
+            self._logger.info(message)
+        if self.on_error is not None:
+            self.on_error(message)
+
+    def stats(self):
+        samples = self.samples
+        return {"enabled": self.enabled, "tracing": self.tracing, "samples": len(samples) if samples is not None else 0,
+                "files": self.files, "snapshots": self.snapshots}
@@ -0,0 +1,402 @@
+import glob
+import json
+import mmap
+import os
+import threading
+import time
+
+# ============================================
+# KONFIGURASI EVENT STORE
+# ============================================
+EVENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "events")
+SEGMENT_BYTES = 64 * 1024 * 1024   # Segmen baru setelah ukuran ini (segmen lama tidak berubah lagi)
+BLOCK_RECORDS = 256                # Granularitas index sparse (record per blok)
+HISTORY_LIMIT = 500                # Event terbaru yang ditampilkan di "View Log"
+
+# Jenis event yang dicatat AlarmCore
+EVENT_HANDSHAKE = "handshake"
+EVENT_START = "start"
+EVENT_ACK = "ack"
+EVENT_STOP = "stop"
+
+
+class _Block:
+    """Satu entri index sparse: rentang byte + rentang waktu sekelompok record"""
+    __slots__ = ("segment", "offset", "end", "min_ts", "max_ts", "count")
+
+    def __init__(self, segment, offset, ts):
+        self.segment = segment
+        self.offset = offset
+        self.end = offset
+        self.min_ts = ts
+        self.max_ts = ts
+        self.count = 0
+
+
+def _segment_file(directory, number):
+    return os.path.join(directory, f"events-{number:06d}.log")
+
+
+def _index_file(directory, number):
+    return os.path.join(directory, f"events-{number:06d}.idx")
+
+
+def _encode(event):
+    return json.dumps(event, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+# ============================================
+# EVENT STORE APPEND-ONLY
+# ============================================
+class EventStore:
+    """Log event alarm di disk: JSON ringkas satu baris per record, append-only.
+
+    append() tidak memblok: record masuk antrian dan satu writer thread
+    menulis semua record yang menumpuk dalam satu write + satu fsync
+    (group commit), jadi durabilitas tidak menambah latensi per alarm.
+    flush() menunggu sampai record sebelumnya benar-benar di disk.
+
+    File dibagi per segmen (data/events/events-NNNNNN.log). Index sparse
+    per BLOCK_RECORDS record (offset + rentang waktu) dan per device_id
+    (daftar blok yang memuat device itu) membuat query rentang waktu atau
+    device hanya membaca blok yang relevan lewat mmap. Index disimpan di
+    .idx saat segmen penuh dan saat close(); saat start hanya bagian yang
+    belum ter-index yang di-scan, dan ekor record yang terpotong (crash
+    saat menulis) dibuang.
+
+    path=None berarti store nonaktif (benchmark/test): append diabaikan.
+    """
+
+    def __init__(self, path=EVENT_DIR, segment_bytes=SEGMENT_BYTES, block_records=BLOCK_RECORDS,
+                 fsync=True, on_error=None):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.block_records = block_records
+        self.fsync = fsync
+        self.on_error = on_error
+        self.error = None
+
+        self._pending = []
+        self._seq = 0              # Nomor record terakhir yang di-append
+        self._committed = 0        # Nomor record terakhir yang sudah di disk
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._blocks = []          # Index sparse waktu, urut sesuai posisi di file
+        self._devices = {}         # device_id -> [nomor blok]
+        self._lock = threading.Lock()
+        self._maps = {}            # segmen -> mmap (dipetakan ulang jika file bertambah)
+        self._map_lock = threading.Lock()
+
+        self._segment = 0
+        self._file = None
+        self._size = 0
+        self._ready = threading.Event()
+
+        if path is None:
+            self._ready.set()
+            self._thread = None
+        else:
+            # Buka + index segmen aktif di writer thread, startup tidak menunggu
+            self._thread = threading.Thread(target=self._run, name="event-store", daemon=True)
+            self._thread.start()
+
+    # ============================================
+    # API TULIS
+    # ============================================
+    def append(self, kind, device=None, ts=None, **fields):
+        """Antrikan satu event (tidak memblok); kembalikan nomor urutnya"""
+        if self.path is None:
+            return 0
+        event = {"ts": round(time.time() if ts is None else ts, 6), "kind": kind, "device": device}
+        event.update((key, value) for key, value in fields.items() if value is not None)
+        with self._cond:
+            if self._closed:
+                return 0
+            self._seq += 1
+            self._pending.append(event)
+            self._cond.notify()
+            return self._seq
+
+    def flush(self, timeout=None):
+        """Tunggu sampai semua event yang sudah di-append tersimpan (fsync)"""
+        with self._cond:
+            target = self._seq
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self, timeout=5):
+        """Tulis sisa antrian, simpan index segmen aktif, hentikan writer"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._map_lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+    # ============================================
+    # WRITER (GROUP COMMIT)
+    # ============================================
+    def _run(self):
+        try:
+            self._open()
+        except OSError as e:
+            self._fail(e)
+        finally:
+            self._ready.set()
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                # Semua yang menumpuk selama fsync sebelumnya ikut satu commit
+                batch, self._pending = self._pending, []
+                last = self._seq
+
+            if self._file is not None:
+                try:
+                    self._commit(batch)
+                except OSError as e:
+                    self._fail(e)
+
+            with self._cond:
+                self._committed = last
+                self._cond.notify_all()
+
+        if self._file is not None:
+            try:
+                # Index segmen aktif disimpan agar start berikutnya tidak scan ulang
+                self._write_index(self._segment)
+            except OSError:
+                pass
+            self._file.close()
+            self._file = None
+
+    def _fail(self, error):
+        self.error = error
+        if self.on_error:
+            self.on_error(error)
+
+    def _commit(self, batch):
+        lines = [_encode(event) for event in batch]
+        try:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except OSError:
+            # Buang tulisan parsial supaya offset index tetap benar
+            try:
+                self._file.truncate(self._size)
+            except OSError:
+                pass
+            raise
+
+        offset = self._size
+        with self._lock:
+            for event, line in zip(batch, lines):
+                self._index_record(self._segment, event, offset, len(line))
+                offset += len(line)
+        self._size = offset
+
+        if self._size >= self.segment_bytes:
+            self._write_index(self._segment)
+            self._file.close()
+            self._start_segment(self._segment + 1)
+
+    def _index_record(self, segment, event, offset, length):
+        """Tambahkan record ke index sparse (dipanggil dengan _lock dipegang)"""
+        ts = event.get("ts", 0)
+        blocks = self._blocks
+        block = blocks[-1] if blocks else None
+        if block is None or block.segment != segment or block.count >= self.block_records:
+            block = _Block(segment, offset, ts)
+            blocks.append(block)
+        block.end = offset + length
+        block.count += 1
+        if ts < block.min_ts:
+            block.min_ts = ts
+        if ts > block.max_ts:
+            block.max_ts = ts
+
+        device = event.get("device")
+        if device is not None:
+            ids = self._devices.setdefault(device, [])
+            number = len(blocks) - 1
+            if not ids or ids[-1] != number:
+                ids.append(number)
+
+    # ============================================
+    # BUKA / INDEX SEGMEN
+    # ============================================
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        numbers = sorted(int(os.path.basename(name)[7:13])
+                         for name in glob.glob(os.path.join(self.path, "events-[0-9]*.log")))
+        if not numbers:
+            self._start_segment(1)
+            return
+
+        for number in numbers[:-1]:
+            indexed = self._load_index(number)
+            if indexed != os.path.getsize(_segment_file(self.path, number)):
+                self._scan_segment(number, indexed)
+                self._write_index(number)
+
+        # Segmen aktif: index dari close() terakhir, lalu scan sisa yang ditulis sesudahnya
+        last = numbers[-1]
+        self._size = self._scan_segment(last, self._load_index(last), repair=True)
+        self._segment = last
+        self._file = open(_segment_file(self.path, last), "ab")
+
+    def _start_segment(self, number):
+        self._segment = number
+        self._size = 0
+        self._file = open(_segment_file(self.path, number), "ab")
+
+    def _scan_segment(self, number, start=0, repair=False):
+        """Index record mulai offset start; repair=True memotong ekor yang tidak lengkap"""
+        path = _segment_file(self.path, number)
+        size = os.path.getsize(path)
+        if size <= start:
+            return start
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = start
+            with self._lock:
+                while pos < size:
+                    newline = data.find(b"\n", pos)
+                    if newline < 0:
+                        break
+                    try:
+                        event = json.loads(data[pos:newline])
+                    except ValueError:
+                        event = None
+                    if isinstance(event, dict):
+                        self._index_record(number, event, pos, newline + 1 - pos)
+                    pos = newline + 1
+        if pos < size and repair:
+            with open(path, "r+b") as f:
+                f.truncate(pos)
+        return pos
+
+    def _load_index(self, number):
+        """Muat .idx segmen; kembalikan jumlah byte yang sudah ter-index (0 jika tidak ada)"""
+        try:
+            with open(_index_file(self.path, number), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            size = data["size"]
+            if size > os.path.getsize(_segment_file(self.path, number)):
+                # File lebih pendek dari index (ekor dipotong): index tidak bisa dipakai
+                return 0
+            blocks = []
+            for offset, end, min_ts, max_ts, count in data["blocks"]:
+                block = _Block(number, offset, min_ts)
+                block.end, block.max_ts, block.count = end, max_ts, count
+                blocks.append(block)
+            devices = {device: [int(i) for i in ids] for device, ids in data["devices"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+        with self._lock:
+            base = len(self._blocks)
+            self._blocks.extend(blocks)
+            for device, ids in devices.items():
+                self._devices.setdefault(device, []).extend(base + i for i in ids)
+        return size
+
+    def _write_index(self, number):
+        with self._lock:
+            numbers = [i for i, block in enumerate(self._blocks) if block.segment == number]
+            if not numbers:
+                return
+            base = numbers[0]
+            blocks = [[b.offset, b.end, b.min_ts, b.max_ts, b.count]
+                      for b in self._blocks[base:numbers[-1] + 1]]
+            devices = {}
+            for device, ids in self._devices.items():
+                local = [i - base for i in ids if base <= i <= numbers[-1]]
+                if local:
+                    devices[device] = local
+            size = blocks[-1][1]
+        path = _index_file(self.path, number)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"size": size, "blocks": blocks, "devices": devices}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    # ============================================
+    # API BACA
+    # ============================================
+    @property
+    def count(self):
+        with self._lock:
+            return sum(block.count for block in self._blocks)
+
+    def devices(self):
+        with self._lock:
+            return sorted(self._devices)
+
+    def query(self, start=None, end=None, device=None, kinds=None, limit=None, newest_first=False):
+        """Event dalam rentang waktu [start, end] (epoch detik), opsional per device/jenis.
+
+        Hanya blok index yang rentang waktunya (dan device-nya) cocok yang
+        dibaca dari mmap; hasil urut sesuai urutan tulis, atau terbaru dulu.
+        """
+        if not self._ready.wait(5):
+            return []
+        low = float("-inf") if start is None else start
+        high = float("inf") if end is None else end
+
+        with self._lock:
+            if device is not None:
+                numbers = self._devices.get(device, ())
+            else:
+                numbers = range(len(self._blocks))
+            spans = [(b.segment, b.offset, b.end) for b in map(self._blocks.__getitem__, numbers)
+                     if b.max_ts >= low and b.min_ts <= high]
+        if newest_first:
+            spans.reverse()
+
+        kinds = set(kinds) if kinds else None
+        # Blok berisi banyak device: baris device lain dilewati tanpa json.loads
+        needle = _encode({"device": device})[1:-2] if device is not None else None
+        results = []
+        for segment, offset, stop in spans:
+            events = []
+            for line in self._read(segment, offset, stop).splitlines():
+                if needle is not None and needle not in line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if not low <= event.get("ts", 0) <= high:
+                    continue
+                if device is not None and event.get("device") != device:
+                    continue
+                if kinds is not None and event.get("kind") not in kinds:
+                    continue
+                events.append(event)
+            if newest_first:
+                events.reverse()
+            results.extend(events)
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+    def recent(self, limit=HISTORY_LIMIT, device=None):
+        """Event terbaru (terbaru dulu), untuk jendela history"""
+        return self.query(device=device, limit=limit, newest_first=True)
+
+    def _read(self, segment, offset, end):
+        with self._map_lock:
+            mapped = self._maps.get(segment)
+            if mapped is None or len(mapped) < end:
+                # Segmen aktif bertambah: petakan ulang sampai ukuran terbaru
+                with open(_segment_file(self.path, segment), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapped
+            return mapped[offset:end]
@@ -0,0 +1,207 @@
+import threading
+import time
+
+# ============================================
+# HISTOGRAM LATENSI (HDR-STYLE, LOG-LINEAR)
+# ============================================
+SUB_BUCKET_BITS = 4            # Nilai < 16 tepat, di atasnya 8 sub-bucket per pangkat dua (~12.5% presisi)
+MAX_VALUE_BITS = 40            # Nilai maksimal ~12 hari dalam mikrodetik
+METRICS_PORT = 9108
+METRICS_HOST = "127.0.0.1"     # Hanya lokal; "0.0.0.0" membuka ID device + latensi ke LAN
+
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+_BUCKETS = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 2) * _HALF
+
+# Tahap yang diukur, semuanya dihitung dari byte diterima (rx)
+STAGES = ("framed", "classified", "ack", "sound")
+
+
+def _bucket_index(value):
+    if value < (1 << SUB_BUCKET_BITS):
+        return value
+    exp = value.bit_length() - SUB_BUCKET_BITS
+    return exp * _HALF + (value >> exp)
+
+
+def _bucket_upper(index):
+    if index < (1 << SUB_BUCKET_BITS):
+        return index
+    exp = index // _HALF - 1
+    mantissa = index - exp * _HALF
+    return ((mantissa + 1) << exp) - 1
+
+
+class LatencyHistogram:
+    """Histogram mikrodetik dengan bucket log-linear; record O(1), memori tetap"""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, micros):
+        if micros < 0:
+            micros = 0
+        index = _bucket_index(micros)
+        if index >= _BUCKETS:
+            index = _BUCKETS - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other):
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Nilai (mikrodetik, batas atas bucket) pada kuantil q (0..1)"""
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(_bucket_upper(index), self.max)
+        return self.max
+
+
+# ============================================
+# TRACE PER ALARM & REGISTRY METRIK
+# ============================================
+class AlarmTrace:
+    """Timestamp monotonic (ns) tiap tahap untuk satu alarm"""
+    __slots__ = ("rx", "framed", "classified", "ack", "sound", "device")
+
+    def __init__(self, rx, framed, classified):
+        self.rx = rx
+        self.framed = framed
+        self.classified = classified
+        self.ack = None
+        self.sound = None
+        self.device = None
+
+
+class LatencyMetrics:
+    """Histogram per (tahap, device) + export Prometheus dan ringkasan log.
+
+    name/help menentukan nama metrik Prometheus (<name>_seconds), stages
+    adalah tahap yang masuk ringkasan log.
+    """
+
+    def __init__(self, name="alarm_latency",
+                 help="Latency from serial bytes received to each alarm stage.", stages=STAGES):
+        self.name = name
+        self.help = help
+        self.stages = stages
+        self._hists = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, stage, device, nanos):
+        micros = nanos // 1000
+        key = (stage, device)
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = LatencyHistogram()
+            hist.record(micros)
+
+    def record_trace(self, trace, *stages):
+        """Catat tahap-tahap trace yang sudah terisi, relatif ke rx"""
+        device = trace.device or "unknown"
+        for stage in stages:
+            stamp = getattr(trace, stage)
+            if stamp is not None:
+                self.record(stage, device, stamp - trace.rx)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: hist for key, hist in self._hists.items()}
+
+    def merged(self, stage):
+        """Histogram gabungan semua device untuk satu tahap"""
+        total = LatencyHistogram()
+        for (name, _), hist in self.snapshot().items():
+            if name == stage:
+                total.merge(hist)
+        return total
+
+    def render_prometheus(self):
+        """Format teks exposition Prometheus (summary + max)"""
+        name = self.name
+        lines = [
+            f"# HELP {name}_seconds {self.help}",
+            f"# TYPE {name}_seconds summary",
+        ]
+        max_lines = [
+            f"# HELP {name}_max_seconds Maximum observed latency per stage and device.",
+            f"# TYPE {name}_max_seconds gauge",
+        ]
+        for (stage, device), hist in sorted(self.snapshot().items()):
+            labels = f'stage="{stage}",device="{_escape(device)}"'
+            for q in (0.5, 0.9, 0.99):
+                lines.append(f'{name}_seconds{{{labels},quantile="{q}"}} {hist.percentile(q) / 1e6:.6f}')
+            lines.append(f"{name}_seconds_sum{{{labels}}} {hist.total / 1e6:.6f}")
+            lines.append(f"{name}_seconds_count{{{labels}}} {hist.count}")
+            max_lines.append(f"{name}_max_seconds{{{labels}}} {hist.max / 1e6:.6f}")
+        return "\n".join(lines + max_lines) + "\n"
+
+    def summary_lines(self):
+        """Ringkasan p50/p99/max per tahap (gabungan semua device)"""
+        result = []
+        for stage in self.stages:
+            hist = self.merged(stage)
+            if hist.count:
+                result.append(
+                    f"{stage:<10} n={hist.count:<6} p50={hist.percentile(0.5) / 1000:.2f} ms "
+                    f"p99={hist.percentile(0.99) / 1000:.2f} ms max={hist.max / 1000:.2f} ms"
+                )
+        return result
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ============================================
+# ENDPOINT /metrics
+# ============================================
+def start_metrics_server(metrics, port=METRICS_PORT, host=METRICS_HOST):
+    """Jalankan HTTP server /metrics di thread daemon, kembalikan server-nya.
+
+    metrics boleh satu LatencyMetrics atau list beberapa registry.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registries = list(metrics) if isinstance(metrics, (list, tuple)) else [metrics]
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = "".join(m.render_prometheus() for m in registries).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
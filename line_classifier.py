@@ -0,0 +1,83 @@
+import json
+
+# ============================================
+# KLASIFIKASI BARIS SERIAL
+# ============================================
+# Jenis pesan, urut sesuai prioritas di process_serial_line
+KIND_EMERGENCY = "emergency"      # !ALARM_START! / "EMERGENCY"
+KIND_JSON_ALARM = "json_alarm"    # {"command":"PLAY_ALARM",...}
+KIND_CANCEL = "cancel"            # !ALARM_STOP! / CANCEL / STOP
+KIND_COMMAND = "command"          # CMD:... / PLAY_SOUND...
+KIND_STATUS = "status"            # STATUS:...
+KIND_INFO = "info"                # Baris info dengan emoji, cukup di-log
+KIND_AUTO = "auto"                # Kata kunci emergency lain
+KIND_UNKNOWN = None
+
+INFO_EMOJIS = ("✅", "🚨", "🔘", "📤", "🤝")
+EMERGENCY_KEYWORDS = ("BUTTON PRESSED", "EMERGENCY BUTTON", "ALARM", "TRIGGER")
+COMMAND_PREFIXES = ("CMD:", "PLAY_SOUND")
+
+_EXACT = {
+    "!ALARM_START!": KIND_EMERGENCY,
+    "!ALARM_STOP!": KIND_CANCEL,
+}
+
+
+def classify_line(line):
+    """Klasifikasi satu baris dengan urutan cek yang sama seperti rantai lama.
+
+    Ini tetap rantai cek `in` per kata kunci, bukan automaton satu pass:
+    yang dihemat adalah upper() sekali per baris (bukan per cek), lookup
+    dict untuk baris kanonik, dan json.loads hanya jika baris bisa berisi
+    PLAY_ALARM. Scanner regex gabungan (automaton kata kunci) sudah
+    dicoba dan di CPython lebih lambat dari beberapa cek substring di C.
+
+    Mengembalikan (kind, data) dengan prioritas yang sama seperti rantai cek
+    lama: emergency > JSON > cancel > CMD > STATUS > info > auto-detect.
+    data berisi dict hasil JSON untuk KIND_JSON_ALARM, payload setelah
+    "STATUS:" untuk KIND_STATUS, {"message": line} untuk KIND_AUTO, selain
+    itu None.
+    """
+    exact = _EXACT.get(line)
+    if exact is not None:
+        return exact, None
+
+    # upper() cukup sekali, semua cek kata kunci memakai salinan yang sama
+    upper = line.upper()
+
+    # 1. Emergency Alarm (Format sederhana)
+    if "EMERGENCY" in upper:
+        return KIND_EMERGENCY, None
+
+    # 2. Emergency Alarm (JSON format), hanya di-parse jika bisa berisi PLAY_ALARM
+    #    (nilai literal atau di-escape dengan backslash)
+    if line[:1] == '{' and line[-1:] == '}' and ("PLAY_ALARM" in line or "\\" in line):
+        try:
+            data = json.loads(line)
+            if data.get("command") == "PLAY_ALARM":
+                return KIND_JSON_ALARM, data
+        except json.JSONDecodeError:
+            pass
+
+    # 3. Cancel Alarm
+    if "CANCEL" in upper or "STOP" in upper:
+        return KIND_CANCEL, None
+
+    # 4. Custom Command
+    if line.startswith(COMMAND_PREFIXES):
+        return KIND_COMMAND, None
+
+    # 5. Status Update
+    if line.startswith("STATUS:"):
+        return KIND_STATUS, line[7:].strip()
+
+    # 6. Info messages
+    for emoji in INFO_EMOJIS:
+        if emoji in line:
+            return KIND_INFO, None
+
+    # 7. Kata kunci emergency lain ("EMERGENCY BUTTON" sudah tertangkap di cek 1)
+    if "ALARM" in upper or "BUTTON PRESSED" in upper or "TRIGGER" in upper:
+        return KIND_AUTO, {"message": line}
+
+    return KIND_UNKNOWN, None
@@ -0,0 +1,238 @@
+import os
+import random
+import select
+import sys
+import threading
+import time
+
+from port_discovery import candidate_ports
+
+# ============================================
+# KONFIGURASI RECONNECT
+# ============================================
+RECONNECT_BASE_S = 0.5         # Jeda retry pertama
+RECONNECT_CAP_S = 30.0         # Jeda retry maksimal
+HOTPLUG_POLL_S = 1.0           # Interval rescan port (polling / cadangan inotify)
+HOTPLUG_DIRS = ("/dev",)       # Direktori yang dipantau inotify di Linux
+
+
+class Backoff:
+    """Exponential backoff dengan jitter: setengah jeda tetap + setengah acak.
+
+    Jitter mencegah banyak PC (atau banyak port) mencoba ulang serentak
+    setelah gangguan yang sama, tanpa membuat jeda terlalu pendek.
+    """
+
+    def __init__(self, base=RECONNECT_BASE_S, cap=RECONNECT_CAP_S, rng=random.random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.attempt = 0
+
+    def next(self):
+        ceiling = min(self.cap, self.base * (1 << min(self.attempt, 30)))
+        self.attempt += 1
+        return ceiling / 2 + self.rng() * ceiling / 2
+
+    def reset(self):
+        self.attempt = 0
+
+
+# ============================================
+# DETEKSI HOT-PLUG
+# ============================================
+class Inotify:
+    """inotify Linux lewat ctypes (tanpa dependensi); hanya pemicu rescan port / baca ulang log"""
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, paths, mask=MASK):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        for path in paths:
+            if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, f"inotify_add_watch failed for {path}")
+        self.fd = fd
+
+    def wait(self, timeout):
+        """True jika ada event (event dibuang, pemanggil cukup rescan)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PortWatcher:
+    """Memanggil on_change(added, removed) saat daftar port serial berubah.
+
+    Linux: inotify pada HOTPLUG_DIRS membangunkan rescan seketika (rescan
+    periodik tetap jalan sebagai cadangan). Platform lain: polling
+    list_ports() setiap poll_interval.
+    """
+
+    def __init__(self, on_change, list_ports=candidate_ports, watch_dirs=HOTPLUG_DIRS,
+                 poll_interval=HOTPLUG_POLL_S, use_inotify=True):
+        self.on_change = on_change
+        self.list_ports = list_ports
+        self.watch_dirs = watch_dirs
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="port-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        notifier = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                notifier = Inotify(self.watch_dirs)
+            except (OSError, AttributeError):
+                notifier = None
+        self.mode = "inotify" if notifier else "poll"
+
+        known = set(self.list_ports())
+        try:
+            while not self._stop.is_set():
+                if notifier:
+                    notifier.wait(self.poll_interval)
+                else:
+                    self._stop.wait(self.poll_interval)
+
+                current = set(self.list_ports())
+                if current != known:
+                    added, removed = current - known, known - current
+                    known = current
+                    self.on_change(added, removed)
+        finally:
+            if notifier:
+                notifier.close()
+
+
+# ============================================
+# SUPERVISOR RECONNECT
+# ============================================
+class LinkSupervisor:
+    """Thread yang menjaga koneksi serial tetap hidup.
+
+    Dibangunkan oleh link putus, port baru/hilang (PortWatcher) atau tombol
+    Reconnect; selama core masih butuh koneksi, connect_serial dicoba ulang
+    dengan Backoff. Waktu dari link putus sampai listening lagi dicatat ke
+    core.recovery_metrics. Semua berjalan di thread sendiri, GUI hanya
+    menerima update lewat run_on_ui.
+    """
+
+    def __init__(self, core, backoff=None, watcher=None):
+        self.core = core
+        self.backoff = backoff or Backoff()
+        self.watcher = watcher if watcher is not None else PortWatcher(
+            self.on_ports_changed, core.find_serial_ports)
+        self.lost_at = {}          # port -> perf_counter_ns saat link putus
+        self.attempts = 0
+        self._force = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="link-supervisor", daemon=True)
+            self._thread.start()
+            self.watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.watcher.stop()
+
+    def kick(self, force=False):
+        """Coba connect sekarang (Reconnect manual / hot-plug), backoff di-reset.
+
+        force=True menjalankan connect_serial walaupun masih terhubung.
+        """
+        self._force = self._force or force
+        self.backoff.reset()
+        self._wake.set()
+
+    def link_lost(self, port):
+        """Dipanggil listener/multiplexer saat port error atau hilang"""
+        with self._lock:
+            self.lost_at.setdefault(port, time.perf_counter_ns())
+        self._wake.set()
+
+    def on_ports_changed(self, added, removed):
+        if added:
+            self.core.log_message(f"🔌 Serial port added: {', '.join(sorted(added))}", "blue")
+        if removed:
+            self.core.log_message(f"🔌 Serial port removed: {', '.join(sorted(removed))}", "orange")
+            self.core.on_ports_removed(removed)
+        if added:
+            self.kick()
+
+    def _run(self):
+        delay = 0
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            force, self._force = self._force, False
+            if not (force or self.core.needs_connection()):
+                delay = None
+                continue
+
+            self.attempts += 1
+            self.core.connect_serial()
+
+            if not self.core.needs_connection():
+                self.backoff.reset()
+                self._record_recovery()
+                delay = None
+            else:
+                delay = self.backoff.next()
+                self.core.log_message(f"🔁 Reconnect attempt {self.backoff.attempt} failed, "
+                                      f"retrying in {delay:.1f} s", "orange")
+
+    def _record_recovery(self):
+        now = time.perf_counter_ns()
+        connected = self.core.connected_ports()
+        with self._lock:
+            if self.core.multi_link:
+                recovered = [(port, port) for port in list(self.lost_at) if port in connected]
+            else:
+                # Single-link: port bisa berganti nama setelah dicabut (ttyUSB0 -> ttyUSB1)
+                current = next(iter(connected), None)
+                recovered = [(port, current) for port in list(self.lost_at)]
+            stamps = [(self.lost_at.pop(port), device) for port, device in recovered]
+
+        for lost, device in stamps:
+            self.core.recovery_metrics.record("recover", device, now - lost)
+            self.core.log_message(f"♻ Serial link {device} recovered in {(now - lost) / 1e6:.0f} ms", "green")
@@ -0,0 +1,176 @@
+import collections
+import sys
+
+# ============================================
+# RING BUFFER LOG (KAPASITAS TETAP)
+# ============================================
+LOG_CAPACITY = 10000           # Baris log yang disimpan di memori
+
+
+class LogRing:
+    """Ring buffer berbasis list dengan kapasitas tetap.
+
+    append/evict O(1) dan akses per index O(1), sehingga view hanya perlu
+    mengambil baris yang terlihat. Setiap baris punya nomor urut absolut
+    (first_seq .. total-1) supaya posisi scroll tetap stabil saat baris lama
+    terbuang.
+    """
+    __slots__ = ("capacity", "_items", "_start", "_count", "total")
+
+    def __init__(self, capacity=LOG_CAPACITY):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self.total = 0
+
+    def append(self, item):
+        capacity = self.capacity
+        if self._count < capacity:
+            self._items[(self._start + self._count) % capacity] = item
+            self._count += 1
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % capacity
+        self.total += 1
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("log ring index out of range")
+        return self._items[(self._start + index) % self.capacity]
+
+    def slice(self, start, stop):
+        """Ambil baris [start, stop) relatif terhadap baris tertua"""
+        start = max(0, start)
+        stop = min(self._count, stop)
+        items = self._items
+        capacity = self.capacity
+        base = self._start
+        return [items[(base + i) % capacity] for i in range(start, stop)]
+
+    @property
+    def first_seq(self):
+        """Nomor urut absolut baris tertua yang masih tersimpan"""
+        return self.total - self._count
+
+    def clear(self):
+        self._items = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+
+# ============================================
+# PIPELINE LOG: THREAD MANAPUN -> TK MAIN LOOP
+# ============================================
+LOG_FLUSH_HZ = 30              # Maksimal flush ke widget per detik
+LOG_MAX_BATCH = 2000           # Baris maksimal per flush agar frame tetap pendek
+LOG_MAX_PENDING = 50000        # Antrian maksimal; saat penuh baris tertua dibuang dan dihitung
+
+
+class LogPipeline:
+    """Antrian log dari thread serial/GUI ke ring buffer dan view di main loop Tk.
+
+    push() boleh dipanggil dari thread manapun: hanya deque.append yang
+    atomic, tanpa lock dan tanpa menyentuh Tk. Drain dijadwalkan dengan
+    root.after dan memindahkan satu batch per frame (maksimal LOG_FLUSH_HZ)
+    ke LogRing, lalu setiap view dirender ulang sekali per batch. Echo ke
+    console juga satu write per batch.
+
+    Antrian dibatasi max_pending (deque maxlen): jika main loop macet, baris
+    tertua dibuang dan flush berikutnya menulis satu peringatan jumlahnya.
+    """
+
+    def __init__(self, root, ring, rate_hz=LOG_FLUSH_HZ, max_batch=LOG_MAX_BATCH, echo=True,
+                 max_pending=LOG_MAX_PENDING):
+        self.root = root
+        self.ring = ring
+        self.views = []
+        self.interval_ms = max(1, int(1000 / rate_hz))
+        self.max_batch = max_batch
+        self.echo = echo
+        self.max_pending = max_pending
+        self.dropped = 0               # Baris yang dibuang karena antrian penuh (perkiraan antar thread)
+        self._reported = 0
+        self._queue = collections.deque(maxlen=max_pending)
+        self._after_id = None
+
+    def push(self, line, color="black"):
+        """Masukkan satu baris log (thread-safe)"""
+        queue = self._queue
+        if len(queue) >= self.max_pending:
+            self.dropped += 1
+        queue.append((line, color))
+
+    def add_view(self, view):
+        self.views.append(view)
+        view.refresh()
+
+    def remove_view(self, view):
+        if view in self.views:
+            self.views.remove(view)
+
+    def refresh_views(self):
+        for view in self.views:
+            view.refresh()
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def flush(self):
+        """Tulis semua yang mengantri sekarang (dipanggil di main thread)"""
+        while self._queue:
+            self._write(self._take())
+
+    @property
+    def backlog(self):
+        return len(self._queue)
+
+    def _take(self):
+        queue = self._queue
+        batch = []
+        dropped = self.dropped
+        if dropped != self._reported:
+            batch.append((f"⚠ {dropped - self._reported} log lines dropped (GUI log backlog full)", "orange"))
+            self._reported = dropped
+        for _ in range(min(len(queue), self.max_batch)):
+            batch.append(queue.popleft())
+        return batch
+
+    def _drain(self):
+        try:
+            if self._queue:
+                self._write(self._take())
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _write(self, batch):
+        if not batch:
+            return
+
+        self.ring.extend(batch)
+        self.refresh_views()
+
+        if self.echo:
+            try:
+                sys.stdout.write("".join(line + "\n" for line, _ in batch))
+                sys.stdout.flush()
+            except (OSError, ValueError):
+                pass
@@ -0,0 +1,402 @@
+import mmap
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from link_supervisor import Inotify
+
+# ============================================
+# KONFIGURASI LOG SERVER
+# ============================================
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+SYSTEM_LOG = os.path.join(LOG_DIR, "system.log")           # Semua level
+ALARM_LOG = os.path.join(LOG_DIR, "alarm-history.log")     # Hanya [ALARM]
+ERROR_LOG = os.path.join(LOG_DIR, "errors.log")            # Hanya [ERROR]
+TAIL_POLL_S = 1.0              # Interval cek file (polling / cadangan inotify)
+READ_BLOCK = 1 << 20           # Byte per blok baca (mmap / read), memori tetap per file
+
+# [2025-12-25T03:53:36.932Z] [ALARM] pesan; baris tanpa header = lanjutan pesan sebelumnya
+_HEADER = re.compile(r"\[([0-9][0-9T:.+\-]*Z?)\] \[([A-Z]+)\] ?([^\r]*)")
+
+
+class LogRecord(namedtuple("LogRecord", "timestamp level message file")):
+    """Satu entri log: timestamp ISO, level, pesan (bisa multi-baris) dan nama file.
+
+    Tuple (dibuat lewat tuple.__new__ tanpa __init__ Python) karena dibuat
+    sekali per baris: jauh lebih murah daripada objek biasa.
+    """
+    __slots__ = ()
+
+    @property
+    def time(self):
+        """Epoch detik; timestamp hanya di-parse jika dibutuhkan, bukan per baris"""
+        try:
+            return datetime.fromisoformat(self.timestamp.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return 0.0
+
+
+_new_record = tuple.__new__
+
+
+class _RecordParser:
+    """Chunk byte -> LogRecord lengkap; sisa baris dan entri multi-baris dibawa ke chunk berikutnya"""
+
+    def __init__(self, name=None):
+        self.name = name
+        self._tail = b""
+        self._pending = None       # Entri terakhir, mungkin masih mendapat baris lanjutan
+        self.orphans = 0           # Baris tanpa header sebelum entri pertama
+
+    def feed(self, data):
+        if self._tail:
+            data = self._tail + data
+        end = data.rfind(b"\n") + 1
+        self._tail = data[end:]
+        if not end:
+            return []
+
+        records = []
+        append = records.append
+        pending = self._pending
+        match = _HEADER.match
+        name = self.name
+        for line in data[:end - 1].decode("utf-8", "replace").split("\n"):
+            header = match(line)
+            if header is not None:
+                if pending is not None:
+                    append(pending)
+                pending = _new_record(LogRecord, (*header.groups(), name))
+            elif pending is not None:
+                # Baris lanjutan (banner, stack trace): jarang, boleh membuat tuple baru
+                pending = pending._replace(message=f"{pending.message}\n{line}")
+            else:
+                self.orphans += 1
+        self._pending = pending
+        return records
+
+    def flush(self):
+        """Entri terakhir dianggap selesai (akhir file / file diam)"""
+        if self._tail:
+            self.feed(b"\n")
+        pending, self._pending = self._pending, None
+        return [pending] if pending is not None else []
+
+    def reset(self):
+        self._tail = b""
+        self._pending = None
+
+    @property
+    def partial(self):
+        """True jika ada baris yang belum lengkap (write masih berjalan)"""
+        return bool(self._tail)
+
+
+# ============================================
+# FILE HISTORIS (MMAP, MEMORI KONSTAN)
+# ============================================
+def read_records(path, start=0, block=READ_BLOCK):
+    """Generator LogRecord dari file historis berapapun ukurannya.
+
+    File di-mmap dan diproses per blok `block` byte: memori yang dipakai
+    hanya satu blok + satu entri, halaman yang sudah lewat boleh dibuang
+    kernel (MADV_SEQUENTIAL).
+    """
+    parser = _RecordParser(os.path.basename(path))
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > start:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for offset in range(start, size, block):
+                    yield from parser.feed(mm[offset:offset + block])
+    yield from parser.flush()
+
+
+# ============================================
+# TAIL -F (INOTIFY / POLLING, TAHAN ROTASI)
+# ============================================
+class _Followed:
+    __slots__ = ("path", "fd", "inode", "offset", "parser")
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.inode = None
+        self.offset = 0            # Byte yang sudah dibaca dari file saat ini
+        self.parser = _RecordParser(os.path.basename(path))
+
+
+class LogTail:
+    """tail -f untuk satu atau beberapa file log server.
+
+    follow() adalah generator LogRecord yang tidak pernah selesai sampai
+    stop() dipanggil. Linux: inotify pada direktori file membangunkan
+    pembacaan seketika; platform lain polling tiap poll_interval. Rotasi
+    ditangani dua cara: file di-rename/dibuat ulang (inode berubah) -> sisa
+    file lama dibaca habis dulu lalu file baru dibaca dari awal; file
+    dipotong (copytruncate, ukuran < offset) -> baca ulang dari awal.
+    File yang belum ada ditunggu sampai dibuat.
+    """
+
+    def __init__(self, paths=(SYSTEM_LOG,), from_start=False, poll_interval=TAIL_POLL_S, use_inotify=True,
+                 block=READ_BLOCK):
+        self.files = [_Followed(path) for path in ([paths] if isinstance(paths, str) else paths)]
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.block = block
+        self.mode = None
+        self.rotations = 0
+        self._stop = threading.Event()
+
+    @property
+    def positions(self):
+        """path -> offset byte yang sudah dibaca (untuk melanjutkan setelah restart)"""
+        return {f.path: f.offset for f in self.files}
+
+    def stop(self):
+        self._stop.set()
+
+    def follow(self):
+        notifier = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                dirs = sorted({os.path.dirname(os.path.abspath(f.path)) for f in self.files})
+                notifier = Inotify(dirs, Inotify.MASK | Inotify.IN_MODIFY)
+            except (OSError, AttributeError):
+                notifier = None
+        self.mode = "inotify" if notifier else "poll"
+
+        for f in self.files:
+            self._open(f, at_end=not self.from_start)
+        try:
+            while not self._stop.is_set():
+                for f in self.files:
+                    yield from self._poll(f)
+                if notifier:
+                    notifier.wait(self.poll_interval)
+                else:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            if notifier:
+                notifier.close()
+            for f in self.files:
+                self._close(f)
+
+    def _open(self, f, at_end=False):
+        try:
+            fd = os.open(f.path, os.O_RDONLY)
+        except OSError:
+            return False
+        stat = os.fstat(fd)
+        f.fd, f.inode = fd, stat.st_ino
+        f.offset = stat.st_size if at_end else 0
+        os.lseek(fd, f.offset, os.SEEK_SET)
+        f.parser.reset()
+        return True
+
+    def _close(self, f):
+        if f.fd is not None:
+            os.close(f.fd)
+            f.fd = None
+
+    def _drain(self, f):
+        """Baca semua byte baru dari fd saat ini"""
+        records = []
+        while True:
+            data = os.read(f.fd, self.block)
+            if not data:
+                return records
+            f.offset += len(data)
+            records += f.parser.feed(data)
+
+    def _poll(self, f):
+        if f.fd is None:
+            # File belum ada / sudah dirotasi: file baru dibaca dari awal
+            if not self._open(f):
+                return []
+        try:
+            stat = os.stat(f.path)
+        except OSError:
+            stat = None
+
+        if stat is not None and stat.st_ino != f.inode:
+            # Rename + file baru: habiskan file lama, lalu pindah
+            records = self._drain(f) + f.parser.flush()
+            self._close(f)
+            self.rotations += 1
+            if self._open(f):
+                records += self._drain(f)
+            return records
+        if stat is not None and stat.st_size < f.offset:
+            # Dipotong di tempat (copytruncate)
+            records = f.parser.flush()
+            self.rotations += 1
+            f.offset = 0
+            os.lseek(f.fd, 0, os.SEEK_SET)
+            f.parser.reset()
+            return records + self._drain(f)
+
+        records = self._drain(f)
+        if not f.parser.partial:
+            # Server menulis satu entri (termasuk baris lanjutan) dalam satu write:
+            # data yang berakhir di newline berarti entri terakhir sudah lengkap
+            records += f.parser.flush()
+        if stat is None:
+            # Dihapus / di-rename tanpa pengganti: tunggu file baru
+            records += f.parser.flush()
+            self._close(f)
+            self.rotations += 1
+        return records
+
+
+# ============================================
+# EVENT TERSTRUKTUR: TRIGGER -> RESPON
+# ============================================
+_TRIGGER = re.compile(r"ALARM TRIGGERED by (\S+)(?: \(([^)]*)\))?")
+_RESPONSE = re.compile(r"Alarm (?:stopped|acknowledged|cancelled) by (\S+)")
+_DEVICE_DATA = "Received data from device: "
+_BUTTON = "Emergency button pressed"
+_DUPLICATE = "ignoring duplicate"
+DEVICE_CONTEXT_S = 5.0         # "Received data from device" berlaku untuk tombol dalam jendela ini
+AUTOMATIC_RESPONDERS = frozenset({"auto_timeout"})   # Alarm berhenti sendiri, bukan respon petugas
+
+
+class AlarmInterval:
+    """Satu alarm selesai: waktu dari trigger sampai ada respon (stop/ack).
+
+    human False berarti alarm dihentikan otomatis (AUTOMATIC_RESPONDERS,
+    misal auto_timeout): seconds adalah lama alarm tanpa respon, bukan
+    waktu respon.
+    """
+    __slots__ = ("device", "source", "triggered", "responded", "seconds", "responder", "duplicates")
+
+    def __init__(self, device, source, triggered, responded, responder, duplicates):
+        self.device = device
+        self.source = source
+        self.triggered = triggered.timestamp
+        self.responded = responded.timestamp
+        self.seconds = round(responded.time - triggered.time, 3)
+        self.responder = responder
+        self.duplicates = duplicates
+
+    @property
+    def human(self):
+        return self.responder not in AUTOMATIC_RESPONDERS
+
+
+def alarm_intervals(records):
+    """Generator AlarmInterval dari stream LogRecord (system.log berisi semua level).
+
+    Server Node hanya punya satu alarm aktif: trigger saat alarm aktif dan
+    "ignoring duplicate" dihitung sebagai duplikat; "ignoring duplicate"
+    tepat setelah trigger itu adalah peringatan untuk trigger yang sama,
+    tidak dihitung dua kali. Device untuk "Emergency button pressed"
+    diambil dari "Received data from device" terakhir.
+    """
+    active = None                  # (record trigger, device, source)
+    duplicates = 0
+    counted = False                # Entri sebelumnya trigger duplikat yang sudah dihitung
+    last_device = None             # (device, waktu)
+    for record in records:
+        message = record.message
+        if message.startswith(_DEVICE_DATA):
+            last_device = (message[len(_DEVICE_DATA):].strip(), record)
+            continue
+
+        trigger = _TRIGGER.search(message) if "TRIGGERED" in message else None
+        if trigger is None and message.startswith(_BUTTON):
+            device = "unknown"
+            if last_device is not None and record.time - last_device[1].time <= DEVICE_CONTEXT_S:
+                device = last_device[0]
+            trigger = (device, "button")
+        elif trigger is not None:
+            trigger = (trigger[1], trigger[2] or "")
+        if trigger is not None:
+            if active is None:
+                active, duplicates = (record, trigger[0], trigger[1]), 0
+            else:
+                duplicates += 1
+                counted = True
+            continue
+
+        if active is not None:
+            if _DUPLICATE in message:
+                if not counted:
+                    duplicates += 1
+            elif "Alarm " in message:
+                response = _RESPONSE.search(message)
+                if response is not None:
+                    yield AlarmInterval(active[1], active[2], active[0], record, response[1], duplicates)
+                    active = None
+        counted = False
+
+
+class IntervalStats:
+    """Ringkasan trigger -> respon per device; alarm yang berhenti otomatis tidak dihitung sebagai respon"""
+
+    def __init__(self):
+        self.devices = {}          # device -> [jumlah, direspon, total detik respon, maks detik respon]
+
+    def add(self, interval):
+        entry = self.devices.setdefault(interval.device, [0, 0, 0.0, 0.0])
+        entry[0] += 1
+        if interval.human:
+            entry[1] += 1
+            entry[2] += interval.seconds
+            entry[3] = max(entry[3], interval.seconds)
+
+    def summary_lines(self):
+        lines = []
+        for device, (count, answered, total, worst) in sorted(self.devices.items()):
+            response = (f"response avg {total / answered:.1f} s, max {worst:.1f} s" if answered
+                        else "no response")
+            lines.append(f"{device}: {count} alarms, {count - answered} stopped without response, {response}")
+        return lines
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse / tail the Node server logs (logs/*.log)")
+    parser.add_argument("paths", nargs="*", default=[SYSTEM_LOG])
+    parser.add_argument("--follow", "-f", action="store_true", help="keep reading new entries (tail -f)")
+    parser.add_argument("--from-start", action="store_true", help="with --follow: read existing entries first")
+    parser.add_argument("--records", action="store_true", help="print every entry, not only alarm intervals")
+    args = parser.parse_args()
+
+    if args.follow:
+        tail = LogTail(args.paths, from_start=args.from_start)
+        records = tail.follow()
+    else:
+        records = (record for path in args.paths for record in read_records(path))
+
+    if args.records:
+        records = _echo(records)
+    stats = IntervalStats()
+    try:
+        for interval in alarm_intervals(records):
+            stats.add(interval)
+            outcome = (f"responded in {interval.seconds:.1f} s by {interval.responder}" if interval.human
+                       else f"no response, stopped by {interval.responder} after {interval.seconds:.1f} s")
+            print(f"⏱ {interval.triggered} {interval.device} ({interval.source}): {outcome}, "
+                  f"{interval.duplicates} duplicate triggers", flush=True)
+    except KeyboardInterrupt:
+        pass
+    for line in stats.summary_lines():
+        print(f"📈 {line}")
+
+
+def _echo(records):
+    for record in records:
+        print(f"[{record.timestamp}] [{record.level}] {record.message}", flush=True)
+        yield record
+
+
+if __name__ == "__main__":
+    main()
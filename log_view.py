@@ -0,0 +1,112 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+# ============================================
+# VIEW LOG VIRTUAL (HANYA RENDER BARIS TERLIHAT)
+# ============================================
+WHEEL_LINES = 3
+
+
+class VirtualLogView:
+    """Menampilkan LogRing lewat Text widget berisi baris yang terlihat saja.
+
+    Scrollbar dipetakan ke posisi di ring, bukan ke isi widget, sehingga
+    render dan memori widget tetap O(jumlah baris terlihat) berapapun
+    panjang history. Saat posisi di bawah, view mengikuti baris terbaru.
+    """
+
+    def __init__(self, parent, ring, height=15, width=100, font=("Consolas", 10)):
+        self.ring = ring
+        self.rows = height
+        self.top_seq = 0
+        self.follow = True
+        self._tags = set()
+
+        self.frame = ttk.Frame(parent)
+        self.text = tk.Text(self.frame, height=height, width=width, font=font,
+                            wrap=tk.NONE, state=tk.DISABLED)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scroll)
+
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self._line_height = max(1, tkfont.Font(font=font).metrics("linespace"))
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", self._on_wheel)
+        self.text.bind("<Button-5>", self._on_wheel)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def _max_top(self):
+        return self.ring.first_seq + max(0, len(self.ring) - self.rows)
+
+    def refresh(self):
+        """Render ulang baris yang terlihat dari ring"""
+        ring = self.ring
+        first = ring.first_seq
+        count = len(ring)
+
+        if self.follow:
+            top = self._max_top()
+        else:
+            top = min(max(self.top_seq, first), self._max_top())
+        self.top_seq = top
+
+        items = ring.slice(top - first, top - first + self.rows)
+
+        args = []
+        for line, color in items:
+            if color != "black" and color not in self._tags:
+                self.text.tag_config(color, foreground=color)
+                self._tags.add(color)
+            args.append(line + "\n")
+            args.append((color,) if color != "black" else ())
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if args:
+            self.text.insert("1.0", *args)
+        self.text.config(state=tk.DISABLED)
+
+        if count:
+            self.scrollbar.set((top - first) / count, (top - first + len(items)) / count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, top_seq):
+        max_top = self._max_top()
+        self.top_seq = min(max(top_seq, self.ring.first_seq), max_top)
+        self.follow = self.top_seq >= max_top
+        self.refresh()
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(self.ring.first_seq + int(float(amount) * len(self.ring)))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self.scroll_to(self.top_seq + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            direction = -1
+        elif event.num == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.top_seq + direction * WHEEL_LINES)
+        return "break"
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
@@ -0,0 +1,340 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+
+# ============================================
+# KONFIGURASI DATA PASIEN
+# ============================================
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+PATIENTS_JSON = os.path.join(DATA_DIR, "patients.json")
+MEDICAL_CSV = os.path.join(DATA_DIR, "medical_data.csv")
+RELOAD_POLL_S = 2.0            # Interval cek mtime/size file data
+READ_BLOCK = 1 << 20           # Byte per blok saat memverifikasi prefix CSV
+
+# Nama kolom CSV dinormalisasi (huruf kecil, tanpa spasi/underscore); export
+# PatientDataForm memakai "Room Number"/"Bed Number", server memakai "Room"/"Bed"
+CSV_COLUMNS = {
+    "deviceid": "device_id", "device": "device_id",
+    "macaddress": "mac", "mac": "mac",
+    "ipaddress": "ip", "ip": "ip",
+    "patientname": "patient", "patient": "patient", "name": "patient",
+    "room": "room", "roomnumber": "room",
+    "bed": "bed", "bednumber": "bed",
+    "admissiontime": "admitted", "status": "status",
+}
+
+
+_MAC_SEPARATORS = str.maketrans("", "", ":-. ")
+
+
+def normalize_mac(mac):
+    """'bc-ff-4d-29-d2-95' / 'BCFF4D29D295' -> 'BC:FF:4D:29:D2:95'"""
+    if not mac:
+        return None
+    text = str(mac).strip().upper()
+    digits = text.translate(_MAC_SEPARATORS)
+    try:
+        valid = len(digits) == 12 and int(digits, 16) >= 0
+    except ValueError:
+        valid = False
+    if not valid:
+        return text or None
+    if len(text) == 17 and text[2::3] == ":::::":
+        return text
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def _key(value):
+    value = str(value).strip() if value is not None else ""
+    return value.lower() or None
+
+
+class PatientRecord:
+    """Pasien/device dari data/patients.json atau data/medical_data.csv"""
+    __slots__ = ("device_id", "mac", "ip", "patient", "room", "bed", "status", "admitted", "source")
+
+    def __init__(self, device_id=None, mac=None, ip=None, patient=None, room=None, bed=None,
+                 status=None, admitted=None, source=None):
+        self.device_id = device_id or None
+        self.mac = normalize_mac(mac)
+        self.ip = ip or None
+        self.patient = patient or None
+        self.room = room or None
+        self.bed = bed or None
+        self.status = status or None
+        self.admitted = admitted or None
+        self.source = source
+
+
+class _Index:
+    """Hash index device_id / MAC / room -> PatientRecord (entri terakhir menang)"""
+
+    def __init__(self):
+        self.by_device = {}
+        self.by_mac = {}
+        self.by_room = {}
+        self.count = 0
+
+    def add(self, record):
+        self.count += 1
+        if record.device_id:
+            self.by_device[_key(record.device_id)] = record
+        if record.mac:
+            self.by_mac[record.mac] = record
+        if record.room and record.patient:
+            self.by_room[_key(record.room)] = record
+
+    def add_undoable(self, record):
+        """add() yang bisa dibatalkan discard(); kembalikan nilai lama tiap key yang ditimpa"""
+        undo = []
+        if record.device_id:
+            key = _key(record.device_id)
+            undo.append((self.by_device, key, self.by_device.get(key)))
+        if record.mac:
+            undo.append((self.by_mac, record.mac, self.by_mac.get(record.mac)))
+        if record.room and record.patient:
+            key = _key(record.room)
+            undo.append((self.by_room, key, self.by_room.get(key)))
+        self.add(record)
+        return undo
+
+    def discard(self, undo):
+        self.count -= 1
+        for table, key, previous in undo:
+            if previous is None:
+                table.pop(key, None)
+            else:
+                table[key] = previous
+
+
+# ============================================
+# REGISTRY PASIEN
+# ============================================
+class PatientRegistry:
+    """Lookup pasien/ruangan per device_id, MAC atau room dalam O(1).
+
+    Kedua file dimuat ke hash index terpisah (JSON menang atas CSV).
+    Thread watcher memeriksa mtime/size tiap RELOAD_POLL_S: patients.json
+    (kecil) dimuat ulang penuh, medical_data.csv yang hanya bertambah
+    (append) cukup di-parse dari offset terakhir; append dikenali dari hash
+    blake2b bagian yang sudah di-parse, CSV yang ditulis ulang dimuat penuh
+    ke index baru lalu ditukar. Jalur alarm hanya membaca
+    dict, tidak pernah membaca file.
+
+    Path None berarti sumber itu tidak dipakai.
+    """
+
+    def __init__(self, json_path=PATIENTS_JSON, csv_path=MEDICAL_CSV, poll_interval=RELOAD_POLL_S,
+                 on_reload=None):
+        self.json_path = json_path
+        self.csv_path = csv_path
+        self.poll_interval = poll_interval
+        self.on_reload = on_reload
+        self._json = _Index()
+        self._csv = _Index()
+        self._json_stat = None
+        self._csv_stat = None
+        self._csv_offset = 0       # Byte CSV yang sudah di-parse (selalu di akhir baris)
+        self._csv_digest = hashlib.blake2b(digest_size=16)   # Hash byte [0, offset), deteksi tulis ulang
+        self._csv_tail = None      # Undo baris terakhir tanpa newline (diganti saat file disambung)
+        self._csv_columns = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ============================================
+    # LOOKUP
+    # ============================================
+    def lookup(self, device_id=None, mac=None, room=None):
+        """Record pertama yang cocok: device_id, lalu MAC, lalu room"""
+        device_key = _key(device_id)
+        mac_key = normalize_mac(mac)
+        room_key = _key(room)
+        for index in (self._json, self._csv):
+            if device_key and device_key in index.by_device:
+                return index.by_device[device_key]
+            if mac_key and mac_key in index.by_mac:
+                return index.by_mac[mac_key]
+        if room_key:
+            for index in (self._json, self._csv):
+                if room_key in index.by_room:
+                    return index.by_room[room_key]
+        return None
+
+    @property
+    def count(self):
+        return self._json.count + self._csv.count
+
+    # ============================================
+    # LOAD / RELOAD
+    # ============================================
+    def start(self):
+        """Load pertama + watcher mtime di thread sendiri (startup tidak menunggu)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="patient-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                if self.on_reload:
+                    self.on_reload(f"reload failed: {e}")
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def refresh(self):
+        """Muat ulang file yang berubah sejak cek terakhir; True jika ada perubahan"""
+        with self._lock:
+            changed = self._refresh_json()
+            return self._refresh_csv() or changed
+
+    def _stat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh_json(self):
+        if not self.json_path:
+            return False
+        stat = self._stat(self.json_path)
+        if stat == self._json_stat:
+            return False
+        self._json_stat = stat
+        index = _Index()
+        if stat is not None:
+            try:
+                with open(self.json_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            self._load_json(data, index)
+        self._json = index
+        self._notify(f"{self.json_path}: {index.count} records")
+        return True
+
+    def _load_json(self, data, index):
+        """Format patients.json: {"device": {...}, "patients": [...]} atau list pasien"""
+        if isinstance(data, list):
+            data = {"patients": data}
+        if not isinstance(data, dict):
+            return
+        patients = [p for p in data.get("patients", []) if isinstance(p, dict)]
+        device = data.get("device") if isinstance(data.get("device"), dict) else None
+
+        for entry in patients:
+            device_id = entry.get("deviceId", entry.get("device_id"))
+            mac = entry.get("mac", entry.get("macAddress"))
+            # File satu device (dashboard): satu-satunya pasien milik device itu
+            if device is not None and len(patients) == 1 and not (device_id or mac):
+                device_id, mac = device.get("id"), device.get("mac")
+            index.add(PatientRecord(
+                device_id, mac, entry.get("ip"), entry.get("name", entry.get("patient")),
+                entry.get("room"), entry.get("bed"), entry.get("status"), entry.get("time"),
+                source="json"))
+
+    def _refresh_csv(self):
+        if not self.csv_path:
+            return False
+        stat = self._stat(self.csv_path)
+        if stat == self._csv_stat:
+            return False
+        self._csv_stat = stat
+        if stat is None:
+            self._csv = _Index()
+            self._reset_csv()
+            return True
+
+        with open(self.csv_path, "rb") as f:
+            appended = (self._csv_columns is not None and stat[1] >= self._csv_offset
+                        and self._prefix_digest(f) == self._csv_digest.digest())
+            if appended:
+                # Hanya baris setelah offset terakhir; baris tanpa newline sebelumnya diganti
+                if self._csv_tail is not None:
+                    self._csv.discard(self._csv_tail)
+                    self._csv_tail = None
+                f.seek(self._csv_offset)
+                added = self._parse_csv(f.read(), self._csv)
+                self._notify(f"{self.csv_path}: +{added} rows (incremental)")
+            else:
+                f.seek(0)
+                index = _Index()
+                self._reset_csv()
+                self._parse_csv(f.read(), index)
+                self._csv = index
+                self._notify(f"{self.csv_path}: {index.count} rows")
+        return True
+
+    def _reset_csv(self):
+        self._csv_offset, self._csv_columns, self._csv_tail = 0, None, None
+        self._csv_digest = hashlib.blake2b(digest_size=16)
+
+    def _prefix_digest(self, f):
+        """Hash byte [0, offset) file saat ini; beda dari _csv_digest = file ditulis ulang"""
+        digest = hashlib.blake2b(digest_size=16)
+        remaining = self._csv_offset
+        while remaining:
+            block = f.read(min(remaining, READ_BLOCK))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        return digest.digest()
+
+    def _parse_csv(self, data, index):
+        """Parse data (bytes) dari offset, update offset + hash; kembalikan jumlah row.
+
+        Offset dan hash hanya maju sampai newline terakhir. Baris terakhir
+        tanpa newline tetap dimuat, undo-nya disimpan di _csv_tail supaya
+        diganti, bukan ditambah lagi, saat baris itu disambung. Header tanpa
+        newline belum dipakai: perubahan berikutnya memuat ulang penuh.
+        """
+        complete = data.rfind(b"\n") + 1
+        if self._csv_columns is None and complete == 0:
+            return 0
+        body, tail = data[:complete], data[complete:]
+        text = body.decode("utf-8-sig" if self._csv_offset == 0 else "utf-8", errors="replace")
+        self._csv_offset += complete
+        self._csv_digest.update(body)
+
+        rows = csv.reader(io.StringIO(text))
+        if self._csv_columns is None:
+            header = next(rows, None)
+            if header is None:
+                return 0
+            names = [CSV_COLUMNS.get(name.strip().lower().replace(" ", "").replace("_", ""))
+                     for name in header]
+            # Posisi kolom per field PatientRecord (None jika kolom tidak ada)
+            self._csv_columns = [names.index(field) if field in names else None
+                                 for field in PatientRecord.__slots__[:-1]]
+        positions = self._csv_columns
+
+        added = 0
+        for row in rows:
+            if not row:
+                continue
+            width = len(row)
+            index.add(PatientRecord(*[row[i].strip() if i is not None and i < width else None
+                                      for i in positions], source="csv"))
+            added += 1
+
+        row = next(csv.reader([tail.decode("utf-8", errors="replace")]), None) if tail.strip() else None
+        if row:
+            width = len(row)
+            self._csv_tail = index.add_undoable(PatientRecord(
+                *[row[i].strip() if i is not None and i < width else None for i in positions], source="csv"))
+            added += 1
+        return added
+
+    def _notify(self, message):
+        if self.on_reload:
+            self.on_reload(message)
@@ -0,0 +1,257 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from serial_link import SerialLink, read_available
+
+# ============================================
+# KONFIGURASI DISCOVERY
+# ============================================
+PORT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "port_cache.json")
+PROBE_TIMEOUT_S = 3.0          # Maksimal menunggu respon ESP8266 (boot setelah reset DTR)
+PROBE_READ_TIMEOUT_S = 0.05    # Timeout read() selama probe agar deadline tetap presisi
+PROBE_WORKERS = 8
+PING_RETRY_S = 0.5             # PC_PING diulang selama belum dijawab (yang pertama hilang saat ESP boot)
+PING = b"PC_PING\n"
+PONG = "PONG"                  # Opsional: firmware di repo ini belum menjawab PC_PING, hanya handshake
+
+
+def candidate_ports():
+    """Daftar port kandidat tanpa membuka port satu per satu"""
+    if sys.platform.startswith('win'):
+        try:
+            from serial.tools import list_ports
+            return [info.device for info in list_ports.comports()]
+        except ImportError:
+            # Tanpa list_ports: semua COM1..COM20 di-probe paralel
+            return [f"COM{i}" for i in range(1, 21)]
+
+    # Linux/Mac
+    import glob
+    return glob.glob('/dev/ttyUSB*') + glob.glob('/dev/ttyACM*')
+
+
+# ============================================
+# CACHE PORT TERAKHIR YANG BERHASIL
+# ============================================
+class PortCache:
+    """Pemetaan port -> device terakhir yang berhasil, disimpan sebagai JSON.
+
+    path=None berarti cache hanya di memori (benchmark/test).
+    """
+
+    def __init__(self, path=PORT_CACHE_FILE):
+        self.path = path
+        self.entries = {}          # port -> {"device_id": str|None, "last_ok": epoch}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self.entries = {port: entry for port, entry in data.get("ports", {}).items()
+                            if isinstance(entry, dict)}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {"ports": dict(self.entries)}
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def is_known(self, port):
+        return port in self.entries
+
+    def device_for(self, port):
+        entry = self.entries.get(port)
+        return entry.get("device_id") if entry else None
+
+    def order(self, ports):
+        """Port yang pernah berhasil lebih dulu (terbaru dulu), sisanya urutan asli"""
+        entries = self.entries
+        known = sorted((p for p in ports if p in entries),
+                       key=lambda p: entries[p].get("last_ok", 0), reverse=True)
+        return known + [p for p in ports if p not in entries]
+
+    def remember(self, port, device_id=None):
+        """Catat port yang berhasil (device_id lama dipertahankan jika None)"""
+        with self._lock:
+            entry = self.entries.setdefault(port, {"device_id": None})
+            if device_id:
+                entry["device_id"] = device_id
+            entry["last_ok"] = time.time()
+        self.save()
+
+    def forget(self, port):
+        with self._lock:
+            removed = self.entries.pop(port, None)
+        if removed is not None:
+            self.save()
+
+
+# ============================================
+# PROBE PARALEL
+# ============================================
+class ProbeResult:
+    """Hasil probe satu port; link sudah terbuka jika berhasil"""
+    __slots__ = ("port", "link", "lines", "handshake", "identified", "elapsed", "error")
+
+    def __init__(self, port):
+        self.port = port
+        self.link = None
+        self.lines = []            # Baris yang sudah dibaca saat probe (belum diproses)
+        self.handshake = None      # Data handshake jika selesai saat probe
+        self.identified = False    # True: ESP8266 menjawab PC_PING / handshake
+        self.elapsed = 0.0
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.link is not None
+
+    def close(self):
+        if self.link is not None:
+            self.link.close()
+            self.link = None
+
+
+def probe_port(port, open_port, timeout=PROBE_TIMEOUT_S, cancel=None):
+    """Buka port, kirim PC_PING dan tunggu handshake (atau PONG) dari device.
+
+    Identifikasi utama adalah handshake yang dikirim firmware setelah boot.
+    PONG opsional: firmware yang menjawab PC_PING dengan PONG teridentifikasi
+    tanpa menunggu handshake, firmware lain cukup mengabaikan PING.
+    Membuka port me-reset ESP8266 (DTR), jadi PING pertama bisa hilang
+    selama boot: PING diulang setelah baris pertama (sisa boot ROM) dan
+    tiap PING_RETRY_S selama belum dijawab. Baris lain tidak dianggap
+    identifikasi (device serial lain juga bisa mengirim baris). Selesai
+    begitu ada jawaban sehingga tidak ada sleep tetap; port yang terbuka
+    tapi tidak menjawab sampai timeout tetap dikembalikan dengan
+    identified=False.
+    """
+    result = ProbeResult(port)
+    begin = time.perf_counter()
+    try:
+        conn = open_port(port)
+    except Exception as e:
+        result.error = e
+        result.elapsed = time.perf_counter() - begin
+        return result
+
+    link = SerialLink(port, conn)
+    result.link = link
+    read_timeout = getattr(conn, "timeout", None)
+    try:
+        conn.timeout = PROBE_READ_TIMEOUT_S
+        conn.reset_input_buffer()
+        conn.write(PING)
+
+        deadline = begin + timeout
+        next_ping = begin + PING_RETRY_S
+        booted = False                 # Sudah ada baris: PING berikutnya tidak jatuh ke boot ROM
+        while True:
+            now = time.perf_counter()
+            if now >= deadline or (cancel and cancel.is_set()):
+                break
+            data = read_available(conn)
+            answered = False
+            for line in link.framer.feed(data) if data else ():
+                result.lines.append(line)
+                handshake = link.track_handshake(line)
+                if handshake is not None:
+                    result.handshake = handshake
+                    answered = True
+                elif line == PONG:
+                    answered = True
+            # Baris di tengah handshake: tunggu sampai END supaya device_id ikut
+            if link.in_handshake:
+                continue
+            if answered:
+                result.identified = True
+                break
+            if (result.lines and not booted) or now >= next_ping:
+                booted = booted or bool(result.lines)
+                conn.write(PING)
+                next_ping = now + PING_RETRY_S
+    except Exception as e:
+        result.error = e
+        result.close()
+    finally:
+        # Timeout pendek hanya untuk probe, listener memakai timeout asli
+        conn.timeout = read_timeout
+
+    result.elapsed = time.perf_counter() - begin
+    return result
+
+
+def discover_ports(ports, open_port, cache=None, first_only=True,
+                   timeout=PROBE_TIMEOUT_S, workers=PROBE_WORKERS, on_result=None):
+    """Probe port secara paralel, kembalikan list ProbeResult yang terbuka.
+
+    Port di cache dicoba lebih dulu, tapi seperti port lain hanya dianggap
+    teridentifikasi jika menjawab handshake/PONG. first_only: berhenti di
+    port pertama yang teridentifikasi, probe lain dibatalkan dan port-nya
+    ditutup. Jika tidak ada yang menjawab, port yang terbuka tetap dipakai
+    (perilaku lama) dengan port cache terbaru di depan. on_result(result)
+    dipanggil untuk setiap probe yang selesai, termasuk yang gagal.
+    """
+    ordered = cache.order(ports) if cache else list(ports)
+    rank = {port: i for i, port in enumerate(ordered)}
+
+    opened = _probe_batch(ordered, open_port, timeout, workers, on_result,
+                          stop=lambda r: first_only and r.identified) if ordered else []
+
+    # Yang menjawab dulu, lalu urutan cache/asli
+    opened.sort(key=lambda r: (not r.identified, rank[r.port]))
+    if first_only:
+        for extra in opened[1:]:
+            extra.close()
+        del opened[1:]
+    return opened
+
+
+def _close_late(future):
+    future.result().close()
+
+
+def _probe_batch(ports, open_port, timeout, workers, on_result, stop):
+    """Probe satu kelompok port; berhenti lebih awal jika stop(result) True"""
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(ports))),
+                              thread_name_prefix="port-probe")
+    futures = [pool.submit(probe_port, port, open_port, timeout, cancel) for port in ports]
+
+    opened = []
+    pending = set(futures)
+    for future in as_completed(futures):
+        pending.discard(future)
+        result = future.result()
+        if on_result is not None:
+            on_result(result)
+        if not result.ok:
+            continue
+        opened.append(result)
+        if stop(result):
+            cancel.set()
+            break
+
+    # Probe yang masih jalan (misal open() lambat) ditutup begitu selesai
+    for future in pending:
+        future.add_done_callback(_close_late)
+    pool.shutdown(wait=False)
+    return opened
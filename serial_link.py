@@ -0,0 +1,261 @@
+import codecs
+import selectors
+import socket
+import threading
+import time
+
+# ============================================
+# FRAMING BARIS SERIAL
+# ============================================
+MAX_LINE_BYTES = 4096          # Batas satu baris sebelum dianggap sampah
+
+
+class LineFramer:
+    """Memotong stream byte dari ESP8266 menjadi baris lengkap.
+
+    Buffer berupa bytearray yang dipakai ulang: tiap chunk hanya memindai
+    byte baru, semua baris lengkap di-decode sekaligus dan dibuang dari
+    buffer sekali per chunk, sisa baris yang belum lengkap tidak disalin
+    ulang per baris.
+    """
+    __slots__ = ("_buf", "_scan", "max_line", "dropped")
+    errors = ()                # Framing teks tidak punya error (lihat FrameDecoder)
+
+    def __init__(self, max_line=MAX_LINE_BYTES):
+        self._buf = bytearray()
+        self._scan = 0
+        self.max_line = max_line
+        self.dropped = 0
+
+    def feed(self, data):
+        """Tambahkan chunk byte, kembalikan list baris (sudah di-strip) yang lengkap"""
+        buf = self._buf
+        buf += data
+
+        # Cari newline terakhir, cukup pindai byte yang baru masuk
+        end = buf.rfind(b"\n", self._scan)
+        if end == -1:
+            # Lindungi dari device yang mengirim data tanpa newline
+            if len(buf) > self.max_line:
+                self.dropped += len(buf)
+                buf.clear()
+            self._scan = len(buf)
+            return []
+
+        # Decode semua baris lengkap sekaligus, sisa tail tetap di buffer
+        block = codecs.decode(buf[:end], "utf-8", "replace")
+        del buf[:end + 1]
+        self._scan = len(buf)
+
+        return [line for line in map(str.strip, block.split("\n")) if line]
+
+    def reset(self):
+        """Kosongkan buffer (misal setelah reconnect)"""
+        self._buf.clear()
+        self._scan = 0
+
+    def take_pending(self):
+        """Ambil byte baris yang belum lengkap (saat link pindah ke framing biner)"""
+        pending = bytes(self._buf)
+        self.reset()
+        return pending
+
+    @property
+    def pending(self):
+        """Jumlah byte baris yang belum lengkap"""
+        return len(self._buf)
+
+
+def read_available(conn):
+    """Blok sampai ada byte masuk (atau timeout port), lalu ambil semua yang tersedia.
+
+    read(1) milik pyserial menunggu di level OS (select di POSIX, overlapped
+    I/O di Windows), jadi thread tidur sampai data datang tanpa polling.
+    """
+    first = conn.read(1)
+    if not first:
+        return b""
+
+    waiting = conn.in_waiting
+    if waiting:
+        return first + conn.read(waiting)
+    return first
+
+
+# ============================================
+# STATE PER LINK SERIAL
+# ============================================
+HANDSHAKE_BEGIN = "=== HANDSHAKE ==="
+HANDSHAKE_END = "=== END_HANDSHAKE ==="
+
+
+class SerialLink:
+    """Satu koneksi ESP8266: port, buffer framing dan state handshake sendiri"""
+    __slots__ = ("port", "conn", "framer", "in_handshake", "handshake_data", "device_id")
+
+    def __init__(self, port, conn):
+        self.port = port
+        self.conn = conn
+        self.framer = LineFramer()
+        self.in_handshake = False
+        self.handshake_data = {}
+        self.device_id = None
+
+    def track_handshake(self, line):
+        """Update state handshake, kembalikan data handshake jika baru selesai"""
+        if line == HANDSHAKE_BEGIN:
+            self.in_handshake = True
+            self.handshake_data = {}
+        elif line == HANDSHAKE_END:
+            self.in_handshake = False
+            self.device_id = self.handshake_data.get("DEVICE_ID", self.device_id)
+            return self.handshake_data
+        elif self.in_handshake and ':' in line:
+            key, value = line.split(':', 1)
+            self.handshake_data[key.strip()] = value.strip()
+        return None
+
+    @property
+    def label(self):
+        """Tag untuk log/alarm: port dan device asal"""
+        return f"{self.port}/{self.device_id or 'UNKNOWN'}"
+
+    @property
+    def is_open(self):
+        return self.conn is not None and self.conn.is_open
+
+    def close(self):
+        try:
+            if self.is_open:
+                self.conn.close()
+        except Exception:
+            pass
+
+
+def _link_fileno(conn):
+    """File descriptor port jika bisa dipakai selectors (POSIX), selain itu None"""
+    try:
+        return conn.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+# ============================================
+# MULTIPLEXER BANYAK LINK DALAM SATU THREAD
+# ============================================
+class LinkMultiplexer:
+    """Membaca banyak SerialLink dari satu loop selectors.
+
+    Port yang punya fileno (POSIX) ditunggu lewat selector sehingga thread
+    tidur sampai ada data. Port tanpa fileno (COM di Windows) dicek
+    in_waiting secara round-robin di loop yang sama, jadi tetap satu
+    thread berapapun jumlah port.
+    """
+
+    def __init__(self, on_lines, on_error, poll_interval=0.005):
+        self.on_lines = on_lines          # callback(link, lines, rx_ns, framed_ns)
+        self.on_error = on_error          # callback(link, exception)
+        self.poll_interval = poll_interval
+        self.links = {}
+        self._polled = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def add(self, link):
+        """Tambahkan link, aman dipanggil dari thread lain"""
+        with self._lock:
+            self.links[link.port] = link
+            fd = _link_fileno(link.conn)
+            if fd is None:
+                self._polled.append(link)
+            else:
+                self._selector.register(fd, selectors.EVENT_READ, link)
+        self._wake()
+
+    def remove(self, link):
+        """Lepas link dari loop (tidak menutup port)"""
+        with self._lock:
+            if self.links.pop(link.port, None) is None:
+                return
+            if link in self._polled:
+                self._polled.remove(link)
+            else:
+                try:
+                    self._selector.unregister(_link_fileno(link.conn))
+                except (KeyError, ValueError, OSError):
+                    pass
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _read(self, link):
+        try:
+            conn = link.conn
+            data = conn.read(conn.in_waiting or 1)
+        except Exception as e:
+            self.remove(link)
+            self.on_error(link, e)
+            return
+        if data:
+            rx = time.perf_counter_ns()
+            lines = link.framer.feed(data)
+            # Error framing (CRC, frame hilang) dilaporkan sekarang, bukan menunggu baris valid berikutnya
+            if lines or link.framer.errors:
+                self.on_lines(link, lines, rx, time.perf_counter_ns())
+
+    def start(self, is_running):
+        """Jalankan run() di thread "serial-multiplexer" (sekali; thread yang masih hidup dipakai lagi)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run, args=(is_running,),
+                                            name="serial-multiplexer", daemon=True)
+            self._thread.start()
+
+    def run(self, is_running):
+        """Loop utama; berhenti saat is_running() bernilai False atau close()"""
+        while is_running() and not self._stop.is_set():
+            timeout = self.poll_interval if self._polled else 1.0
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        self._wake_r.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._read(key.data)
+
+            with self._lock:
+                polled = list(self._polled)
+            for link in polled:
+                try:
+                    waiting = link.conn.in_waiting
+                except Exception as e:
+                    self.remove(link)
+                    self.on_error(link, e)
+                    continue
+                if waiting:
+                    self._read(link)
+
+    def close(self, timeout=2.0):
+        """Hentikan loop dan tunggu thread-nya keluar dari select() sebelum selector ditutup"""
+        self._stop.set()
+        self._wake()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._lock:
+            links = list(self.links.values())
+        for link in links:
+            self.remove(link)
+            link.close()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
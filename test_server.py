@@ -1,25 +1,293 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import collections
 import json
+import re
+import sys
+import threading
 import time
 
+# ============================================
+# KONFIGURASI INGEST
+# ============================================
+HTTP_PORT = 8080
+KEEPALIVE_TIMEOUT_S = 30       # Koneksi keep-alive yang diam lebih lama ditutup
+LISTEN_BACKLOG = 1024          # Antrian accept() kernel (default HTTPServer hanya 5)
+MAX_CONNECTIONS = 2048         # Koneksi serentak; lebih dari ini langsung 503
+MAX_BODY_BYTES = 256 * 1024    # Batas ukuran body POST /emergency
+MAX_BATCH_EVENTS = 1000        # Batas jumlah event per request
+INGEST_QUEUE_SIZE = 10000      # Event yang boleh menunggu diproses
+SINK_BATCH = 500               # Event per panggilan sink
+RETRY_AFTER_S = 1              # Saran jeda retry saat antrian penuh
+
+# ============================================
+# KONFIGURASI STREAM /events (SERVER-SENT EVENTS)
+# ============================================
+STREAM_HISTORY = 1024          # Event terakhir yang bisa di-replay lewat Last-Event-ID
+CLIENT_BUFFER = 256            # Event yang boleh tertunda per client; lebih dari ini client diputus
+HEARTBEAT_S = 15               # Komentar keep-alive jika tidak ada event
+SEND_TIMEOUT_S = 5             # Client yang tidak membaca selama ini diputus
+CLIENT_RETRY_MS = 3000         # Saran jeda reconnect untuk EventSource
+
+# Nama event sama dengan event socket.io di server.js
+STREAM_TRIGGERED = "alarm_triggered"
+STREAM_CANCELLED = "alarm_cancelled"
+STREAM_ACKNOWLEDGED = "alarm_acknowledged"
+STREAM_RESET = "reset"
+
+# Kata utuh di field event/action/raw -> jenis event ("ALARM_STOPPED_ACK" = dibatalkan)
+CANCEL_WORDS = frozenset({"STOP", "STOPPED", "CANCEL", "CANCELED", "CANCELLED"})
+ACK_WORDS = frozenset({"ACK", "ACKED", "ACKNOWLEDGE", "ACKNOWLEDGED"})
+_WORD_SPLIT = re.compile(r"[^A-Z]+")
+
+
+# ============================================
+# PARSING BODY /emergency
+# ============================================
+def parse_events(body):
+    """Body POST /emergency -> list event (dict).
+
+    Diterima: satu objek JSON, list objek JSON, atau {"events": [...]}.
+    Body non-JSON (firmware lama yang mengirim teks biasa) dibungkus jadi
+    {"raw": teks}. ValueError jika body tidak valid.
+    """
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("Body is not valid UTF-8")
+    if not text.strip():
+        raise ValueError("Empty body")
+
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return [{"raw": text}]
+
+    if isinstance(payload, dict) and isinstance(payload.get("events"), list):
+        events = payload["events"]
+    elif isinstance(payload, list):
+        events = payload
+    elif isinstance(payload, dict):
+        events = [payload]
+    else:
+        raise ValueError("Expected a JSON object, a list of objects or {\"events\": [...]}")
+
+    if not events:
+        raise ValueError("Batch contains no events")
+    if len(events) > MAX_BATCH_EVENTS:
+        raise ValueError(f"Batch too large (max {MAX_BATCH_EVENTS} events)")
+    if not all(isinstance(event, dict) for event in events):
+        raise ValueError("Every event must be a JSON object")
+    return events
+
+
+def print_events(events):
+    """Sink default: cetak event seperti versi lama, satu write per batch"""
+    lines = []
+    for event in events:
+        raw = event.get("raw")
+        lines.append(f"Received emergency: {raw if raw is not None else json.dumps(event)}\n")
+    sys.stdout.write("".join(lines))
+    sys.stdout.flush()
+
+
+# ============================================
+# ANTRIAN EVENT TERBATAS
+# ============================================
+class IngestQueue:
+    """Antrian event dengan kapasitas tetap.
+
+    offer() menerima satu batch utuh atau menolaknya seluruhnya (handler
+    membalas 503), sehingga antrian tidak pernah tumbuh tanpa batas saat
+    sink lebih lambat dari device. Worker mengambil event per batch.
+    """
+
+    def __init__(self, maxsize=INGEST_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.closed = False
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def offer(self, events):
+        with self._cond:
+            if self.closed or len(self._items) + len(events) > self.maxsize:
+                return False
+            self._items.extend(events)
+            self._cond.notify()
+            return True
+
+    def drain(self, limit=SINK_BATCH):
+        """Blok sampai ada event; list kosong berarti antrian sudah ditutup"""
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            count = min(limit, len(self._items))
+            return [self._items.popleft() for _ in range(count)]
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+# ============================================
+# STREAM EVENT ALARM (FAN-OUT SSE)
+# ============================================
+def alarm_kind(event):
+    """Jenis event stream untuk satu event /emergency (default: alarm baru)"""
+    text = str(event.get("event") or event.get("action") or event.get("raw") or "").upper()
+    words = set(_WORD_SPLIT.split(text))
+    if words & CANCEL_WORDS:
+        return STREAM_CANCELLED
+    if words & ACK_WORDS:
+        return STREAM_ACKNOWLEDGED
+    return STREAM_TRIGGERED
+
+
+class AlarmStream:
+    """Fan-out event alarm ke banyak client SSE.
+
+    Tiap event di-encode sekali menjadi frame SSE dan disimpan di ring
+    STREAM_HISTORY slot; client hanya menyimpan posisi (id terakhir yang
+    terkirim), jadi publish() O(1) berapapun jumlah client. Frame yang belum
+    terkirim ke satu client dibatasi CLIENT_BUFFER: client yang tertinggal
+    lebih jauh (tidak membaca) diputus, bukan ditunggu.
+
+    Id event berbentuk "<boot>-<seq>". Client yang reconnect dengan
+    Last-Event-ID mendapat replay event yang terlewat; jika id berasal dari
+    boot lain atau tertinggal lebih dari CLIENT_BUFFER event, client
+    menerima event "reset" (ambil ulang state penuh) lalu lanjut dari event
+    terbaru.
+    """
+
+    def __init__(self, history=STREAM_HISTORY, client_buffer=CLIENT_BUFFER):
+        self.history = history
+        self.client_buffer = min(client_buffer, history)
+        self.boot = format(int(time.time() * 1000), "x")
+        self.seq = 0
+        self.closed = False
+        self.published = 0
+        self.subscribers = 0
+        self.dropped = 0
+        self._frames = [None] * history
+        self._cond = threading.Condition()
+
+    def publish(self, kind, data):
+        """Kirim satu event ke semua client; kembalikan id-nya"""
+        payload = json.dumps(data, separators=(",", ":"))
+        with self._cond:
+            self.seq += 1
+            event_id = f"{self.boot}-{self.seq}"
+            self._frames[self.seq % self.history] = \
+                f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n".encode("utf-8")
+            self.published += 1
+            self._cond.notify_all()
+            return event_id
+
+    def publish_events(self, events, kind=alarm_kind):
+        """kind: nama event, atau fungsi event -> nama event"""
+        for event in events:
+            self.publish(kind(event) if callable(kind) else kind, event)
+
+    def subscribe(self, last_event_id=None):
+        """Posisi awal client + frame pembuka (replay atau reset)"""
+        with self._cond:
+            self.subscribers += 1
+            cursor = self._resume(last_event_id)
+            if cursor is None:
+                reset = json.dumps({"last_id": f"{self.boot}-{self.seq}"})
+                return self.seq, [f"event: {STREAM_RESET}\ndata: {reset}\n\n".encode()]
+            return cursor, []
+
+    def _resume(self, last_event_id):
+        if not last_event_id:
+            return self.seq
+        boot, _, seq = last_event_id.partition("-")
+        try:
+            seq = int(seq)
+        except ValueError:
+            return None
+        # Lebih jauh dari client_buffer: wait() akan langsung memutus lagi, jadi reset
+        if boot != self.boot or seq > self.seq or self.seq - seq > self.client_buffer:
+            return None
+        return seq
+
+    def wait(self, cursor, timeout=HEARTBEAT_S):
+        """Blok sampai ada event setelah cursor.
+
+        Kembalikan (cursor baru, frame); frame kosong = timeout (kirim
+        heartbeat), None = client terlalu lambat atau stream ditutup.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > cursor or self.closed, timeout)
+            if self.closed:
+                return cursor, None
+            if self.seq - cursor > self.client_buffer:
+                self.dropped += 1
+                return cursor, None
+            frames = [self._frames[seq % self.history] for seq in range(cursor + 1, self.seq + 1)]
+            return self.seq, frames
+
+    def count_dropped(self):
+        with self._cond:
+            self.dropped += 1
+
+    def unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"stream_subscribers": self.subscribers, "stream_published": self.published,
+                    "stream_dropped": self.dropped}
+
+
+# ============================================
+# HANDLER HTTP
+# ============================================
+# POST path -> jenis event stream /events (None: diterima tanpa di-stream).
+# Route /api/... sama dengan server.js, jadi server ini bisa menjadi
+# pengganti lokal server pusat untuk alarm_forwarder.
+POST_ROUTES = {
+    "/emergency": alarm_kind,
+    "/api/alarm/trigger": STREAM_TRIGGERED,
+    "/api/alarm/cancel": STREAM_CANCELLED,
+    "/api/device/heartbeat": None,
+    "/api/device/register": None,
+}
+
 class TestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1: koneksi ESP tetap terbuka antar request (keep-alive)
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT_S
+    # Header dan body ditulis terpisah: tanpa ini Nagle + delayed ACK client
+    # menahan tiap balasan keep-alive ~40 ms
+    disable_nagle_algorithm = True
+
     def do_GET(self):
-        if self.path == '/status':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+        path = self.path.split("?", 1)[0]
+        if path == '/status':
             response = {
                 "status": "running",
                 "server": "Python Test Server",
                 "time": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "message": "Ready for ESP-01S connections"
             }
-            self.wfile.write(json.dumps(response).encode())
-        
-        elif self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
+            response.update(self.server.stats())
+            self.send_json(200, response)
+
+        elif path == '/events':
+            self.stream_events()
+
+        elif path == '/':
             html = """
             <html>
             <body>
@@ -27,39 +295,237 @@ class TestHandler(BaseHTTPRequestHandler):
                 <p>Server is running!</p>
                 <p>Endpoints:</p>
                 <ul>
-                    <li>POST /emergency - For ESP-01S emergency signal</li>
+                    <li>POST /emergency - For ESP-01S emergency signal (single event or batch)</li>
+                    <li>POST /api/alarm/trigger, /api/alarm/cancel, /api/device/heartbeat, /api/device/register - Central server API</li>
                     <li>GET /status - Check server status</li>
+                    <li>GET /events - Live alarm stream (Server-Sent Events)</li>
                 </ul>
                 <p>Time: """ + time.strftime("%Y-%m-%d %H:%M:%S") + """</p>
             </body>
             </html>
             """
-            self.wfile.write(html.encode())
-    
+            self.send_body(200, "text/html", html.encode())
+
+        else:
+            self.send_json(404, {"status": "error", "message": "Not found"})
+
     def do_POST(self):
-        if self.path == '/emergency':
+        path = self.path.split("?", 1)[0]
+        if path not in POST_ROUTES:
+            # Body tidak dibaca, koneksi tidak bisa dipakai ulang
+            self.send_json(404, {"status": "error", "message": "Not found"}, close=True)
+            return
+
+        if "chunked" in self.headers.get('Transfer-Encoding', '').lower():
+            self.send_json(411, {"status": "error", "message": "Content-Length required"}, close=True)
+            return
+        try:
             content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            print(f"Received emergency: {post_data.decode()}")
-            
+        except (TypeError, ValueError):
+            self.send_json(411, {"status": "error", "message": "Content-Length required"}, close=True)
+            return
+        if content_length < 0:
+            self.send_json(400, {"status": "error", "message": "Invalid Content-Length"}, close=True)
+            return
+        if content_length > MAX_BODY_BYTES:
+            self.send_json(413, {"status": "error",
+                                 "message": f"Body too large (max {MAX_BODY_BYTES} bytes)"}, close=True)
+            return
+
+        post_data = self.rfile.read(content_length)
+        try:
+            events = parse_events(post_data)
+        except ValueError as e:
+            self.server.count_rejected()
+            self.send_json(400, {"status": "error", "message": str(e)})
+            return
+
+        received_at = time.time()
+        for event in events:
+            event.setdefault("received_at", received_at)
+
+        if not self.server.submit(events, POST_ROUTES[path]):
+            # Backpressure: antrian penuh, device diminta mencoba lagi
+            self.send_json(503, {"status": "busy", "message": "Ingest queue full",
+                                 "retry_after": RETRY_AFTER_S},
+                           headers={"Retry-After": str(RETRY_AFTER_S)})
+            return
+
+        self.send_json(200, {
+            "status": "received",
+            "message": "Emergency signal received",
+            "timestamp": received_at,
+            "accepted": len(events)
+        })
+
+    def stream_events(self):
+        """GET /events: alarm triggered/cancelled/acknowledged sebagai Server-Sent Events"""
+        stream = self.server.stream
+        last_event_id = self.headers.get('Last-Event-ID')
+        if last_event_id is None and "lastEventId=" in self.path:
+            last_event_id = self.path.split("lastEventId=", 1)[1].split("&", 1)[0]
+        cursor, frames = stream.subscribe(last_event_id)
+        try:
             self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-type', "text/event-stream; charset=utf-8")
+            self.send_header('Cache-Control', "no-cache")
+            self.send_header('X-Accel-Buffering', "no")
+            self.send_header('Connection', 'close')
+            self.close_connection = True
             self.end_headers()
-            response = {
-                "status": "received",
-                "message": "Emergency signal received",
-                "timestamp": time.time()
-            }
-            self.wfile.write(json.dumps(response).encode())
+            # Client yang tidak membaca membuat sendall() blok: putus setelah SEND_TIMEOUT_S
+            self.connection.settimeout(SEND_TIMEOUT_S)
+            self.wfile.write(f"retry: {CLIENT_RETRY_MS}\n\n".encode() + b"".join(frames))
+            while True:
+                cursor, frames = stream.wait(cursor)
+                if frames is None:
+                    return
+                self.wfile.write(b"".join(frames) if frames else b": keepalive\n\n")
+        except TimeoutError:
+            stream.count_dropped()
+        except OSError:
+            pass
+        finally:
+            stream.unsubscribe()
+
+    def send_json(self, code, payload, headers=None, close=False):
+        self.send_body(code, "application/json", json.dumps(payload).encode(), headers, close)
+
+    def send_body(self, code, content_type, body, headers=None, close=False):
+        """Setiap respons membawa Content-Length supaya koneksi bisa dipakai ulang"""
+        self.send_response(code)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if close:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+# ============================================
+# SERVER INGEST
+# ============================================
+class IngestServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer dengan batas koneksi dan antrian event terbatas.
+
+    Tiap koneksi dilayani thread sendiri (keep-alive); event dari semua
+    koneksi masuk IngestQueue dan diproses satu worker per batch lewat
+    sink(events). Saat koneksi atau antrian penuh server membalas 503
+    dengan Retry-After, bukan menumpuk request di memori. Event yang
+    diterima langsung di-push ke client GET /events (AlarmStream).
+    """
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, server_address, handler_class=TestHandler, sink=print_events,
+                 queue_size=INGEST_QUEUE_SIZE, max_connections=MAX_CONNECTIONS, access_log=True):
+        super().__init__(server_address, handler_class)
+        self.sink = sink
+        self.access_log = access_log
+        self.events = IngestQueue(queue_size)
+        self.stream = AlarmStream()
+        self.accepted = 0
+        self.rejected = 0
+        self.busy = 0
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._active = 0
+        self._stats_lock = threading.Lock()
+        self._sink_thread = threading.Thread(target=self._sink_loop, name="ingest-sink", daemon=True)
+        self._sink_thread.start()
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self._reject_connection(request)
+            return
+        with self._stats_lock:
+            self._active += 1
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._stats_lock:
+                self._active -= 1
+            self._slots.release()
+
+    def _reject_connection(self, request):
+        with self._stats_lock:
+            self.busy += 1
+        body = json.dumps({"status": "busy", "message": "Too many connections",
+                           "retry_after": RETRY_AFTER_S}).encode()
+        head = (f"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nRetry-After: {RETRY_AFTER_S}\r\n"
+                f"Connection: close\r\n\r\n").encode()
+        try:
+            request.sendall(head + body)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def submit(self, events, kind=alarm_kind):
+        ok = self.events.offer(events)
+        with self._stats_lock:
+            if ok:
+                self.accepted += len(events)
+            else:
+                self.busy += 1
+        if ok and kind is not None:
+            self.stream.publish_events(events, kind)
+        return ok
+
+    def count_rejected(self):
+        with self._stats_lock:
+            self.rejected += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {"accepted": self.accepted, "rejected": self.rejected, "busy": self.busy,
+                    "connections": self._active, "queue_depth": len(self.events),
+                    "queue_size": self.events.maxsize, **self.stream.stats()}
+
+    def _sink_loop(self):
+        while True:
+            batch = self.events.drain()
+            if not batch:
+                return
+            try:
+                self.sink(batch)
+            except Exception as e:
+                print(f"Sink error: {e}", file=sys.stderr)
+
+    def server_close(self):
+        super().server_close()
+        self.events.close()
+        self.stream.close()
+
 
-def run_server():
-    server_address = ('', 8080)  # Listen on all interfaces, port 8080
-    httpd = HTTPServer(server_address, TestHandler)
-    print(f"Test server running on http://localhost:8080")
+def run_server(port=HTTP_PORT, host='', quiet=False):
+    server_address = (host, port)  # Listen on all interfaces, port 8080
+    sink = (lambda events: None) if quiet else print_events
+    httpd = IngestServer(server_address, sink=sink, access_log=not quiet)
+    print(f"Test server running on http://localhost:{port}")
     print(f"Access from ESP-01S using your PC's IP")
     print(f"Check your PC IP with: ipconfig (Windows) or ifconfig (Linux/Mac)")
-    httpd.serve_forever()
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
 
 if __name__ == '__main__':
-    run_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Emergency ingestion test server")
+    parser.add_argument("--port", type=int, default=HTTP_PORT)
+    parser.add_argument("--host", default='')
+    parser.add_argument("--quiet", action="store_true",
+                        help="Tanpa access log dan tanpa mencetak event (untuk benchmark)")
+    args = parser.parse_args()
+    run_server(args.port, args.host, args.quiet)
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Modul aplikasi ada di root repo (tanpa package), sama seperti benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.headless import headless_core
+
+
+@pytest.fixture
+def make_core():
+    """Buat HeadlessCore (log disimpan di core.messages); semua ditutup setelah test"""
+    cores = []
+
+    def make(**overrides):
+        core = headless_core(messages=[], **overrides)
+        cores.append(core)
+        return core
+
+    yield make
+    for core in cores:
+        core.close()
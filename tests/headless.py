@@ -0,0 +1,81 @@
+"""Core headless bersama untuk tests/ dan benchmarks/.
+
+HeadlessCore adalah AlarmCore asli tanpa file di data/ (cache port, event
+store, registry pasien dimatikan), tanpa metrics server, suara dan log.
+Test memakainya lewat fixture make_core (conftest.py), benchmark lewat
+`from tests.headless import ...`; yang butuh hook sendiri (hitung log,
+latency, handshake) cukup mewarisi HeadlessCore.
+"""
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_core import AlarmCore
+from event_store import EventStore
+from patient_registry import PatientRegistry
+from port_discovery import PortCache
+
+
+class HeadlessCore(AlarmCore):
+    """AlarmCore tanpa file, suara dan metrics server.
+
+    ports_dir: port dicari sebagai ttyUSB* di direktori itu (pty
+    esp_simulator) dan dibuka dengan port_opener(); None = port asli.
+    messages: list penampung log_message; None = log dibuang.
+    """
+
+    def __init__(self, ports_dir=None, messages=None, **overrides):
+        self.ports_dir = ports_dir
+        self.opener = None
+        if ports_dir is not None:
+            from benchmarks.esp_simulator import port_opener     # POSIX (pty), hanya untuk benchmark armada
+            self.opener = port_opener()
+        self.messages = messages
+        options = dict(metrics_port=0, port_cache=PortCache(path=None), event_store=EventStore(path=None),
+                       patients=PatientRegistry(json_path=None, csv_path=None))
+        options.update(overrides)
+        super().__init__(**options)
+
+    def log_message(self, message, color="black"):
+        if self.messages is not None:
+            self.messages.append(message)
+
+    def request_alarm_sound(self, trace=None, layer="alarm"):
+        pass
+
+    def request_stop_sound(self, layer=None):
+        pass
+
+    def find_serial_ports(self):
+        if self.ports_dir is None:
+            return super().find_serial_ports()
+        return sorted(glob.glob(os.path.join(self.ports_dir, "ttyUSB*")))
+
+    def open_serial_port(self, port):
+        if self.opener is None:
+            return super().open_serial_port(port)
+        return self.opener(port)
+
+    def close(self):
+        """Hentikan worker dan tutup port; tanpa jeda/PC_SHUTDOWN seperti shutdown()"""
+        self.running = False
+        self._stop_event.set()
+        self.supervisor.stop()
+        self.patients.stop()
+        if self.vitals is not None:
+            self.vitals.stop()
+        self.diagnostics.stop()
+        self.commands.close()
+        if self.multiplexer:
+            self.multiplexer.close()
+        for conn in [link.conn for link in list(self.links.values())] + [self.serial_conn]:
+            if conn is not None:
+                conn.close()
+        self.sound_queue.put(None)
+
+
+def headless_core(**overrides):
+    """HeadlessCore dengan argumen AlarmCore (atau ports_dir/messages) yang diganti"""
+    return HeadlessCore(**overrides)
@@ -0,0 +1,91 @@
+"""Corpus baris serial + salinan rantai cek lama process_serial_line.
+
+Dipakai tests/test_line_classifier.py (kesetaraan) dan
+benchmarks/bench_line_classifier.py (kecepatan).
+"""
+import json
+
+from line_classifier import (
+    KIND_AUTO, KIND_CANCEL, KIND_COMMAND, KIND_EMERGENCY, KIND_INFO,
+    KIND_JSON_ALARM, KIND_STATUS, KIND_UNKNOWN,
+)
+
+# (baris, kind yang diharapkan) - format yang ditangani process_serial_line
+CORPUS = [
+    ("!ALARM_START!", KIND_EMERGENCY),
+    ("!ALARM_STOP!", KIND_CANCEL),
+    ("EMERGENCY", KIND_EMERGENCY),
+    ("emergency button pressed", KIND_EMERGENCY),
+    ("🚨 EMERGENCY! Sending alarm to PC", KIND_EMERGENCY),
+    ("Emergency cancelled", KIND_EMERGENCY),
+    ('{"command":"PLAY_ALARM","patient":"Budi","room":"101","device_id":"ESP-101"}', KIND_JSON_ALARM),
+    ('{"command": "PLAY_ALARM"}', KIND_JSON_ALARM),
+    ('{"command":"PLAY\\u005fALARM"}', KIND_JSON_ALARM),
+    ('{"command":"STOP_ALARM"}', KIND_CANCEL),
+    ('{"command":"play_alarm"}', KIND_AUTO),
+    ('{"command":"PLAY_ALARM"', KIND_AUTO),
+    ('{"status":"ok"}', KIND_UNKNOWN),
+    ("{not json but STOP}", KIND_CANCEL),
+    ("CANCEL", KIND_CANCEL),
+    ("Alarm cancel requested", KIND_CANCEL),
+    ("stop", KIND_CANCEL),
+    ("STOPLAY_ALARM", KIND_CANCEL),
+    ("CMD:PLAY_SOUND", KIND_COMMAND),
+    ("CMD:RESET", KIND_COMMAND),
+    ("CMD:alarm", KIND_COMMAND),
+    ("PLAY_SOUND", KIND_COMMAND),
+    ("PLAY_SOUND:siren", KIND_COMMAND),
+    ("STATUS: OK, RSSI=-61, BATTERY=87", KIND_STATUS),
+    ("STATUS:ALARM_ACTIVE", KIND_STATUS),
+    ("STATUS:", KIND_STATUS),
+    ("✅ WiFi connected", KIND_INFO),
+    ("🔘 Button pressed", KIND_INFO),
+    ("📤 Sent to PC: ALARM", KIND_INFO),
+    ("🤝 Handshake sent", KIND_INFO),
+    ("Button pressed", KIND_AUTO),
+    ("BUTTON PRESSED", KIND_AUTO),
+    ("alarm", KIND_AUTO),
+    ("Trigger received", KIND_AUTO),
+    ("ALARM_ACKNOWLEDGED", KIND_AUTO),
+    ("=== HANDSHAKE ===", KIND_UNKNOWN),
+    ("DEVICE_ID: ESP8266-ROOM-101", KIND_UNKNOWN),
+    ("PATIENT: Budi Santoso", KIND_UNKNOWN),
+    ("ROOM: 101", KIND_UNKNOWN),
+    ("=== END_HANDSHAKE ===", KIND_UNKNOWN),
+    ("Heap: 41234", KIND_UNKNOWN),
+    ("ets Jan  8 2013,rst cause:2, boot mode:(3,6)", KIND_UNKNOWN),
+    ("straße", KIND_UNKNOWN),
+    ("ﬆop", KIND_CANCEL),
+]
+
+
+def legacy_classify(line):
+    """Salinan rantai cek lama, dikembalikan sebagai (kind, data)"""
+    if line == "!ALARM_START!" or "EMERGENCY" in line.upper():
+        return KIND_EMERGENCY, None
+
+    if line.startswith('{') and line.endswith('}'):
+        try:
+            data = json.loads(line)
+            if data.get("command") == "PLAY_ALARM":
+                return KIND_JSON_ALARM, data
+        except json.JSONDecodeError:
+            pass
+
+    if line == "!ALARM_STOP!" or "CANCEL" in line.upper() or "STOP" in line.upper():
+        return KIND_CANCEL, None
+
+    if line.startswith("CMD:") or line.startswith("PLAY_SOUND"):
+        return KIND_COMMAND, None
+
+    if line.startswith("STATUS:"):
+        return KIND_STATUS, line[7:].strip()
+
+    if any(keyword in line for keyword in ["✅", "🚨", "🔘", "📤", "🤝"]):
+        return KIND_INFO, None
+
+    emergency_keywords = ["BUTTON PRESSED", "EMERGENCY BUTTON", "ALARM", "TRIGGER"]
+    if any(keyword in line.upper() for keyword in emergency_keywords):
+        return KIND_AUTO, {"message": line}
+
+    return KIND_UNKNOWN, None
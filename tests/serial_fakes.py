@@ -0,0 +1,46 @@
+import time
+
+from port_discovery import PING
+
+BOOT_S = 0.1
+BOOT_ROM = b"\x00\xe0ets Jan  8 2013,rst cause:2, boot mode:(3,6)\r\n"
+HANDSHAKE = (b"=== HANDSHAKE ===\nDEVICE_ID: ESP8266-101\nPATIENT: Budi\nROOM: 204\n"
+             b"=== END_HANDSHAKE ===\n")
+
+
+class FakePort:
+    """Port palsu: output boot ROM saat dibuka, PING sebelum boot selesai hilang"""
+
+    def __init__(self, reply=b"PONG\n", boot_output=BOOT_ROM, chatter=None):
+        self.is_open = True
+        self.timeout = 1
+        self.writes = []
+        self.reply = reply
+        self.chatter = chatter
+        self._booted_at = time.perf_counter() + BOOT_S
+        self._data = bytearray(boot_output)
+
+    @property
+    def in_waiting(self):
+        return len(self._data)
+
+    def read(self, size=1):
+        if not self._data:
+            time.sleep(min(self.timeout, 0.01))
+            if self.chatter:
+                self._data += self.chatter
+        chunk = bytes(self._data[:size])
+        del self._data[:size]
+        return chunk
+
+    def write(self, data):
+        self.writes.append(data)
+        if data == PING and self.reply and time.perf_counter() >= self._booted_at:
+            self._data += self.reply
+        return len(data)
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
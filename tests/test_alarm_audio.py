@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+import alarm_audio
+from alarm_audio import AlarmAudio, AudioUnavailable, NullBackend
+
+
+def test_default_backend_never_falls_back_to_null(monkeypatch):
+    monkeypatch.setattr(alarm_audio.sys, "platform", "linux")
+    monkeypatch.setattr(alarm_audio.SubprocessBackend, "available_player", classmethod(lambda cls: None))
+    with pytest.raises(AudioUnavailable):
+        alarm_audio.default_backend()
+    with pytest.raises(AudioUnavailable):
+        AlarmAudio()
+
+
+def test_null_backend_only_when_injected():
+    backend = NullBackend()
+    engine = AlarmAudio(backend)
+    engine.start()
+    assert backend.starts == 1
+    engine.close()
+
+
+class SlowBackend(NullBackend):
+    """prepare() lambat seperti winsound (tulis file temp), dihitung per kombinasi"""
+
+    def __init__(self):
+        super().__init__()
+        self.prepared = []
+
+    def prepare(self, pcm):
+        self.prepared.append(pcm)
+        time.sleep(0.05)
+        return pcm
+
+
+def test_warm_up_and_start_prepare_each_mix_once():
+    backend = SlowBackend()
+    engine = AlarmAudio(backend)
+    # Warm-up sedang menyiapkan alarm+beep / alarm+urgent di background
+    engine.start()
+    engine.start("urgent")
+    deadline = time.monotonic() + 5
+    while len(backend.prepared) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    engine.close()
+    assert len(backend.prepared) == len(engine._prepared) == 3
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+
+class Conn:
+    is_open = True
+
+    def close(self):
+        self.is_open = False
+
+
+def link(index):
+    return SimpleNamespace(port=f"/dev/ttyUSB{index}", conn=Conn(),
+                           handshake_data={"DEVICE_ID": f"ESP8266-{index:03d}"})
+
+
+def fleet(make_core, count=3):
+    core = make_core(multi_link=True, dedup_window=0)
+    links = [link(i) for i in range(count)]
+    for item in links:
+        core.links[item.port] = item
+    sent = []
+    core.commands.send = lambda message, target=None, key=None, priority=None: sent.append((message, target.port))
+    return core, links, sent
+
+
+def test_ack_goes_only_to_originating_esp(make_core):
+    core, links, sent = fleet(make_core)
+    core.process_serial_line("!ALARM_START!", links[1].handshake_data, links[1])
+    assert sent == [("ALARM_ACKNOWLEDGED", links[1].port)]
+
+
+def test_portless_alarm_is_not_acknowledged_to_any_esp(make_core):
+    core, links, sent = fleet(make_core)
+    core.handle_emergency_start("Manual Test", {"device_id": "TEST_DEVICE"})
+    assert "TEST_DEVICE" in core.registry.alarms
+    assert sent == []
+
+
+def test_stop_ack_goes_only_to_originating_esp(make_core):
+    core, links, sent = fleet(make_core)
+    core.process_serial_line("!ALARM_START!", links[2].handshake_data, links[2])
+    core.handle_emergency_start("Manual Test", {"device_id": "TEST_DEVICE"})
+    sent.clear()
+    core.stop_alarm()
+    assert sent == [("ALARM_STOPPED_ACK", links[2].port)]
+    assert not core.registry.alarms
+
+
+class Forwarded:
+    def __init__(self):
+        self.calls = []
+
+    def trigger(self, device, **fields):
+        self.calls.append(("trigger", device, fields))
+
+    def cancel(self, device, **fields):
+        self.calls.append(("cancel", device, fields))
+
+
+def test_manual_test_alarm_is_not_forwarded(make_core):
+    core, links, sent = fleet(make_core)
+    core.forwarder = Forwarded()
+    core.test_alarm()
+    core.process_serial_line("!ALARM_START!", links[0].handshake_data, links[0])
+    core.stop_alarm()
+    assert [(kind, device) for kind, device, _ in core.forwarder.calls] == [
+        ("trigger", "ESP8266-000"), ("cancel", "ESP8266-000")]
+    assert core.forwarder.calls[1][2]["duration_s"] >= 0
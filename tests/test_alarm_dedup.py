@@ -0,0 +1,76 @@
+from alarm_registry import DEDUP_START, DEDUP_STOP, AlarmDeduplicator
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+# ============================================
+# DEDUP
+# ============================================
+def test_duplicate_inside_window_is_coalesced():
+    clock = Clock()
+    dedup = AlarmDeduplicator(window=2.0, clock=clock)
+    assert dedup.admit("ESP-1", DEDUP_START) == (True, 0)
+    clock.now += 0.5
+    assert dedup.admit("ESP-1", DEDUP_START) == (False, 0)
+    clock.now += 1.0
+    assert dedup.admit("ESP-1", DEDUP_START) == (False, 0)
+    assert dedup.coalesced == 2
+
+
+def test_trigger_outside_window_is_admitted_with_repeat_count():
+    clock = Clock()
+    dedup = AlarmDeduplicator(window=2.0, clock=clock)
+    dedup.admit("ESP-1", DEDUP_START)
+    dedup.admit("ESP-1", DEDUP_START)
+    clock.now += 2.0
+    assert dedup.admit("ESP-1", DEDUP_START) == (True, 1)
+    clock.now += 2.5
+    assert dedup.admit("ESP-1", DEDUP_START) == (True, 0)
+
+
+def test_devices_and_actions_have_separate_windows():
+    dedup = AlarmDeduplicator(window=2.0, clock=Clock())
+    assert dedup.admit("ESP-1", DEDUP_START)[0]
+    assert dedup.admit("ESP-2", DEDUP_START)[0]
+    assert dedup.admit("ESP-1", DEDUP_STOP)[0]
+
+
+def test_forget_reopens_window_after_stop():
+    dedup = AlarmDeduplicator(window=2.0, clock=Clock())
+    dedup.admit("ESP-1", DEDUP_START)
+    dedup.admit("ESP-1", DEDUP_START)
+    assert dedup.forget("ESP-1", DEDUP_START) == 1
+    assert dedup.admit("ESP-1", DEDUP_START) == (True, 0)
+
+
+def test_lru_bounds_memory():
+    clock = Clock()
+    dedup = AlarmDeduplicator(window=2.0, max_keys=3, clock=clock)
+    for n in range(5):
+        dedup.admit(f"ESP-{n}", DEDUP_START)
+    assert len(dedup) == 3 and dedup.evicted == 2
+    # Key yang dibuang LRU diproses lagi, tidak pernah tertelan
+    assert dedup.admit("ESP-0", DEDUP_START)[0]
+
+
+# ============================================
+# CORE: TRIGGER BERULANG
+# ============================================
+def test_core_coalesces_repeated_triggers_until_stop(make_core):
+    core = make_core(dedup_window=60)
+    data = {"device_id": "ESP-1", "patient": "Budi", "room": "101"}
+    for _ in range(3):
+        core.handle_emergency_start("Button Press", data)
+    assert core.registry.active_count == 1 and core.dedup.coalesced == 2
+
+    core.stop_device_alarm(core.registry.alarm("ESP-1"))
+    assert core.registry.active_count == 0
+    # Setelah stop jendela ditutup: alarm baru langsung diproses
+    core.handle_emergency_start("Button Press", data)
+    assert core.registry.alarm("ESP-1") is not None
@@ -0,0 +1,133 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import alarm_forwarder
+from alarm_forwarder import PATH_HEARTBEAT, PATH_REGISTER, PATH_TRIGGER, AlarmForwarder, DiskSpool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.received.append((self.path, body))
+        data = b'{"status":"received"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class Central:
+    """Pengganti server.js yang mencatat (path, body) tiap POST"""
+
+    def __init__(self, port=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.received = []
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def received(self):
+        return self.server.received
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(alarm_forwarder, "RETRY_MIN_S", 0.05)
+    monkeypatch.setattr(alarm_forwarder, "RETRY_MAX_S", 0.1)
+
+
+def test_disabled_forwarder_is_idle():
+    forwarder = AlarmForwarder(url=None)
+    assert forwarder.trigger("ESP8266-001") == 0
+    assert forwarder.backlog == 0
+    assert forwarder.wait_idle(0)
+    forwarder.close()
+
+
+def test_spool_resumes_after_restart_and_drops_torn_tail(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    spool.append([{"n": n} for n in range(5)])
+    records = spool.read(limit=2)
+    spool.commit(records[-1][1], len(records))
+    spool.close()
+    with open(tmp_path / "spool.jsonl", "ab") as f:
+        f.write(b'{"n": 5')
+
+    spool = DiskSpool(str(tmp_path))
+    assert spool.count == 3
+    assert [record["n"] for record, _ in spool.read()] == [2, 3, 4]
+    spool.prepend([{"n": 1}])
+    assert spool.count == 4
+    records = spool.read()
+    spool.commit(records[-1][1], len(records))
+    assert spool.count == spool.pending == 0
+    spool.close()
+
+
+def test_events_queued_while_offline_are_replayed_in_order(tmp_path, fast_retry):
+    port = free_port()
+    forwarder = AlarmForwarder(f"http://127.0.0.1:{port}", spool_dir=str(tmp_path), memory_events=2,
+                               heartbeat_interval=60)
+    central = None
+    try:
+        for n in range(6):
+            forwarder.trigger("ESP8266-001", n=n)
+        assert wait_until(lambda: not forwarder.online)
+        assert forwarder.backlog == 6
+        assert forwarder.stats()["spool_events"] == 6
+
+        central = Central(port)
+        assert forwarder.wait_idle(5)
+        assert forwarder.backlog == 0
+        assert [body["n"] for path, body in central.received if path == PATH_TRIGGER] == list(range(6))
+        assert forwarder.stats()["replayed"] == 6
+    finally:
+        forwarder.close()
+        if central is not None:
+            central.stop()
+
+
+def test_first_heartbeat_registers_device_with_dashboard_fields(tmp_path):
+    central = Central()
+    forwarder = AlarmForwarder(f"http://127.0.0.1:{central.port}", spool_dir=str(tmp_path),
+                               heartbeat_interval=0.05)
+    try:
+        forwarder.heartbeat("ESP8266-101", patient="Budi", room="204", port="COM3")
+        assert wait_until(lambda: len(central.received) == 1)
+        forwarder.heartbeat("ESP8266-101", room="204", port="COM3")
+        assert wait_until(lambda: len(central.received) == 2)
+    finally:
+        forwarder.close()
+        central.stop()
+    (first_path, first), (second_path, second) = central.received
+    assert (first_path, second_path) == (PATH_REGISTER, PATH_HEARTBEAT)
+    assert first["room_number"] == "204" and first["ip_address"] == "serial:COM3"
+    assert second["status"] == "online" and second["ip_address"] == "serial:COM3"
@@ -0,0 +1,85 @@
+import threading
+from types import SimpleNamespace
+
+from alarm_registry import AlarmRegistry
+
+
+# ============================================
+# REGISTRY
+# ============================================
+def test_start_ack_stop_ordering():
+    registry = AlarmRegistry()
+    first, is_new = registry.start("ESP-1", "Budi", "101", "COM3", "Button Press")
+    assert is_new and not first.acknowledged
+    assert registry.start("ESP-1", "Budi", "101", "COM3", "Button Press") == (first, False)
+    second, _ = registry.start("ESP-2", "Sari", "101", "COM4", "JSON Command")
+
+    assert registry.acknowledge("ESP-1") is first and first.acknowledged
+    acknowledged_at = first.acknowledged_at
+    registry.acknowledge("ESP-1")
+    assert first.acknowledged_at == acknowledged_at
+
+    assert registry.active_alarms() == [first, second]
+    assert registry.latest_alarm() is second
+    assert registry.alarms_in_room("101") == [first, second]
+
+    assert registry.stop("ESP-1") is first
+    assert registry.stop("ESP-1") is None
+    assert registry.acknowledge("ESP-1") is None
+    assert registry.alarms_in_room("101") == [second]
+    assert registry.alarm_for_port("COM3") is None
+    assert registry.alarm_for_port("COM4") is second
+
+    registry.stop("ESP-2")
+    assert registry.active_count == 0 and not registry.room_alarms and not registry.port_alarms
+
+
+def test_alarm_for_port_prefers_handshake_device():
+    registry = AlarmRegistry()
+    registry.update_device("ESP-1", "Budi", "101", "COM3")
+    other, _ = registry.start("Unknown@COM3", "Unknown", "Unknown", "COM3", "Auto-detected")
+    assert registry.alarm_for_port("COM3") is other
+    own, _ = registry.start("ESP-1", "Budi", "101", "COM3", "Button Press")
+    assert registry.alarm_for_port("COM3") is own
+
+
+def test_concurrent_start_creates_one_alarm_per_device():
+    registry = AlarmRegistry()
+    barrier = threading.Barrier(2)
+    results = [[], []]
+
+    def worker(index):
+        barrier.wait()
+        for n in range(2000):
+            record, is_new = registry.start(f"ESP-{n}", "Patient", f"{n % 10}", "COM3", f"thread {index}")
+            results[index].append((record, is_new))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for n in range(2000):
+        (a, a_new), (b, b_new) = results[0][n], results[1][n]
+        assert a is b and a_new != b_new
+    assert registry.active_count == 2000
+    assert sum(len(alarms) for alarms in registry.room_alarms.values()) == 2000
+
+
+# ============================================
+# CORE: ALARM PER DEVICE
+# ============================================
+def test_core_stop_from_one_port_keeps_other_alarms(make_core):
+    core = make_core(multi_link=True, dedup_window=0)
+    links = [SimpleNamespace(port=f"/dev/ttyUSB{i}", conn=SimpleNamespace(is_open=True, close=lambda: None),
+                             handshake_data={"DEVICE_ID": f"ESP-{i}"}) for i in range(2)]
+    for link in links:
+        core.links[link.port] = link
+        core.process_serial_line("!ALARM_START!", link.handshake_data, link)
+    assert [record.device_id for record in core.registry.active_alarms()] == ["ESP-0", "ESP-1"]
+    assert all(record.acknowledged for record in core.registry.active_alarms())
+
+    core.process_serial_line("!ALARM_STOP!", links[0].handshake_data, links[0])
+    assert [record.device_id for record in core.registry.active_alarms()] == ["ESP-1"]
+    assert core.registry.alarm_for_port(links[1].port).device_id == "ESP-1"
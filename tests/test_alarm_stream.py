@@ -0,0 +1,85 @@
+import pytest
+
+from test_server import (
+    STREAM_ACKNOWLEDGED, STREAM_CANCELLED, STREAM_RESET, STREAM_TRIGGERED, AlarmStream, alarm_kind,
+)
+
+
+def publish(stream, count):
+    return [stream.publish("alarm_triggered", {"n": n}) for n in range(count)]
+
+
+def is_reset(frames):
+    return len(frames) == 1 and frames[0].startswith(f"event: {STREAM_RESET}\n".encode())
+
+
+def test_new_client_starts_at_latest_event():
+    stream = AlarmStream(history=16, client_buffer=4)
+    publish(stream, 3)
+    assert stream.subscribe() == (3, [])
+
+
+def test_resume_replays_missed_events_within_buffer():
+    stream = AlarmStream(history=16, client_buffer=4)
+    ids = publish(stream, 6)
+    cursor, frames = stream.subscribe(ids[1])
+    assert (cursor, frames) == (2, [])
+    cursor, frames = stream.wait(cursor, timeout=0)
+    assert cursor == 6
+    assert [frame.split(b"\n", 1)[0] for frame in frames] == [f"id: {id_}".encode() for id_ in ids[2:]]
+
+
+def test_resume_too_far_behind_resets_instead_of_looping():
+    stream = AlarmStream(history=16, client_buffer=4)
+    ids = publish(stream, 10)
+    for _ in range(3):
+        # Masih di ring, tapi lebih dari client_buffer: dulu diputus di tiap reconnect
+        cursor, frames = stream.subscribe(ids[2])
+        assert cursor == 10 and is_reset(frames)
+        assert stream.wait(cursor, timeout=0) == (10, [])
+    assert stream.dropped == 0
+
+
+def test_dropped_client_reconnects_with_reset():
+    stream = AlarmStream(history=16, client_buffer=4)
+    cursor, _ = stream.subscribe()
+    publish(stream, 6)
+    assert stream.wait(cursor, timeout=0) == (cursor, None)
+    assert stream.dropped == 1
+    cursor, frames = stream.subscribe(f"{stream.boot}-{cursor}")
+    assert cursor == 6 and is_reset(frames)
+    publish(stream, 1)
+    cursor, frames = stream.wait(cursor, timeout=0)
+    assert cursor == 7 and len(frames) == 1
+
+
+def test_unknown_boot_or_future_id_resets():
+    stream = AlarmStream(history=16, client_buffer=4)
+    publish(stream, 2)
+    for last_event_id in ("0-1", f"{stream.boot}-99", f"{stream.boot}-x"):
+        cursor, frames = stream.subscribe(last_event_id)
+        assert cursor == 2 and is_reset(frames)
+
+
+@pytest.mark.parametrize("text, kind", [
+    ("EMERGENCY", STREAM_TRIGGERED),
+    ("ALARM_START", STREAM_TRIGGERED),
+    ("BACK", STREAM_TRIGGERED),
+    ("STACK overflow", STREAM_TRIGGERED),
+    ("feedback", STREAM_TRIGGERED),
+    ("ACK", STREAM_ACKNOWLEDGED),
+    ("alarm_acknowledged", STREAM_ACKNOWLEDGED),
+    ("ALARM_ACKNOWLEDGED", STREAM_ACKNOWLEDGED),
+    ("ALARM_STOP", STREAM_CANCELLED),
+    ("ALARM_STOPPED_ACK", STREAM_CANCELLED),
+    ("cancel", STREAM_CANCELLED),
+    ("alarm_cancelled", STREAM_CANCELLED),
+])
+def test_alarm_kind_matches_whole_words(text, kind):
+    assert alarm_kind({"event": text}) == kind
+
+
+def test_alarm_kind_falls_back_to_action_and_raw():
+    assert alarm_kind({"action": "stop"}) == STREAM_CANCELLED
+    assert alarm_kind({"raw": "!ALARM_START!"}) == STREAM_TRIGGERED
+    assert alarm_kind({}) == STREAM_TRIGGERED
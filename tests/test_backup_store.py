@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+from backup_store import BackupStore, _render, compact
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def backup(devices):
+    return _render({"devices": devices, "settings": {"interval": 30}})
+
+
+def test_structured_snapshot_round_trips(tmp_path):
+    store = BackupStore(str(tmp_path / "store"), fsync=False)
+    data = backup([{"id": "ESP8266-ROOM-101", "status": "connected"}])
+    snapshot = store.add(data, 1, "backup-1.json")
+    assert snapshot.raw is None
+    assert store.restore(name="backup-1.json") == data
+    store.close()
+
+
+def test_lone_surrogate_is_stored_raw(tmp_path):
+    store = BackupStore(str(tmp_path / "store"), fsync=False)
+    data = b'{"a":"\\ud800"}'
+    assert json.loads(data) == {"a": "\ud800"}
+    snapshot = store.add(data, 1, "x.json")
+    assert snapshot.raw is not None
+    assert store.restore(name="x.json") == data
+    store.close()
+
+
+def test_compact_batch_with_lone_surrogate(tmp_path):
+    files = {
+        "backup-1000.json": backup([{"id": "ESP8266-ROOM-101"}]),
+        "backup-2000.json": b'{\n  "devices": [\n    {\n      "id": "\\ud800"\n    }\n  ]\n}',
+        "backup-3000.json": backup([{"id": "ESP8266-ROOM-102"}]),
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+    assert compact(str(tmp_path))[0] == 3
+    assert not list(tmp_path.glob("backup-*.json"))
+    store = BackupStore(str(tmp_path / "store"), fsync=False)
+    for name, data in files.items():
+        assert store.restore(name=name) == data
+    store.close()
+
+
+def test_restore_to_stdout_is_byte_identical(tmp_path):
+    data = backup([{"id": "ESP8266-ROOM-101"}])
+    (tmp_path / "backup-1000.json").write_bytes(data)
+    compact(str(tmp_path))
+    output = subprocess.run([sys.executable, os.path.join(ROOT, "backup_store.py"), "--dir", str(tmp_path),
+                             "restore", "backup-1000.json"], capture_output=True, check=True).stdout
+    assert output == data
@@ -0,0 +1,80 @@
+import json
+
+from binary_frames import (
+    FRAME_TEXT, FrameDecoder, FrameEncoder, encode_frame, frame_supported,
+)
+from serial_link import LineFramer
+
+
+def decode_bytewise(data):
+    decoder = FrameDecoder()
+    lines = []
+    for i in range(len(data)):
+        lines += decoder.feed(data[i:i + 1])
+    return decoder, lines
+
+
+def test_round_trip_of_every_frame_type():
+    encoder = FrameEncoder()
+    data = b"".join([
+        encoder.emergency(), encoder.cancel(), encoder.alarm(room="204"),
+        encoder.status(-61, 87, 3600), encoder.command("CMD:PLAY_SOUND"),
+        encoder.text("=== HANDSHAKE ==="), encoder.heartbeat(),
+    ])
+    decoder = FrameDecoder()
+    lines = decoder.feed(data)
+    assert lines[:2] == ["!ALARM_START!", "!ALARM_STOP!"]
+    assert json.loads(lines[2]) == {"command": "PLAY_ALARM", "room": "204"}
+    assert lines[3:] == ["STATUS: RSSI=-61, BATTERY=87, UPTIME=3600", "CMD:PLAY_SOUND", "=== HANDSHAKE ==="]
+    assert (decoder.frames, decoder.heartbeats, decoder.errors) == (7, 1, [])
+
+
+def test_frames_split_across_reads_and_mixed_with_text():
+    encoder = FrameEncoder()
+    data = b"INFO: boot\n" + encoder.emergency() + b"Button released\n" + encoder.cancel()
+    decoder, lines = decode_bytewise(data)
+    assert lines == ["INFO: boot", "!ALARM_START!", "Button released", "!ALARM_STOP!"]
+    assert decoder.text_lines == 2 and decoder.pending == 0
+
+
+def test_crc_error_drops_only_the_damaged_frame():
+    encoder = FrameEncoder()
+    start = encoder.emergency()
+    damaged = bytearray(encoder.text("PATIENT: Budi"))
+    damaged[-3] ^= 0xFF
+    decoder = FrameDecoder()
+    lines = decoder.feed(start + bytes(damaged) + encoder.cancel())
+    assert lines == ["!ALARM_START!", "!ALARM_STOP!"]
+    assert decoder.corrupt == 1
+    errors = decoder.take_errors()
+    assert errors[0].startswith("CRC mismatch (frame type 0x06, seq 1)")
+    assert "1 frame(s) lost before seq 2" in errors
+    assert decoder.take_errors() == []
+
+
+def test_broken_sync_and_oversized_length_resync_on_next_frame():
+    good = encode_frame(FRAME_TEXT, 0, b"ok")
+    bad_sync = b"\xA5\x00" + good[2:]
+    too_long = b"\xA5\x5A\x06\x00\x00\xFF\xFF"
+    decoder = FrameDecoder()
+    assert decoder.feed(bad_sync + too_long + good) == ["ok"]
+    assert decoder.corrupt >= 2
+    assert any(error.startswith("Frame sync lost") for error in decoder.take_errors())
+
+
+def test_sequence_gap_duplicate_and_wrap():
+    decoder = FrameDecoder()
+    lines = decoder.feed(encode_frame(FRAME_TEXT, 0xFFFF, b"a") + encode_frame(FRAME_TEXT, 0, b"b")
+                         + encode_frame(FRAME_TEXT, 0, b"b") + encode_frame(FRAME_TEXT, 3, b"c"))
+    assert lines == ["a", "b", "c"]
+    assert (decoder.duplicates, decoder.lost) == (1, 2)
+    decoder.reset_sequence()
+    assert decoder.feed(encode_frame(FRAME_TEXT, 9, b"d")) == ["d"] and decoder.lost == 2
+
+
+def test_pending_text_is_carried_over_from_line_framer():
+    framer = LineFramer()
+    assert framer.feed(b"=== END_HANDSHAKE ===\nSTATUS: bo") == ["=== END_HANDSHAKE ==="]
+    decoder = FrameDecoder(previous=framer)
+    assert decoder.feed(b"ot\n") == ["STATUS: boot"]
+    assert frame_supported({"FRAMING": "text, bin1"}) and not frame_supported({})
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from command_queue import CommandQueue, parse_cmd_ack
+
+
+class Writer:
+    """write() palsu: mencatat data; hold() menahan tiap write sampai step()"""
+
+    def __init__(self):
+        self.data = []
+        self.entered = 0
+        self._permits = None
+
+    def __call__(self, link, data):
+        self.entered += 1
+        permits = self._permits
+        if permits is not None:
+            permits.acquire(timeout=5)
+        self.data.append(data.decode("utf-8").strip())
+
+    def hold(self):
+        self._permits = threading.Semaphore(0)
+
+    def step(self, count=1):
+        self._permits.release(count)
+
+    def free(self):
+        permits, self._permits = self._permits, None
+        if permits is not None:
+            permits.release(100)
+
+
+@pytest.fixture
+def writer():
+    return Writer()
+
+
+def make_queue(writer, **options):
+    options.setdefault("retransmit", 0.05)
+    return CommandQueue(writer, **options)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_critical_messages_jump_ahead_of_status(writer):
+    queue = make_queue(writer)
+    writer.hold()
+    queue.send("STATUS_REQUEST")
+    assert wait_until(lambda: writer.entered == 1)
+    queue.send("GET_STATUS")
+    queue.send("PC_CONTROLLER_READY")
+    queue.send("ALARM_ACKNOWLEDGED")
+    writer.free()
+    assert queue.flush(5)
+    queue.close()
+    assert writer.data == ["STATUS_REQUEST", "ALARM_ACKNOWLEDGED", "PC_CONTROLLER_READY", "GET_STATUS"]
+
+
+def test_repeat_of_last_queued_message_is_coalesced(writer):
+    queue = make_queue(writer)
+    writer.hold()
+    queue.send("STATUS_REQUEST")
+    assert wait_until(lambda: writer.entered == 1)
+    assert queue.send("ALARM_ACKNOWLEDGED")
+    assert not queue.send("ALARM_ACKNOWLEDGED")
+    # Bukan pesan terakhir: urutan ACK -> STOPPED_ACK -> ACK tetap utuh
+    assert queue.send("ALARM_STOPPED_ACK")
+    assert queue.send("ALARM_ACKNOWLEDGED")
+    writer.free()
+    assert queue.flush(5)
+    queue.close()
+    assert writer.data == ["STATUS_REQUEST", "ALARM_ACKNOWLEDGED", "ALARM_STOPPED_ACK", "ALARM_ACKNOWLEDGED"]
+    assert queue.coalesced == 1
+
+
+def test_critical_message_is_retransmitted_until_cmd_ack(writer):
+    queue = make_queue(writer)
+    queue.enable_acks("COM3")
+    queue.send("ALARM_ACKNOWLEDGED", key="COM3")
+    assert wait_until(lambda: len(writer.data) >= 2)
+    assert queue.confirm("COM3", parse_cmd_ack("CMD_ACK:1")) is not None
+    count = len(writer.data)
+    time.sleep(0.2)
+    queue.close()
+    assert len(writer.data) == count
+    assert set(writer.data) == {"ALARM_ACKNOWLEDGED #1"}
+    assert queue.stats()["confirmed"] == 1 and queue.retransmits >= 1
+
+
+def test_unconfirmed_message_expires_after_max_attempts(writer):
+    expired = []
+    queue = make_queue(writer, max_attempts=2, on_expired=expired.append)
+    queue.enable_acks("COM3")
+    queue.send("ALARM_STOPPED_ACK", key="COM3")
+    assert wait_until(lambda: expired)
+    queue.close()
+    assert writer.data == ["ALARM_STOPPED_ACK #1"] * 2
+    assert expired[0].seq == 1 and queue.expired == 1
+    assert queue.awaiting == 0
+
+
+def test_superseded_message_is_not_retransmitted(writer):
+    queue = make_queue(writer, retransmit=0.1)
+    queue.enable_acks("COM3")
+    queue.send("ALARM_ACKNOWLEDGED", key="COM3")
+    assert wait_until(lambda: len(writer.data) == 1)
+
+    # Writer tertahan di GET_STATUS sampai deadline #1 lewat
+    writer.hold()
+    queue.send("GET_STATUS", key="COM3")
+    assert wait_until(lambda: writer.entered == 2)
+    queue.send("HANDSHAKE_ACK", key="COM4")
+    time.sleep(0.15)
+    # GET_STATUS selesai: #1 antri dikirim ulang di belakang HANDSHAKE_ACK yang sedang ditulis
+    writer.step()
+    assert wait_until(lambda: writer.entered == 3)
+    assert queue.send("ALARM_ACKNOWLEDGED", key="COM3")
+    writer.free()
+
+    assert wait_until(lambda: "ALARM_ACKNOWLEDGED #2" in writer.data)
+    queue.confirm("COM3", 2)
+    assert queue.flush(5)
+    queue.close()
+    assert writer.data == ["ALARM_ACKNOWLEDGED #1", "GET_STATUS", "HANDSHAKE_ACK", "ALARM_ACKNOWLEDGED #2"]
+    assert queue.awaiting == 0
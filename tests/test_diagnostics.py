@@ -0,0 +1,100 @@
+import os
+import pstats
+import threading
+import time
+
+from diagnostics import REPORT_NAME, Diagnostics, StackSamples, profile_mode
+
+ROOT = ("app.py", 1, "main")
+LOOP = ("app.py", 10, "loop")
+READ = ("serial.py", 5, "read")
+
+
+def test_profile_mode_from_environment():
+    assert profile_mode({}) is None
+    assert profile_mode({"ALARM_PROFILE": "off"}) is None
+    assert profile_mode({"ALARM_PROFILE": " CPU "}) == "cpu"
+    assert profile_mode({"ALARM_PROFILE": "1"}) == "full"
+
+
+def test_stack_samples_fold_and_pstats():
+    samples = StackSamples(interval=0.01)
+    for _ in range(3):
+        samples.add("serial-listener", (ROOT, LOOP, READ))
+    samples.add("MainThread", (ROOT, LOOP, LOOP))
+    assert len(samples) == 4
+
+    stats = samples.pstats()
+    cc, nc, tt, ct, callers = stats[READ]
+    assert (cc, nc) == (3, 3) and abs(tt - 0.03) < 1e-9 and abs(ct - 0.03) < 1e-9
+    assert callers[LOOP][:2] == (3, 3)
+    # Rekursi: cumulative loop dihitung sekali per stack, leaf time hanya dari stack MainThread
+    cc, nc, tt, ct, _ = stats[LOOP]
+    assert (cc, nc) == (4, 5) and abs(ct - 0.04) < 1e-9 and abs(tt - 0.01) < 1e-9
+    assert samples.top(1) == [("serial-listener", READ, 3)]
+
+
+def test_folded_output(tmp_path):
+    samples = StackSamples(interval=0.01)
+    samples.add("serial-listener", (ROOT, READ))
+    samples.add("serial-listener", (ROOT, READ))
+    path = tmp_path / "out.folded"
+    samples.write_folded(str(path))
+    assert path.read_text(encoding="utf-8") == "serial-listener;main (app.py:1);read (serial.py:5) 2\n"
+
+
+class Controller:
+    def process_serial_line(self, line):
+        return line.upper()
+
+
+def test_instrument_records_timings_and_uninstrument_restores():
+    diagnostics = Diagnostics()
+    controller = Controller()
+    diagnostics.instrument(controller)
+    assert controller.process_serial_line("ping") == "PING"
+    assert diagnostics.timings.merged("process_serial_line").count == 1
+    diagnostics.uninstrument()
+    assert "process_serial_line" not in vars(controller)
+
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_start_stop_writes_profile_and_report(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy, args=(stop,), name="serial-test", daemon=True)
+    worker.start()
+    diagnostics = Diagnostics(directory=str(tmp_path), sample_interval=0.002, window=60,
+                              memory_interval=60, gauges={"log_pending": lambda: 7})
+    try:
+        assert diagnostics.start()
+        assert not diagnostics.start()
+        deadline = time.monotonic() + 5
+        while len(diagnostics.samples) < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert diagnostics.stop()
+    finally:
+        stop.set()
+        worker.join()
+    assert not diagnostics.enabled and not diagnostics.stop()
+
+    [prof] = [name for name in os.listdir(tmp_path) if name.endswith(".prof")]
+    functions = {name for _, _, name in pstats.Stats(str(tmp_path / prof)).stats}
+    assert "busy" in functions
+    assert (tmp_path / prof.replace(".prof", ".folded")).exists()
+    report = (tmp_path / REPORT_NAME).read_text(encoding="utf-8")
+    assert "gauge log_pending = 7" in report and "profiling stopped" in report
+
+
+def test_rotation_keeps_newest_profiles(tmp_path):
+    for stamp in ("20260101-000000", "20260101-000500", "20260101-001000"):
+        for suffix in (".folded", ".prof"):
+            (tmp_path / f"profile-{stamp}{suffix}").write_text("", encoding="utf-8")
+    Diagnostics(directory=str(tmp_path), keep=2)._rotate()
+    assert sorted(os.listdir(tmp_path)) == [
+        "profile-20260101-000500.folded", "profile-20260101-000500.prof",
+        "profile-20260101-001000.folded", "profile-20260101-001000.prof",
+    ]
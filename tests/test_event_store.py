@@ -0,0 +1,74 @@
+import glob
+import os
+
+from event_store import EVENT_ACK, EVENT_START, EVENT_STOP, EventStore
+
+
+def open_store(path, **options):
+    options.setdefault("fsync", False)
+    return EventStore(str(path), **options)
+
+
+def fill(store, devices=3, rounds=10, base=1000.0):
+    for n in range(rounds):
+        for d in range(devices):
+            ts = base + n * 10 + d
+            store.append(EVENT_START if n % 2 == 0 else EVENT_STOP, f"ESP8266-{d:03d}", ts=ts, n=n)
+    assert store.flush(5)
+
+
+def test_query_by_time_device_and_kind(tmp_path):
+    store = open_store(tmp_path, block_records=4)
+    fill(store)
+    assert store.count == 30
+    assert store.devices() == ["ESP8266-000", "ESP8266-001", "ESP8266-002"]
+
+    window = store.query(start=1020, end=1041)
+    assert [e["ts"] for e in window] == [1020, 1021, 1022, 1030, 1031, 1032, 1040, 1041]
+
+    device = store.query(device="ESP8266-001", kinds=[EVENT_STOP])
+    assert [e["n"] for e in device] == [1, 3, 5, 7, 9]
+
+    newest = store.recent(limit=2, device="ESP8266-002")
+    assert [e["n"] for e in newest] == [9, 8]
+    store.close()
+
+
+def test_reopen_uses_saved_index_and_drops_torn_tail(tmp_path):
+    store = open_store(tmp_path)
+    fill(store)
+    store.close()
+    [segment] = glob.glob(os.path.join(tmp_path, "events-*.log"))
+    with open(segment, "ab") as f:
+        f.write(b'{"ts":2000,"kind":"start","dev')
+
+    store = open_store(tmp_path)
+    store.append(EVENT_ACK, "ESP8266-009", ts=2001)
+    assert store.flush(5)
+    assert store.count == 31
+    assert [e["kind"] for e in store.query(start=1995)] == [EVENT_ACK]
+    store.close()
+    with open(segment, "rb") as f:
+        assert f.read().endswith(b'"device":"ESP8266-009"}\n')
+
+
+def test_segments_roll_over_and_are_indexed_on_restart(tmp_path):
+    store = open_store(tmp_path, segment_bytes=512, block_records=4)
+    fill(store)
+    store.close()
+    assert len(glob.glob(os.path.join(tmp_path, "events-*.log"))) > 1
+
+    # Index dihapus: segmen di-scan ulang
+    for index in glob.glob(os.path.join(tmp_path, "events-*.idx")):
+        os.remove(index)
+    store = open_store(tmp_path, segment_bytes=512, block_records=4)
+    assert store.query(limit=1) and store.count == 30
+    assert [e["n"] for e in store.query(device="ESP8266-000")] == list(range(10))
+    store.close()
+
+
+def test_disabled_store_ignores_appends():
+    store = EventStore(path=None)
+    assert store.append(EVENT_START, "ESP8266-001") == 0
+    assert store.flush(1) and store.query() == []
+    store.close()
@@ -0,0 +1,25 @@
+import urllib.request
+
+from latency_metrics import LatencyHistogram, LatencyMetrics, start_metrics_server
+
+
+def test_bucket_error_is_at_most_one_eighth():
+    for value in (0, 7, 15, 16, 17, 100, 1_000, 12_345, 999_999, 10**9):
+        hist = LatencyHistogram()
+        hist.record(value)
+        hist.record(10**10)                       # max besar: percentile = batas atas bucket
+        upper = hist.percentile(0.5)
+        assert value <= upper <= value + max(value // 8, 0), (value, upper)
+
+
+def test_metrics_server_listens_on_localhost_by_default():
+    metrics = LatencyMetrics()
+    metrics.record("sound", "ESP8266-001", 2_000_000)
+    server = start_metrics_server(metrics, port=0)
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert b"ESP8266-001" in response.read()
+    finally:
+        server.shutdown()
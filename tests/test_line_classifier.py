@@ -0,0 +1,19 @@
+import itertools
+
+import pytest
+
+from line_classifier import classify_line
+from line_corpus import CORPUS, legacy_classify
+
+
+@pytest.mark.parametrize("line, expected", CORPUS)
+def test_corpus_matches_legacy_chain(line, expected):
+    assert classify_line(line) == legacy_classify(line)
+    assert classify_line(line)[0] == expected
+
+
+def test_line_pairs_match_legacy_priority():
+    # Kombinasi pasangan baris untuk menangkap interaksi prioritas
+    for (a, _), (b, _) in itertools.product(CORPUS, repeat=2):
+        for line in (a + " " + b, a + b):
+            assert classify_line(line) == legacy_classify(line), f"mismatch on {line!r}"
@@ -0,0 +1,70 @@
+import threading
+
+from log_pipeline import LogPipeline, LogRing
+
+
+class ManualRoot:
+    def after(self, ms, func, *args):
+        return "after"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class CountingView:
+    def __init__(self):
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def lines(ring):
+    return [line for line, _ in ring.slice(0, len(ring))]
+
+
+def test_ring_keeps_last_lines_with_absolute_sequence():
+    ring = LogRing(capacity=3)
+    ring.extend(range(5))
+    assert ring.slice(0, 3) == [2, 3, 4] and ring[-1] == 4
+    assert (ring.first_seq, ring.total) == (2, 5)
+
+
+def test_drain_moves_one_batch_and_refreshes_views_once():
+    ring = LogRing()
+    pipeline = LogPipeline(ManualRoot(), ring, max_batch=3, echo=False)
+    view = CountingView()
+    pipeline.add_view(view)
+    for i in range(5):
+        pipeline.push(f"line {i}")
+    pipeline._drain()
+    assert lines(ring) == ["line 0", "line 1", "line 2"] and pipeline.backlog == 2
+    assert view.refreshes == 2                    # add_view + satu batch
+    pipeline.flush()
+    assert lines(ring)[-1] == "line 4" and pipeline.backlog == 0
+
+
+def test_push_from_many_threads_keeps_every_line():
+    ring = LogRing(capacity=10000)
+    pipeline = LogPipeline(ManualRoot(), ring, echo=False)
+    threads = [threading.Thread(target=lambda n=n: [pipeline.push(f"{n}-{i}") for i in range(1000)])
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pipeline.flush()
+    assert len(ring) == 4000 and len(set(lines(ring))) == 4000
+
+
+def test_full_queue_drops_oldest_and_reports_once():
+    ring = LogRing()
+    pipeline = LogPipeline(ManualRoot(), ring, echo=False, max_pending=10)
+    for i in range(25):
+        pipeline.push(f"line {i}")
+    assert pipeline.backlog == 10 and pipeline.dropped == 15
+    pipeline.flush()
+    assert lines(ring) == ["⚠ 15 log lines dropped (GUI log backlog full)"] + [f"line {i}" for i in range(15, 25)]
+    pipeline.push("next")
+    pipeline.flush()
+    assert lines(ring)[-1] == "next" and len(ring) == 12
@@ -0,0 +1,62 @@
+from log_tail import IntervalStats, alarm_intervals, read_records
+
+
+def intervals(tmp_path, lines):
+    path = tmp_path / "system.log"
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return list(alarm_intervals(read_records(str(path))))
+
+
+def test_back_to_back_triggers_count_as_duplicate(tmp_path):
+    [interval] = intervals(tmp_path, [
+        "[2025-12-25T03:53:36.932Z] [ALARM] 🚨 ALARM TRIGGERED by system_test (test)",
+        "[2025-12-25T03:53:37.100Z] [ALARM] 🚨 ALARM TRIGGERED by system_test (test)",
+        "[2025-12-25T03:53:46.950Z] [INFO] Alarm stopped by auto_timeout",
+    ])
+    assert (interval.device, interval.source, interval.responder) == ("system_test", "test", "auto_timeout")
+    assert interval.seconds == 10.018
+    assert interval.duplicates == 1
+    assert not interval.human
+
+
+def test_button_warning_is_not_counted_twice(tmp_path):
+    [interval] = intervals(tmp_path, [
+        "[2025-12-25T03:53:47.379Z] [ALARM] 🚨 ALARM TRIGGERED by system_test (test)",
+        "[2025-12-25T03:53:47.402Z] [INFO] Data saved successfully",
+        "[2025-12-25T03:53:48.150Z] [INFO] Received data from device: ESP8266-TEST",
+        "[2025-12-25T03:53:48.151Z] [ALARM] Emergency button pressed on device!",
+        "[2025-12-25T03:53:48.152Z] [WARN] Alarm already active, ignoring duplicate trigger",
+        "[2025-12-25T03:53:48.155Z] [INFO] Data saved successfully",
+        "[2025-12-25T03:53:53.656Z] [WARN] Alarm already active, ignoring duplicate trigger",
+        "[2025-12-25T03:53:57.403Z] [INFO] Alarm stopped by auto_timeout",
+    ])
+    assert interval.duplicates == 2
+
+
+def test_button_starts_alarm_for_last_device(tmp_path):
+    first, second = intervals(tmp_path, [
+        "[2025-12-25T03:53:48.150Z] [INFO] Received data from device: ESP8266-TEST",
+        "[2025-12-25T03:53:48.151Z] [ALARM] Emergency button pressed on device!",
+        "[2025-12-25T03:53:57.403Z] [INFO] Alarm stopped by nurse_1",
+        "[2025-12-25T03:55:44.286Z] [ALARM] 🚨 ALARM TRIGGERED by system_test (test)",
+        "[2025-12-25T03:55:54.304Z] [INFO] Alarm stopped by auto_timeout",
+    ])
+    assert (first.device, first.source, first.responder, first.duplicates) == ("ESP8266-TEST", "button", "nurse_1", 0)
+    assert (second.device, second.duplicates) == ("system_test", 0)
+
+
+def test_auto_timeout_is_not_counted_as_a_response(tmp_path):
+    stats = IntervalStats()
+    for interval in intervals(tmp_path, [
+        "[2025-12-25T03:50:00.000Z] [ALARM] 🚨 ALARM TRIGGERED by ESP8266-101 (button)",
+        "[2025-12-25T03:50:04.000Z] [INFO] Alarm acknowledged by nurse_1",
+        "[2025-12-25T03:51:00.000Z] [ALARM] 🚨 ALARM TRIGGERED by ESP8266-101 (button)",
+        "[2025-12-25T03:51:30.000Z] [INFO] Alarm stopped by auto_timeout",
+        "[2025-12-25T03:52:00.000Z] [ALARM] 🚨 ALARM TRIGGERED by system_test (test)",
+        "[2025-12-25T03:52:10.000Z] [INFO] Alarm stopped by auto_timeout",
+    ]):
+        stats.add(interval)
+    assert stats.summary_lines() == [
+        "ESP8266-101: 2 alarms, 1 stopped without response, response avg 4.0 s, max 4.0 s",
+        "system_test: 1 alarms, 1 stopped without response, no response",
+    ]
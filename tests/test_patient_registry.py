@@ -0,0 +1,89 @@
+import json
+
+from patient_registry import PatientRegistry, normalize_mac
+
+HEADER = "DeviceID,MACAddress,PatientName,Room,Bed\n"
+
+
+def registry_for(tmp_path, text, json_data=None):
+    csv_path = tmp_path / "medical_data.csv"
+    csv_path.write_text(text, encoding="utf-8")
+    json_path = None
+    if json_data is not None:
+        json_path = tmp_path / "patients.json"
+        json_path.write_text(json.dumps(json_data), encoding="utf-8")
+    registry = PatientRegistry(json_path=json_path and str(json_path), csv_path=str(csv_path))
+    registry.refresh()
+    return registry, csv_path
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_lookup_by_device_mac_and_room(tmp_path):
+    registry, _ = registry_for(tmp_path, HEADER + "ESP-1,bc-ff-4d-29-d2-95,Alice,101,1\n")
+    assert registry.lookup(device_id="esp-1").patient == "Alice"
+    assert registry.lookup(mac="BCFF4D29D295").device_id == "ESP-1"
+    assert registry.lookup(room=" 101 ").patient == "Alice"
+    assert registry.lookup(device_id="ESP-9") is None
+    assert normalize_mac("bc-ff-4d-29-d2-95") == "BC:FF:4D:29:D2:95"
+
+
+def test_json_wins_over_csv(tmp_path):
+    registry, _ = registry_for(tmp_path, HEADER + "ESP-1,,Alice,101,1\n",
+                               json_data={"patients": [{"deviceId": "ESP-1", "name": "Budi", "room": "204"}]})
+    assert registry.lookup(device_id="ESP-1").patient == "Budi"
+    assert registry.count == 2
+
+
+def test_append_is_incremental(tmp_path):
+    registry, path = registry_for(tmp_path, HEADER + "ESP-1,,Alice,101,1\n")
+    append(path, "ESP-2,,Bob,102,1\n")
+    assert registry.refresh()
+    assert registry.count == 2 and registry.lookup(device_id="ESP-2").patient == "Bob"
+
+
+def test_unterminated_last_row_is_replaced_on_append(tmp_path):
+    registry, path = registry_for(tmp_path, HEADER + "ESP-1,,Alice,101,1\nESP-2,,Bob,102")
+    assert registry.count == 2 and registry.lookup(device_id="ESP-2").room == "102"
+
+    append(path, ",2\nESP-3,,Cici,103,1\n")
+    assert registry.refresh()
+    assert registry.count == 3
+    assert registry.lookup(device_id="ESP-2").bed == "2"
+    assert registry.lookup(device_id="ESP-3").patient == "Cici"
+
+
+def test_unterminated_row_keeps_earlier_entry_for_same_key(tmp_path):
+    registry, path = registry_for(tmp_path, HEADER + "ESP-1,,Alice,101,1\nESP-1")
+    append(path, "0,,Dewi,110,1\n")
+    registry.refresh()
+    assert registry.count == 2
+    assert registry.lookup(device_id="ESP-1").patient == "Alice"
+    assert registry.lookup(device_id="ESP-10").patient == "Dewi"
+
+
+def test_header_without_newline_is_not_indexed(tmp_path):
+    registry, path = registry_for(tmp_path, HEADER.rstrip("\n"))
+    assert registry.count == 0
+
+    append(path, "\nESP-1,,Alice,101,1\n")
+    registry.refresh()
+    assert registry.count == 1
+    assert registry.lookup(device_id="DeviceID") is None
+    assert registry.lookup(device_id="ESP-1").patient == "Alice"
+
+
+def test_rewrite_past_first_block_reloads_fully(tmp_path):
+    rows = [f"ESP-{i:04d},,Patient {i},{i},1\n" for i in range(300)]
+    registry, path = registry_for(tmp_path, HEADER + "".join(rows))
+    assert registry.count == 300
+
+    rows[250] = "ESP-0250,,Changed Name,250,1\n"
+    path.write_text(HEADER + "".join(rows) + "ESP-0300,,Patient 300,300,1\n", encoding="utf-8")
+    registry.refresh()
+    assert registry.count == 301
+    assert registry.lookup(device_id="ESP-0250").patient == "Changed Name"
+    assert registry.lookup(device_id="ESP-0300").patient == "Patient 300"
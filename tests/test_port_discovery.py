@@ -0,0 +1,71 @@
+import time
+
+from port_discovery import PING, PortCache, discover_ports, probe_port
+from serial_fakes import BOOT_S, HANDSHAKE, FakePort
+
+
+def probe(port, timeout=1.0):
+    return probe_port("COM9", lambda name: port, timeout)
+
+
+def test_boot_rom_line_is_not_identification_and_ping_is_resent():
+    port = FakePort()
+    result = probe(port)
+    assert result.identified
+    assert result.lines[-1] == "PONG"
+    assert port.writes.count(PING) >= 2
+    assert result.elapsed >= BOOT_S
+
+
+def test_handshake_reply_identifies_with_device_id():
+    result = probe(FakePort(reply=HANDSHAKE, boot_output=b""))
+    assert result.identified
+    assert result.handshake["DEVICE_ID"] == "ESP8266-101"
+
+
+def test_other_serial_device_printing_lines_is_not_identified():
+    port = FakePort(reply=None, boot_output=b"", chatter=b"TEMP: 21.5\n")
+    result = probe(port, timeout=0.3)
+    assert result.ok and not result.identified
+    assert "TEMP: 21.5" in result.lines
+    result.close()
+
+
+def test_silent_port_is_returned_unidentified():
+    result = probe(FakePort(reply=None, boot_output=b""), timeout=0.2)
+    assert result.ok and not result.identified and not result.lines
+
+
+def test_silent_cached_port_loses_to_identified_port():
+    ports = {"COM3": FakePort(reply=None, boot_output=b""),
+             "COM9": FakePort(reply=HANDSHAKE, boot_output=b"")}
+    cache = PortCache(path=None)
+    cache.remember("COM3")
+    [result] = discover_ports(["COM9", "COM3"], ports.__getitem__, cache, timeout=1.0)
+    assert result.port == "COM9" and result.identified
+    # Probe COM3 dibatalkan dan ditutup di thread probe
+    deadline = time.monotonic() + 1.0
+    while ports["COM3"].is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not ports["COM3"].is_open
+    result.close()
+
+
+def test_unidentified_fallback_prefers_cached_port():
+    cache = PortCache(path=None)
+    cache.remember("COM9")
+    opener = lambda name: FakePort(reply=None, boot_output=b"")
+    [result] = discover_ports(["COM3", "COM9"], opener, cache, timeout=0.2)
+    assert result.port == "COM9" and not result.identified
+    result.close()
+
+
+def test_read_timeout_restored_when_probe_fails():
+    class BrokenPort(FakePort):
+        def reset_input_buffer(self):
+            raise OSError("device disconnected")
+
+    port = BrokenPort()
+    result = probe(port)
+    assert isinstance(result.error, OSError) and not result.ok
+    assert port.timeout == 1
@@ -0,0 +1,40 @@
+from serial_fakes import FakePort
+
+GOOD = ["/dev/ttyUSB0", "/dev/ttyUSB1"]
+BROKEN = "/dev/ttyUSB2"
+
+
+def multi_link_core(make_core):
+    core = make_core(multi_link=True)
+    core.find_serial_ports = lambda: GOOD + [BROKEN]
+
+    def open_port(port):
+        if port == BROKEN:
+            raise OSError("could not open port")
+        return FakePort(boot_output=b"")
+
+    core.open_serial_port = open_port
+    core.connect_serial()
+    return core
+
+
+def test_unopenable_candidate_does_not_keep_reconnecting(make_core):
+    core = multi_link_core(make_core)
+    assert sorted(core.links) == GOOD
+    assert core.failed_ports == {BROKEN}
+    assert not core.needs_connection()
+
+
+def test_lost_esp_port_is_still_reconnected(make_core):
+    core = multi_link_core(make_core)
+    link = core.links[GOOD[0]]
+    core.multiplexer.remove(link)
+    core.on_link_error(link, OSError("device disconnected"))
+    assert core.needs_connection()
+
+
+def test_replugged_port_is_tried_again(make_core):
+    core = multi_link_core(make_core)
+    core.on_ports_removed([BROKEN])
+    assert BROKEN not in core.failed_ports
+    assert core.needs_connection()
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+from binary_frames import FrameDecoder, FrameEncoder
+from serial_link import LinkMultiplexer, SerialLink
+
+
+class PipeConn:
+    """Port palsu di atas os.pipe: punya fileno, jadi ditunggu lewat selector"""
+
+    def __init__(self):
+        self._read, self.writer = os.pipe()
+        self.is_open = True
+
+    def fileno(self):
+        return self._read
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    def read(self, size=1):
+        return os.read(self._read, 4096)
+
+    def write(self, data):
+        return os.write(self.writer, data)
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            os.close(self._read)
+            os.close(self.writer)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_close_joins_loop_before_closing_selector():
+    mux = LinkMultiplexer(lambda *args: None, lambda *args: None)
+    link = SerialLink("/dev/ttyUSB0", PipeConn())
+    mux.add(link)
+    mux.start(lambda: True)
+    time.sleep(0.05)                               # loop sedang di select(1.0)
+    begin = time.perf_counter()
+    mux.close()
+    assert not mux._thread.is_alive()
+    assert time.perf_counter() - begin < 0.5
+    assert not link.is_open
+
+
+def test_framing_error_is_reported_without_a_following_line():
+    calls = []
+    mux = LinkMultiplexer(lambda link, lines, rx, framed: calls.append((lines, list(link.framer.errors))),
+                          lambda *args: None)
+    link = SerialLink("/dev/ttyUSB0", PipeConn())
+    link.framer = FrameDecoder()
+    mux.add(link)
+    mux.start(lambda: True)
+    try:
+        frame = bytearray(FrameEncoder().emergency())
+        frame[-1] ^= 0xFF                          # CRC rusak
+        link.conn.write(bytes(frame))
+        assert wait_for(lambda: calls), "corrupt frame must be reported immediately"
+        lines, errors = calls[0]
+        assert lines == [] and "CRC mismatch" in errors[0]
+    finally:
+        mux.close()
+
+
+def test_lines_are_delivered_per_link():
+    received = []
+    done = threading.Event()
+
+    def on_lines(link, lines, rx, framed):
+        received.extend((link.port, line) for line in lines)
+        done.set()
+
+    mux = LinkMultiplexer(on_lines, lambda *args: None)
+    links = [SerialLink(f"/dev/ttyUSB{i}", PipeConn()) for i in range(2)]
+    for link in links:
+        mux.add(link)
+    mux.start(lambda: True)
+    try:
+        links[1].conn.write(b"!ALARM_START!\n")
+        assert done.wait(2)
+        assert received == [("/dev/ttyUSB1", "!ALARM_START!")]
+    finally:
+        mux.close()
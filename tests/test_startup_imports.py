@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "tkinter", "serial", "winsound")
+
+
+def test_headless_core_import_stays_lightweight():
+    code = ("import sys, alarm_core; "
+            f"print(','.join(name for name in {HEAVY!r} if name in sys.modules))")
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    assert loaded == ""
+
+
+def test_vitals_monitor_starts_in_warm_up_thread(make_core):
+    core = make_core()
+    deadline = time.monotonic() + 10
+    while core.vitals is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert core.vitals is not None and core.vitals._thread is not None
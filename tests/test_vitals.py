@@ -0,0 +1,73 @@
+import pytest
+
+from vitals import VitalsMonitor, parse_vitals
+
+np = pytest.importorskip("numpy")
+
+
+def feed(monitor, device, values, field="HR"):
+    for value in values:
+        monitor.record(device, f"OK, {field}={value}")
+    return monitor.tick()
+
+
+def test_parse_vitals_aliases():
+    assert parse_vitals("OK, BPM=72, O2: 97, BATT=80, RSSI=-61, TEMP=36.5") == {
+        "hr": 72.0, "spo2": 97.0, "battery": 80.0, "rssi": -61.0}
+
+
+def test_single_spike_does_not_breach_but_sustained_median_does():
+    monitor = VitalsMonitor()
+    assert feed(monitor, "ESP8266-101", [72, 75, 180, 74, 73]) == []
+
+    [breach] = feed(monitor, "ESP8266-101", [150, 160, 170])
+    assert (breach.field, breach.value, breach.cleared, breach.alarm) == ("hr", 150.0, False, True)
+    assert breach.describe() == "HR 150 > 140"
+    # Masih melanggar: tidak dilaporkan ulang
+    assert feed(monitor, "ESP8266-101", [165]) == []
+
+    [cleared] = feed(monitor, "ESP8266-101", [80, 82, 81])
+    assert cleared.cleared and cleared.describe() == "HR 82 back in range"
+    assert monitor.stats()["breaches"] == 1 and monitor.stats()["active"] == 0
+
+
+def test_too_few_samples_are_not_evaluated():
+    monitor = VitalsMonitor()
+    assert feed(monitor, "ESP8266-101", [85, 86], field="SPO2") == []
+    [breach] = feed(monitor, "ESP8266-101", [84], field="SPO2")
+    assert breach.describe() == "SpO2 85 < 90" and breach.alarm
+
+
+def test_silent_device_keeps_its_state():
+    monitor = VitalsMonitor()
+    feed(monitor, "ESP8266-101", [10, 10, 10], field="BATTERY")
+    assert feed(monitor, "ESP8266-202", [90, 90, 90], field="BATTERY") == []
+    assert monitor.stats()["active"] == 1
+
+
+def test_ring_wraps_around_history():
+    monitor = VitalsMonitor(history=4, recent=3)
+    for start in range(0, 10, 3):
+        feed(monitor, "ESP8266-101", range(start + 60, start + 63))
+    history = monitor.snapshot("ESP8266-101")["hr"]
+    assert history == {"last": 71.0, "mean": 69.5, "min": 68.0, "max": 71.0, "samples": 4}
+
+
+def test_burst_longer_than_history_keeps_newest_samples():
+    monitor = VitalsMonitor(history=4, recent=3)
+    feed(monitor, "ESP8266-101", range(60, 70))
+    assert monitor.snapshot("ESP8266-101")["hr"]["min"] == 66.0
+    [breach] = feed(monitor, "ESP8266-101", [150, 150, 150])
+    assert breach.value == 150.0
+
+
+def test_device_array_grows_past_capacity():
+    monitor = VitalsMonitor(capacity=1)
+    for n in range(3):
+        monitor.record(f"ESP8266-{n:03d}", "HR=30, SPO2=99")
+        monitor.record(f"ESP8266-{n:03d}", "HR=30, SPO2=99")
+        monitor.record(f"ESP8266-{n:03d}", "HR=30, SPO2=99")
+    events = monitor.tick()
+    assert monitor.capacity >= 3
+    assert sorted(e.device_id for e in events) == ["ESP8266-000", "ESP8266-001", "ESP8266-002"]
+    assert all(e.field == "hr" and e.describe() == "HR 30 < 40" for e in events)
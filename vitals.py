@@ -0,0 +1,289 @@
+import re
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:            # Tanpa NumPy telemetri vital dimatikan, STATUS tetap di-log
+    np = None
+
+# ============================================
+# KONFIGURASI TELEMETRI VITAL
+# ============================================
+VITAL_FIELDS = ("hr", "spo2", "battery", "rssi")
+FIELD_LABELS = {"hr": "HR", "spo2": "SpO2", "battery": "Battery", "rssi": "RSSI"}
+
+# Nama field di payload STATUS (huruf besar) -> field vital
+FIELD_ALIASES = {
+    "HR": "hr", "BPM": "hr", "HEART_RATE": "hr", "PULSE": "hr",
+    "SPO2": "spo2", "O2": "spo2",
+    "BATTERY": "battery", "BATT": "battery", "BAT": "battery",
+    "RSSI": "rssi",
+}
+
+# (batas bawah, batas atas) per field; None = tanpa batas
+THRESHOLDS = {
+    "hr": (40, 140),
+    "spo2": (90, None),
+    "battery": (15, None),
+    "rssi": (-90, None),
+}
+ALARM_FIELDS = frozenset({"hr", "spo2"})   # Vital pasien memicu alarm; battery/RSSI cukup peringatan
+
+HISTORY_SAMPLES = 60           # Ring per device: 60 STATUS terakhir
+RECENT_SAMPLES = 5             # Ambang dicek pada median sample terakhir ini, bukan satu spike
+MIN_SAMPLES = 3                # Sample valid minimal di jendela itu sebelum field dievaluasi
+TICK_S = 1.0                   # Interval evaluasi semua device sekaligus
+INITIAL_DEVICES = 64           # Kapasitas awal array device; tumbuh 2x saat penuh
+
+_PAIR = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*[=:]\s*(-?\d+(?:\.\d+)?)")
+
+
+def parse_vitals(payload):
+    """'OK, HR=72, SPO2=97, RSSI=-61' -> {"hr": 72.0, "spo2": 97.0, "rssi": -61.0}"""
+    values = {}
+    for key, value in _PAIR.findall(payload):
+        field = FIELD_ALIASES.get(key.upper())
+        if field is not None:
+            values[field] = float(value)
+    return values
+
+
+class VitalBreach:
+    """Perubahan state ambang satu field satu device (mulai melanggar atau pulih)"""
+    __slots__ = ("device_id", "field", "value", "low", "high", "cleared")
+
+    def __init__(self, device_id, field, value, low, high, cleared=False):
+        self.device_id = device_id
+        self.field = field
+        self.value = value
+        self.low = low
+        self.high = high
+        self.cleared = cleared
+
+    @property
+    def alarm(self):
+        return self.field in ALARM_FIELDS
+
+    def describe(self):
+        label = FIELD_LABELS.get(self.field, self.field)
+        if self.cleared:
+            return f"{label} {self.value:g} back in range"
+        if self.low is not None and self.value < self.low:
+            return f"{label} {self.value:g} < {self.low:g}"
+        return f"{label} {self.value:g} > {self.high:g}"
+
+
+# ============================================
+# MONITOR VITAL
+# ============================================
+class VitalsMonitor:
+    """Riwayat vital per device di ring array NumPy + cek ambang tervektorisasi.
+
+    record() dipanggil thread serial: payload STATUS di-parse lalu hanya
+    ditambahkan ke antrian. Tiap TICK_S thread "vitals" menyebar seluruh
+    antrian ke ring (device, HISTORY_SAMPLES, field) float32 yang
+    dialokasikan sekali (NaN = kosong), lalu menghitung median
+    RECENT_SAMPLES terakhir (satu spike tidak memicu alarm) dan
+    membandingkannya dengan ambang untuk semua device yang mengirim STATUS
+    dalam satu operasi array. Device yang diam tidak dievaluasi, jadi
+    state-nya tetap. Hanya perubahan state (mulai melanggar / pulih) yang
+    dilaporkan ke on_breach.
+
+    NumPy tidak terpasang -> enabled False, record() hanya mem-parse.
+    """
+
+    def __init__(self, fields=VITAL_FIELDS, thresholds=THRESHOLDS, history=HISTORY_SAMPLES,
+                 recent=RECENT_SAMPLES, min_samples=MIN_SAMPLES, interval=TICK_S,
+                 capacity=INITIAL_DEVICES, on_breach=None, on_error=None):
+        self.enabled = np is not None
+        self.fields = tuple(fields)
+        self.thresholds = {field: thresholds.get(field, (None, None)) for field in self.fields}
+        self.history = history
+        self.recent = min(recent, history)
+        self.min_samples = min_samples
+        self.interval = interval
+        self.on_breach = on_breach
+        self.on_error = on_error
+        self.devices = {}              # device_id -> baris array
+        self.names = []                # baris array -> device_id
+        self.records = 0
+        self.ticks = 0
+        self.breaches = 0
+        self.last_tick_us = 0.0
+        # Antrian sejak tick terakhir: baris, urutan dalam device itu, nilai per field (rata)
+        self._rows = []
+        self._ranks = []
+        self._values = []
+        self._queued = {}              # baris -> jumlah STATUS di antrian
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if not self.enabled:
+            return
+
+        self._ring = np.full((capacity, history, len(self.fields)), np.nan, dtype=np.float32)
+        self._head = np.zeros(capacity, dtype=np.int64)           # Slot berikutnya yang ditulis
+        self._active = np.zeros((capacity, len(self.fields)), dtype=bool)
+        self._low = np.array([-np.inf if self.thresholds[f][0] is None else self.thresholds[f][0]
+                              for f in self.fields], dtype=np.float32)
+        self._high = np.array([np.inf if self.thresholds[f][1] is None else self.thresholds[f][1]
+                               for f in self.fields], dtype=np.float32)
+        self._recent_back = np.arange(self.recent, 0, -1)        # Slot head-recent .. head-1
+
+    @property
+    def capacity(self):
+        return len(self._head) if self.enabled else 0
+
+    # ============================================
+    # INPUT (THREAD SERIAL)
+    # ============================================
+    def record(self, device_id, payload):
+        """Catat payload STATUS satu device; kembalikan field vital yang terbaca"""
+        values = parse_vitals(payload) if isinstance(payload, str) else payload
+        if not self.enabled or not device_id or not values:
+            return values
+        row_values = tuple(values.get(field, np.nan) for field in self.fields)
+        with self._lock:
+            row = self.devices.get(device_id)
+            if row is None:
+                row = self._add_device(device_id)
+            rank = self._queued.get(row, 0)
+            self._queued[row] = rank + 1
+            self._rows.append(row)
+            self._ranks.append(rank)
+            self._values.extend(row_values)
+            self.records += 1
+        return values
+
+    def _add_device(self, device_id):
+        row = len(self.names)
+        if row == self.capacity:
+            self._grow(max(row * 2, INITIAL_DEVICES))
+        self.names.append(device_id)
+        self.devices[device_id] = row
+        return row
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self._ring = np.concatenate(
+            [self._ring, np.full((extra,) + self._ring.shape[1:], np.nan, dtype=np.float32)])
+        self._head = np.concatenate([self._head, np.zeros(extra, dtype=np.int64)])
+        self._active = np.concatenate([self._active, np.zeros((extra, len(self.fields)), dtype=bool)])
+
+    # ============================================
+    # EVALUASI (THREAD VITALS)
+    # ============================================
+    def tick(self):
+        """Terapkan antrian ke ring lalu cek ambang device yang mengirim STATUS; list VitalBreach"""
+        if not self.enabled:
+            return []
+        begin = time.perf_counter_ns()
+        with self._lock:
+            if not self._rows:
+                return []
+            devices = self._apply()
+            events = self._evaluate(devices)
+        self.ticks += 1
+        self.last_tick_us = (time.perf_counter_ns() - begin) / 1000
+        return events
+
+    def _apply(self):
+        """Sebar semua baris antrian ke slot ring masing-masing device sekaligus"""
+        rows = np.array(self._rows, dtype=np.int64)
+        rank = np.array(self._ranks, dtype=np.int64)
+        values = np.array(self._values, dtype=np.float32).reshape(len(rows), len(self.fields))
+        devices = np.fromiter(self._queued.keys(), dtype=np.int64, count=len(self._queued))
+        counts = np.fromiter(self._queued.values(), dtype=np.int64, count=len(self._queued))
+        self._rows, self._ranks, self._values, self._queued = [], [], [], {}
+
+        # Lebih dari `history` STATUS dalam satu tick: hanya yang terakhir yang muat di ring
+        if counts.max() > self.history:
+            per_row = np.zeros(self.capacity, dtype=np.int64)
+            per_row[devices] = counts
+            keep = rank >= per_row[rows] - self.history
+            rows, rank, values = rows[keep], rank[keep], values[keep]
+        self._ring[rows, (self._head[rows] + rank) % self.history] = values
+        self._head[devices] = (self._head[devices] + counts) % self.history
+        return devices
+
+    def _evaluate(self, devices):
+        # Median RECENT_SAMPLES slot terakhir per (device, field); NaN (kosong) diurutkan ke belakang
+        slots = (self._head[devices, None] - self._recent_back) % self.history
+        recent = np.sort(self._ring[devices[:, None], slots], axis=1)
+        samples = np.count_nonzero(~np.isnan(recent), axis=1)
+        middle = np.maximum(samples - 1, 0)[:, None, :]
+        median = (np.take_along_axis(recent, middle // 2, axis=1)[:, 0]
+                  + np.take_along_axis(recent, (middle + 1) // 2, axis=1)[:, 0]) / 2
+
+        with np.errstate(invalid="ignore"):
+            breach = (samples >= self.min_samples) & ((median < self._low) | (median > self._high))
+        active = self._active[devices]
+        changed = breach != active
+        if not changed.any():
+            return []
+        self._active[devices] = breach
+
+        events = []
+        for index, column in zip(*np.nonzero(changed)):
+            field = self.fields[column]
+            low, high = self.thresholds[field]
+            cleared = not breach[index, column]
+            events.append(VitalBreach(self.names[devices[index]], field, round(float(median[index, column]), 1),
+                                      low, high, cleared))
+            if not cleared:
+                self.breaches += 1
+        return events
+
+    # ============================================
+    # THREAD + QUERY
+    # ============================================
+    def start(self):
+        """Evaluasi periodik di thread sendiri; tidak ada thread tanpa NumPy"""
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="vitals", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                events = self.tick()
+                if events and self.on_breach:
+                    self.on_breach(events)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(str(e))
+
+    def snapshot(self, device_id):
+        """Statistik riwayat satu device: field -> {last, mean, min, max, samples}"""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            row = self.devices.get(device_id)
+            if row is None:
+                return {}
+            # Urut dari lama ke baru
+            history = np.roll(self._ring[row], -int(self._head[row]), axis=0)
+        result = {}
+        for column, field in enumerate(self.fields):
+            values = history[:, column][~np.isnan(history[:, column])]
+            if len(values):
+                result[field] = {"last": float(values[-1]), "mean": round(float(values.mean()), 1),
+                                 "min": float(values.min()), "max": float(values.max()),
+                                 "samples": len(values)}
+        return result
+
+    def stats(self):
+        count = len(self.names)
+        return {
+            "enabled": self.enabled,
+            "devices": count,
+            "records": self.records,
+            "ticks": self.ticks,
+            "breaches": self.breaches,
+            "active": int(self._active[:count].sum()) if self.enabled else 0,
+            "tick_us": round(self.last_tick_us, 1),
+        }